@@ -35,7 +35,11 @@ Esecuzione_test = st.Page("views/esecuzione_test.py", title="Esecuzione Test", i
 Visualizza_risultati = st.Page("views/visualizza_risultati.py",
                                title="Visualizzazione Risultati",
                                icon=":material/bar_chart:")
+Analisi_risultati = st.Page("views/analisi_risultati.py",
+                            title="Analisi Risultati",
+                            icon=":material/leaderboard:")
 
 # --- Navigazione ---
-pg = st.navigation([Home, Configurazione_API, Gestione_domande, Gestione_set, Esecuzione_test, Visualizza_risultati])
+pg = st.navigation([Home, Configurazione_API, Gestione_domande, Gestione_set, Esecuzione_test, Visualizza_risultati,
+                    Analisi_risultati])
 pg.run()
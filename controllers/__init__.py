@@ -24,6 +24,9 @@ from .question_controller import (
     update_question,
     delete_question,
     get_filtered_questions,
+    get_questions_page,
+    get_question_categories,
+    search_questions,
     save_question_action,
     delete_question_action,
     import_questions_action,
@@ -47,18 +50,46 @@ from .question_set_controller import (
 from .test_controller import (
     load_results,
     refresh_results,
+    load_partial_results,
+    list_incomplete_runs,
     import_results_action,
     export_results_action,
+    export_results_file,
     generate_answer,
+    generate_answer_async,
     evaluate_answer,
+    evaluate_answer_async,
+    evaluate_answers_batch,
     run_test,
+    resume_test,
+    run_matrix,
+)
+
+from .job_controller import (
+    submit_test_run,
+    submit_resume_run,
+    submit_matrix_run,
+    get_job_status,
+    list_recent_jobs,
 )
 
 from .result_controller import (
     get_results,
+    get_result_summaries,
+    get_results_by_ids,
+    get_result_statistics,
     list_set_names,
     list_model_names,
+    list_result_set_names,
+    list_result_model_names,
     prepare_select_options,
+    prepare_summary_options,
+)
+
+from .analytics_controller import (
+    get_leaderboard,
+    get_score_trends,
+    get_regressions,
 )
 
 from models.test_result import TestResult
@@ -87,6 +118,9 @@ __all__ = [
     "update_question",
     "delete_question",
     "get_filtered_questions",
+    "get_questions_page",
+    "get_question_categories",
+    "search_questions",
     "save_question_action",
     "delete_question_action",
     "import_questions_action",
@@ -104,16 +138,40 @@ __all__ = [
     # Risultati dei test
     "load_results",
     "refresh_results",
+    "load_partial_results",
+    "list_incomplete_runs",
     "import_results_action",
     "export_results_action",
+    "export_results_file",
     "generate_answer",
+    "generate_answer_async",
     "evaluate_answer",
+    "evaluate_answer_async",
+    "evaluate_answers_batch",
     "calculate_statistics",
     "run_test",
+    "resume_test",
+    "run_matrix",
+    # Esecuzione in background
+    "submit_test_run",
+    "submit_resume_run",
+    "submit_matrix_run",
+    "get_job_status",
+    "list_recent_jobs",
     "get_results",
+    "get_result_summaries",
+    "get_results_by_ids",
+    "get_result_statistics",
     "list_set_names",
     "list_model_names",
+    "list_result_set_names",
+    "list_result_model_names",
     "prepare_select_options",
+    "prepare_summary_options",
+    # Analisi dei risultati
+    "get_leaderboard",
+    "get_score_trends",
+    "get_regressions",
     # Avvio
     "get_initial_state",
 ]
@@ -0,0 +1,56 @@
+"""Classifiche, andamenti e regressioni dei risultati dei test."""
+
+import logging
+from typing import Sequence
+
+import pandas as pd
+
+from utils.cache import get_result_analytics
+from utils.result_analytics import DIMENSIONS, REGRESSION_THRESHOLD
+from .question_set_controller import load_sets
+from .result_controller import _preset_models
+
+logger = logging.getLogger(__name__)
+
+
+def _with_set_names(df: pd.DataFrame) -> pd.DataFrame:
+    """Aggiunge la colonna ``set_name`` accanto a ``set_id``."""
+    if "set_id" not in df.columns:
+        return df
+    sets_df = load_sets()
+    names = (
+        dict(zip(sets_df["id"].astype(str), sets_df["name"]))
+        if not sets_df.empty
+        else {}
+    )
+    df = df.copy()
+    df.insert(
+        df.columns.get_loc("set_id") + 1,
+        "set_name",
+        df["set_id"].astype(str).map(names).fillna("Set Sconosciuto"),
+    )
+    return df
+
+
+def get_leaderboard(by: Sequence[str] = DIMENSIONS) -> pd.DataFrame:
+    """Classifica per modello, set e/o categoria (vedi :meth:`ResultAnalytics.leaderboard`)."""
+    board = get_result_analytics().leaderboard(by, _preset_models())
+    return _with_set_names(board)
+
+
+def get_score_trends(by: Sequence[str] = ("model",), freq: str = "D") -> pd.DataFrame:
+    """Andamento del punteggio medio per periodo (vedi :meth:`ResultAnalytics.trends`)."""
+    trends = get_result_analytics().trends(by, freq, _preset_models())
+    return _with_set_names(trends)
+
+
+def get_regressions(
+    by: Sequence[str] = ("model", "set_id"),
+    threshold: float = REGRESSION_THRESHOLD,
+) -> pd.DataFrame:
+    """Gruppi peggiorati nell'ultima esecuzione (vedi :meth:`ResultAnalytics.regressions`)."""
+    regressions = get_result_analytics().regressions(by, threshold, _preset_models())
+    return _with_set_names(regressions)
+
+
+__all__ = ["get_leaderboard", "get_score_trends", "get_regressions"]
@@ -81,7 +81,8 @@ def save_preset(
     if not is_valid:
         return False, message, load_presets()
 
-    df = load_presets()
+    version = _get_api_presets.version
+    df = load_presets().copy()
     preset_data = {
         "name": data.get("name"),
         "provider_name": data.get("provider_name", ""),
@@ -90,27 +91,34 @@ def save_preset(
         "model": data.get("model"),
         "temperature": float(data.get("temperature", 0.0)),
         "max_tokens": int(data.get("max_tokens", 1000)),
+        "max_concurrency": int(data.get("max_concurrency", 4)),
+        "requests_per_minute": int(data.get("requests_per_minute", 0)),
+        "tokens_per_minute": int(data.get("tokens_per_minute", 0)),
     }
 
+    changed_rows = []
     if preset_id:
         idx = df.index[df["id"] == preset_id]
         if not idx.empty:
             for key, value in preset_data.items():
                 df.loc[idx[0], key] = value
+            changed_rows.append(dict(preset_data, id=preset_id))
         success_message = f"Preset '{preset_data['name']}' aggiornato con successo!"
     else:
         preset_data["id"] = str(uuid.uuid4())
         df = pd.concat([df, pd.DataFrame([preset_data])], ignore_index=True)
+        changed_rows.append(preset_data)
         success_message = f"Preset '{preset_data['name']}' creato con successo!"
 
     presets = [APIPreset(**row) for row in df.to_dict(orient="records")]
     APIPreset.save(presets)
-    updated_df = refresh_api_presets()
-    return True, success_message, updated_df
+    _get_api_presets.upsert(changed_rows, base_version=version)
+    return True, success_message, load_presets()
 
 
 def delete_preset(preset_id: str) -> Tuple[bool, str, pd.DataFrame]:
     """Elimina un preset e ritorna lo stato aggiornato."""
+    version = _get_api_presets.version
     df = load_presets()
     match = df[df["id"] == preset_id]
     if match.empty:
@@ -118,8 +126,8 @@ def delete_preset(preset_id: str) -> Tuple[bool, str, pd.DataFrame]:
 
     preset_name = match.iloc[0]["name"]
     APIPreset.delete(preset_id)
-    updated_df = refresh_api_presets()
-    return True, f"Preset '{preset_name}' eliminato.", updated_df
+    _get_api_presets.delete([preset_id], base_version=version)
+    return True, f"Preset '{preset_name}' eliminato.", load_presets()
 
 
 def test_api_connection(
@@ -0,0 +1,199 @@
+"""Esecuzione dei test in background tramite la coda dei lavori."""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from models.job import Job
+from models.test_result import TestResult
+from models.test_run import TestRun
+from utils.job_queue import get_job_queue
+from utils.sampling import SamplingConfig
+from .test_controller import ProgressCallback, resume_test, run_matrix, run_test
+
+logger = logging.getLogger(__name__)
+
+JOB_KIND_RUN_TEST = "run_test"
+JOB_KIND_RESUME_TEST = "resume_test"
+JOB_KIND_RUN_MATRIX = "run_matrix"
+
+
+def _progress_reporter(job_id: str) -> ProgressCallback:
+    """Restituisce la callback che salva l'avanzamento del lavoro ``job_id``."""
+
+    def report(run_id: Optional[str], completed: int, total: int) -> None:
+        try:
+            Job.update(job_id, run_id=run_id, completed=completed, total=total)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(
+                "Impossibile aggiornare l'avanzamento del lavoro %s: %s", job_id, exc
+            )
+
+    return report
+
+
+def _job_outcome(result: Dict[str, Any]) -> Dict[str, Any]:
+    if not result:
+        raise RuntimeError("Esecuzione del test non riuscita. Controlla i log per i dettagli.")
+    return {"result_id": result["result_id"], "run_id": result.get("run_id")}
+
+
+def submit_test_run(
+    set_id: str,
+    set_name: str,
+    question_ids: List[str],
+    gen_preset_config: Dict[str, Any],
+    eval_preset_config: Dict[str, Any],
+    use_cache: bool = True,
+    evaluation_batch_size: int = 1,
+    sampling: Optional[SamplingConfig] = None,
+    use_async: bool = False,
+) -> str:
+    """Accoda l'esecuzione di :func:`run_test` e restituisce l'id del lavoro."""
+    payload: Dict[str, Any] = {
+        "set_id": set_id,
+        "set_name": set_name,
+        "question_count": len(question_ids),
+        "generation_preset": gen_preset_config.get("name"),
+        "evaluation_preset": eval_preset_config.get("name"),
+        "evaluation_batch_size": evaluation_batch_size,
+        "use_async": use_async,
+    }
+    if sampling is not None:
+        payload["sampling"] = sampling.to_dict()
+
+    def execute(job_id: str) -> Dict[str, Any]:
+        return _job_outcome(
+            run_test(
+                set_id,
+                set_name,
+                question_ids,
+                gen_preset_config,
+                eval_preset_config,
+                use_async=use_async,
+                use_cache=use_cache,
+                progress=_progress_reporter(job_id),
+                evaluation_batch_size=evaluation_batch_size,
+                sampling=sampling,
+            )
+        )
+
+    return get_job_queue().submit(JOB_KIND_RUN_TEST, payload, execute)
+
+
+def submit_resume_run(
+    run_id: str,
+    gen_preset_config: Dict[str, Any],
+    eval_preset_config: Dict[str, Any],
+    use_cache: bool = True,
+    evaluation_batch_size: int = 1,
+    use_async: bool = False,
+) -> str:
+    """Accoda la ripresa di un'esecuzione interrotta e restituisce l'id del lavoro.
+
+    Il lavoro viene associato subito a ``run_id``, così che l'esecuzione non
+    venga proposta di nuovo per la ripresa mentre è in coda.
+    """
+    payload = {
+        "run_id": run_id,
+        "generation_preset": gen_preset_config.get("name"),
+        "evaluation_preset": eval_preset_config.get("name"),
+        "evaluation_batch_size": evaluation_batch_size,
+        "use_async": use_async,
+    }
+
+    def execute(job_id: str) -> Dict[str, Any]:
+        return _job_outcome(
+            resume_test(
+                run_id,
+                gen_preset_config,
+                eval_preset_config,
+                use_async=use_async,
+                use_cache=use_cache,
+                progress=_progress_reporter(job_id),
+                evaluation_batch_size=evaluation_batch_size,
+            )
+        )
+
+    return get_job_queue().submit(JOB_KIND_RESUME_TEST, payload, execute, run_id=run_id)
+
+
+def submit_matrix_run(
+    set_ids: List[str],
+    gen_preset_configs: List[Dict[str, Any]],
+    eval_preset_config: Dict[str, Any],
+    use_cache: bool = True,
+    evaluation_batch_size: int = 1,
+) -> str:
+    """Accoda l'esecuzione di :func:`run_matrix` e restituisce l'id del lavoro.
+
+    Al termine il ``payload`` del lavoro contiene anche ``matrix_id``.
+    """
+    payload = {
+        "set_ids": list(set_ids),
+        "generation_presets": [p.get("name") for p in gen_preset_configs],
+        "evaluation_preset": eval_preset_config.get("name"),
+        "evaluation_batch_size": evaluation_batch_size,
+    }
+
+    def execute(job_id: str) -> Dict[str, Any]:
+        result = run_matrix(
+            set_ids,
+            gen_preset_configs,
+            eval_preset_config,
+            use_cache=use_cache,
+            progress=_progress_reporter(job_id),
+            evaluation_batch_size=evaluation_batch_size,
+        )
+        if not result:
+            raise RuntimeError("Esecuzione della matrice non riuscita. Controlla i log per i dettagli.")
+        return {"payload": {**payload, "matrix_id": result["matrix_id"]}}
+
+    return get_job_queue().submit(JOB_KIND_RUN_MATRIX, payload, execute)
+
+
+def get_job_status(job_id: str) -> Optional[Dict[str, Any]]:
+    """Restituisce stato, avanzamento e risultati parziali del lavoro ``job_id``.
+
+    ``results`` contiene le domande già completate nell'ordine del set e
+    ``avg_score`` il punteggio medio calcolato su di esse.
+    """
+    job = Job.get(job_id)
+    if job is None:
+        return None
+
+    results: Dict[str, Dict[str, Any]] = {}
+    if job.run_id:
+        run = TestRun.get(job.run_id)
+        items = TestRun.load_items(job.run_id)
+        order = run.question_ids if run is not None else list(items)
+        results = {q_id: items[q_id] for q_id in order if q_id in items}
+    stats = TestResult.calculate_statistics(results)
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "is_active": job.is_active,
+        "progress": job.progress,
+        "completed": job.completed,
+        "total": job.total,
+        "run_id": job.run_id,
+        "result_id": job.result_id,
+        "error": job.error,
+        "payload": job.payload,
+        "results": results,
+        "avg_score": stats["avg_score"],
+    }
+
+
+def list_recent_jobs(limit: int = 20) -> List[Job]:
+    """Elenca gli ultimi lavori registrati."""
+    return Job.list_recent(limit)
+
+
+__all__ = [
+    "submit_test_run",
+    "submit_resume_run",
+    "submit_matrix_run",
+    "get_job_status",
+    "list_recent_jobs",
+]
@@ -1,18 +1,29 @@
 """Controller per la gestione delle domande senza layer di service."""
 
 import logging
+from dataclasses import asdict
 from typing import IO, Optional, Tuple, List, Dict, Any, Union
 
 import pandas as pd
 
-from models.question import Question, question_importer
+from models.question import (
+    ImportProgressCallback,
+    Question,
+    QuestionImporter,
+    question_importer,
+)
 from utils.cache import (
     get_questions as _get_questions,
+    refresh_question_sets as _refresh_question_sets,
     refresh_questions as _refresh_questions,
+    search_questions as _search_questions,
 )
 
 logger = logging.getLogger(__name__)
 
+# Numero predefinito di domande mostrate per pagina
+QUESTIONS_PAGE_SIZE = 25
+
 
 def load_questions() -> pd.DataFrame:
     """Restituisce tutte le domande utilizzando la cache."""
@@ -36,8 +47,7 @@ def add_question_if_not_exists(
     if str(question_id) in df["id"].astype(str).values:
         return False
 
-    Question.add(domanda, risposta_attesa, categoria, question_id)
-    refresh_questions()
+    add_question(domanda, risposta_attesa, categoria, question_id)
     return True
 
 
@@ -47,9 +57,20 @@ def add_question(
     categoria: str = "",
     question_id: Optional[str] = None,
 ) -> str:
-    """Aggiunge una nuova domanda e aggiorna la cache."""
+    """Aggiunge una nuova domanda e la inserisce nella cache."""
+    version = _get_questions.version
     qid = Question.add(domanda, risposta_attesa, categoria, question_id)
-    refresh_questions()
+    _get_questions.upsert(
+        [
+            {
+                "id": qid,
+                "domanda": domanda,
+                "risposta_attesa": risposta_attesa,
+                "categoria": categoria,
+            }
+        ],
+        base_version=version,
+    )
     return qid
 
 
@@ -59,16 +80,32 @@ def update_question(
     risposta_attesa: Optional[str] = None,
     categoria: Optional[str] = None,
 ) -> bool:
-    """Aggiorna una domanda esistente e ricarica la cache."""
+    """Aggiorna una domanda esistente e applica la modifica alla cache."""
+    version = _get_questions.version
     updated = Question.update(question_id, domanda, risposta_attesa, categoria)
-    refresh_questions()
+    if updated:
+        changes = {
+            "domanda": domanda,
+            "risposta_attesa": risposta_attesa,
+            "categoria": categoria,
+        }
+        row = {k: v for k, v in changes.items() if v is not None}
+        row["id"] = question_id
+        _get_questions.upsert([row], base_version=version)
     return updated
 
 
 def delete_question(question_id: str) -> None:
-    """Elimina una domanda e aggiorna la cache."""
+    """Elimina una domanda e la rimuove dalla cache.
+
+    L'eliminazione rimuove la domanda anche dai set che la contengono, per cui
+    la cache dei set viene ricaricata e l'invalidazione pubblicata agli altri
+    processi.
+    """
+    version = _get_questions.version
     Question.delete(question_id)
-    refresh_questions()
+    _get_questions.delete([question_id], base_version=version)
+    _refresh_question_sets()
 
 
 def get_filtered_questions(category: Optional[str] = None) -> Tuple[pd.DataFrame, List[str]]:
@@ -76,6 +113,71 @@ def get_filtered_questions(category: Optional[str] = None) -> Tuple[pd.DataFrame
     return Question.filter_by_category(category)
 
 
+def search_questions(
+    query: str, limit: Optional[int] = 50, category: Optional[str] = None
+) -> pd.DataFrame:
+    """Ricerca testuale su domanda, risposta attesa e categoria.
+
+    Restituisce le domande ordinate per rilevanza con la colonna ``score``.
+    """
+    ranked = _search_questions(query, limit=limit, category=category)
+    columns = ["id", "domanda", "risposta_attesa", "categoria", "score"]
+    if not ranked:
+        return pd.DataFrame(columns=columns)
+    df = load_questions().set_index("id")
+    ranked = [(qid, score) for qid, score in ranked if qid in df.index]
+    result = df.loc[[qid for qid, _ in ranked]].reset_index()
+    result["score"] = [score for _, score in ranked]
+    return result.reindex(columns=columns)
+
+
+def get_questions_page(
+    page: int = 1,
+    page_size: int = QUESTIONS_PAGE_SIZE,
+    category: Optional[str] = None,
+    search: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Restituisce una pagina di domande filtrate direttamente dal database.
+
+    Restituisce
+    -----------
+    dict
+        ``{"questions_df": DataFrame, "total": int, "page": int, "page_count": int}``
+
+    ``page`` parte da 1 e viene limitata all'intervallo delle pagine esistenti.
+    Con un testo di ricerca le domande sono ordinate per rilevanza tramite
+    l'indice di :func:`search_questions`, altrimenti per ID.
+    """
+    page_size = max(1, int(page_size))
+    if search and search.strip():
+        matches = search_questions(search, limit=None, category=category)
+        total = len(matches)
+    else:
+        total = Question.count(category)
+    page_count = max(1, -(-total // page_size))
+    page = min(max(1, int(page)), page_count)
+    offset = (page - 1) * page_size
+    if search and search.strip():
+        questions_df = matches.iloc[offset:offset + page_size].reset_index(drop=True)
+    else:
+        questions = Question.load_page(offset, page_size, category)
+        questions_df = pd.DataFrame(
+            [asdict(q) for q in questions],
+            columns=["id", "domanda", "risposta_attesa", "categoria"],
+        )
+    return {
+        "questions_df": questions_df,
+        "total": total,
+        "page": page,
+        "page_count": page_count,
+    }
+
+
+def get_question_categories() -> List[str]:
+    """Restituisce l'elenco ordinato delle categorie delle domande."""
+    return Question.categories()
+
+
 def save_question_action(
     question_id: str, edited_question: str, edited_answer: str, edited_category: str
 ) -> dict:
@@ -95,15 +197,14 @@ def save_question_action(
         risposta_attesa=edited_answer,
         categoria=edited_category,
     )
-    questions = refresh_questions() if success else None
+    questions = load_questions() if success else None
     return {"success": success, "questions_df": questions}
 
 
 def delete_question_action(question_id: str) -> pd.DataFrame:
     """Elimina una domanda e restituisce il ``DataFrame`` aggiornato."""
     delete_question(question_id)
-    questions = refresh_questions()
-    return questions
+    return load_questions()
 
 
 def export_questions_action(destination: Union[str, IO[str]]) -> None:
@@ -111,31 +212,52 @@ def export_questions_action(destination: Union[str, IO[str]]) -> None:
     question_importer.export_to_file(destination)
 
 
-def import_questions_action(uploaded_file: IO[str] | IO[bytes]) -> Dict[str, Any]:
+def import_questions_action(
+    uploaded_file: IO[str] | IO[bytes],
+    progress: Optional[ImportProgressCallback] = None,
+) -> Dict[str, Any]:
     """Importa domande da file e restituisce i risultati dell'operazione.
 
+    Il file (CSV, JSON o JSONL) viene letto e salvato a blocchi, con un commit
+    per blocco, così da poter importare archivi di grandi dimensioni.
+
     Parametri
     ---------
     uploaded_file: file-like
         Il file caricato dall'utente.
+    progress: callable, opzionale
+        Invocata dopo ogni blocco con righe elaborate e domande importate.
+
+    Le domande di ogni blocco vengono aggiunte alla cache come delta, senza
+    ricaricare l'intera tabella: ``questions_df`` è il DataFrame in cache
+    aggiornato, oppure ``None`` se la cache non era ancora stata caricata.
 
     Restituisce
     -----------
     dict
-        ``{"questions_df": DataFrame, "imported_count": int, "warnings": list[str]}``
+        ``{"questions_df": DataFrame | None, "imported_count": int, "warnings": list[str]}``
     """
 
     if uploaded_file is None:
         raise ValueError("Nessun file caricato.")
 
-    result = question_importer.import_from_file(uploaded_file)
+    version = [_get_questions.version]
+
+    def apply_chunk(rows: pd.DataFrame) -> None:
+        _get_questions.upsert(
+            rows.reindex(columns=_get_questions.columns).fillna("").to_dict(orient="records"),
+            base_version=version[0],
+        )
+        version[0] = _get_questions.version
+
+    importer = QuestionImporter(progress=progress, on_chunk=apply_chunk)
+    result = importer.import_from_file(uploaded_file)
     if not result.get("success", True):
         message = "; ".join(result.get("warnings", []))
         raise ValueError(message)
 
-    questions = refresh_questions()
     return {
-        "questions_df": questions,
+        "questions_df": _get_questions() if _get_questions.loaded else None,
         "imported_count": result["imported_count"],
         "warnings": result.get("warnings", []),
     }
@@ -1,4 +1,5 @@
 import logging
+from dataclasses import asdict
 from typing import List, Optional, Any, Dict, IO, Union
 
 import pandas as pd
@@ -6,13 +7,11 @@ import pandas as pd
 from models.question_set import QuestionSet, question_set_importer # PersistSetsResult not used
 from utils.cache import (
     get_questions as _get_questions,
+    get_category_index as _get_category_index,
     get_question_sets as _get_question_sets,
     refresh_question_sets as _refresh_question_sets,
 )
-from utils.data_format_utils import (
-    build_questions_detail,
-    format_questions_for_view,
-)
+from utils.category_index import MISSING_CATEGORY
 logger = logging.getLogger(__name__)
 
 
@@ -26,10 +25,20 @@ def refresh_question_sets() -> pd.DataFrame:
     return _refresh_question_sets()
 
 
+def _sync_set(set_id: str, version: int) -> None:
+    """Applica alla cache lo stato attuale del set ``set_id``."""
+    qset = QuestionSet.get(set_id)
+    if qset is None:
+        _get_question_sets.delete([set_id], base_version=version)
+    else:
+        _get_question_sets.upsert([asdict(qset)], base_version=version)
+
+
 def create_set(name: str, question_ids: Optional[List[str]] = None) -> str:
-    """Crea un nuovo set di domande e aggiorna la cache."""
+    """Crea un nuovo set di domande e lo inserisce nella cache."""
+    version = _get_question_sets.version
     set_id = QuestionSet.create(name, question_ids)
-    refresh_question_sets()
+    _sync_set(set_id, version)
     return set_id
 
 
@@ -38,19 +47,23 @@ def update_set(
     name: Optional[str] = None,
     question_ids: Optional[List[str]] = None,
 ) -> pd.DataFrame:
-    """Aggiorna un set di domande esistente e ricarica la cache.
+    """Aggiorna un set di domande esistente e applica la modifica alla cache.
 
     Restituisce il DataFrame aggiornato dei set di domande."""
+    version = _get_question_sets.version
     QuestionSet.update(set_id, name, question_ids)
-    return refresh_question_sets()
+    _sync_set(set_id, version)
+    return load_sets()
 
 
 def delete_set(set_id: str) -> pd.DataFrame:
-    """Elimina un set di domande e aggiorna la cache.
+    """Elimina un set di domande e lo rimuove dalla cache.
 
     Restituisce il DataFrame aggiornato dei set di domande."""
+    version = _get_question_sets.version
     QuestionSet.delete(set_id)
-    return refresh_question_sets()
+    _get_question_sets.delete([set_id], base_version=version)
+    return load_sets()
 
 
 def export_sets_action(destination: Union[str, IO[str]]) -> None:
@@ -61,40 +74,44 @@ def export_sets_action(destination: Union[str, IO[str]]) -> None:
 def prepare_sets_for_view(
     selected_categories: Optional[List[str]] = None,
 ) -> Dict[str, Any]:
-    """Prepara le informazioni dei set e delle domande per la vista."""
+    """Prepara le informazioni dei set e delle domande per la vista.
+
+    Categorie, dettagli delle domande e filtro per categoria provengono
+    dall'indice delle categorie, aggiornato a ogni modifica di domande e set.
+    """
     try:
-        questions_df_raw = _get_questions()
+        questions_df = _get_questions()
         sets_df = _get_question_sets()
+        index = _get_category_index()
 
-        questions_df, question_map, categories = format_questions_for_view(
-            questions_df_raw
-        )
+        if questions_df.empty:
+            questions_df = pd.DataFrame(
+                columns=["id", "domanda", "risposta_attesa", "categoria"]
+            )
+        elif questions_df["categoria"].isna().any():
+            questions_df = questions_df.assign(
+                categoria=questions_df["categoria"].fillna(MISSING_CATEGORY)
+            )
 
         if sets_df.empty:
             sets_df = pd.DataFrame(
                 columns=["id", "name", "questions", "questions_detail"]
             )
         else:
-            sets_df = sets_df.copy()
-            sets_df["questions_detail"] = sets_df["questions"].apply(
-                lambda q_ids: build_questions_detail(question_map, q_ids)
+            sets_df = sets_df.assign(
+                questions_detail=[index.questions_detail(sid) for sid in sets_df["id"]]
             )
 
         filtered_sets_df = sets_df
         if selected_categories:
-            def has_categories(details: List[Dict[str, Any]]) -> bool:
-                categories_in_set = {d.get("categoria") for d in details}
-                return all(cat in categories_in_set for cat in selected_categories)
-
-            filtered_sets_df = sets_df[
-                sets_df["questions_detail"].apply(has_categories)
-            ]
+            matching = index.sets_with_categories(selected_categories)
+            filtered_sets_df = sets_df[sets_df["id"].isin(matching)]
 
         return {
             "questions_df": questions_df,
             "sets_df": filtered_sets_df,
             "raw_sets_df": sets_df,
-            "categories": categories,
+            "categories": index.categories(),
         }
     except Exception as exc:  # pragma: no cover - error path
         logger.error("Errore nella preparazione dei set: %s", exc)
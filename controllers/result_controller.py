@@ -1,48 +1,300 @@
+import functools
+import heapq
 import logging
-from typing import Dict
+import math
+from typing import Any, Callable, Dict, List, Sequence
 
 import pandas as pd
 
-from .test_controller import load_results
+from models.test_result import SUMMARY_COLUMNS, TestResult
+from .test_controller import (
+    count_filtered_results,
+    load_filtered_results,
+    load_partial_results,
+    load_result_summaries,
+    load_results,
+    load_results_by_ids,
+    result_column_values,
+)
 from .question_set_controller import load_sets
 from .api_preset_controller import load_presets
 
 logger = logging.getLogger(__name__)
 
+# Risultati per pagina nel selettore della vista
+RESULTS_PAGE_SIZE = 25
+# Colonne restituite da :func:`get_result_summaries`
+RESULT_SUMMARY_COLUMNS = SUMMARY_COLUMNS + ["status", "progress"]
 
-def get_results(filter_set: str | None, filter_model: str | None) -> pd.DataFrame:
-    """Carica i risultati e applica eventuali filtri per set e modello LLM."""
-    df = load_results()
 
-    if filter_set:
-        sets_df = load_sets()
-        set_ids = (
-            sets_df[sets_df["name"] == filter_set]["id"].astype(str).tolist()
-            if not sets_df.empty
-            else []
+def _preset_models() -> Dict[str, str]:
+    presets_df = load_presets()
+    return presets_df.set_index("name")["model"].to_dict() if not presets_df.empty else {}
+
+
+def _result_model(res: dict, preset_models: Dict[str, str]) -> str | None:
+    model = res.get("generation_llm")
+    if not model:
+        preset_name = res.get("generation_preset")
+        model = preset_models.get(preset_name) if preset_name else None
+    return model
+
+
+def _set_ids_for(filter_set: str | None) -> List[str] | None:
+    if not filter_set:
+        return None
+    sets_df = load_sets()
+    if sets_df.empty:
+        return []
+    return sets_df[sets_df["name"] == filter_set]["id"].astype(str).tolist()
+
+
+def _filter_partial(
+    partial_df: pd.DataFrame,
+    set_ids: List[str] | None,
+    filter_model: str | None,
+    preset_models: Dict[str, str],
+) -> pd.DataFrame:
+    if set_ids is not None and not partial_df.empty:
+        partial_df = partial_df[partial_df["set_id"].astype(str).isin(set_ids)]
+    if filter_model and not partial_df.empty:
+        partial_df = partial_df[
+            partial_df["results"].apply(
+                lambda res: _result_model(res, preset_models) == filter_model
+            )
+        ]
+    return partial_df
+
+
+def get_results(
+    filter_set: str | None,
+    filter_model: str | None,
+    include_partial: bool = True,
+) -> pd.DataFrame:
+    """Carica i risultati e applica eventuali filtri per set e modello LLM.
+
+    Senza filtri viene restituito il DataFrame in cache; con i filtri la
+    selezione avviene nella query SQL sulle colonne indicizzate di
+    ``test_results``, senza leggere l'intero storico.
+    Con ``include_partial`` vengono incluse anche le esecuzioni interrotte,
+    riconoscibili dal campo ``status`` uguale a ``"partial"`` in ``results``.
+    """
+    set_ids = _set_ids_for(filter_set)
+    preset_models: Dict[str, str] = _preset_models() if filter_model else {}
+    if set_ids is None and not filter_model:
+        df = load_results()
+    else:
+        df = load_filtered_results(
+            set_ids,
+            filter_model or None,
+            [name for name, model in preset_models.items() if model == filter_model],
+        )
+
+    if include_partial:
+        partial_df = _filter_partial(
+            load_partial_results(), set_ids, filter_model, preset_models
+        )
+        if not partial_df.empty:
+            df = pd.concat([df, partial_df], ignore_index=True)
+
+    return df
+
+
+def _partial_summary(row: Dict[str, Any]) -> Dict[str, Any]:
+    res = row["results"] if isinstance(row["results"], dict) else {}
+    return {
+        "id": row["id"],
+        "set_id": row["set_id"],
+        "timestamp": row["timestamp"],
+        "generation_llm": res.get("generation_llm"),
+        "generation_preset": res.get("generation_preset"),
+        "evaluation_llm": res.get("evaluation_llm"),
+        "avg_score": res.get("avg_score"),
+        "status": "partial",
+        "progress": f"{res.get('completed_questions', 0)}/{res.get('total_questions', 0)}",
+    }
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or value == "" or (isinstance(value, float) and math.isnan(value))
+
+
+def _summary_comparator(
+    sort_by: str, descending: bool
+) -> Callable[[Dict[str, Any], Dict[str, Any]], int]:
+    """Confronto tra riepiloghi coerente con l'ordinamento di ``load_summaries``.
+
+    I valori mancanti vanno in fondo, a parità di valore decide l'ID.
+    """
+    direction = -1 if descending else 1
+
+    def compare(a: Dict[str, Any], b: Dict[str, Any]) -> int:
+        va: Any = a.get(sort_by)
+        vb: Any = b.get(sort_by)
+        missing_a, missing_b = _is_missing(va), _is_missing(vb)
+        if missing_a != missing_b:
+            return 1 if missing_a else -1
+        if not missing_a and va != vb:
+            return direction * (-1 if va < vb else 1)
+        ida, idb = str(a.get("id")), str(b.get("id"))
+        return direction * ((ida > idb) - (ida < idb))
+
+    return compare
+
+
+def get_result_summaries(
+    filter_set: str | None = None,
+    filter_model: str | None = None,
+    page: int = 1,
+    page_size: int = RESULTS_PAGE_SIZE,
+    sort_by: str = "timestamp",
+    descending: bool = True,
+    include_partial: bool = True,
+) -> Dict[str, Any]:
+    """Restituisce una pagina di riepiloghi dei risultati per il selettore.
+
+    Restituisce
+    -----------
+    dict
+        ``{"summaries_df": DataFrame, "total": int, "page": int, "page_count": int}``
+
+    I riepiloghi contengono solo le colonne di ``RESULT_SUMMARY_COLUMNS``:
+    filtri, ordinamento e paginazione sono applicati nella query SQL, senza
+    leggere il JSON dei risultati. Con ``include_partial`` le esecuzioni
+    interrotte sono inserite nella posizione dettata da ``sort_by`` e
+    ``descending`` e contate in ``total`` e ``page_count``.
+    """
+    page_size = max(1, int(page_size))
+    set_ids = _set_ids_for(filter_set)
+    preset_models: Dict[str, str] = _preset_models() if filter_model else {}
+    presets = [name for name, model in preset_models.items() if model == filter_model]
+    model = filter_model or None
+
+    partial_rows: List[Dict[str, Any]] = []
+    if include_partial:
+        partial_df = _filter_partial(
+            load_partial_results(), set_ids, filter_model, preset_models
         )
-        df = df[df["set_id"].astype(str).isin(set_ids)]
-
-    if filter_model:
-        presets_df = load_presets()
-        preset_models: Dict[str, str] = (
-            presets_df.set_index("name")["model"].to_dict()
-            if not presets_df.empty
-            else {}
+        partial_rows = [_partial_summary(row) for row in partial_df.to_dict("records")]
+
+    saved_total = count_filtered_results(set_ids, model, presets)
+    total = saved_total + len(partial_rows)
+    page_count = max(1, -(-total // page_size))
+    page = min(max(1, int(page)), page_count)
+    offset = (page - 1) * page_size
+
+    if not partial_rows:
+        summaries_df = load_result_summaries(
+            offset, page_size, sort_by, descending, set_ids, model, presets
+        ).reindex(columns=RESULT_SUMMARY_COLUMNS)
+    else:
+        # Le esecuzioni parziali precedono al massimo len(partial_rows) righe
+        # salvate: basta leggere la finestra SQL allargata di altrettante righe
+        start = max(0, offset - len(partial_rows))
+        window = load_result_summaries(
+            start, offset + page_size - start, sort_by, descending, set_ids, model, presets
+        ).reindex(columns=RESULT_SUMMARY_COLUMNS).to_dict("records")
+        sort_key = functools.cmp_to_key(_summary_comparator(sort_by, descending))
+        partial_rows.sort(key=sort_key)
+        if window:
+            first = sort_key(window[0])
+            before = [r for r in partial_rows if sort_key(r) < first]
+            rest = [r for r in partial_rows if not sort_key(r) < first]
+        else:
+            before, rest = [], partial_rows
+        merged = list(heapq.merge(window, rest, key=sort_key))
+        if start == 0:
+            merged = before + merged
+            position = 0
+        else:
+            position = start + len(before)
+        summaries_df = pd.DataFrame(
+            merged[offset - position:offset - position + page_size],
+            columns=RESULT_SUMMARY_COLUMNS,
         )
 
-        def matches_model(res: dict) -> bool:
-            model = res.get("generation_llm")
-            if not model:
-                preset_name = res.get("generation_preset")
-                model = preset_models.get(preset_name) if preset_name else None
-            return model == filter_model
+    return {
+        "summaries_df": summaries_df,
+        "total": total,
+        "page": page,
+        "page_count": page_count,
+    }
+
 
-        df = df[df["results"].apply(matches_model)]
+def get_results_by_ids(ids: Sequence[str]) -> pd.DataFrame:
+    """Carica il JSON completo dei soli risultati indicati.
 
+    Gli ID non presenti tra i risultati salvati vengono cercati tra le
+    esecuzioni interrotte.
+    """
+    ids = [i for i in ids if i]
+    df = load_results_by_ids(ids)
+    missing = set(ids) - set(df["id"].astype(str))
+    if missing:
+        partial_df = load_partial_results()
+        if not partial_df.empty:
+            partial_df = partial_df[partial_df["id"].astype(str).isin(missing)]
+            if not partial_df.empty:
+                df = (
+                    partial_df.reset_index(drop=True)
+                    if df.empty
+                    else pd.concat([df, partial_df], ignore_index=True)
+                )
     return df
 
 
+def get_result_statistics(results_df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """Restituisce le statistiche dei risultati di ``results_df`` per ID.
+
+    Le statistiche sono lette dalla tabella ``test_result_stats``, popolata al
+    salvataggio e all'importazione; vengono calcolate al momento solo per le
+    esecuzioni interrotte e per i risultati non ancora elaborati dal backfill.
+    """
+    if results_df.empty:
+        return {}
+    ids = results_df["id"].astype(str).tolist()
+    stats = TestResult.load_statistics(ids)
+    for row in results_df.to_dict("records"):
+        if str(row["id"]) not in stats:
+            stats[str(row["id"])] = TestResult.compute_statistics(row["results"])
+    return stats
+
+
+def list_result_set_names(question_sets_df: pd.DataFrame) -> list[str]:
+    """Elenca i nomi dei set presenti nei risultati senza caricarne il JSON."""
+    set_ids = set(result_column_values("set_id"))
+    partial_df = load_partial_results()
+    if not partial_df.empty:
+        set_ids.update(partial_df["set_id"].astype(str))
+    if not set_ids:
+        return []
+    set_name_map = (
+        {str(row["id"]): row["name"] for row in question_sets_df.to_dict("records")}
+        if not question_sets_df.empty
+        else {}
+    )
+    return sorted({set_name_map.get(sid, "Set Sconosciuto") for sid in set_ids})
+
+
+def list_result_model_names() -> list[str]:
+    """Elenca i modelli di generazione presenti nei risultati senza caricarne il JSON.
+
+    Per i risultati senza modello registrato viene usato il modello del preset.
+    """
+    preset_models = _preset_models()
+    models = set(result_column_values("generation_llm"))
+    for preset_name in result_column_values("generation_preset"):
+        if preset_name in preset_models:
+            models.add(preset_models[preset_name])
+    partial_df = load_partial_results()
+    if not partial_df.empty:
+        for res in partial_df["results"]:
+            model = _result_model(res, preset_models)
+            if model:
+                models.add(model)
+    return sorted(m for m in models if m)
+
+
 def list_set_names(results_df: pd.DataFrame, question_sets_df: pd.DataFrame) -> list[str]:
     """Elenca i nomi dei set disponibili nei risultati."""
     if results_df.empty or question_sets_df.empty:
@@ -59,15 +311,10 @@ def list_model_names(results_df: pd.DataFrame) -> list[str]:
     """Elenca i nomi dei modelli LLM presenti nei risultati."""
     if results_df.empty:
         return []
-    presets_df = load_presets()
-    preset_models: Dict[str, str] = (
-        presets_df.set_index("name")["model"].to_dict() if not presets_df.empty else {}
-    )
+    preset_models = _preset_models()
     models = set()
     for res in results_df["results"]:
-        model = res.get("generation_llm")
-        if not model and res.get("generation_preset"):
-            model = preset_models.get(res.get("generation_preset"))
+        model = _result_model(res, preset_models)
         if model:
             models.add(model)
     return sorted(models)
@@ -90,11 +337,41 @@ def prepare_select_options(
         avg_score = result_data.get("avg_score", 0)
         method = result_data.get("method", "N/A")
         method_icon = "🤖" if method == "LLM" else "📊"
-        processed.append(
-            {
-                "id": row["id"],
-                "display_name": f"{row['timestamp']} - {method_icon} {set_name} (Avg: {avg_score:.2f}%) - {method}",
-            }
-        )
+        display_name = f"{row['timestamp']} - {method_icon} {set_name} (Avg: {avg_score:.2f}%) - {method}"
+        if result_data.get("status") == "partial":
+            display_name += (
+                f" - ⏸️ Parziale ({result_data.get('completed_questions', 0)}"
+                f"/{result_data.get('total_questions', 0)})"
+            )
+        processed.append({"id": row["id"], "display_name": display_name})
     processed.sort(key=lambda x: x["display_name"].split(" - ")[0], reverse=True)
     return {p["id"]: p["display_name"] for p in processed}
+
+
+def prepare_summary_options(
+    summaries_df: pd.DataFrame, question_sets_df: pd.DataFrame
+) -> Dict[str, str]:
+    """Prepara le opzioni del selectbox a partire dai riepiloghi dei risultati.
+
+    L'ordine delle opzioni è quello di ``summaries_df``.
+    """
+    if summaries_df.empty:
+        return {}
+    set_name_map = {
+        str(row["id"]): row["name"]
+        for row in question_sets_df.to_dict("records")
+    }
+    options: Dict[str, str] = {}
+    for row in summaries_df.to_dict("records"):
+        set_name = set_name_map.get(str(row["set_id"]), "Set Sconosciuto")
+        avg_score = row.get("avg_score")
+        score = 0.0 if avg_score is None or pd.isna(avg_score) else float(avg_score)
+        model = row.get("generation_llm")
+        if not isinstance(model, str) or not model:
+            preset = row.get("generation_preset")
+            model = preset if isinstance(preset, str) and preset else "N/A"
+        display_name = f"{row['timestamp']} - {set_name} (Avg: {score:.2f}%) - {model}"
+        if row.get("status") == "partial":
+            display_name += f" - ⏸️ Parziale ({row.get('progress')})"
+        options[row["id"]] = display_name
+    return options
@@ -2,17 +2,40 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import json
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, IO, List, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    IO,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import pandas as pd
 from openai import APIConnectionError, APIStatusError, RateLimitError
 
+from models.cache_version import CacheVersion
+from models.test_matrix import TestMatrix
 from models.test_result import TestResult, test_result_importer
+from models.test_run import STATUS_PARTIAL, TestRun
+from models.job import Job
 from models.question import Question
-from utils import openai_client
+from models.question_set import QuestionSet
+from models.response_cache import ResponseCache
+from utils import llm_pipeline, openai_client, rate_limiter
+from utils.sampling import SamplingConfig, bootstrap_ci, sample_order
 
 DEFAULT_MODEL = openai_client.DEFAULT_MODEL
 
@@ -21,14 +44,86 @@ logger = logging.getLogger(__name__)
 
 def load_results() -> pd.DataFrame:
     """Restituisce i risultati dei test utilizzando la cache."""
+    CacheVersion.poll()
     return TestResult.load_all_df()
 
 
+def load_filtered_results(
+    set_ids: Optional[List[str]] = None,
+    generation_llm: Optional[str] = None,
+    generation_presets: Sequence[str] = (),
+) -> pd.DataFrame:
+    """Restituisce i risultati filtrati per set e modello tramite una query SQL.
+
+    Vedi :meth:`TestResult.load_filtered_df`.
+    """
+    return TestResult.load_filtered_df(set_ids, generation_llm, generation_presets)
+
+
+def load_result_summaries(
+    offset: int = 0,
+    limit: Optional[int] = None,
+    sort_by: str = "timestamp",
+    descending: bool = True,
+    set_ids: Optional[List[str]] = None,
+    generation_llm: Optional[str] = None,
+    generation_presets: Sequence[str] = (),
+) -> pd.DataFrame:
+    """Restituisce una pagina di riepiloghi dei risultati, senza il JSON completo.
+
+    Vedi :meth:`TestResult.load_summaries`.
+    """
+    return TestResult.load_summaries(
+        offset, limit, sort_by, descending, set_ids, generation_llm, generation_presets
+    )
+
+
+def count_filtered_results(
+    set_ids: Optional[List[str]] = None,
+    generation_llm: Optional[str] = None,
+    generation_presets: Sequence[str] = (),
+) -> int:
+    """Conta i risultati salvati che soddisfano i filtri."""
+    return TestResult.count_filtered(set_ids, generation_llm, generation_presets)
+
+
+def load_results_by_ids(ids: Sequence[str]) -> pd.DataFrame:
+    """Carica il JSON completo dei soli risultati indicati."""
+    return TestResult.load_by_ids(ids)
+
+
+def result_column_values(column: str) -> List[str]:
+    """Valori distinti di una colonna di riepilogo dei risultati salvati."""
+    return TestResult.distinct_values(column)
+
+
 def refresh_results() -> pd.DataFrame:
     """Svuota e ricarica la cache dei risultati dei test."""
     return TestResult.refresh_cache()
 
 
+def load_partial_results() -> pd.DataFrame:
+    """Restituisce le esecuzioni interrotte nel formato di :func:`load_results`."""
+    try:
+        return TestRun.load_partial_df()
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Impossibile caricare le esecuzioni parziali: %s", exc)
+        return pd.DataFrame(columns=["id", "set_id", "timestamp", "results"])
+
+
+def list_incomplete_runs() -> List[TestRun]:
+    """Elenca le esecuzioni non completate che possono essere riprese.
+
+    Sono escluse quelle ancora in corso in un lavoro in background.
+    """
+    try:
+        active = set(Job.active_run_ids())
+        return [run for run in TestRun.load_incomplete() if run.id not in active]
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Impossibile caricare le esecuzioni interrotte: %s", exc)
+        return []
+
+
 def import_results_action(
     uploaded_file: IO[str] | IO[bytes],
 ) -> Tuple[pd.DataFrame, str]:
@@ -62,78 +157,145 @@ def export_results_action(destination: Union[str, IO[str]]) -> None:
     test_result_importer.export_to_file(destination)
 
 
-def generate_answer(question: str, client_config: Dict[str, Any]) -> str:
-    """Genera una risposta per ``question`` utilizzando la configurazione LLM fornita.
+def export_results_file(fmt: str = "json") -> IO[bytes]:
+    """Esporta tutti i risultati nel formato ``fmt`` e restituisce il file da scaricare.
 
-    Restituisce solo la risposta generata. In caso di errore viene sollevata
-    un'eccezione.
+    I risultati vengono letti dal database e serializzati a blocchi solo al
+    momento della chiamata (ad esempio al click sul pulsante di download).
     """
+    return test_result_importer.export_to_buffer(fmt)
+
+
+EVALUATION_REQUIRED_KEYS = [
+    "score",
+    "explanation",
+    "similarity",
+    "correctness",
+    "completeness",
+]
 
-    api_key = str(client_config.get("api_key", ""))
+# Token di output riservati a ciascuna valutazione di un lotto: bastano per
+# i punteggi e una spiegazione di 100 parole
+BATCH_EVALUATION_ITEM_TOKENS = 300
+# Token di output massimi di una richiesta a lotti, entro il limite di
+# output dei modelli valutatori più comuni; i lotti più grandi vengono divisi
+BATCH_EVALUATION_MAX_TOKENS = 4096
+
+
+def _get_client(client_config: Dict[str, Any], factory: Any, error_message: str) -> Any:
+    """Ottiene un client da ``factory`` convertendo gli errori in ``ValueError``."""
     try:
-        client = openai_client.get_openai_client(
-            api_key=api_key,
+        return factory(
+            api_key=str(client_config.get("api_key", "")),
             base_url=client_config.get("endpoint"),
         )
     except openai_client.ClientCreationError as exc:
-        logger.error(
-            "Client API per la generazione risposte non configurato: %s", exc
+        logger.error("%s: %s", error_message, exc)
+        raise ValueError(error_message) from exc
+
+
+def _cache_key(
+    client_config: Dict[str, Any], request: Dict[str, Any], use_cache: bool
+) -> str | None:
+    """Restituisce la chiave di cache per ``request`` o ``None`` se non cacheabile.
+
+    Solo le richieste deterministiche (temperatura 0) vengono servite dalla cache.
+    """
+    if not use_cache:
+        return None
+    try:
+        if float(request.get("temperature") or 0.0) > 0.0:
+            return None
+    except (TypeError, ValueError):
+        return None
+    return ResponseCache.make_key(client_config.get("endpoint"), request)
+
+
+def _cache_lookup(cache_key: str | None) -> str | None:
+    if cache_key is None:
+        return None
+    try:
+        return ResponseCache.get(cache_key)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Cache delle risposte non disponibile: %s", exc)
+        return None
+
+
+def _cache_store(
+    cache_key: str | None,
+    client_config: Dict[str, Any],
+    request: Dict[str, Any],
+    content: str,
+) -> None:
+    if cache_key is None:
+        return
+    try:
+        ResponseCache.put(
+            cache_key, str(request.get("model", "")), client_config.get("endpoint"), content
         )
-        raise ValueError("Client API non configurato") from exc
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Impossibile salvare la risposta in cache: %s", exc)
+
 
+def _build_generation_request(question: str, client_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Valida ``question`` e costruisce la richiesta di generazione."""
     if question is None or not isinstance(question, str) or question.strip() == "":
         logger.error("La domanda fornita è vuota o non valida.")
         raise ValueError("Domanda vuota o non valida")
 
     prompt = f"Rispondi alla seguente domanda in modo conciso e accurato: {question}"
-    api_request_details = {
+    return {
         "model": client_config.get("model", DEFAULT_MODEL),
         "messages": [{"role": "user", "content": prompt}],
         "temperature": client_config.get("temperature", 0.7),
         "max_tokens": client_config.get("max_tokens", 500),
     }
 
-    try:
-        response = client.chat.completions.create(**api_request_details)
-        choices = getattr(response, "choices", None)
-        if not choices or not choices[0].message.content:
-            raise RuntimeError("Risposta API non valida")
-        return choices[0].message.content.strip()
-    except (APIConnectionError, RateLimitError, APIStatusError) as e:
+
+def _parse_generation_response(response: Any) -> str:
+    choices = getattr(response, "choices", None)
+    if not choices or not choices[0].message.content:
+        raise RuntimeError("Risposta API non valida")
+    return choices[0].message.content.strip()
+
+
+def _usage_tokens(response: Any) -> int | None:
+    """Token complessivi riportati in ``response.usage``, se disponibili."""
+    tokens = getattr(getattr(response, "usage", None), "total_tokens", None)
+    return tokens if isinstance(tokens, int) else None
+
+
+def _record_usage(
+    stats: Dict[str, Any] | None, started: float, response: Any
+) -> None:
+    """Salva in ``stats`` la durata della chiamata API e i token consumati."""
+    if stats is None:
+        return
+    stats["latency"] = time.perf_counter() - started
+    tokens = _usage_tokens(response)
+    if tokens is not None:
+        stats["tokens"] = tokens
+
+
+def _generation_error(exc: Exception) -> RuntimeError:
+    """Registra ``exc`` e lo converte nell'errore sollevato dalla generazione."""
+    if isinstance(exc, (APIConnectionError, RateLimitError, APIStatusError)):
         logger.error(
-            f"Errore API durante la generazione della risposta di esempio: {type(e).__name__} - {e}"
+            f"Errore API durante la generazione della risposta di esempio: {type(exc).__name__} - {exc}"
         )
-        raise RuntimeError(str(e)) from e
-    except Exception as exc:  # noqa: BLE001
+    else:
         logger.error(
             f"Errore imprevisto durante la generazione della risposta: {type(exc).__name__} - {exc}"
         )
-        raise RuntimeError(str(exc)) from exc
+    return RuntimeError(str(exc))
 
 
-def evaluate_answer(
+def _build_evaluation_request(
     question: str,
     expected_answer: str,
     actual_answer: str,
     client_config: Dict[str, Any],
 ) -> Dict[str, Any]:
-    """Valuta ``actual_answer`` rispetto a ``expected_answer`` utilizzando un LLM.
-
-    Restituisce i dati di valutazione come dizionario oppure solleva
-    un'eccezione in caso di errore.
-    """
-
-    api_key = str(client_config.get("api_key", ""))
-    try:
-        client = openai_client.get_openai_client(
-            api_key=api_key,
-            base_url=client_config.get("endpoint"),
-        )
-    except openai_client.ClientCreationError as exc:
-        raise ValueError(
-            "Errore: Client API per la valutazione non configurato."
-        ) from exc
-
     prompt = f"""
     Sei un valutatore esperto che valuta la qualità delle risposte alle domande.
     Domanda: {question}
@@ -162,7 +324,7 @@ def evaluate_answer(
     }}
     """
 
-    api_request_details = {
+    return {
         "model": client_config.get("model", DEFAULT_MODEL),
         "messages": [{"role": "user", "content": prompt}],
         "temperature": client_config.get("temperature", 0.0),
@@ -170,37 +332,1021 @@ def evaluate_answer(
         "response_format": {"type": "json_object"},
     }
 
+
+def _parse_evaluation_response(response: Any) -> Dict[str, Any]:
+    choices = getattr(response, "choices", None)
+    if not choices or not choices[0].message.content:
+        logger.error("Risposta API priva di 'choices' validi")
+        raise RuntimeError("Risposta API non valida.")
+    content = choices[0].message.content
     try:
-        response = client.chat.completions.create(**api_request_details)
-        choices = getattr(response, "choices", None)
-        if not choices or not choices[0].message.content:
-            logger.error("Risposta API priva di 'choices' validi")
-            raise RuntimeError("Risposta API non valida.")
-        content = choices[0].message.content
         evaluation = json.loads(content)
-        required_keys = [
-            "score",
-            "explanation",
-            "similarity",
-            "correctness",
-            "completeness",
-        ]
-        if not all(key in evaluation for key in required_keys):
-            raise ValueError(f"Risposta JSON incompleta: {content}")
-        return evaluation
     except json.JSONDecodeError as e:
         logger.error(
             f"Errore: Impossibile decodificare la risposta JSON dalla valutazione LLM: {content}"
         )
         raise ValueError(f"Errore di decodifica JSON: {content[:100]}...") from e
-    except (APIConnectionError, RateLimitError, APIStatusError) as e:
-        logger.error(f"Errore API durante la valutazione: {type(e).__name__} - {e}")
-        raise RuntimeError(str(e)) from e
-    except Exception as exc:  # noqa: BLE001
+    if not all(key in evaluation for key in EVALUATION_REQUIRED_KEYS):
+        raise RuntimeError(f"Risposta JSON incompleta: {content}")
+    return evaluation
+
+
+def _evaluation_error(exc: Exception) -> RuntimeError:
+    """Registra ``exc`` e lo converte nell'errore sollevato dalla valutazione."""
+    if isinstance(exc, (APIConnectionError, RateLimitError, APIStatusError)):
+        logger.error(f"Errore API durante la valutazione: {type(exc).__name__} - {exc}")
+    else:
         logger.error(
             f"Errore imprevisto durante la valutazione: {type(exc).__name__} - {exc}"
         )
-        raise RuntimeError(str(exc)) from exc
+    return RuntimeError(str(exc))
+
+
+def generate_answer(
+    question: str,
+    client_config: Dict[str, Any],
+    use_cache: bool = False,
+    stats: Dict[str, Any] | None = None,
+) -> str:
+    """Genera una risposta per ``question`` utilizzando la configurazione LLM fornita.
+
+    Restituisce solo la risposta generata. In caso di errore viene sollevata
+    un'eccezione. Con ``use_cache`` le richieste deterministiche vengono
+    servite, se possibile, dalla cache persistente delle risposte.
+    Se indicato, ``stats`` riceve ``latency`` (durata della sola chiamata API,
+    senza le attese del rate limiter) e ``tokens`` (``usage.total_tokens``);
+    resta vuoto quando la risposta proviene dalla cache.
+    """
+
+    client = _get_client(
+        client_config,
+        openai_client.get_openai_client,
+        "Client API non configurato",
+    )
+    api_request_details = _build_generation_request(question, client_config)
+    cache_key = _cache_key(client_config, api_request_details, use_cache)
+    cached = _cache_lookup(cache_key)
+    if cached is not None:
+        return cached
+
+    def call() -> Any:
+        started = time.perf_counter()
+        response = client.chat.completions.create(**api_request_details)
+        _record_usage(stats, started, response)
+        return response
+
+    try:
+        response = rate_limiter.call_with_rate_limit(
+            client_config, api_request_details, call
+        )
+        answer = _parse_generation_response(response)
+    except Exception as exc:  # noqa: BLE001
+        raise _generation_error(exc) from exc
+    _cache_store(cache_key, client_config, api_request_details, answer)
+    return answer
+
+
+async def generate_answer_async(
+    question: str,
+    client_config: Dict[str, Any],
+    use_cache: bool = False,
+    stats: Dict[str, Any] | None = None,
+) -> str:
+    """Variante asincrona di :func:`generate_answer` basata su ``AsyncOpenAI``."""
+
+    client = _get_client(
+        client_config,
+        openai_client.get_async_openai_client,
+        "Client API non configurato",
+    )
+    api_request_details = _build_generation_request(question, client_config)
+    cache_key = _cache_key(client_config, api_request_details, use_cache)
+    if cache_key is not None:
+        cached = await asyncio.to_thread(_cache_lookup, cache_key)
+        if cached is not None:
+            return cached
+
+    async def call() -> Any:
+        started = time.perf_counter()
+        response = await client.chat.completions.create(**api_request_details)
+        _record_usage(stats, started, response)
+        return response
+
+    try:
+        response = await rate_limiter.call_with_rate_limit_async(
+            client_config, api_request_details, call
+        )
+        answer = _parse_generation_response(response)
+    except Exception as exc:  # noqa: BLE001
+        raise _generation_error(exc) from exc
+    if cache_key is not None:
+        await asyncio.to_thread(
+            _cache_store, cache_key, client_config, api_request_details, answer
+        )
+    return answer
+
+
+def evaluate_answer(
+    question: str,
+    expected_answer: str,
+    actual_answer: str,
+    client_config: Dict[str, Any],
+    use_cache: bool = False,
+) -> Dict[str, Any]:
+    """Valuta ``actual_answer`` rispetto a ``expected_answer`` utilizzando un LLM.
+
+    Restituisce i dati di valutazione come dizionario oppure solleva
+    un'eccezione in caso di errore. Con ``use_cache`` le valutazioni
+    deterministiche vengono servite, se possibile, dalla cache persistente.
+    """
+
+    client = _get_client(
+        client_config,
+        openai_client.get_openai_client,
+        "Errore: Client API per la valutazione non configurato.",
+    )
+    api_request_details = _build_evaluation_request(
+        question, expected_answer, actual_answer, client_config
+    )
+    cache_key = _cache_key(client_config, api_request_details, use_cache)
+    cached = _cache_lookup(cache_key)
+    if cached is not None:
+        return json.loads(cached)
+
+    try:
+        response = rate_limiter.call_with_rate_limit(
+            client_config,
+            api_request_details,
+            lambda: client.chat.completions.create(**api_request_details),
+        )
+        evaluation = _parse_evaluation_response(response)
+    except ValueError:
+        raise
+    except Exception as exc:  # noqa: BLE001
+        raise _evaluation_error(exc) from exc
+    _cache_store(cache_key, client_config, api_request_details, json.dumps(evaluation))
+    return evaluation
+
+
+async def evaluate_answer_async(
+    question: str,
+    expected_answer: str,
+    actual_answer: str,
+    client_config: Dict[str, Any],
+    use_cache: bool = False,
+) -> Dict[str, Any]:
+    """Variante asincrona di :func:`evaluate_answer` basata su ``AsyncOpenAI``."""
+
+    client = _get_client(
+        client_config,
+        openai_client.get_async_openai_client,
+        "Errore: Client API per la valutazione non configurato.",
+    )
+    api_request_details = _build_evaluation_request(
+        question, expected_answer, actual_answer, client_config
+    )
+    cache_key = _cache_key(client_config, api_request_details, use_cache)
+    if cache_key is not None:
+        cached = await asyncio.to_thread(_cache_lookup, cache_key)
+        if cached is not None:
+            return json.loads(cached)
+
+    try:
+        response = await rate_limiter.call_with_rate_limit_async(
+            client_config,
+            api_request_details,
+            lambda: client.chat.completions.create(**api_request_details),
+        )
+        evaluation = _parse_evaluation_response(response)
+    except ValueError:
+        raise
+    except Exception as exc:  # noqa: BLE001
+        raise _evaluation_error(exc) from exc
+    if cache_key is not None:
+        await asyncio.to_thread(
+            _cache_store,
+            cache_key,
+            client_config,
+            api_request_details,
+            json.dumps(evaluation),
+        )
+    return evaluation
+
+
+def _batch_item_tokens(client_config: Dict[str, Any]) -> int:
+    """Token di output riservati a ogni elemento di una valutazione a lotti."""
+    max_tokens = int(client_config.get("max_tokens", 250) or 250)
+    return max(1, min(max_tokens, BATCH_EVALUATION_ITEM_TOKENS))
+
+
+def _build_batch_evaluation_request(
+    triples: List[Tuple[str, str, str]], client_config: Dict[str, Any]
+) -> Dict[str, Any]:
+    items = [
+        {
+            "id": idx,
+            "domanda": question,
+            "risposta_attesa": expected_answer,
+            "risposta_effettiva": actual_answer,
+        }
+        for idx, (question, expected_answer, actual_answer) in enumerate(triples)
+    ]
+    prompt = f"""
+    Sei un valutatore esperto che valuta la qualità delle risposte alle domande.
+    Per ciascun elemento dell'elenco seguente valuta la risposta effettiva
+    rispetto alla risposta attesa in base a:
+    1. Somiglianza (0-100): Quanto è semanticamente simile la risposta effettiva a quella attesa?
+    2. Correttezza (0-100): Le informazioni nella risposta effettiva sono fattualmente corrette?
+    3. Completezza (0-100): La risposta effettiva contiene tutti i punti chiave della risposta attesa?
+    Calcola un punteggio complessivo (0-100) basato su queste metriche.
+    Fornisci una breve spiegazione della tua valutazione (max 100 parole).
+    Valuta ogni elemento in modo indipendente dagli altri.
+
+    Elementi da valutare (JSON):
+    {json.dumps(items, ensure_ascii=False, indent=2)}
+
+    Formatta la tua risposta come un oggetto JSON con il campo "evaluations":
+    un array con un oggetto per ogni elemento, nello stesso ordine, con questi campi:
+    - id: l'id dell'elemento valutato (numero)
+    - score: il punteggio complessivo (numero)
+    - explanation: la tua spiegazione (stringa)
+    - similarity: punteggio di somiglianza (numero)
+    - correctness: punteggio di correttezza (numero)
+    - completeness: punteggio di completezza (numero)
+    Esempio di risposta JSON:
+    {{
+        "evaluations": [
+            {{
+                "id": 0,
+                "score": 95,
+                "explanation": "La risposta è corretta e completa",
+                "similarity": 90,
+                "correctness": 100,
+                "completeness": 95
+            }}
+        ]
+    }}
+    """
+
+    return {
+        "model": client_config.get("model", DEFAULT_MODEL),
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": client_config.get("temperature", 0.0),
+        "max_tokens": min(
+            _batch_item_tokens(client_config) * len(triples), BATCH_EVALUATION_MAX_TOKENS
+        ),
+        "response_format": {"type": "json_object"},
+    }
+
+
+def _valid_evaluation(evaluation: Any) -> bool:
+    if not isinstance(evaluation, dict):
+        return False
+    if not all(key in evaluation for key in EVALUATION_REQUIRED_KEYS):
+        return False
+    return all(
+        isinstance(evaluation[key], (int, float)) and not isinstance(evaluation[key], bool)
+        for key in ("score", "similarity", "correctness", "completeness")
+    )
+
+
+def _parse_batch_evaluation_response(
+    response: Any, count: int
+) -> List[Dict[str, Any] | None]:
+    """Estrae le valutazioni di un lotto; ``None`` per gli elementi non validi."""
+    choices = getattr(response, "choices", None)
+    if not choices or not choices[0].message.content:
+        raise RuntimeError("Risposta API non valida.")
+    content = choices[0].message.content
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Errore di decodifica JSON: {content[:100]}...") from e
+
+    entries = data.get("evaluations") if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        raise ValueError("Campo 'evaluations' mancante nella risposta del lotto")
+
+    evaluations: List[Dict[str, Any] | None] = [None] * count
+    for position, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            continue
+        try:
+            idx = int(entry.get("id", position))
+        except (TypeError, ValueError):
+            continue
+        if 0 <= idx < count and evaluations[idx] is None and _valid_evaluation(entry):
+            evaluations[idx] = {
+                key: value for key, value in entry.items() if key != "id"
+            }
+    return evaluations
+
+
+def _evaluate_batch_outcomes(
+    triples: List[Tuple[str, str, str]],
+    client_config: Dict[str, Any],
+    use_cache: bool = False,
+) -> List[Tuple[Dict[str, Any] | None, str | None]]:
+    """Valuta ``triples`` con una sola richiesta, ripiegando sulle singole valutazioni.
+
+    Se le valutazioni richieste superano ``BATCH_EVALUATION_MAX_TOKENS`` token
+    di output, il lotto viene diviso in più richieste.
+
+    Restituisce per ogni terna la valutazione oppure il messaggio di errore
+    della valutazione singola usata come ripiego.
+    """
+    single_requests = [
+        _build_evaluation_request(question, expected, actual, client_config)
+        for question, expected, actual in triples
+    ]
+    cache_keys = [
+        _cache_key(client_config, request, use_cache) for request in single_requests
+    ]
+    evaluations: List[Dict[str, Any] | None] = []
+    for cache_key in cache_keys:
+        cached = _cache_lookup(cache_key)
+        evaluations.append(json.loads(cached) if cached is not None else None)
+
+    missing = [idx for idx, evaluation in enumerate(evaluations) if evaluation is None]
+    per_request = max(1, BATCH_EVALUATION_MAX_TOKENS // _batch_item_tokens(client_config))
+    for start in range(0, len(missing), per_request):
+        group = missing[start:start + per_request]
+        if len(group) < 2:
+            continue
+        batch_request = _build_batch_evaluation_request(
+            [triples[idx] for idx in group], client_config
+        )
+        try:
+            client = _get_client(
+                client_config,
+                openai_client.get_openai_client,
+                "Errore: Client API per la valutazione non configurato.",
+            )
+            response = rate_limiter.call_with_rate_limit(
+                client_config,
+                batch_request,
+                lambda: client.chat.completions.create(**batch_request),
+            )
+            parsed = _parse_batch_evaluation_response(response, len(group))
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(
+                "Valutazione a lotti non riuscita (%s - %s): valutazione delle singole risposte",
+                type(exc).__name__,
+                exc,
+            )
+            parsed = [None] * len(group)
+        for idx, evaluation in zip(group, parsed):
+            if evaluation is not None:
+                evaluations[idx] = evaluation
+                _cache_store(
+                    cache_keys[idx], client_config, single_requests[idx], json.dumps(evaluation)
+                )
+
+    outcomes: List[Tuple[Dict[str, Any] | None, str | None]] = []
+    fallback = 0
+    for idx, evaluation in enumerate(evaluations):
+        if evaluation is not None:
+            outcomes.append((evaluation, None))
+            continue
+        fallback += 1
+        question, expected, actual = triples[idx]
+        try:
+            outcomes.append(
+                (evaluate_answer(question, expected, actual, client_config, use_cache=use_cache), None)
+            )
+        except Exception as e:  # noqa: BLE001
+            outcomes.append((None, str(e)))
+    if fallback and len(missing) > 1:
+        logger.info(
+            "%d valutazioni su %d ripetute singolarmente dopo la valutazione a lotti",
+            fallback,
+            len(triples),
+        )
+    return outcomes
+
+
+def evaluate_answers_batch(
+    triples: List[Tuple[str, str, str]],
+    client_config: Dict[str, Any],
+    use_cache: bool = False,
+) -> List[Dict[str, Any]]:
+    """Valuta più terne ``(domanda, risposta attesa, risposta effettiva)`` insieme.
+
+    Le terne vengono inviate al modello valutatore in un'unica richiesta in
+    modalità JSON, così la rubrica di valutazione viene trasmessa una sola
+    volta. Gli elementi mancanti o non validi nella risposta vengono valutati
+    singolarmente con :func:`evaluate_answer`. Restituisce le valutazioni
+    nello stesso ordine di ``triples`` e solleva un'eccezione se anche la
+    valutazione singola di un elemento fallisce.
+    """
+    evaluations: List[Dict[str, Any]] = []
+    for evaluation, error in _evaluate_batch_outcomes(triples, client_config, use_cache):
+        if evaluation is None:
+            raise RuntimeError(error or "Valutazione non riuscita")
+        evaluations.append(evaluation)
+    return evaluations
+
+
+def _error_evaluation(message: str) -> Dict[str, Any]:
+    """Valutazione a punteggio nullo usata quando generazione o valutazione falliscono."""
+    return {
+        "score": 0,
+        "explanation": message,
+        "similarity": 0,
+        "correctness": 0,
+        "completeness": 0,
+    }
+
+
+def _prepare_items(
+    question_ids: List[str], questions_map: Dict[str, Question]
+) -> List[Tuple[str, str, str]]:
+    """Restituisce le terne ``(id, domanda, risposta attesa)`` da eseguire."""
+    items: List[Tuple[str, str, str]] = []
+    for q_id in question_ids:
+        q_obj = questions_map.get(str(q_id))
+        if not q_obj:
+            continue
+        question = q_obj.domanda or ""
+        if not question.strip():
+            continue
+        expected = q_obj.risposta_attesa or "Risposta non disponibile"
+        items.append((str(q_id), question, expected))
+    return items
+
+
+def _result_entry(
+    question: str,
+    expected: str,
+    actual_answer: str,
+    evaluation: Dict[str, Any],
+    stats: Dict[str, Any] | None = None,
+) -> Dict[str, Any]:
+    entry: Dict[str, Any] = {
+        "question": question,
+        "expected_answer": expected,
+        "actual_answer": actual_answer,
+        "evaluation": evaluation,
+    }
+    if stats:
+        # Durata della chiamata di generazione (in secondi) e token consumati;
+        # assenti se la risposta proviene dalla cache
+        if "latency" in stats:
+            entry["latency"] = round(stats["latency"], 3)
+        if "tokens" in stats:
+            entry["tokens"] = stats["tokens"]
+    return entry
+
+
+# Callback invocata con id della domanda, risultato e flag di errore
+ResultCallback = Callable[[str, Dict[str, Any], bool], None]
+# Callback di avanzamento: id dell'esecuzione, domande completate e totali
+ProgressCallback = Callable[[Optional[str], int, int], None]
+# Combinazioni della matrice eseguite contemporaneamente
+MATRIX_MAX_PARALLEL_RUNS = 4
+
+
+def _notify(
+    on_result: Optional[ResultCallback], failed_ids: set[str]
+) -> Optional[Callable[[Tuple[str, str, str], Dict[str, Any]], None]]:
+    if on_result is None:
+        return None
+
+    def callback(item: Tuple[str, str, str], entry: Dict[str, Any]) -> None:
+        on_result(item[0], entry, item[0] in failed_ids)
+
+    return callback
+
+
+def _track_cache(cache_stats: Optional[Dict[str, int]]) -> ContextManager[Any]:
+    """Conta in ``cache_stats``, se indicato, hit e miss della cache nel blocco."""
+    if cache_stats is None:
+        return contextlib.nullcontext()
+    return ResponseCache.track(cache_stats)
+
+
+def _execute_questions(
+    items: List[Tuple[str, str, str]],
+    gen_preset_config: dict[str, Any],
+    eval_preset_config: dict[str, Any],
+    use_async: bool = False,
+    use_cache: bool = True,
+    on_result: Optional[ResultCallback] = None,
+    evaluation_batch_size: int = 1,
+    cache_stats: Optional[Dict[str, int]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Genera e valuta le risposte di ``items`` tramite la pipeline concorrente.
+
+    Con ``use_async`` le chiamate vengono eseguite sull'event loop condiviso
+    di :func:`openai_client.run_async` tramite i client ``AsyncOpenAI``,
+    adatto a fan-out elevati.
+    Con ``evaluation_batch_size`` maggiore di 1 le risposte vengono valutate
+    a lotti tramite :func:`evaluate_answers_batch` (sempre nel percorso a thread).
+    ``on_result`` riceve id della domanda, risultato e un flag di errore non
+    appena ciascuna domanda è completata. ``cache_stats`` accumula hit e miss
+    della cache delle risposte di questa chiamata.
+    Il dizionario restituito mantiene l'ordine di ``items``.
+    """
+    if use_async and evaluation_batch_size <= 1:
+        return openai_client.run_async(
+            _execute_questions_async(
+                items,
+                gen_preset_config,
+                eval_preset_config,
+                use_cache=use_cache,
+                on_result=on_result,
+                cache_stats=cache_stats,
+            )
+        )
+
+    failed_ids: set[str] = set()
+    usage: Dict[str, Dict[str, Any]] = {}
+
+    def generate_step(item: Tuple[str, str, str]) -> Tuple[str, str | None]:
+        q_id, question, _ = item
+        try:
+            with llm_pipeline.concurrency_slot(gen_preset_config):
+                stats: Dict[str, Any] = {}
+                answer = generate_answer(
+                    question, gen_preset_config, use_cache=use_cache, stats=stats
+                )
+                usage[q_id] = stats
+                return answer, None
+        except Exception as e:  # noqa: BLE001
+            return str(e), str(e)
+
+    def evaluate_step(
+        item: Tuple[str, str, str], generated: Tuple[str, str | None]
+    ) -> Dict[str, Any]:
+        q_id, question, expected = item
+        actual_answer, error_msg = generated
+        if error_msg is not None:
+            failed_ids.add(q_id)
+            evaluation = _error_evaluation(error_msg)
+        else:
+            try:
+                with llm_pipeline.concurrency_slot(eval_preset_config):
+                    evaluation = evaluate_answer(
+                        question,
+                        expected,
+                        actual_answer,
+                        eval_preset_config,
+                        use_cache=use_cache,
+                    )
+            except Exception as e:  # noqa: BLE001
+                failed_ids.add(q_id)
+                evaluation = _error_evaluation(str(e))
+        return _result_entry(
+            question, expected, actual_answer, evaluation, usage.get(q_id)
+        )
+
+    def evaluate_batch_step(
+        batch: List[Tuple[Tuple[str, str, str], Tuple[str, str | None]]]
+    ) -> List[Dict[str, Any]]:
+        evaluations: Dict[int, Dict[str, Any]] = {}
+        to_evaluate: List[int] = []
+        for position, ((q_id, _, _), (_, error_msg)) in enumerate(batch):
+            if error_msg is not None:
+                failed_ids.add(q_id)
+                evaluations[position] = _error_evaluation(error_msg)
+            else:
+                to_evaluate.append(position)
+
+        if to_evaluate:
+            triples = [
+                (batch[pos][0][1], batch[pos][0][2], batch[pos][1][0])
+                for pos in to_evaluate
+            ]
+            try:
+                with llm_pipeline.concurrency_slot(eval_preset_config):
+                    outcomes = _evaluate_batch_outcomes(
+                        triples, eval_preset_config, use_cache=use_cache
+                    )
+            except Exception as e:  # noqa: BLE001
+                outcomes = [(None, str(e))] * len(triples)
+            for pos, (evaluation, error) in zip(to_evaluate, outcomes):
+                if evaluation is None:
+                    failed_ids.add(batch[pos][0][0])
+                    evaluation = _error_evaluation(error or "Valutazione non riuscita")
+                evaluations[pos] = evaluation
+
+        return [
+            _result_entry(
+                item[1], item[2], generated[0], evaluations[pos], usage.get(item[0])
+            )
+            for pos, (item, generated) in enumerate(batch)
+        ]
+
+    with _track_cache(cache_stats):
+        if evaluation_batch_size > 1:
+            outcomes = llm_pipeline.run_batched_pipeline(
+                items,
+                generate_step,
+                evaluate_batch_step,
+                batch_size=evaluation_batch_size,
+                generation_workers=llm_pipeline.get_max_concurrency(gen_preset_config),
+                evaluation_workers=llm_pipeline.get_max_concurrency(eval_preset_config),
+                on_result=_notify(on_result, failed_ids),
+            )
+        else:
+            outcomes = llm_pipeline.run_pipeline(
+                items,
+                generate_step,
+                evaluate_step,
+                generation_workers=llm_pipeline.get_max_concurrency(gen_preset_config),
+                evaluation_workers=llm_pipeline.get_max_concurrency(eval_preset_config),
+                on_result=_notify(on_result, failed_ids),
+            )
+    return {item[0]: outcome for item, outcome in zip(items, outcomes)}
+
+
+async def _execute_questions_async(
+    items: List[Tuple[str, str, str]],
+    gen_preset_config: dict[str, Any],
+    eval_preset_config: dict[str, Any],
+    use_cache: bool = True,
+    on_result: Optional[ResultCallback] = None,
+    cache_stats: Optional[Dict[str, int]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Variante asincrona di :func:`_execute_questions`."""
+    failed_ids: set[str] = set()
+    usage: Dict[str, Dict[str, Any]] = {}
+
+    async def generate_step(item: Tuple[str, str, str]) -> Tuple[str, str | None]:
+        q_id, question, _ = item
+        try:
+            async with llm_pipeline.async_concurrency_slot(gen_preset_config):
+                stats: Dict[str, Any] = {}
+                answer = await generate_answer_async(
+                    question, gen_preset_config, use_cache=use_cache, stats=stats
+                )
+                usage[q_id] = stats
+                return answer, None
+        except Exception as e:  # noqa: BLE001
+            return str(e), str(e)
+
+    async def evaluate_step(
+        item: Tuple[str, str, str], generated: Tuple[str, str | None]
+    ) -> Dict[str, Any]:
+        q_id, question, expected = item
+        actual_answer, error_msg = generated
+        if error_msg is not None:
+            failed_ids.add(q_id)
+            evaluation = _error_evaluation(error_msg)
+        else:
+            try:
+                async with llm_pipeline.async_concurrency_slot(eval_preset_config):
+                    evaluation = await evaluate_answer_async(
+                        question,
+                        expected,
+                        actual_answer,
+                        eval_preset_config,
+                        use_cache=use_cache,
+                    )
+            except Exception as e:  # noqa: BLE001
+                failed_ids.add(q_id)
+                evaluation = _error_evaluation(str(e))
+        return _result_entry(
+            question, expected, actual_answer, evaluation, usage.get(q_id)
+        )
+
+    # Il contesto viene impostato qui, sull'event loop condiviso, perché le
+    # coroutine della pipeline ereditino i contatori della cache
+    with _track_cache(cache_stats):
+        outcomes = await llm_pipeline.run_pipeline_async(
+            items, generate_step, evaluate_step, on_result=_notify(on_result, failed_ids)
+        )
+    return {item[0]: outcome for item, outcome in zip(items, outcomes)}
+
+
+def _start_run(
+    set_id: str,
+    set_name: str,
+    question_ids: List[str],
+    gen_preset_config: dict[str, Any],
+    eval_preset_config: dict[str, Any],
+    sampling: Optional[Dict[str, Any]] = None,
+) -> str | None:
+    """Registra l'esecuzione; in caso di errore il test prosegue senza checkpoint."""
+    try:
+        run = TestRun.create(
+            set_id,
+            set_name,
+            question_ids,
+            gen_preset_config,
+            eval_preset_config,
+            sampling=sampling,
+        )
+        return run.id
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Impossibile registrare l'esecuzione del test: %s", exc)
+        return None
+
+
+def _checkpoint(
+    run_id: str | None,
+    progress: Optional[ProgressCallback] = None,
+    completed: int = 0,
+    total: int = 0,
+) -> Optional[ResultCallback]:
+    """Restituisce la callback che salva ogni domanda completata di ``run_id``.
+
+    Se indicata, ``progress`` viene notificata subito con ``completed`` domande
+    già concluse e poi dopo ogni nuova domanda.
+    """
+    if run_id is None and progress is None:
+        return None
+    if progress is not None:
+        progress(run_id, completed, total)
+    done = [completed]
+
+    def save(q_id: str, entry: Dict[str, Any], failed: bool) -> None:
+        if run_id is not None:
+            try:
+                TestRun.save_item(run_id, q_id, entry, failed)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(
+                    "Impossibile salvare il checkpoint della domanda %s: %s", q_id, exc
+                )
+        done[0] += 1
+        if progress is not None:
+            progress(run_id, done[0], total)
+
+    return save
+
+
+def _finalize_run(
+    run_id: str | None,
+    set_id: str,
+    set_name: str,
+    results: Dict[str, Dict[str, Any]],
+    gen_preset_config: dict[str, Any],
+    eval_preset_config: dict[str, Any],
+    use_cache: bool,
+    extra: Optional[Dict[str, Any]] = None,
+    refresh: bool = True,
+    cache_stats: Optional[Dict[str, int]] = None,
+) -> dict[str, Any]:
+    """Salva il risultato finale del test e chiude l'esecuzione ``run_id``.
+
+    ``extra`` viene aggiunto ai dati del risultato. Con ``refresh=False`` la
+    cache dei risultati non viene aggiornata e ``results_df`` è omesso: il
+    chiamante la aggiorna una sola volta al termine di più esecuzioni.
+    ``cache_stats`` contiene hit e miss della cache di questa esecuzione.
+    """
+    if use_cache and cache_stats is not None:
+        hits = cache_stats.get("hits", 0)
+        misses = cache_stats.get("misses", 0)
+        logger.info(
+            "Cache delle risposte dell'esecuzione: %d hit, %d miss (hit rate %.0f%%)",
+            hits,
+            misses,
+            hits / (hits + misses) * 100 if hits + misses else 0.0,
+        )
+
+    stats = TestResult.calculate_statistics(results)
+    result_data = {
+        "set_name": set_name,
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "avg_score": stats["avg_score"],
+        "sample_type": "Generata da LLM",
+        "method": "LLM",
+        "generation_llm": gen_preset_config.get("model"),
+        "evaluation_llm": eval_preset_config.get("model"),
+        "questions": results,
+        "per_question_scores": stats["per_question_scores"],
+        "radar_metrics": stats["radar_metrics"],
+        **(extra or {}),
+    }
+
+    result_id = (
+        TestResult.add_and_refresh(set_id, result_data)
+        if refresh
+        else TestResult.add(set_id, result_data)
+    )
+    if run_id is not None:
+        try:
+            TestRun.complete(run_id, result_id)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Impossibile chiudere l'esecuzione %s: %s", run_id, exc)
+    outcome = {
+        "result_id": result_id,
+        "run_id": run_id,
+        "avg_score": stats["avg_score"],
+        "results": results,
+        "per_question_scores": stats["per_question_scores"],
+        "radar_metrics": stats["radar_metrics"],
+    }
+    if refresh:
+        outcome["results_df"] = TestResult.load_all_df()
+    return outcome
+
+
+def _run_items(
+    set_id: str,
+    set_name: str,
+    items: List[Tuple[str, str, str]],
+    gen_preset_config: dict[str, Any],
+    eval_preset_config: dict[str, Any],
+    use_async: bool = False,
+    use_cache: bool = True,
+    progress: Optional[ProgressCallback] = None,
+    evaluation_batch_size: int = 1,
+    extra: Optional[Dict[str, Any]] = None,
+    refresh: bool = True,
+) -> dict[str, Any]:
+    """Registra, esegue e salva il test delle domande già preparate ``items``."""
+    run_id = _start_run(
+        set_id,
+        set_name,
+        [item[0] for item in items],
+        gen_preset_config,
+        eval_preset_config,
+    )
+    cache_stats: Dict[str, int] = {}
+    results = _execute_questions(
+        items,
+        gen_preset_config,
+        eval_preset_config,
+        use_async=use_async,
+        use_cache=use_cache,
+        on_result=_checkpoint(run_id, progress, 0, len(items)),
+        evaluation_batch_size=evaluation_batch_size,
+        cache_stats=cache_stats,
+    )
+    return _finalize_run(
+        run_id,
+        set_id,
+        set_name,
+        results,
+        gen_preset_config,
+        eval_preset_config,
+        use_cache,
+        extra=extra,
+        refresh=refresh,
+        cache_stats=cache_stats,
+    )
+
+
+def _run_sampled(
+    set_id: str,
+    set_name: str,
+    items: List[Tuple[str, str, str]],
+    categories: Dict[str, str],
+    gen_preset_config: dict[str, Any],
+    eval_preset_config: dict[str, Any],
+    sampling: SamplingConfig,
+    use_async: bool = False,
+    use_cache: bool = True,
+    progress: Optional[ProgressCallback] = None,
+    evaluation_batch_size: int = 1,
+) -> dict[str, Any]:
+    """Valuta un campione casuale di ``items`` fermandosi quando l'IC è abbastanza stretto.
+
+    Le domande vengono valutate a blocchi (``min_questions``, poi ``step``)
+    nell'ordine di :func:`sample_order`; dopo ogni blocco viene calcolato
+    l'intervallo bootstrap del punteggio medio. Il risultato riporta in
+    ``sampling`` dimensione del campione, intervallo e parametri usati.
+    """
+    by_id = {item[0]: item for item in items}
+    order = sample_order(
+        list(by_id), categories if sampling.stratify else None, sampling.seed
+    )
+    planned = [by_id[q_id] for q_id in order[:sampling.max_questions]]
+    run_id = _start_run(
+        set_id,
+        set_name,
+        [item[0] for item in planned],
+        gen_preset_config,
+        eval_preset_config,
+        # La dimensione della popolazione non è ricavabile dall'ordine
+        # pianificato: viene salvata per riportarla anche dopo una ripresa
+        sampling={**sampling.to_dict(), "population_size": len(items)},
+    )
+    return _continue_sampled(
+        run_id,
+        set_id,
+        set_name,
+        planned,
+        {},
+        len(items),
+        categories,
+        gen_preset_config,
+        eval_preset_config,
+        sampling,
+        use_async=use_async,
+        use_cache=use_cache,
+        progress=progress,
+        evaluation_batch_size=evaluation_batch_size,
+    )
+
+
+def _continue_sampled(
+    run_id: str | None,
+    set_id: str,
+    set_name: str,
+    planned: List[Tuple[str, str, str]],
+    done: Dict[str, Dict[str, Any]],
+    population_size: int,
+    categories: Dict[str, str],
+    gen_preset_config: dict[str, Any],
+    eval_preset_config: dict[str, Any],
+    sampling: SamplingConfig,
+    use_async: bool = False,
+    use_cache: bool = True,
+    progress: Optional[ProgressCallback] = None,
+    evaluation_batch_size: int = 1,
+) -> dict[str, Any]:
+    """Prosegue la valutazione a blocchi di ``planned`` a partire da ``done``.
+
+    Le domande già in ``done`` non vengono rieseguite; se sono sufficienti
+    a ottenere un intervallo abbastanza stretto l'esecuzione si chiude
+    senza nuove chiamate API.
+    """
+    results: Dict[str, Dict[str, Any]] = dict(done)
+    on_result = _checkpoint(run_id, progress, len(results), len(planned))
+    first_check = min(sampling.min_questions, len(planned))
+    cache_stats: Dict[str, int] = {}
+    ci_low, ci_high = 0.0, 0.0
+    # L'arresto anticipato vale solo se l'intervallo è abbastanza stretto;
+    # un blocco senza risultati interrompe il campionamento senza convergenza
+    converged = False
+    incomplete = False
+    while True:
+        remaining = [item for item in planned if item[0] not in results]
+        if results and len(results) >= first_check:
+            ci_low, ci_high = bootstrap_ci(
+                [r.get("evaluation", {}).get("score", 0) or 0 for r in results.values()],
+                sampling.confidence,
+                sampling.resamples,
+                [categories.get(q_id, "") for q_id in results] if sampling.stratify else None,
+                sampling.seed,
+            )
+            if ci_high - ci_low <= sampling.ci_width:
+                converged = True
+                break
+        if not remaining:
+            break
+        if len(results) < sampling.min_questions:
+            size = sampling.min_questions - len(results)
+        else:
+            size = sampling.step
+        block_results = _execute_questions(
+            remaining[:size],
+            gen_preset_config,
+            eval_preset_config,
+            use_async=use_async,
+            use_cache=use_cache,
+            on_result=on_result,
+            evaluation_batch_size=evaluation_batch_size,
+            cache_stats=cache_stats,
+        )
+        if not block_results:
+            incomplete = True
+            logger.warning(
+                "Campionamento interrotto dopo %d domande su %d: nessun risultato dal blocco",
+                len(results),
+                len(planned),
+            )
+            break
+        results.update(block_results)
+
+    stopped_early = converged and len(results) < len(planned)
+    if stopped_early:
+        logger.info(
+            "Campionamento interrotto dopo %d domande su %d: IC [%.1f, %.1f]",
+            len(results),
+            population_size,
+            ci_low,
+            ci_high,
+        )
+        if progress is not None:
+            progress(run_id, len(results), len(results))
+    ordered = {item[0]: results[item[0]] for item in planned if item[0] in results}
+    return _finalize_run(
+        run_id,
+        set_id,
+        set_name,
+        ordered,
+        gen_preset_config,
+        eval_preset_config,
+        use_cache,
+        extra={
+            "sampling": {
+                "sample_size": len(ordered),
+                "population_size": population_size,
+                "ci_low": round(ci_low, 3),
+                "ci_high": round(ci_high, 3),
+                "ci_width": round(ci_high - ci_low, 3),
+                "confidence": sampling.confidence,
+                "stopped_early": stopped_early,
+                "converged": converged,
+                "incomplete": incomplete,
+                "settings": sampling.to_dict(),
+            }
+        },
+        cache_stats=cache_stats,
+    )
 
 
 def run_test(
@@ -209,91 +1355,340 @@ def run_test(
     question_ids: List[str],
     gen_preset_config: dict[str, Any],
     eval_preset_config: dict[str, Any],
+    use_async: bool = False,
+    use_cache: bool = True,
+    progress: Optional[ProgressCallback] = None,
+    evaluation_batch_size: int = 1,
+    sampling: Optional[SamplingConfig] = None,
 ) -> dict[str, Any]:
-    """Esegue un test generando e valutando risposte con LLM."""
+    """Esegue un test generando e valutando risposte con LLM.
+
+    Le domande vengono elaborate in parallelo fino al limite ``max_concurrency``
+    di ciascun preset; la valutazione di una risposta parte non appena questa è
+    stata generata. Con ``use_async`` viene usato il percorso asincrono.
+    Le chiamate rispettano i limiti di richieste e token al minuto dei preset
+    e gli errori di rate limit vengono ritentati prima di assegnare punteggio 0.
+    Con ``use_cache=False`` la cache persistente delle risposte viene ignorata.
+
+    Ogni domanda completata viene salvata subito come checkpoint
+    dell'esecuzione, che in caso di interruzione può essere ripresa con
+    :func:`resume_test`. ``progress`` riceve l'avanzamento dell'esecuzione.
+    Con ``evaluation_batch_size`` maggiore di 1 il modello valutatore riceve
+    più risposte per richiesta.
+
+    Con ``sampling`` viene valutato solo un campione casuale delle domande
+    (eventualmente stratificato per categoria), interrotto non appena
+    l'intervallo di confidenza del punteggio medio è più stretto di
+    ``sampling.ci_width``: vedi :class:`~utils.sampling.SamplingConfig`.
+    """
 
     try:
         questions_map = {str(q.id): q for q in Question.load_all()}
-        results: Dict[str, Dict[str, Any]] = {}
+        if sampling is not None:
+            return _run_sampled(
+                set_id,
+                set_name,
+                _prepare_items(question_ids, questions_map),
+                {q_id: getattr(q, "categoria", "") or "" for q_id, q in questions_map.items()},
+                gen_preset_config,
+                eval_preset_config,
+                sampling,
+                use_async=use_async,
+                use_cache=use_cache,
+                progress=progress,
+                evaluation_batch_size=evaluation_batch_size,
+            )
+        return _run_items(
+            set_id,
+            set_name,
+            _prepare_items(question_ids, questions_map),
+            gen_preset_config,
+            eval_preset_config,
+            use_async=use_async,
+            use_cache=use_cache,
+            progress=progress,
+            evaluation_batch_size=evaluation_batch_size,
+        )
+    except Exception as exc:  # noqa: BLE001
+        logger.error(
+            f"Errore durante l'esecuzione del test LLM: {type(exc).__name__} - {exc}"
+        )
+        return {}
 
-        for q_id in question_ids:
-            q_obj = questions_map.get(str(q_id))
-            if not q_obj:
-                continue
-            question = q_obj.domanda or ""
-            if not question.strip():
-                continue
-            expected = q_obj.risposta_attesa or "Risposta non disponibile"
 
-            try:
-                actual_answer = generate_answer(question, gen_preset_config)
-            except Exception as e:  # noqa: BLE001
-                error_msg = str(e)
-                evaluation = {
-                    "score": 0,
-                    "explanation": error_msg,
-                    "similarity": 0,
-                    "correctness": 0,
-                    "completeness": 0,
-                }
-                actual_answer = error_msg
-            else:
-                try:
-                    evaluation = evaluate_answer(
-                        question, expected, actual_answer, eval_preset_config
-                    )
-                except Exception as e:  # noqa: BLE001
-                    error_msg = str(e)
-                    evaluation = {
-                        "score": 0,
-                        "explanation": error_msg,
-                        "similarity": 0,
-                        "correctness": 0,
-                        "completeness": 0,
-                    }
-
-            results[str(q_id)] = {
-                "question": question,
-                "expected_answer": expected,
-                "actual_answer": actual_answer,
-                "evaluation": evaluation,
+def resume_test(
+    run_id: str,
+    gen_preset_config: dict[str, Any],
+    eval_preset_config: dict[str, Any],
+    use_async: bool = False,
+    use_cache: bool = True,
+    progress: Optional[ProgressCallback] = None,
+    evaluation_batch_size: int = 1,
+) -> dict[str, Any]:
+    """Riprende un'esecuzione interrotta di :func:`run_test`.
+
+    Le domande già completate vengono riutilizzate senza nuove chiamate API;
+    sono rieseguite solo quelle mancanti o terminate con un errore.
+    Le esecuzioni a campione riprendono con i parametri salvati e la stessa
+    regola di arresto sull'intervallo di confidenza. Restituisce lo stesso dizionario di :func:`run_test` oppure ``{}`` in
+    caso di errore.
+    """
+
+    try:
+        run = TestRun.get(run_id)
+        if run is None:
+            raise ValueError(f"Esecuzione '{run_id}' non trovata")
+        if run.status != STATUS_PARTIAL:
+            raise ValueError(f"L'esecuzione '{run_id}' è già completata")
+
+        done = TestRun.load_items(run_id, include_failed=False)
+        questions_map = {str(q.id): q for q in Question.load_all()}
+        planned = _prepare_items(run.question_ids, questions_map)
+        if run.sampling:
+            settings = dict(run.sampling)
+            population_size = int(settings.pop("population_size", len(planned)))
+            logger.info(
+                "Ripresa dell'esecuzione a campione %s: %d domande completate",
+                run_id,
+                len(done),
+            )
+            return _continue_sampled(
+                run_id,
+                run.set_id,
+                run.set_name,
+                planned,
+                {q_id: done[q_id] for q_id in run.question_ids if q_id in done},
+                population_size,
+                {q_id: getattr(q, "categoria", "") or "" for q_id, q in questions_map.items()},
+                gen_preset_config,
+                eval_preset_config,
+                SamplingConfig(**settings),
+                use_async=use_async,
+                use_cache=use_cache,
+                progress=progress,
+                evaluation_batch_size=evaluation_batch_size,
+            )
+        items = [item for item in planned if item[0] not in done]
+        logger.info(
+            "Ripresa dell'esecuzione %s: %d domande completate, %d da eseguire",
+            run_id,
+            len(done),
+            len(items),
+        )
+        cache_stats: Dict[str, int] = {}
+        new_results = _execute_questions(
+            items,
+            gen_preset_config,
+            eval_preset_config,
+            use_async=use_async,
+            use_cache=use_cache,
+            on_result=_checkpoint(run_id, progress, len(done), len(done) + len(items)),
+            evaluation_batch_size=evaluation_batch_size,
+            cache_stats=cache_stats,
+        )
+        results = {
+            q_id: done[q_id] if q_id in done else new_results[q_id]
+            for q_id in run.question_ids
+            if q_id in done or q_id in new_results
+        }
+        return _finalize_run(
+            run_id,
+            run.set_id,
+            run.set_name,
+            results,
+            gen_preset_config,
+            eval_preset_config,
+            use_cache,
+            cache_stats=cache_stats,
+        )
+    except Exception as exc:  # noqa: BLE001
+        logger.error(
+            f"Errore durante la ripresa del test LLM: {type(exc).__name__} - {exc}"
+        )
+        return {}
+
+
+def _matrix_summary(
+    combinations: List[Dict[str, Any]], eval_preset_config: dict[str, Any]
+) -> Dict[str, Any]:
+    """Riepilogo della matrice con il preset migliore di ogni set."""
+    best: Dict[str, Dict[str, Any]] = {}
+    for combo in combinations:
+        if combo["error"] is not None:
+            continue
+        current = best.get(combo["set_id"])
+        if current is None or combo["avg_score"] > current["avg_score"]:
+            best[combo["set_id"]] = {
+                "generation_preset": combo["generation_preset"],
+                "generation_llm": combo["generation_llm"],
+                "avg_score": combo["avg_score"],
+                "result_id": combo["result_id"],
             }
+    return {
+        "evaluation_preset": eval_preset_config.get("name"),
+        "evaluation_llm": eval_preset_config.get("model"),
+        "combinations": combinations,
+        "best_by_set": best,
+        "failed": sum(1 for c in combinations if c["error"] is not None),
+    }
+
+
+def run_matrix(
+    set_ids: Sequence[str],
+    gen_preset_configs: Sequence[dict[str, Any]],
+    eval_preset_config: dict[str, Any],
+    use_cache: bool = True,
+    progress: Optional[ProgressCallback] = None,
+    evaluation_batch_size: int = 1,
+    max_parallel_runs: int = MATRIX_MAX_PARALLEL_RUNS,
+) -> dict[str, Any]:
+    """Esegue ogni combinazione set × preset di generazione con un unico valutatore.
+
+    Le domande di tutti i set vengono caricate una sola volta e le
+    combinazioni vengono eseguite in parallelo (al massimo
+    ``max_parallel_runs`` alla volta) condividendo i limiti di concorrenza
+    dei preset: le esecuzioni dello stesso preset non superano insieme il
+    suo ``max_concurrency``. Ogni combinazione salva un ``TestResult`` con
+    ``matrix_id``, ``generation_preset`` ed ``evaluation_preset``; un errore
+    in una combinazione non interrompe le altre e viene riportato nel
+    riepilogo. ``progress`` riceve ``(None, domande completate, totale)``
+    sommati su tutte le combinazioni.
+
+    Restituisce ``matrix_id``, ``result_ids``, ``summary`` (vedi
+    :class:`TestMatrix`) e ``results_df``, oppure ``{}`` in caso di errore;
+    una matrice già registrata viene in tal caso chiusa come fallita.
+    """
+
+    matrix: Optional[TestMatrix] = None
+    finished = False
+    try:
+        if not set_ids or not gen_preset_configs:
+            raise ValueError("Seleziona almeno un set e un preset di generazione")
+        sets = []
+        for set_id in dict.fromkeys(str(s) for s in set_ids):
+            qset = QuestionSet.get(set_id)
+            if qset is None:
+                raise ValueError(f"Set '{set_id}' non trovato")
+            sets.append(qset)
 
-        stats = TestResult.calculate_statistics(results)
-        result_data = {
-            "set_name": set_name,
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "avg_score": stats["avg_score"],
-            "sample_type": "Generata da LLM",
-            "method": "LLM",
-            "generation_llm": gen_preset_config.get("model"),
-            "evaluation_llm": eval_preset_config.get("model"),
-            "questions": results,
-            "per_question_scores": stats["per_question_scores"],
-            "radar_metrics": stats["radar_metrics"],
+        questions_map = {
+            str(q.id): q
+            for q in Question.load_by_ids(q_id for qset in sets for q_id in qset.questions)
         }
+        items_by_set = {
+            qset.id: _prepare_items(qset.questions, questions_map) for qset in sets
+        }
+        matrix = TestMatrix.create(
+            [qset.id for qset in sets],
+            [str(p.get("name") or "") for p in gen_preset_configs],
+            str(eval_preset_config.get("name") or ""),
+        )
+        combinations = [(qset, gen) for qset in sets for gen in gen_preset_configs]
+        total = sum(len(items_by_set[qset.id]) for qset, _ in combinations)
+        completed = [0] * len(combinations)
+        lock = threading.Lock()
+
+        def report(index: int) -> Optional[ProgressCallback]:
+            if progress is None:
+                return None
 
-        result_id = TestResult.add_and_refresh(set_id, result_data)
+            def callback(run_id: Optional[str], done: int, _total: int) -> None:
+                with lock:
+                    completed[index] = done
+                    progress(None, sum(completed), total)
+
+            return callback
+
+        def execute(index: int) -> Dict[str, Any]:
+            qset, gen = combinations[index]
+            summary = {
+                "set_id": qset.id,
+                "set_name": qset.name,
+                "generation_preset": gen.get("name"),
+                "generation_llm": gen.get("model"),
+                "questions": len(items_by_set[qset.id]),
+                "result_id": None,
+                "run_id": None,
+                "avg_score": None,
+                "error": None,
+            }
+            try:
+                outcome = _run_items(
+                    qset.id,
+                    qset.name,
+                    items_by_set[qset.id],
+                    gen,
+                    eval_preset_config,
+                    use_cache=use_cache,
+                    progress=report(index),
+                    evaluation_batch_size=evaluation_batch_size,
+                    extra={
+                        "matrix_id": matrix.id,
+                        "generation_preset": gen.get("name"),
+                        "evaluation_preset": eval_preset_config.get("name"),
+                    },
+                    refresh=False,
+                )
+                summary.update(
+                    result_id=outcome["result_id"],
+                    run_id=outcome["run_id"],
+                    avg_score=outcome["avg_score"],
+                )
+            except Exception as exc:  # noqa: BLE001
+                logger.error(
+                    "Errore nella combinazione %s × %s della matrice %s: %s - %s",
+                    qset.name,
+                    gen.get("name"),
+                    matrix.id,
+                    type(exc).__name__,
+                    exc,
+                )
+                summary["error"] = f"{type(exc).__name__}: {exc}"
+            return summary
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(max_parallel_runs, len(combinations))),
+            thread_name_prefix="test-matrix",
+        ) as pool:
+            outcomes = list(pool.map(execute, range(len(combinations))))
+
+        summary = _matrix_summary(outcomes, eval_preset_config)
+        TestMatrix.finish(matrix.id, summary, failed=summary["failed"] == len(outcomes))
+        finished = True
         return {
-            "result_id": result_id,
-            "avg_score": stats["avg_score"],
-            "results": results,
-            "per_question_scores": stats["per_question_scores"],
-            "radar_metrics": stats["radar_metrics"],
-            "results_df": TestResult.load_all_df(),
+            "matrix_id": matrix.id,
+            "result_ids": [c["result_id"] for c in outcomes if c["result_id"]],
+            "summary": summary,
+            "results_df": TestResult.refresh_cache(),
         }
     except Exception as exc:  # noqa: BLE001
         logger.error(
-            f"Errore durante l'esecuzione del test LLM: {type(exc).__name__} - {exc}"
+            f"Errore durante l'esecuzione della matrice di test: {type(exc).__name__} - {exc}"
         )
+        if matrix is not None and not finished:
+            try:
+                TestMatrix.finish(
+                    matrix.id, {"error": f"{type(exc).__name__}: {exc}"}, failed=True
+                )
+            except Exception as finish_exc:  # noqa: BLE001
+                logger.warning(
+                    "Impossibile chiudere la matrice %s: %s", matrix.id, finish_exc
+                )
         return {}
 
 
 __all__ = [
     "load_results",
     "refresh_results",
+    "load_partial_results",
+    "list_incomplete_runs",
     "import_results_action",
     "generate_answer",
+    "generate_answer_async",
     "evaluate_answer",
+    "evaluate_answer_async",
+    "evaluate_answers_batch",
     "run_test",
+    "resume_test",
+    "run_matrix",
 ]
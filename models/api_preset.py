@@ -19,6 +19,9 @@ class APIPreset:
     model: str
     temperature: float
     max_tokens: int
+    max_concurrency: int = 4
+    requests_per_minute: int = 0
+    tokens_per_minute: int = 0
 
     @staticmethod
     def load_all() -> List["APIPreset"]:
@@ -34,6 +37,9 @@ class APIPreset:
                     model=p.model,
                     temperature=p.temperature,
                     max_tokens=p.max_tokens,
+                    max_concurrency=p.max_concurrency or 1,
+                    requests_per_minute=p.requests_per_minute or 0,
+                    tokens_per_minute=p.tokens_per_minute or 0,
                 )
                 for p in presets
             ]
@@ -60,6 +66,9 @@ class APIPreset:
                     obj.model = preset.model
                     obj.temperature = preset.temperature
                     obj.max_tokens = preset.max_tokens
+                    obj.max_concurrency = preset.max_concurrency
+                    obj.requests_per_minute = preset.requests_per_minute
+                    obj.tokens_per_minute = preset.tokens_per_minute
                 else:
                     session.add(APIPresetORM(**asdict(preset)))
             session.commit()
@@ -0,0 +1,138 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, List
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from models.database import DatabaseEngine
+from models.orm_models import CacheVersionORM
+
+logger = logging.getLogger(__name__)
+
+
+class CacheVersion:
+    """Versioni condivise delle cache in memoria dei processi dell'applicazione.
+
+    Ogni scrittura su una tabella mantenuta in cache incrementa la versione
+    corrispondente nella tabella ``cache_versions`` tramite :meth:`publish`.
+    Ogni processo interroga periodicamente la tabella con :meth:`poll` e
+    invalida solo le cache la cui versione è cambiata per opera di altri
+    processi, così che più repliche dietro un bilanciatore non servano dati
+    obsoleti.
+    """
+
+    # Intervallo minimo in secondi tra due letture della tabella
+    poll_interval: float = 2.0
+
+    _lock = threading.Lock()
+    _listeners: Dict[str, List[Callable[[], None]]] = {}
+    _seen: Dict[str, int] = {}
+    _next_poll: float = 0.0
+
+    @staticmethod
+    def subscribe(name: str, invalidate: Callable[[], None]) -> None:
+        """Registra ``invalidate`` come callback per le modifiche della cache ``name``."""
+        with CacheVersion._lock:
+            CacheVersion._listeners.setdefault(name, []).append(invalidate)
+
+    @staticmethod
+    def load_all() -> Dict[str, int]:
+        """Restituisce le versioni correnti registrate nel database."""
+        with DatabaseEngine.instance().get_session() as session:
+            rows = session.execute(
+                select(CacheVersionORM.name, CacheVersionORM.version)
+            ).all()
+            return {str(name): int(version or 0) for name, version in rows}
+
+    @staticmethod
+    def bump(name: str) -> int:
+        """Incrementa in modo atomico la versione di ``name`` e la restituisce."""
+        with DatabaseEngine.instance().get_session() as session:
+            for _ in range(2):
+                result = session.execute(
+                    update(CacheVersionORM)
+                    .where(CacheVersionORM.name == name)
+                    .values(version=CacheVersionORM.version + 1)
+                )
+                if int(getattr(result, "rowcount", 0) or 0) == 0:
+                    session.add(CacheVersionORM(name=name, version=1))
+                    try:
+                        session.flush()
+                    except IntegrityError:
+                        # Un altro processo ha creato la riga nel frattempo
+                        session.rollback()
+                        continue
+                version = session.execute(
+                    select(CacheVersionORM.version).where(CacheVersionORM.name == name)
+                ).scalar_one()
+                session.commit()
+                return int(version)
+        raise RuntimeError(f"Impossibile aggiornare la versione della cache '{name}'")
+
+    @staticmethod
+    def _notify(names: List[str]) -> None:
+        for name in names:
+            for invalidate in list(CacheVersion._listeners.get(name, [])):
+                invalidate()
+
+    @staticmethod
+    def publish(name: str) -> None:
+        """Segnala agli altri processi che i dati della cache ``name`` sono cambiati.
+
+        Se nel frattempo anche un altro processo ha modificato gli stessi dati
+        la cache locale viene invalidata. Gli errori di accesso al database
+        vengono registrati ma non interrompono l'operazione.
+        """
+        try:
+            version = CacheVersion.bump(name)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Impossibile pubblicare la versione della cache %s: %s", name, exc)
+            return
+        with CacheVersion._lock:
+            missed = CacheVersion._seen.get(name, 0) != version - 1
+            CacheVersion._seen[name] = version
+        if missed:
+            CacheVersion._notify([name])
+
+    @staticmethod
+    def poll(force: bool = False) -> List[str]:
+        """Invalida le cache modificate da altri processi.
+
+        La tabella viene letta al massimo una volta ogni ``poll_interval``
+        secondi, a meno che ``force`` sia ``True``. Restituisce i nomi delle
+        cache invalidate.
+        """
+        now = time.monotonic()
+        with CacheVersion._lock:
+            if not force and now < CacheVersion._next_poll:
+                return []
+            CacheVersion._next_poll = now + CacheVersion.poll_interval
+            names = list(CacheVersion._listeners)
+        try:
+            versions = CacheVersion.load_all()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Impossibile leggere le versioni delle cache: %s", exc)
+            return []
+
+        changed: List[str] = []
+        with CacheVersion._lock:
+            for name in names:
+                current = versions.get(name, 0)
+                # Alla prima lettura la versione corrente fa solo da riferimento
+                previous = CacheVersion._seen.get(name, current)
+                if previous != current:
+                    changed.append(name)
+                CacheVersion._seen[name] = current
+        if changed:
+            logger.info("Cache modificate da altri processi: %s", ", ".join(changed))
+            CacheVersion._notify(changed)
+        return changed
+
+    @staticmethod
+    def reset() -> None:
+        """Dimentica le versioni lette (usato principalmente nei test)."""
+        with CacheVersion._lock:
+            CacheVersion._seen.clear()
+            CacheVersion._next_poll = 0.0
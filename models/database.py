@@ -118,7 +118,10 @@ class DatabaseEngine:
     def init_db(self) -> None:
         engine = self.get_engine()
         import models.orm_models  # noqa: F401
+        from models.migrations import run_migrations
+
         Base.metadata.create_all(engine)
+        run_migrations(engine)
 
 
 class Base(DeclarativeBase):
@@ -0,0 +1,172 @@
+import logging
+
+from dataclasses import dataclass, field
+from datetime import datetime
+import uuid
+from typing import Any, Dict, List, Optional, cast
+
+from sqlalchemy import select, update
+
+from models.database import DatabaseEngine
+from models.orm_models import JobORM
+
+logger = logging.getLogger(__name__)
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+ACTIVE_STATUSES = (STATUS_QUEUED, STATUS_RUNNING)
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+@dataclass
+class Job:
+    """Lavoro eseguito in background con stato e avanzamento persistiti.
+
+    ``payload`` contiene solo i parametri non sensibili della richiesta (ad
+    esempio i nomi dei preset, mai le chiavi API).
+    """
+
+    id: str
+    kind: str
+    status: str
+    payload: Dict[str, Any] = field(default_factory=dict)
+    run_id: Optional[str] = None
+    result_id: Optional[str] = None
+    completed: int = 0
+    total: int = 0
+    error: Optional[str] = None
+    owner: str = ""
+    created_at: str = ""
+    updated_at: str = ""
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in ACTIVE_STATUSES
+
+    @property
+    def progress(self) -> float:
+        """Frazione di avanzamento compresa tra 0 e 1."""
+        if self.total <= 0:
+            return 1.0 if self.status == STATUS_COMPLETED else 0.0
+        return min(1.0, self.completed / self.total)
+
+    @staticmethod
+    def _from_orm(job: JobORM) -> "Job":
+        return Job(
+            id=cast(str, job.id),
+            kind=cast(str, job.kind),
+            status=cast(str, job.status),
+            payload=cast(Dict[str, Any], job.payload or {}),
+            run_id=job.run_id,
+            result_id=job.result_id,
+            completed=int(job.completed or 0),
+            total=int(job.total or 0),
+            error=job.error,
+            owner=cast(str, job.owner or ""),
+            created_at=cast(str, job.created_at or ""),
+            updated_at=cast(str, job.updated_at or ""),
+        )
+
+    @staticmethod
+    def create(
+        kind: str,
+        payload: Dict[str, Any],
+        owner: str = "",
+        run_id: Optional[str] = None,
+    ) -> "Job":
+        """Registra un nuovo lavoro in coda per il processo ``owner``.
+
+        ``run_id`` associa subito il lavoro a un'esecuzione già esistente (ad
+        esempio quella da riprendere), così che non venga offerta di nuovo.
+        """
+        now = _now()
+        job = Job(
+            id=str(uuid.uuid4()),
+            kind=kind,
+            status=STATUS_QUEUED,
+            payload=payload,
+            owner=owner,
+            run_id=run_id,
+            created_at=now,
+            updated_at=now,
+        )
+        with DatabaseEngine.instance().get_session() as session:
+            session.add(
+                JobORM(
+                    id=job.id,
+                    kind=job.kind,
+                    status=job.status,
+                    payload=job.payload,
+                    completed=0,
+                    total=0,
+                    run_id=job.run_id,
+                    owner=job.owner,
+                    created_at=job.created_at,
+                    updated_at=job.updated_at,
+                )
+            )
+            session.commit()
+        return job
+
+    @staticmethod
+    def get(job_id: str) -> Optional["Job"]:
+        with DatabaseEngine.instance().get_session() as session:
+            job = session.get(JobORM, job_id)
+            return Job._from_orm(job) if job is not None else None
+
+    @staticmethod
+    def list_recent(limit: int = 20) -> List["Job"]:
+        """Restituisce gli ultimi ``limit`` lavori, dal più recente."""
+        with DatabaseEngine.instance().get_session() as session:
+            jobs = session.execute(
+                select(JobORM).order_by(JobORM.created_at.desc()).limit(limit)
+            ).scalars().all()
+            return [Job._from_orm(j) for j in jobs]
+
+    @staticmethod
+    def active_run_ids() -> List[str]:
+        """Restituisce gli id delle esecuzioni di test associate a lavori attivi."""
+        with DatabaseEngine.instance().get_session() as session:
+            run_ids = session.execute(
+                select(JobORM.run_id)
+                .where(JobORM.status.in_(ACTIVE_STATUSES))
+                .where(JobORM.run_id.is_not(None))
+            ).scalars().all()
+            return [str(r) for r in run_ids]
+
+    @staticmethod
+    def update(job_id: str, **values: Any) -> None:
+        """Aggiorna i campi indicati del lavoro ``job_id``."""
+        values["updated_at"] = _now()
+        with DatabaseEngine.instance().get_session() as session:
+            session.execute(update(JobORM).where(JobORM.id == job_id).values(**values))
+            session.commit()
+
+    @staticmethod
+    def fail_interrupted(host: str, current_owner: str) -> int:
+        """Segna come falliti i lavori rimasti attivi dopo un riavvio del processo.
+
+        Vengono considerati solo i lavori di processi precedenti sullo stesso
+        ``host``: quelli di altre repliche restano invariati.
+        Restituisce il numero di lavori aggiornati.
+        """
+        with DatabaseEngine.instance().get_session() as session:
+            result = session.execute(
+                update(JobORM)
+                .where(JobORM.status.in_(ACTIVE_STATUSES))
+                .where(JobORM.owner.like(f"{host}:%"))
+                .where(JobORM.owner != current_owner)
+                .values(
+                    status=STATUS_FAILED,
+                    error="Esecuzione interrotta dal riavvio dell'applicazione",
+                    updated_at=_now(),
+                )
+            )
+            session.commit()
+            return int(getattr(result, "rowcount", 0) or 0)
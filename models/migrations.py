@@ -0,0 +1,194 @@
+"""Migrazioni incrementali dello schema del database.
+
+``Base.metadata.create_all`` crea solo le tabelle mancanti: le colonne aggiunte
+ai modelli dopo la prima installazione devono essere applicate ai database
+esistenti tramite le migrazioni definite qui. Ogni migrazione viene eseguita
+una sola volta e registrata nella tabella ``schema_migrations``.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Callable, List, Tuple, cast
+
+from sqlalchemy import Column, Table, bindparam, inspect, insert, select, update
+from sqlalchemy.engine import Connection, Engine
+
+from models.orm_models import (
+    APIPresetORM,
+    SchemaMigrationORM,
+    TestResultItemORM,
+    TestResultORM,
+    TestRunORM,
+)
+from models.test_result import (
+    backfill_result_stats,
+    result_item_rows,
+    result_summary_columns,
+)
+
+logger = logging.getLogger(__name__)
+
+# Numero di risultati elaborati per transazione durante i backfill
+BACKFILL_CHUNK_SIZE = 500
+
+
+def add_column_if_missing(conn: Connection, table_name: str, column: Column[Any]) -> bool:
+    """Aggiunge ``column`` a ``table_name`` se non è già presente.
+
+    Restituisce ``True`` se la colonna è stata creata.
+    """
+    existing = {c["name"] for c in inspect(conn).get_columns(table_name)}
+    if column.name in existing:
+        return False
+
+    column_type = column.type.compile(dialect=conn.dialect)
+    ddl = f"ALTER TABLE {table_name} ADD COLUMN {column.name} {column_type}"
+    default = getattr(column.default, "arg", None)
+    if isinstance(default, (int, float)):
+        ddl += f" DEFAULT {default}"
+    elif isinstance(default, str):
+        ddl += f" DEFAULT '{default}'"
+    conn.exec_driver_sql(ddl)
+    logger.info("Aggiunta colonna '%s' alla tabella '%s'", column.name, table_name)
+    return True
+
+
+def _add_api_preset_max_concurrency(conn: Connection) -> None:
+    add_column_if_missing(
+        conn,
+        APIPresetORM.__tablename__,
+        cast(Column[Any], APIPresetORM.__table__.c.max_concurrency),
+    )
+
+
+def _add_api_preset_rate_limits(conn: Connection) -> None:
+    for name in ("requests_per_minute", "tokens_per_minute"):
+        add_column_if_missing(
+            conn,
+            APIPresetORM.__tablename__,
+            cast(Column[Any], APIPresetORM.__table__.c[name]),
+        )
+
+
+def _backfill_test_result_items(conn: Connection) -> None:
+    """Popola ``test_result_items`` a partire dal JSON dei risultati esistenti."""
+    done = select(TestResultItemORM.result_id).distinct()
+    pending_ids = conn.execute(
+        select(TestResultORM.id).where(TestResultORM.id.not_in(done))
+    ).scalars().all()
+    inserted = 0
+    for start in range(0, len(pending_ids), BACKFILL_CHUNK_SIZE):
+        chunk = pending_ids[start:start + BACKFILL_CHUNK_SIZE]
+        rows = []
+        for result_id, results in conn.execute(
+            select(TestResultORM.id, TestResultORM.results).where(
+                TestResultORM.id.in_(chunk)
+            )
+        ):
+            rows.extend(result_item_rows(result_id, results))
+        if rows:
+            conn.execute(insert(TestResultItemORM), rows)
+            inserted += len(rows)
+    logger.info(
+        "Backfill di test_result_items: %d risultati, %d righe inserite",
+        len(pending_ids),
+        inserted,
+    )
+
+
+def _add_test_result_summary_columns(conn: Connection) -> None:
+    """Aggiunge e popola le colonne indicizzate di ``test_results``."""
+    table = cast(Table, TestResultORM.__table__)
+    for name in result_summary_columns(None):
+        add_column_if_missing(conn, TestResultORM.__tablename__, table.c[name])
+    for index in table.indexes:
+        index.create(conn, checkfirst=True)
+
+    result_ids = conn.execute(select(TestResultORM.id)).scalars().all()
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("result_id"))
+        .values({name: bindparam(name) for name in result_summary_columns(None)})
+    )
+    for start in range(0, len(result_ids), BACKFILL_CHUNK_SIZE):
+        chunk = result_ids[start:start + BACKFILL_CHUNK_SIZE]
+        rows = [
+            {"result_id": result_id, **result_summary_columns(results)}
+            for result_id, results in conn.execute(
+                select(TestResultORM.id, TestResultORM.results).where(
+                    TestResultORM.id.in_(chunk)
+                )
+            )
+        ]
+        if rows:
+            conn.execute(statement, rows)
+    logger.info("Backfill delle colonne di test_results: %d risultati", len(result_ids))
+
+
+def _backfill_test_result_stats(conn: Connection) -> None:
+    """Popola ``test_result_stats`` per i risultati già salvati."""
+    processed = backfill_result_stats(conn, chunk_size=BACKFILL_CHUNK_SIZE)
+    logger.info("Backfill di test_result_stats: %d risultati", processed)
+
+
+def _add_test_run_sampling(conn: Connection) -> None:
+    add_column_if_missing(
+        conn,
+        TestRunORM.__tablename__,
+        cast(Column[Any], TestRunORM.__table__.c.sampling),
+    )
+
+
+def _index_test_result_timestamp(conn: Connection) -> None:
+    """Rende ``test_results.timestamp`` indicizzabile e crea l'indice di ordinamento."""
+    table = cast(Table, TestResultORM.__table__)
+    if conn.dialect.name == "mysql":
+        # MySQL non indicizza le colonne TEXT senza prefisso: la colonna
+        # diventa VARCHAR come nel modello (SQLite ignora la differenza)
+        column = table.c.timestamp
+        conn.exec_driver_sql(
+            f"ALTER TABLE {table.name} MODIFY "
+            f"{conn.dialect.identifier_preparer.quote(column.name)} "
+            f"{column.type.compile(dialect=conn.dialect)} NOT NULL"
+        )
+    for index in table.indexes:
+        index.create(conn, checkfirst=True)
+
+
+MIGRATIONS: List[Tuple[str, Callable[[Connection], None]]] = [
+    ("0001_api_presets_max_concurrency", _add_api_preset_max_concurrency),
+    ("0002_api_presets_rate_limits", _add_api_preset_rate_limits),
+    ("0003_backfill_test_result_items", _backfill_test_result_items),
+    ("0004_test_results_summary_columns", _add_test_result_summary_columns),
+    ("0005_backfill_test_result_stats", _backfill_test_result_stats),
+    ("0006_test_runs_sampling", _add_test_run_sampling),
+    ("0007_test_results_timestamp_index", _index_test_result_timestamp),
+]
+
+
+def run_migrations(engine: Engine) -> List[str]:
+    """Applica le migrazioni non ancora registrate.
+
+    Restituisce l'elenco degli identificativi delle migrazioni applicate.
+    """
+    with engine.connect() as conn:
+        applied = set(conn.execute(select(SchemaMigrationORM.id)).scalars().all())
+
+    newly_applied: List[str] = []
+    for migration_id, migration in MIGRATIONS:
+        if migration_id in applied:
+            continue
+        with engine.begin() as conn:
+            migration(conn)
+            conn.execute(
+                insert(SchemaMigrationORM).values(
+                    id=migration_id,
+                    applied_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                )
+            )
+        logger.info("Migrazione '%s' applicata", migration_id)
+        newly_applied.append(migration_id)
+    return newly_applied
+
+
+__all__ = ["add_column_if_missing", "run_migrations", "MIGRATIONS"]
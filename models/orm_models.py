@@ -4,7 +4,7 @@ import logging
 
 from typing import List
 
-from sqlalchemy import Column, String, Text, Float, Integer, ForeignKey, Table, JSON
+from sqlalchemy import Boolean, Column, String, Text, Float, Index, Integer, ForeignKey, Table, JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .database import Base
@@ -43,10 +43,128 @@ class QuestionSetORM(Base):
 
 class TestResultORM(Base):
     __tablename__ = "test_results"
+    # Ordinamento predefinito dei riepiloghi: timestamp con id come spareggio
+    __table_args__ = (Index("ix_test_results_timestamp_id", "timestamp", "id"),)
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
-    set_id: Mapped[str] = mapped_column(String(36))
-    timestamp: Mapped[str] = mapped_column(Text)
+    set_id: Mapped[str] = mapped_column(String(36), index=True)
+    # Formato "AAAA-MM-GG HH:MM:SS"; il margine accoglie i timestamp ISO importati
+    timestamp: Mapped[str] = mapped_column(String(32))
     results: Mapped[dict] = mapped_column(JSON)
+    # Campi di ``results`` duplicati in colonne indicizzate per filtrare in SQL
+    generation_llm: Mapped[str | None] = mapped_column(String(255), nullable=True, index=True)
+    generation_preset: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    evaluation_llm: Mapped[str | None] = mapped_column(String(255), nullable=True, index=True)
+    avg_score: Mapped[float | None] = mapped_column(Float, nullable=True, index=True)
+
+
+class TestResultItemORM(Base):
+    __tablename__ = "test_result_items"
+    result_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("test_results.id"), primary_key=True, index=True
+    )
+    question_id: Mapped[str] = mapped_column(String(36), primary_key=True, index=True)
+    score: Mapped[float | None] = mapped_column(Float, nullable=True)
+    similarity: Mapped[float | None] = mapped_column(Float, nullable=True)
+    correctness: Mapped[float | None] = mapped_column(Float, nullable=True)
+    completeness: Mapped[float | None] = mapped_column(Float, nullable=True)
+    latency: Mapped[float | None] = mapped_column(Float, nullable=True)
+    tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    answer: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+
+class TestResultStatsORM(Base):
+    """Statistiche di un risultato calcolate al salvataggio o all'importazione."""
+
+    __tablename__ = "test_result_stats"
+    result_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("test_results.id"), primary_key=True
+    )
+    question_count: Mapped[int] = mapped_column(Integer, default=0)
+    avg_score: Mapped[float | None] = mapped_column(Float, nullable=True)
+    avg_similarity: Mapped[float | None] = mapped_column(Float, nullable=True)
+    avg_correctness: Mapped[float | None] = mapped_column(Float, nullable=True)
+    avg_completeness: Mapped[float | None] = mapped_column(Float, nullable=True)
+    score_std: Mapped[float | None] = mapped_column(Float, nullable=True)
+    score_min: Mapped[float | None] = mapped_column(Float, nullable=True)
+    score_p25: Mapped[float | None] = mapped_column(Float, nullable=True)
+    score_median: Mapped[float | None] = mapped_column(Float, nullable=True)
+    score_p75: Mapped[float | None] = mapped_column(Float, nullable=True)
+    score_p90: Mapped[float | None] = mapped_column(Float, nullable=True)
+    score_max: Mapped[float | None] = mapped_column(Float, nullable=True)
+    # Aggregati per categoria: {categoria: {"count", "avg_score", ...}}
+    category_stats: Mapped[dict] = mapped_column(JSON)
+
+
+class TestMatrixORM(Base):
+    __tablename__ = "test_matrices"
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    status: Mapped[str] = mapped_column(String(20), index=True)
+    set_ids: Mapped[list] = mapped_column(JSON)
+    generation_presets: Mapped[list] = mapped_column(JSON)
+    evaluation_preset: Mapped[str] = mapped_column(Text)
+    summary: Mapped[dict] = mapped_column(JSON)
+    created_at: Mapped[str] = mapped_column(Text)
+    completed_at: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+
+class TestRunORM(Base):
+    __tablename__ = "test_runs"
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    set_id: Mapped[str] = mapped_column(String(36))
+    set_name: Mapped[str] = mapped_column(Text)
+    status: Mapped[str] = mapped_column(String(20), index=True)
+    question_ids: Mapped[list] = mapped_column(JSON)
+    generation_preset: Mapped[str] = mapped_column(Text)
+    evaluation_preset: Mapped[str] = mapped_column(Text)
+    generation_llm: Mapped[str] = mapped_column(Text)
+    evaluation_llm: Mapped[str] = mapped_column(Text)
+    created_at: Mapped[str] = mapped_column(Text)
+    result_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    sampling: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+
+
+class TestRunItemORM(Base):
+    __tablename__ = "test_run_items"
+    run_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("test_runs.id"), primary_key=True
+    )
+    question_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    result: Mapped[dict] = mapped_column(JSON)
+    failed: Mapped[bool] = mapped_column(Boolean, default=False)
+    completed_at: Mapped[str] = mapped_column(Text)
+
+
+class JobORM(Base):
+    __tablename__ = "jobs"
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    kind: Mapped[str] = mapped_column(String(50))
+    status: Mapped[str] = mapped_column(String(20), index=True)
+    payload: Mapped[dict] = mapped_column(JSON)
+    run_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    result_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    completed: Mapped[int] = mapped_column(Integer, default=0)
+    total: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    owner: Mapped[str] = mapped_column(String(255), default="")
+    created_at: Mapped[str] = mapped_column(Text)
+    updated_at: Mapped[str] = mapped_column(Text)
+
+
+class ResponseCacheORM(Base):
+    __tablename__ = "llm_response_cache"
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    model: Mapped[str] = mapped_column(Text)
+    endpoint: Mapped[str] = mapped_column(Text)
+    content: Mapped[str] = mapped_column(Text)
+    created_at: Mapped[float] = mapped_column(Float, index=True)
+    last_used_at: Mapped[float] = mapped_column(Float, index=True)
+    hits: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class CacheVersionORM(Base):
+    __tablename__ = "cache_versions"
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
 
 
 class APIPresetORM(Base):
@@ -59,3 +177,12 @@ class APIPresetORM(Base):
     model: Mapped[str] = mapped_column(Text)
     temperature: Mapped[float] = mapped_column(Float)
     max_tokens: Mapped[int] = mapped_column(Integer)
+    max_concurrency: Mapped[int] = mapped_column(Integer, default=4)
+    requests_per_minute: Mapped[int] = mapped_column(Integer, default=0)
+    tokens_per_minute: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class SchemaMigrationORM(Base):
+    __tablename__ = "schema_migrations"
+    id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    applied_at: Mapped[str] = mapped_column(Text)
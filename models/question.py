@@ -1,20 +1,34 @@
 import logging
 
 from dataclasses import dataclass
-from typing import IO, List, Optional, Tuple, Dict, Any, cast
+from typing import IO, Callable, Iterable, Iterator, List, Optional, Set, Tuple, Dict, Any, cast
 import uuid
 import pandas as pd
-from sqlalchemy import select, delete
+from sqlalchemy import ColumnElement, delete, func, or_, select
 from sqlalchemy.orm import Mapper
 
 from models.database import DatabaseEngine
 from models.orm_models import QuestionORM, question_set_questions
 from utils.data_format_utils import format_questions_for_view
-from utils.file_reader_utils import read_questions, filter_new_rows
+from utils.file_reader_utils import (
+    QUESTION_CHUNK_SIZE,
+    filter_new_rows,
+    iter_question_chunks,
+)
 from utils.import_template import ImportTemplate
 from utils.export_template import ExportTemplate
 logger = logging.getLogger(__name__)
 
+# Numero massimo di ID per ogni query di verifica dei duplicati
+ID_LOOKUP_BATCH_SIZE = 1000
+# Avvisi riportati singolarmente; gli altri vengono riassunti in un conteggio
+MAX_IMPORT_WARNINGS = 100
+
+# Callback di avanzamento: (righe elaborate, domande importate)
+ImportProgressCallback = Callable[[int, int], None]
+# Callback invocata con le domande inserite da ciascun blocco importato
+ImportChunkCallback = Callable[[pd.DataFrame], None]
+
 
 @dataclass
 class Question:
@@ -37,6 +51,93 @@ class Question:
                 for q in results
             ]
 
+    @staticmethod
+    def load_by_ids(ids: Iterable[str]) -> List["Question"]:
+        """Carica le sole domande indicate, interrogando il database a lotti."""
+        unique = sorted({str(q_id) for q_id in ids})
+        questions: List[Question] = []
+        with DatabaseEngine.instance().get_session() as session:
+            for start in range(0, len(unique), ID_LOOKUP_BATCH_SIZE):
+                batch = unique[start:start + ID_LOOKUP_BATCH_SIZE]
+                questions.extend(
+                    Question(
+                        id=q.id,
+                        domanda=q.domanda or "",
+                        risposta_attesa=q.risposta_attesa or "",
+                        categoria=q.categoria or "",
+                    )
+                    for q in session.execute(
+                        select(QuestionORM).where(QuestionORM.id.in_(batch))
+                    ).scalars()
+                )
+        return questions
+
+    @staticmethod
+    def _filters(
+        category: Optional[str] = None, search: Optional[str] = None
+    ) -> List[ColumnElement[bool]]:
+        """Condizioni SQL per il filtro per categoria e la ricerca testuale.
+
+        Come in :meth:`load_all`, una categoria ``NULL`` equivale alla stringa
+        vuota.
+        """
+        conditions: List[ColumnElement[bool]] = []
+        if category is not None:
+            conditions.append(func.coalesce(QuestionORM.categoria, "") == category)
+        term = (search or "").strip()
+        if term:
+            conditions.append(
+                or_(
+                    QuestionORM.domanda.icontains(term, autoescape=True),
+                    QuestionORM.risposta_attesa.icontains(term, autoescape=True),
+                    QuestionORM.id == term,
+                )
+            )
+        return conditions
+
+    @staticmethod
+    def load_page(
+        offset: int,
+        limit: int,
+        category: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> List["Question"]:
+        """Carica una pagina di domande filtrate, ordinate per ID."""
+        query = (
+            select(QuestionORM)
+            .where(*Question._filters(category, search))
+            .order_by(QuestionORM.id)
+            .offset(max(0, offset))
+            .limit(max(0, limit))
+        )
+        with DatabaseEngine.instance().get_session() as session:
+            results = session.execute(query).scalars().all()
+            return [
+                Question(
+                    id=q.id,
+                    domanda=q.domanda or "",
+                    risposta_attesa=q.risposta_attesa or "",
+                    categoria=q.categoria or "",
+                )
+                for q in results
+            ]
+
+    @staticmethod
+    def count(category: Optional[str] = None, search: Optional[str] = None) -> int:
+        """Conta le domande che soddisfano i filtri di :meth:`load_page`."""
+        query = select(func.count()).select_from(QuestionORM).where(
+            *Question._filters(category, search)
+        )
+        with DatabaseEngine.instance().get_session() as session:
+            return int(session.execute(query).scalar() or 0)
+
+    @staticmethod
+    def categories() -> List[str]:
+        """Restituisce l'elenco ordinato delle categorie distinte."""
+        query = select(func.coalesce(QuestionORM.categoria, "")).distinct()
+        with DatabaseEngine.instance().get_session() as session:
+            return sorted(str(c) for c in session.execute(query).scalars().all())
+
     @staticmethod
     def add(domanda: str, risposta_attesa: str, categoria: str = "", question_id: Optional[str] = None) -> str:
         qid = question_id or str(uuid.uuid4())
@@ -89,13 +190,41 @@ class Question:
             session.commit()
 
     @staticmethod
-    def _persist_entities(df: pd.DataFrame) -> Tuple[int, List[str]]:
-        """Persiste nuove domande da ``df`` evitando duplicati.
+    def _existing_ids(session: Any, ids: List[str]) -> Set[str]:
+        """Restituisce gli ID di ``ids`` già presenti, interrogando il database a lotti."""
+        found: Set[str] = set()
+        for start in range(0, len(ids), ID_LOOKUP_BATCH_SIZE):
+            batch = ids[start:start + ID_LOOKUP_BATCH_SIZE]
+            found.update(
+                str(q_id)
+                for q_id in session.execute(
+                    select(QuestionORM.id).where(QuestionORM.id.in_(batch))
+                ).scalars().all()
+            )
+        return found
+
+    @staticmethod
+    def import_chunks(
+        chunks: Iterable[pd.DataFrame],
+        progress: Optional[ImportProgressCallback] = None,
+        on_chunk: Optional[ImportChunkCallback] = None,
+    ) -> Tuple[int, List[str]]:
+        """Persiste blocchi di domande normalizzate evitando duplicati.
+
+        Ogni blocco viene confrontato con il database tramite i soli suoi ID e
+        salvato con un commit dedicato, così che la memoria usata dipenda dalla
+        dimensione del blocco e non da quella del file o della tabella. Gli ID
+        già visti nel file vengono ricordati per scartare (segnalandoli) i
+        duplicati anche tra blocchi diversi.
 
         Parametri
         ---------
-        df: DataFrame
-            Dati delle domande normalizzati.
+        chunks: Iterable[DataFrame]
+            Blocchi di domande normalizzati (vedi ``iter_question_chunks``).
+        progress: callable, opzionale
+            Invocata dopo ogni blocco con righe elaborate e domande importate.
+        on_chunk: callable, opzionale
+            Invocata dopo il commit di ogni blocco con le sole domande inserite.
 
         Restituisce
         -----------
@@ -104,35 +233,83 @@ class Question:
         """
 
         warnings: List[str] = []
+        omitted = 0
+        seen_ids: Set[str] = set()
+        duplicated_ids: Set[str] = set()
+        processed = 0
+        added_total = 0
+
+        def warn(message: str) -> None:
+            nonlocal omitted
+            if len(warnings) < MAX_IMPORT_WARNINGS:
+                warnings.append(message)
+            else:
+                omitted += 1
+
         with DatabaseEngine.instance().get_session() as session:
-            existing_ids = session.execute(select(QuestionORM.id)).scalars().all()
+            for chunk in chunks:
+                processed += len(chunk)
+                keep: List[bool] = []
+                chunk_ids: List[str] = []
+                for q_id in chunk["id"].astype(str):
+                    is_new = q_id not in seen_ids
+                    keep.append(is_new)
+                    if is_new:
+                        seen_ids.add(q_id)
+                        chunk_ids.append(q_id)
+                    elif q_id not in duplicated_ids:
+                        duplicated_ids.add(q_id)
+                        warn(f"Domanda con ID '{q_id}' già presente nel file; saltata.")
+                chunk = chunk[keep]
 
-            df_unique = df.drop_duplicates(subset="id", keep="first")
-            duplicated_ids = set(df["id"].astype(str)) - set(
-                df_unique["id"].astype(str)
-            )
-            for dup in duplicated_ids:
-                warnings.append(
-                    f"Domanda con ID '{dup}' già presente nel file; saltata."
+                existing_ids = Question._existing_ids(session, chunk_ids)
+                new_rows, added_count = filter_new_rows(chunk, existing_ids)
+                for sid in (i for i in chunk_ids if i in existing_ids):
+                    warn(f"Domanda con ID '{sid}' già esistente; saltata.")
+
+                if added_count > 0:
+                    session.bulk_insert_mappings(
+                        cast(Mapper[Any], QuestionORM.__mapper__),
+                        new_rows.to_dict(orient="records"),
+                    )
+                    session.commit()
+                    added_total += added_count
+                    if on_chunk is not None:
+                        on_chunk(new_rows)
+
+                logger.debug(
+                    "Importazione domande: %d righe elaborate, %d importate",
+                    processed,
+                    added_total,
                 )
+                if progress is not None:
+                    progress(processed, added_total)
 
-            new_rows, added_count = filter_new_rows(df_unique, existing_ids)
-            skipped_ids = set(df_unique["id"].astype(str)) - set(
-                new_rows["id"].astype(str)
+        if omitted:
+            warnings.append(
+                f"Altre {omitted} domande duplicate o già esistenti sono state saltate."
             )
-            for sid in skipped_ids:
-                warnings.append(
-                    f"Domanda con ID '{sid}' già esistente; saltata."
-                )
+        return added_total, warnings
 
-            if added_count > 0:
-                session.bulk_insert_mappings(
-                    cast(Mapper[Any], QuestionORM.__mapper__),
-                    new_rows.to_dict(orient="records"),
-                )
-                session.commit()
+    @staticmethod
+    def _persist_entities(df: pd.DataFrame) -> Tuple[int, List[str]]:
+        """Persiste nuove domande da ``df`` evitando duplicati.
 
-        return added_count, warnings
+        Parametri
+        ---------
+        df: DataFrame
+            Dati delle domande normalizzati.
+
+        Restituisce
+        -----------
+        Tuple[int, list[str]]
+            Numero di domande importate ed elenco degli avvisi.
+        """
+
+        return Question.import_chunks(
+            df.iloc[start:start + QUESTION_CHUNK_SIZE]
+            for start in range(0, len(df), QUESTION_CHUNK_SIZE)
+        )
 
     @staticmethod
     def filter_by_category(
@@ -149,15 +326,29 @@ class Question:
 
 
 class QuestionImporter(ImportTemplate, ExportTemplate):
-    """Importer per le domande basato su :class:`ImportTemplate` e :class:`ExportTemplate`."""
+    """Importer per le domande basato su :class:`ImportTemplate` e :class:`ExportTemplate`.
+
+    Il file viene letto e salvato a blocchi di ``chunk_size`` righe: il
+    parsing restituisce un iteratore consumato durante la persistenza.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = QUESTION_CHUNK_SIZE,
+        progress: Optional[ImportProgressCallback] = None,
+        on_chunk: Optional[ImportChunkCallback] = None,
+    ) -> None:
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.on_chunk = on_chunk
 
-    def parse_file(self, file: IO[Any]) -> pd.DataFrame:  # type: ignore[override]
-        """Legge le domande dal file usando ``read_questions``."""
-        return read_questions(file)
+    def parse_file(self, file: IO[Any]) -> Iterator[pd.DataFrame]:  # type: ignore[override]
+        """Legge le domande dal file a blocchi usando ``iter_question_chunks``."""
+        return iter_question_chunks(file, self.chunk_size)
 
-    def persist_data(self, df: pd.DataFrame) -> Dict[str, Any]:  # type: ignore[override]
-        """Persiste i dati tramite :meth:`Question._persist_entities`."""
-        imported, warnings = Question._persist_entities(df)
+    def persist_data(self, chunks: Iterable[pd.DataFrame]) -> Dict[str, Any]:  # type: ignore[override]
+        """Persiste i blocchi tramite :meth:`Question.import_chunks`."""
+        imported, warnings = Question.import_chunks(chunks, self.progress, self.on_chunk)
         return {"success": True, "imported_count": imported, "warnings": warnings}
 
     def gather_data(self) -> pd.DataFrame:  # type: ignore[override]
@@ -10,7 +10,7 @@ from utils.file_reader_utils import read_question_sets
 from utils.import_template import ImportTemplate
 from utils.export_template import ExportTemplate
 from models.database import DatabaseEngine
-from models.orm_models import QuestionSetORM, QuestionORM
+from models.orm_models import QuestionSetORM, QuestionORM, question_set_questions
 logger = logging.getLogger(__name__)
 
 
@@ -34,16 +34,53 @@ class QuestionSet:
 
     @staticmethod
     def load_all() -> List["QuestionSet"]:
+        """Carica tutti i set con gli ID delle rispettive domande.
+
+        Gli ID vengono letti direttamente dalla tabella di associazione
+        ``question_set_questions`` con un'unica query, senza istanziare
+        ``QuestionORM`` né caricare la relazione ``questions`` set per set.
+        """
         with DatabaseEngine.instance().get_session() as session:
-            sets = session.execute(select(QuestionSetORM)).scalars().all()
-            return [
-                QuestionSet(
-                    id=s.id,
-                    name=s.name or "",
-                    questions=[q.id for q in s.questions],
+            sets = session.execute(
+                select(QuestionSetORM.id, QuestionSetORM.name)
+            ).all()
+            links = session.execute(
+                select(
+                    question_set_questions.c.set_id,
+                    question_set_questions.c.question_id,
+                ).order_by(
+                    question_set_questions.c.set_id,
+                    question_set_questions.c.question_id,
                 )
-                for s in sets
-            ]
+            ).all()
+
+        questions_by_set: Dict[str, List[str]] = {}
+        for set_id, question_id in links:
+            questions_by_set.setdefault(set_id, []).append(question_id)
+        return [
+            QuestionSet(
+                id=set_id,
+                name=name or "",
+                questions=questions_by_set.get(set_id, []),
+            )
+            for set_id, name in sets
+        ]
+
+    @staticmethod
+    def get(set_id: str) -> Optional["QuestionSet"]:
+        """Carica un singolo set con gli ID delle sue domande."""
+        with DatabaseEngine.instance().get_session() as session:
+            qset = session.get(QuestionSetORM, set_id)
+            if qset is None:
+                return None
+            question_ids = session.execute(
+                select(question_set_questions.c.question_id)
+                .where(question_set_questions.c.set_id == set_id)
+                .order_by(question_set_questions.c.question_id)
+            ).scalars().all()
+            return QuestionSet(
+                id=qset.id, name=qset.name or "", questions=list(question_ids)
+            )
 
     @staticmethod
     def create(name: str, question_ids: Optional[List[str]] = None) -> str:
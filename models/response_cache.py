@@ -0,0 +1,187 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+from sqlalchemy import delete, func, select
+
+from models.database import DatabaseEngine
+from models.orm_models import ResponseCacheORM
+
+logger = logging.getLogger(__name__)
+
+# Contatori aggiuntivi attivi nel contesto corrente (vedi ``ResponseCache.track``)
+_tracked: ContextVar[Optional[Dict[str, int]]] = ContextVar(
+    "response_cache_tracked", default=None
+)
+
+
+class ResponseCache:
+    """Cache persistente delle risposte LLM indirizzata per contenuto.
+
+    La chiave è l'hash SHA-256 di modello, endpoint, prompt, temperatura e
+    ``max_tokens`` della richiesta. Le voci scadono dopo ``ttl_seconds`` e,
+    oltre ``max_entries``, vengono rimosse quelle usate meno di recente.
+    """
+
+    ttl_seconds: float = 30 * 24 * 3600
+    max_entries: int = 50_000
+    # Numero di inserimenti tra due passaggi di pulizia
+    eviction_interval: int = 200
+
+    _lock = threading.Lock()
+    _stats: Dict[str, int] = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+    _stores_since_eviction = 0
+
+    @staticmethod
+    def make_key(endpoint: Optional[str], request: Dict[str, Any]) -> str:
+        """Calcola la chiave della cache per ``request`` inviata a ``endpoint``."""
+        payload = {
+            "model": request.get("model"),
+            "endpoint": endpoint or "",
+            "messages": request.get("messages"),
+            "temperature": request.get("temperature"),
+            "max_tokens": request.get("max_tokens"),
+            "response_format": request.get("response_format"),
+        }
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _count(stat: str, amount: int = 1) -> None:
+        tracked = _tracked.get()
+        with ResponseCache._lock:
+            ResponseCache._stats[stat] += amount
+            if tracked is not None:
+                tracked[stat] = tracked.get(stat, 0) + amount
+
+    @staticmethod
+    @contextmanager
+    def track(counters: Dict[str, int]) -> Iterator[Dict[str, int]]:
+        """Accumula in ``counters`` i contatori delle operazioni eseguite nel blocco.
+
+        A differenza di :meth:`stats`, che riguarda l'intero processo, conta
+        solo le letture e le scritture avvenute nel contesto corrente, per
+        esempio quelle di una singola esecuzione di test.
+        """
+        token = _tracked.set(counters)
+        try:
+            yield counters
+        finally:
+            _tracked.reset(token)
+
+    @staticmethod
+    def get(key: str) -> Optional[str]:
+        """Restituisce il contenuto in cache per ``key`` o ``None`` se assente o scaduto."""
+        now = time.time()
+        with DatabaseEngine.instance().get_session() as session:
+            entry = session.get(ResponseCacheORM, key)
+            if entry is None:
+                ResponseCache._count("misses")
+                return None
+            if now - entry.created_at > ResponseCache.ttl_seconds:
+                session.delete(entry)
+                session.commit()
+                ResponseCache._count("misses")
+                ResponseCache._count("evictions")
+                return None
+            entry.last_used_at = now
+            entry.hits = (entry.hits or 0) + 1
+            content = entry.content
+            session.commit()
+        ResponseCache._count("hits")
+        return content
+
+    @staticmethod
+    def put(key: str, model: str, endpoint: Optional[str], content: str) -> None:
+        """Salva ``content`` in cache, sostituendo un'eventuale voce precedente."""
+        now = time.time()
+        with DatabaseEngine.instance().get_session() as session:
+            entry = session.get(ResponseCacheORM, key)
+            if entry is None:
+                session.add(
+                    ResponseCacheORM(
+                        key=key,
+                        model=model or "",
+                        endpoint=endpoint or "",
+                        content=content,
+                        created_at=now,
+                        last_used_at=now,
+                        hits=0,
+                    )
+                )
+            else:
+                entry.content = content
+                entry.created_at = now
+                entry.last_used_at = now
+            session.commit()
+        ResponseCache._count("stores")
+
+        with ResponseCache._lock:
+            ResponseCache._stores_since_eviction += 1
+            run_eviction = ResponseCache._stores_since_eviction >= ResponseCache.eviction_interval
+            if run_eviction:
+                ResponseCache._stores_since_eviction = 0
+        if run_eviction:
+            ResponseCache.evict()
+
+    @staticmethod
+    def evict(
+        ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None
+    ) -> int:
+        """Rimuove le voci scadute e quelle in eccesso meno usate di recente.
+
+        Restituisce il numero di voci eliminate.
+        """
+        ttl = ResponseCache.ttl_seconds if ttl_seconds is None else ttl_seconds
+        limit = ResponseCache.max_entries if max_entries is None else max_entries
+        removed = 0
+        with DatabaseEngine.instance().get_session() as session:
+            result = session.execute(
+                delete(ResponseCacheORM).where(
+                    ResponseCacheORM.created_at < time.time() - ttl
+                )
+            )
+            removed += int(getattr(result, "rowcount", 0) or 0)
+
+            total = session.execute(select(func.count(ResponseCacheORM.key))).scalar() or 0
+            excess = total - limit
+            if excess > 0:
+                stale_keys = session.execute(
+                    select(ResponseCacheORM.key)
+                    .order_by(ResponseCacheORM.last_used_at)
+                    .limit(excess)
+                ).scalars().all()
+                session.execute(
+                    delete(ResponseCacheORM).where(ResponseCacheORM.key.in_(stale_keys))
+                )
+                removed += len(stale_keys)
+            session.commit()
+        ResponseCache._count("evictions", removed)
+        return removed
+
+    @staticmethod
+    def clear() -> None:
+        """Svuota completamente la cache."""
+        with DatabaseEngine.instance().get_session() as session:
+            session.execute(delete(ResponseCacheORM))
+            session.commit()
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        """Restituisce i contatori di hit/miss del processo corrente."""
+        with ResponseCache._lock:
+            stats: Dict[str, Any] = dict(ResponseCache._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    @staticmethod
+    def reset_stats() -> None:
+        with ResponseCache._lock:
+            for stat in ResponseCache._stats:
+                ResponseCache._stats[stat] = 0
@@ -0,0 +1,122 @@
+import logging
+
+from dataclasses import dataclass, field
+from datetime import datetime
+import uuid
+from typing import Any, Dict, List, Optional, cast
+
+from sqlalchemy import select, update
+
+from models.database import DatabaseEngine
+from models.orm_models import TestMatrixORM
+
+logger = logging.getLogger(__name__)
+
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+@dataclass
+class TestMatrix:
+    """Esecuzione di più preset di generazione su uno o più set.
+
+    Ogni combinazione set × preset produce un ``TestResult`` distinto, che
+    riporta l'id della matrice in ``results["matrix_id"]``; ``summary``
+    raccoglie l'esito di tutte le combinazioni.
+    """
+
+    id: str
+    status: str
+    set_ids: List[str] = field(default_factory=list)
+    generation_presets: List[str] = field(default_factory=list)
+    evaluation_preset: str = ""
+    summary: Dict[str, Any] = field(default_factory=dict)
+    created_at: str = ""
+    completed_at: Optional[str] = None
+    __test__ = False
+
+    @property
+    def result_ids(self) -> List[str]:
+        return [
+            str(c["result_id"])
+            for c in self.summary.get("combinations", [])
+            if c.get("result_id")
+        ]
+
+    @staticmethod
+    def _from_orm(matrix: TestMatrixORM) -> "TestMatrix":
+        return TestMatrix(
+            id=cast(str, matrix.id),
+            status=cast(str, matrix.status),
+            set_ids=[str(s) for s in (matrix.set_ids or [])],
+            generation_presets=[str(p) for p in (matrix.generation_presets or [])],
+            evaluation_preset=cast(str, matrix.evaluation_preset or ""),
+            summary=cast(Dict[str, Any], matrix.summary or {}),
+            created_at=cast(str, matrix.created_at or ""),
+            completed_at=matrix.completed_at,
+        )
+
+    @staticmethod
+    def create(
+        set_ids: List[str], generation_presets: List[str], evaluation_preset: str
+    ) -> "TestMatrix":
+        """Registra una nuova matrice con stato ``running``."""
+        matrix = TestMatrix(
+            id=str(uuid.uuid4()),
+            status=STATUS_RUNNING,
+            set_ids=[str(s) for s in set_ids],
+            generation_presets=[str(p) for p in generation_presets],
+            evaluation_preset=evaluation_preset,
+            created_at=_now(),
+        )
+        with DatabaseEngine.instance().get_session() as session:
+            session.add(
+                TestMatrixORM(
+                    id=matrix.id,
+                    status=matrix.status,
+                    set_ids=matrix.set_ids,
+                    generation_presets=matrix.generation_presets,
+                    evaluation_preset=matrix.evaluation_preset,
+                    summary={},
+                    created_at=matrix.created_at,
+                )
+            )
+            session.commit()
+        return matrix
+
+    @staticmethod
+    def finish(matrix_id: str, summary: Dict[str, Any], failed: bool = False) -> None:
+        """Salva il riepilogo e chiude la matrice come completata o fallita."""
+        with DatabaseEngine.instance().get_session() as session:
+            session.execute(
+                update(TestMatrixORM)
+                .where(TestMatrixORM.id == matrix_id)
+                .values(
+                    status=STATUS_FAILED if failed else STATUS_COMPLETED,
+                    summary=summary,
+                    completed_at=_now(),
+                )
+            )
+            session.commit()
+
+    @staticmethod
+    def get(matrix_id: str) -> Optional["TestMatrix"]:
+        with DatabaseEngine.instance().get_session() as session:
+            matrix = session.get(TestMatrixORM, matrix_id)
+            return TestMatrix._from_orm(matrix) if matrix is not None else None
+
+    @staticmethod
+    def list_recent(limit: int = 20) -> List["TestMatrix"]:
+        """Restituisce le ultime matrici registrate, dalla più recente."""
+        with DatabaseEngine.instance().get_session() as session:
+            matrices = session.execute(
+                select(TestMatrixORM)
+                .order_by(TestMatrixORM.created_at.desc())
+                .limit(limit)
+            ).scalars().all()
+            return [TestMatrix._from_orm(m) for m in matrices]
@@ -1,21 +1,345 @@
+import json
 import logging
+import math
 
 from dataclasses import dataclass, asdict
 import uuid
-from typing import IO, Any, Dict, List, cast
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, TypeVar, Union, cast
 from functools import lru_cache
 
 import pandas as pd
-from sqlalchemy import select
+from sqlalchemy import and_, delete, func, insert, or_, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
 
+from models.cache_version import CacheVersion
 from models.database import DatabaseEngine
-from models.orm_models import TestResultORM
-from utils.file_reader_utils import read_test_results, filter_new_rows
+from models.orm_models import (
+    QuestionORM,
+    TestResultItemORM,
+    TestResultORM,
+    TestResultStatsORM,
+)
+from utils.category_index import MISSING_CATEGORY
+from utils.columnar_utils import columnar_format, import_pyarrow, iter_columnar_rows
+from utils.file_reader_utils import iter_test_result_chunks
 from utils.import_template import ImportTemplate
 from utils.export_template import ExportTemplate
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Righe inserite per singola istruzione INSERT durante le importazioni
+IMPORT_CHUNK_SIZE = 500
+# Righe lette per volta durante l'esportazione
+EXPORT_BATCH_SIZE = 500
+
+# Colonne dei riepiloghi dei risultati, lette senza il JSON completo
+SUMMARY_COLUMNS = [
+    "id",
+    "set_id",
+    "timestamp",
+    "generation_llm",
+    "generation_preset",
+    "evaluation_llm",
+    "avg_score",
+]
+# Colonne ammesse per l'ordinamento dei riepiloghi
+SUMMARY_SORT_COLUMNS = ("timestamp", "avg_score", "set_id", "generation_llm")
+
+# Metriche del grafico radar
+RADAR_METRICS = ("similarity", "correctness", "completeness")
+# Percentili dei punteggi materializzati in ``test_result_stats``
+STATS_PERCENTILES = {"score_p25": 25, "score_median": 50, "score_p75": 75, "score_p90": 90}
+# ID di domande cercati per singola query durante il calcolo delle statistiche
+CATEGORY_LOOKUP_BATCH_SIZE = 1000
+# Risultati elaborati per blocco durante il ricalcolo delle statistiche
+STATS_BACKFILL_CHUNK_SIZE = 500
+
+# Connessione o sessione su cui eseguire le istruzioni SQL
+Executor = Union[Connection, Session]
+
+# Nome della cache dei risultati in ``cache_versions``
+RESULTS_CACHE = "test_results"
+
+# Colonne delle righe per risultato e categoria di :meth:`TestResult.load_category_rows`
+CATEGORY_ROW_COLUMNS = [
+    "result_id",
+    "set_id",
+    "timestamp",
+    "generation_llm",
+    "generation_preset",
+    "category",
+    "count",
+    "avg_score",
+    "avg_similarity",
+    "avg_correctness",
+    "avg_completeness",
+]
+
+# Callback da invocare dopo ogni modifica dei risultati
+_change_listeners: List[Callable[[], None]] = []
+
+
+def _batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    batch: List[T] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _as_float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_int(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_label(value: Any) -> Optional[str]:
+    return str(value)[:255] if value else None
+
+
+def result_summary_columns(results_data: Any) -> Dict[str, Any]:
+    """Valori delle colonne indicizzate di ``test_results`` ricavati da ``results_data``."""
+    data = results_data if isinstance(results_data, dict) else {}
+    return {
+        "generation_llm": _as_label(data.get("generation_llm")),
+        "generation_preset": _as_label(data.get("generation_preset")),
+        "evaluation_llm": _as_label(data.get("evaluation_llm")),
+        "avg_score": _as_float(data.get("avg_score")),
+    }
+
+
+def result_item_rows(result_id: str, results_data: Any) -> List[Dict[str, Any]]:
+    """Converte le domande di ``results_data`` in righe di ``test_result_items``."""
+    questions = results_data.get("questions") if isinstance(results_data, dict) else None
+    if not isinstance(questions, dict):
+        return []
+    rows: List[Dict[str, Any]] = []
+    for question_id, qdata in questions.items():
+        if not isinstance(qdata, dict):
+            continue
+        evaluation = qdata.get("evaluation")
+        if not isinstance(evaluation, dict):
+            evaluation = {}
+        answer = qdata.get("actual_answer")
+        rows.append(
+            {
+                "result_id": result_id,
+                "question_id": str(question_id),
+                "score": _as_float(evaluation.get("score")),
+                "similarity": _as_float(evaluation.get("similarity")),
+                "correctness": _as_float(evaluation.get("correctness")),
+                "completeness": _as_float(evaluation.get("completeness")),
+                "latency": _as_float(qdata.get("latency")),
+                "tokens": _as_int(qdata.get("tokens")),
+                "answer": str(answer) if answer is not None else None,
+            }
+        )
+    return rows
+
+
+def _result_questions(results_data: Any) -> Dict[str, Dict[str, Any]]:
+    questions = results_data.get("questions") if isinstance(results_data, dict) else None
+    if not isinstance(questions, dict):
+        return {}
+    return {str(q_id): q for q_id, q in questions.items() if isinstance(q, dict)}
+
+
+def _percentile(values: Sequence[float], q: float) -> float:
+    """Percentile ``q`` (0-100) di ``values`` ordinati, con interpolazione lineare."""
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def result_stats_row(
+    result_id: Optional[str], results_data: Any, categories: Mapping[str, str]
+) -> Dict[str, Any]:
+    """Calcola la riga di ``test_result_stats`` per ``results_data``.
+
+    Media e metriche radar seguono :meth:`TestResult.calculate_statistics`
+    (le metriche mancanti valgono 0); ``score_std`` è la deviazione standard
+    della popolazione e i percentili usano l'interpolazione lineare.
+    ``categories`` associa l'ID di ogni domanda alla sua categoria.
+    """
+    questions = _result_questions(results_data)
+    scores: List[float] = []
+    sums = {metric: 0.0 for metric in RADAR_METRICS}
+    per_category: Dict[str, Dict[str, float]] = {}
+    for q_id, qdata in questions.items():
+        evaluation = qdata.get("evaluation")
+        if not isinstance(evaluation, dict):
+            evaluation = {}
+        values = {
+            name: _as_float(evaluation.get(name)) or 0.0
+            for name in ("score",) + RADAR_METRICS
+        }
+        scores.append(values["score"])
+        for metric in RADAR_METRICS:
+            sums[metric] += values[metric]
+        totals = per_category.setdefault(
+            categories.get(q_id) or MISSING_CATEGORY,
+            {"count": 0, "score": 0.0, **{m: 0.0 for m in RADAR_METRICS}},
+        )
+        totals["count"] += 1
+        for name, value in values.items():
+            totals[name] += value
+
+    count = len(scores)
+    row: Dict[str, Any] = {
+        "result_id": result_id,
+        "question_count": count,
+        "avg_score": sum(scores) / count if count else 0.0,
+        **{f"avg_{m}": sums[m] / count if count else 0.0 for m in RADAR_METRICS},
+        "score_std": None,
+        "score_min": None,
+        "score_max": None,
+        **{column: None for column in STATS_PERCENTILES},
+        "category_stats": {
+            category: {
+                "count": int(totals["count"]),
+                "avg_score": totals["score"] / totals["count"],
+                **{f"avg_{m}": totals[m] / totals["count"] for m in RADAR_METRICS},
+            }
+            for category, totals in sorted(per_category.items())
+        },
+    }
+    if count:
+        ordered = sorted(scores)
+        mean = row["avg_score"]
+        row["score_std"] = math.sqrt(sum((s - mean) ** 2 for s in scores) / count)
+        row["score_min"] = ordered[0]
+        row["score_max"] = ordered[-1]
+        for column, q in STATS_PERCENTILES.items():
+            row[column] = _percentile(ordered, q)
+    return row
+
+
+def statistics_from_row(row: Mapping[str, Any]) -> Dict[str, Any]:
+    """Converte una riga di ``test_result_stats`` nel formato usato dalle viste."""
+    return {
+        "question_count": int(row.get("question_count") or 0),
+        "avg_score": row.get("avg_score") or 0.0,
+        "radar_metrics": {m: row.get(f"avg_{m}") or 0.0 for m in RADAR_METRICS},
+        "score_std": row.get("score_std"),
+        "score_min": row.get("score_min"),
+        "score_max": row.get("score_max"),
+        "percentiles": {q: row.get(column) for column, q in STATS_PERCENTILES.items()},
+        "category_stats": row.get("category_stats") or {},
+    }
+
+
+def question_categories(executor: Executor, question_ids: Iterable[str]) -> Dict[str, str]:
+    """Restituisce la categoria delle domande indicate che esistono ancora."""
+    categories: Dict[str, str] = {}
+    for batch in _batched(sorted(set(question_ids)), CATEGORY_LOOKUP_BATCH_SIZE):
+        for q_id, category in executor.execute(
+            select(QuestionORM.id, QuestionORM.categoria).where(QuestionORM.id.in_(batch))
+        ):
+            categories[str(q_id)] = category or MISSING_CATEGORY
+    return categories
+
+
+def write_result_stats(executor: Executor, results: Sequence[Tuple[str, Any]]) -> None:
+    """Calcola e sostituisce le statistiche delle coppie ``(id, results)`` indicate."""
+    if not results:
+        return
+    categories = question_categories(
+        executor, (q_id for _, data in results for q_id in _result_questions(data))
+    )
+    executor.execute(
+        delete(TestResultStatsORM).where(
+            TestResultStatsORM.result_id.in_([str(rid) for rid, _ in results])
+        )
+    )
+    executor.execute(
+        insert(TestResultStatsORM),
+        [result_stats_row(str(rid), data, categories) for rid, data in results],
+    )
+
+
+def backfill_result_stats(
+    executor: Executor,
+    recompute: bool = False,
+    chunk_size: int = STATS_BACKFILL_CHUNK_SIZE,
+) -> int:
+    """Materializza le statistiche dei risultati che ne sono privi.
+
+    Con ``recompute`` vengono ricalcolate quelle di tutti i risultati, ad
+    esempio dopo aver cambiato la categoria delle domande. Restituisce il
+    numero di risultati elaborati; il commit è a carico del chiamante.
+    """
+    query = select(TestResultORM.id)
+    if not recompute:
+        query = query.where(
+            TestResultORM.id.not_in(select(TestResultStatsORM.result_id))
+        )
+    result_ids = executor.execute(query).scalars().all()
+    for chunk in _batched(result_ids, max(1, chunk_size)):
+        rows = executor.execute(
+            select(TestResultORM.id, TestResultORM.results).where(
+                TestResultORM.id.in_(chunk)
+            )
+        ).all()
+        write_result_stats(executor, [(r.id, r.results) for r in rows])
+    return len(result_ids)
+
+
+# Colonne dei file Parquet/Arrow: una riga per domanda di ogni risultato
+FLAT_RESULT_COLUMNS: List[Tuple[str, str]] = [
+    ("result_id", "string"),
+    ("set_id", "string"),
+    ("timestamp", "string"),
+    ("set_name", "string"),
+    ("method", "string"),
+    ("generation_llm", "string"),
+    ("evaluation_llm", "string"),
+    ("avg_score", "float64"),
+    ("question_id", "string"),
+    ("question", "string"),
+    ("expected_answer", "string"),
+    ("actual_answer", "string"),
+    ("score", "float64"),
+    ("similarity", "float64"),
+    ("correctness", "float64"),
+    ("completeness", "float64"),
+    ("explanation", "string"),
+    ("latency", "float64"),
+    ("tokens", "int64"),
+    ("metadata", "string"),
+]
+# Campi del risultato riportati come colonne; gli altri finiscono in ``metadata``
+_FLAT_RESULT_FIELDS = ("set_name", "method", "generation_llm", "evaluation_llm", "avg_score")
+# Campi ricalcolati dalle domande durante l'importazione
+_DERIVED_RESULT_FIELDS = ("questions", "per_question_scores", "radar_metrics")
+_FLAT_METRICS = ("score", "similarity", "correctness", "completeness")
+
+
+def _as_text(value: Any) -> Optional[str]:
+    return str(value) if value is not None else None
+
+
+def flat_result_schema() -> Any:
+    """Schema ``pyarrow`` delle righe prodotte da :meth:`TestResult.flatten`."""
+    pa = import_pyarrow()
+    return pa.schema([(name, getattr(pa, dtype)()) for name, dtype in FLAT_RESULT_COLUMNS])
+
 
 @dataclass
 class TestResult:
@@ -39,6 +363,263 @@ class TestResult:
                 for r in results
             ]
 
+    @staticmethod
+    def iter_all(batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+        """Itera su tutti i risultati leggendoli dal database a blocchi.
+
+        A differenza di :meth:`load_all` non mantiene in memoria l'intera
+        tabella: è pensato per le esportazioni di storici molto grandi.
+        """
+        with DatabaseEngine.instance().get_session() as session:
+            rows = session.execute(
+                select(TestResultORM).execution_options(yield_per=batch_size)
+            ).scalars()
+            for r in rows:
+                yield {
+                    "id": r.id,
+                    "set_id": r.set_id,
+                    "timestamp": r.timestamp,
+                    "results": r.results or {},
+                }
+
+    @staticmethod
+    def _filter_conditions(
+        set_ids: Optional[Sequence[str]],
+        generation_llm: Optional[str],
+        generation_presets: Sequence[str],
+    ) -> List[Any]:
+        conditions: List[Any] = []
+        if set_ids is not None:
+            conditions.append(TestResultORM.set_id.in_(list(set_ids)))
+        if generation_llm is not None:
+            condition = TestResultORM.generation_llm == generation_llm
+            if generation_presets:
+                condition = or_(
+                    condition,
+                    and_(
+                        TestResultORM.generation_llm.is_(None),
+                        TestResultORM.generation_preset.in_(list(generation_presets)),
+                    ),
+                )
+            conditions.append(condition)
+        return conditions
+
+    @staticmethod
+    def load_filtered_df(
+        set_ids: Optional[Sequence[str]] = None,
+        generation_llm: Optional[str] = None,
+        generation_presets: Sequence[str] = (),
+    ) -> pd.DataFrame:
+        """Carica i risultati filtrando direttamente nella query SQL.
+
+        ``set_ids`` limita i risultati ai set indicati; ``generation_llm``
+        seleziona il modello di generazione, considerando anche i risultati
+        senza modello registrato ma generati con uno dei ``generation_presets``.
+        """
+        query = select(
+            TestResultORM.id,
+            TestResultORM.set_id,
+            TestResultORM.timestamp,
+            TestResultORM.results,
+        ).where(*TestResult._filter_conditions(set_ids, generation_llm, generation_presets))
+        with DatabaseEngine.instance().get_session() as session:
+            rows = session.execute(query).all()
+        return pd.DataFrame(
+            [(r.id, r.set_id, r.timestamp, r.results or {}) for r in rows],
+            columns=["id", "set_id", "timestamp", "results"],
+        )
+
+    @staticmethod
+    def load_by_ids(ids: Sequence[str]) -> pd.DataFrame:
+        """Carica i risultati completi (con il JSON) dei soli ``ids`` indicati."""
+        columns = ["id", "set_id", "timestamp", "results"]
+        if not ids:
+            return pd.DataFrame(columns=columns)
+        with DatabaseEngine.instance().get_session() as session:
+            rows = session.execute(
+                select(
+                    TestResultORM.id,
+                    TestResultORM.set_id,
+                    TestResultORM.timestamp,
+                    TestResultORM.results,
+                ).where(TestResultORM.id.in_(list(ids)))
+            ).all()
+        return pd.DataFrame(
+            [(r.id, r.set_id, r.timestamp, r.results or {}) for r in rows],
+            columns=columns,
+        )
+
+    @staticmethod
+    def load_summaries(
+        offset: int = 0,
+        limit: Optional[int] = None,
+        sort_by: str = "timestamp",
+        descending: bool = True,
+        set_ids: Optional[Sequence[str]] = None,
+        generation_llm: Optional[str] = None,
+        generation_presets: Sequence[str] = (),
+    ) -> pd.DataFrame:
+        """Restituisce una pagina di riepiloghi dei risultati senza il JSON completo.
+
+        Le colonne sono quelle di ``SUMMARY_COLUMNS``; ordinamento, filtri e
+        paginazione sono applicati nella query. ``sort_by`` è una chiave di
+        ``SUMMARY_SORT_COLUMNS``.
+        """
+        if sort_by not in SUMMARY_SORT_COLUMNS:
+            raise ValueError(f"Ordinamento non supportato: {sort_by}")
+        sort_column = getattr(TestResultORM, sort_by)
+        order = sort_column.desc() if descending else sort_column.asc()
+        tie_break = TestResultORM.id.desc() if descending else TestResultORM.id.asc()
+        # I valori nulli vanno in fondo; per le colonne obbligatorie il
+        # criterio viene omesso così che l'ordinamento possa usare l'indice
+        nulls_last = (
+            [sort_column.is_(None)] if TestResultORM.__table__.c[sort_by].nullable else []
+        )
+        query = (
+            select(*[getattr(TestResultORM, c) for c in SUMMARY_COLUMNS])
+            .where(*TestResult._filter_conditions(set_ids, generation_llm, generation_presets))
+            .order_by(*nulls_last, order, tie_break)
+            .offset(offset)
+            .limit(limit)
+        )
+        with DatabaseEngine.instance().get_session() as session:
+            rows = session.execute(query).all()
+        return pd.DataFrame([tuple(r) for r in rows], columns=SUMMARY_COLUMNS)
+
+    @staticmethod
+    def count_filtered(
+        set_ids: Optional[Sequence[str]] = None,
+        generation_llm: Optional[str] = None,
+        generation_presets: Sequence[str] = (),
+    ) -> int:
+        """Conta i risultati che soddisfano i filtri di :meth:`load_summaries`."""
+        query = select(func.count()).select_from(TestResultORM).where(
+            *TestResult._filter_conditions(set_ids, generation_llm, generation_presets)
+        )
+        with DatabaseEngine.instance().get_session() as session:
+            return int(session.execute(query).scalar_one())
+
+    @staticmethod
+    def distinct_values(column: str) -> List[str]:
+        """Valori distinti e non vuoti di una colonna di riepilogo (es. ``set_id``)."""
+        orm_column = getattr(TestResultORM, column)
+        with DatabaseEngine.instance().get_session() as session:
+            values = session.execute(
+                select(orm_column).where(orm_column.is_not(None)).distinct()
+            ).scalars().all()
+        return sorted(str(v) for v in values if v)
+
+    @staticmethod
+    def flatten(record: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Appiattisce un risultato in una riga per domanda con colonne tipizzate.
+
+        I campi del risultato sono ripetuti su ogni riga; quelli senza una
+        colonna dedicata vengono serializzati in JSON nella colonna
+        ``metadata``. Un risultato senza domande produce una sola riga con
+        ``question_id`` nullo.
+        """
+        data = record.get("results")
+        data = data if isinstance(data, dict) else {}
+        base: Dict[str, Any] = {
+            "result_id": _as_text(record.get("id")),
+            "set_id": _as_text(record.get("set_id")),
+            "timestamp": _as_text(record.get("timestamp")),
+            "set_name": _as_text(data.get("set_name")),
+            "method": _as_text(data.get("method")),
+            "generation_llm": _as_text(data.get("generation_llm")),
+            "evaluation_llm": _as_text(data.get("evaluation_llm")),
+            "avg_score": _as_float(data.get("avg_score")),
+        }
+        metadata = {
+            k: v
+            for k, v in data.items()
+            if k not in _FLAT_RESULT_FIELDS + _DERIVED_RESULT_FIELDS
+        }
+        base["metadata"] = json.dumps(metadata, ensure_ascii=False, default=str)
+
+        questions = data.get("questions")
+        rows: List[Dict[str, Any]] = []
+        for question_id, qdata in (questions.items() if isinstance(questions, dict) else []):
+            if not isinstance(qdata, dict):
+                continue
+            evaluation = qdata.get("evaluation")
+            if not isinstance(evaluation, dict):
+                evaluation = {}
+            row = dict(base)
+            row.update(
+                question_id=str(question_id),
+                question=_as_text(qdata.get("question")),
+                expected_answer=_as_text(qdata.get("expected_answer")),
+                actual_answer=_as_text(qdata.get("actual_answer")),
+                explanation=_as_text(evaluation.get("explanation")),
+                latency=_as_float(qdata.get("latency")),
+                tokens=_as_int(qdata.get("tokens")),
+            )
+            for metric in _FLAT_METRICS:
+                row[metric] = _as_float(evaluation.get(metric))
+            rows.append(row)
+        return rows or [base]
+
+    @staticmethod
+    def _from_flat_group(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        first = rows[0]
+        metadata = first.get("metadata")
+        data: Dict[str, Any] = json.loads(metadata) if metadata else {}
+        for field in _FLAT_RESULT_FIELDS:
+            if first.get(field) is not None:
+                data[field] = first[field]
+
+        questions: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            if row.get("question_id") is None:
+                continue
+            evaluation = {m: row[m] for m in _FLAT_METRICS if row.get(m) is not None}
+            if row.get("explanation") is not None:
+                evaluation["explanation"] = row["explanation"]
+            entry: Dict[str, Any] = {
+                "question": row.get("question"),
+                "expected_answer": row.get("expected_answer"),
+                "actual_answer": row.get("actual_answer"),
+                "evaluation": evaluation,
+            }
+            for key in ("latency", "tokens"):
+                if row.get(key) is not None:
+                    entry[key] = row[key]
+            questions[str(row["question_id"])] = entry
+        if questions:
+            stats = TestResult.calculate_statistics(questions)
+            data["questions"] = questions
+            data["per_question_scores"] = stats["per_question_scores"]
+            data["radar_metrics"] = stats["radar_metrics"]
+        return {
+            "id": first.get("result_id"),
+            "set_id": first.get("set_id") or "",
+            "timestamp": first.get("timestamp") or "",
+            "results": data,
+        }
+
+    @staticmethod
+    def from_flat_rows(rows: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Ricostruisce i risultati dalle righe prodotte da :meth:`flatten`.
+
+        Le righe di uno stesso risultato devono essere contigue; i punteggi per
+        domanda e le metriche radar vengono ricalcolati dalle domande.
+        """
+        group: List[Dict[str, Any]] = []
+        done: set[Any] = set()
+        for row in rows:
+            if group and row.get("result_id") != group[0].get("result_id"):
+                done.add(group[0].get("result_id"))
+                yield TestResult._from_flat_group(group)
+                group = []
+            if not group and row.get("result_id") in done:
+                raise ValueError(
+                    f"Le righe del risultato '{row.get('result_id')}' non sono contigue nel file."
+                )
+            group.append(row)
+        if group:
+            yield TestResult._from_flat_group(group)
+
     @staticmethod
     @lru_cache(maxsize=1)
     def load_all_df() -> pd.DataFrame:
@@ -49,10 +630,180 @@ class TestResult:
 
     @staticmethod
     def refresh_cache() -> pd.DataFrame:
-        """Svuota e ricarica il DataFrame in cache dei risultati."""
+        """Svuota e ricarica il DataFrame in cache dei risultati.
+
+        La modifica viene segnalata anche agli altri processi.
+        """
         TestResult.load_all_df.cache_clear()
+        CacheVersion.publish(RESULTS_CACHE)
+        for listener in list(_change_listeners):
+            listener()
         return TestResult.load_all_df()
 
+    @staticmethod
+    def add_change_listener(listener: Callable[[], None]) -> None:
+        """Registra ``listener`` per le modifiche dei risultati.
+
+        Viene invocato dopo ogni :meth:`refresh_cache` di questo processo e
+        quando un altro processo segnala una modifica tramite
+        :class:`CacheVersion`.
+        """
+        _change_listeners.append(listener)
+        CacheVersion.subscribe(RESULTS_CACHE, listener)
+
+    @staticmethod
+    def list_ids() -> List[str]:
+        """Restituisce gli ID di tutti i risultati salvati."""
+        with DatabaseEngine.instance().get_session() as session:
+            return [str(i) for i in session.execute(select(TestResultORM.id)).scalars()]
+
+    @staticmethod
+    def load_category_rows(ids: Sequence[str]) -> pd.DataFrame:
+        """Righe per risultato e categoria ricavate da ``test_result_stats``.
+
+        Ogni riga riporta le colonne di riepilogo del risultato e gli
+        aggregati di una categoria delle sue domande (vedi
+        ``CATEGORY_ROW_COLUMNS``); i risultati senza statistiche sono esclusi.
+        """
+        rows: List[Tuple[Any, ...]] = []
+        with DatabaseEngine.instance().get_session() as session:
+            for batch in _batched(list(ids), CATEGORY_LOOKUP_BATCH_SIZE):
+                for r in session.execute(
+                    select(
+                        TestResultORM.id,
+                        TestResultORM.set_id,
+                        TestResultORM.timestamp,
+                        TestResultORM.generation_llm,
+                        TestResultORM.generation_preset,
+                        TestResultStatsORM.category_stats,
+                    )
+                    .join(TestResultStatsORM, TestResultStatsORM.result_id == TestResultORM.id)
+                    .where(TestResultORM.id.in_(batch))
+                ):
+                    for category, values in (r.category_stats or {}).items():
+                        rows.append(
+                            (
+                                r.id, r.set_id, r.timestamp, r.generation_llm,
+                                r.generation_preset, category, values.get("count", 0),
+                                *(values.get(f"avg_{name}") for name in ("score",) + RADAR_METRICS),
+                            )
+                        )
+        return pd.DataFrame(rows, columns=CATEGORY_ROW_COLUMNS)
+
+    @staticmethod
+    def _write_items(session: Session, result_id: str, results_data: Any) -> None:
+        """Sostituisce le righe normalizzate di ``result_id`` nella sessione."""
+        session.execute(
+            delete(TestResultItemORM).where(TestResultItemORM.result_id == result_id)
+        )
+        rows = result_item_rows(result_id, results_data)
+        if rows:
+            session.execute(insert(TestResultItemORM), rows)
+
+    @staticmethod
+    def question_averages(set_id: Optional[str] = None) -> pd.DataFrame:
+        """Calcola in SQL i punteggi medi per domanda su tutti i risultati.
+
+        Restituisce un DataFrame con le colonne ``question_id``, ``runs``,
+        ``avg_score``, ``avg_similarity``, ``avg_correctness`` e
+        ``avg_completeness``; con ``set_id`` considera solo i risultati del set.
+        """
+        query = select(
+            TestResultItemORM.question_id,
+            func.count().label("runs"),
+            func.avg(TestResultItemORM.score).label("avg_score"),
+            func.avg(TestResultItemORM.similarity).label("avg_similarity"),
+            func.avg(TestResultItemORM.correctness).label("avg_correctness"),
+            func.avg(TestResultItemORM.completeness).label("avg_completeness"),
+        ).group_by(TestResultItemORM.question_id)
+        if set_id is not None:
+            query = query.join(
+                TestResultORM, TestResultORM.id == TestResultItemORM.result_id
+            ).where(TestResultORM.set_id == set_id)
+        columns = [
+            "question_id",
+            "runs",
+            "avg_score",
+            "avg_similarity",
+            "avg_correctness",
+            "avg_completeness",
+        ]
+        with DatabaseEngine.instance().get_session() as session:
+            rows = session.execute(query).all()
+        return pd.DataFrame([tuple(r) for r in rows], columns=columns)
+
+    @staticmethod
+    def _insert_ignore(session: Session, table: Any, rows: List[Dict[str, Any]]) -> None:
+        """Inserisce ``rows`` in un'unica istruzione ignorando le chiavi duplicate."""
+        dialect = session.get_bind().dialect.name
+        if dialect == "mysql":
+            session.execute(mysql_insert(table).values(rows).prefix_with("IGNORE"))
+        elif dialect == "sqlite":
+            session.execute(sqlite_insert(table).values(rows).on_conflict_do_nothing())
+        else:
+            session.execute(insert(table), rows)
+
+    @staticmethod
+    def insert_new(
+        results: List["TestResult"], chunk_size: int = IMPORT_CHUNK_SIZE
+    ) -> int:
+        """Inserisce solo i risultati con ``id`` non ancora presente.
+
+        I risultati esistenti non vengono letti né modificati: per ogni blocco
+        di ``chunk_size`` elementi viene verificata la presenza degli id con
+        una query sulla chiave primaria e le righe nuove sono inserite con un
+        INSERT multi-riga (``INSERT IGNORE`` su MySQL, ``ON CONFLICT DO
+        NOTHING`` su SQLite). Restituisce il numero di risultati inseriti.
+        """
+        unique: Dict[str, TestResult] = {}
+        for result in results:
+            unique.setdefault(str(result.id), result)
+        pending = list(unique.values())
+
+        added = 0
+        with DatabaseEngine.instance().get_session() as session:
+            for start in range(0, len(pending), max(1, chunk_size)):
+                chunk = pending[start:start + chunk_size]
+                existing = set(
+                    session.execute(
+                        select(TestResultORM.id).where(
+                            TestResultORM.id.in_([str(r.id) for r in chunk])
+                        )
+                    ).scalars().all()
+                )
+                new_results = [r for r in chunk if str(r.id) not in existing]
+                if not new_results:
+                    continue
+                TestResult._insert_ignore(
+                    session,
+                    TestResultORM,
+                    [
+                        {
+                            "id": str(r.id),
+                            "set_id": r.set_id,
+                            "timestamp": r.timestamp,
+                            "results": r.results,
+                            **result_summary_columns(r.results),
+                        }
+                        for r in new_results
+                    ],
+                )
+                item_rows = [
+                    row
+                    for r in new_results
+                    for row in result_item_rows(str(r.id), r.results)
+                ]
+                for item_start in range(0, len(item_rows), max(1, chunk_size)):
+                    TestResult._insert_ignore(
+                        session,
+                        TestResultItemORM,
+                        item_rows[item_start:item_start + chunk_size],
+                    )
+                write_result_stats(session, [(str(r.id), r.results) for r in new_results])
+                added += len(new_results)
+            session.commit()
+        return added
+
     @staticmethod
     def _persist_entities(imported_df: pd.DataFrame) -> int:
         """Persiste nuovi risultati di test evitando duplicati.
@@ -68,19 +819,18 @@ class TestResult:
             Numero di nuovi risultati inseriti.
         """
 
-        existing_df = TestResult.load_all_df()
-        existing_ids = (
-            existing_df["id"].astype(str).tolist() if not existing_df.empty else []
-        )
-        new_rows, added_count = filter_new_rows(imported_df, existing_ids)
-
-        if added_count > 0:
-            combined_df = pd.concat([existing_df, new_rows], ignore_index=True)
-            results = [
-                TestResult(**row) for row in combined_df.to_dict(orient="records")
-            ]
-            TestResult.save(results)
-        return added_count
+        if imported_df is None or imported_df.empty:
+            return 0
+        results = [
+            TestResult(
+                id=str(row["id"]),
+                set_id=row["set_id"],
+                timestamp=row["timestamp"],
+                results=row["results"],
+            )
+            for row in imported_df.to_dict(orient="records")
+        ]
+        return TestResult.insert_new(results)
 
     @staticmethod
     def save(results: List["TestResult"]) -> None:
@@ -92,6 +842,12 @@ class TestResult:
             for rid in set(existing_ids) - set(incoming_ids):
                 obj = session.get(TestResultORM, rid)
                 if obj:
+                    session.execute(
+                        delete(TestResultItemORM).where(TestResultItemORM.result_id == rid)
+                    )
+                    session.execute(
+                        delete(TestResultStatsORM).where(TestResultStatsORM.result_id == rid)
+                    )
                     session.delete(obj)
 
             for result in results:
@@ -101,8 +857,17 @@ class TestResult:
                     obj_cast.set_id = result.set_id
                     obj_cast.timestamp = result.timestamp
                     obj_cast.results = result.results
+                    for column, value in result_summary_columns(result.results).items():
+                        setattr(obj_cast, column, value)
                 else:
-                    session.add(TestResultORM(**asdict(result)))
+                    session.add(
+                        TestResultORM(
+                            **asdict(result), **result_summary_columns(result.results)
+                        )
+                    )
+                session.flush()
+                TestResult._write_items(session, result.id, result.results)
+            write_result_stats(session, [(r.id, r.results) for r in results])
             session.commit()
 
     @staticmethod
@@ -115,8 +880,12 @@ class TestResult:
                     set_id=set_id,
                     timestamp=results_data.get('timestamp', ''),
                     results=results_data,
+                    **result_summary_columns(results_data),
                 )
             )
+            session.flush()
+            TestResult._write_items(session, result_id, results_data)
+            write_result_stats(session, [(result_id, results_data)])
             session.commit()
         return result_id
 
@@ -127,6 +896,39 @@ class TestResult:
         TestResult.refresh_cache()
         return rid
 
+    @staticmethod
+    def load_statistics(ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """Legge le statistiche materializzate dei risultati indicati.
+
+        Restituisce un dizionario ``{id: statistiche}`` nel formato di
+        :func:`statistics_from_row`; i risultati senza statistiche non sono
+        inclusi.
+        """
+        if not ids:
+            return {}
+        with DatabaseEngine.instance().get_session() as session:
+            rows = session.execute(
+                select(TestResultStatsORM.__table__).where(
+                    TestResultStatsORM.result_id.in_(list(ids))
+                )
+            ).mappings().all()
+        return {row["result_id"]: statistics_from_row(dict(row)) for row in rows}
+
+    @staticmethod
+    def compute_statistics(results_data: Any) -> Dict[str, Any]:
+        """Calcola le statistiche di un risultato non salvato (es. un'esecuzione parziale)."""
+        with DatabaseEngine.instance().get_session() as session:
+            categories = question_categories(session, _result_questions(results_data))
+        return statistics_from_row(result_stats_row(None, results_data, categories))
+
+    @staticmethod
+    def backfill_statistics(recompute: bool = False) -> int:
+        """Materializza le statistiche mancanti (o tutte con ``recompute``)."""
+        with DatabaseEngine.instance().get_session() as session:
+            processed = backfill_result_stats(session, recompute)
+            session.commit()
+        return processed
+
     @staticmethod
     def calculate_statistics(
         questions_results: Dict[str, Dict[str, Any]]
@@ -169,16 +971,32 @@ class TestResult:
         }
 
 
+CacheVersion.subscribe(RESULTS_CACHE, TestResult.load_all_df.cache_clear)
+
+
 class TestResultImporter(ImportTemplate, ExportTemplate):
     """Importer per i risultati di test basato su :class:`ImportTemplate` e :class:`ExportTemplate`."""
 
-    def parse_file(self, file: IO[Any]) -> pd.DataFrame:  # type: ignore[override]
-        """Legge i risultati dal file usando ``read_test_results``."""
-        return read_test_results(file)
+    def parse_file(self, file: IO[Any]) -> Iterator[pd.DataFrame]:  # type: ignore[override]
+        """Legge i risultati dal file a blocchi.
+
+        I file Parquet e Arrow contengono le righe appiattite di
+        :meth:`TestResult.flatten`, che vengono ricomposte in risultati.
+        """
+        fmt = columnar_format(getattr(file, "name", ""))
+        if fmt is None:
+            return iter_test_result_chunks(file)
+        if hasattr(file, "seek"):
+            file.seek(0)
+        records = TestResult.from_flat_rows(iter_columnar_rows(file, fmt))
+        return (
+            pd.DataFrame(chunk, columns=["id", "set_id", "timestamp", "results"])
+            for chunk in _batched(records, IMPORT_CHUNK_SIZE)
+        )
 
-    def persist_data(self, df: pd.DataFrame) -> Dict[str, Any]:  # type: ignore[override]
-        """Persiste i dati tramite :meth:`TestResult._persist_entities`."""
-        added_count = TestResult._persist_entities(df)
+    def persist_data(self, chunks: Iterable[pd.DataFrame]) -> Dict[str, Any]:  # type: ignore[override]
+        """Persiste ogni blocco tramite :meth:`TestResult._persist_entities`."""
+        added_count = sum(TestResult._persist_entities(chunk) for chunk in chunks)
         if added_count > 0:
             TestResult.refresh_cache()
         message = (
@@ -192,5 +1010,16 @@ class TestResultImporter(ImportTemplate, ExportTemplate):
         """Recupera tutti i risultati dei test dal database."""
         return TestResult.load_all_df()
 
+    def iter_data(self) -> Iterator[Dict[str, Any]]:
+        """Legge i risultati a blocchi durante l'esportazione."""
+        return TestResult.iter_all()
+
+    def iter_columnar_data(self) -> Iterator[Dict[str, Any]]:
+        """Esporta in Parquet/Arrow una riga per domanda (vedi :meth:`TestResult.flatten`)."""
+        return (row for record in TestResult.iter_all() for row in TestResult.flatten(record))
+
+    def columnar_schema(self) -> Any:
+        return flat_result_schema()
+
 
 test_result_importer = TestResultImporter()
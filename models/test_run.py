@@ -0,0 +1,221 @@
+import logging
+
+from dataclasses import dataclass, field
+from datetime import datetime
+import uuid
+from typing import Any, Dict, List, Optional, cast
+
+import pandas as pd
+from sqlalchemy import select, update
+
+from models.database import DatabaseEngine
+from models.orm_models import TestRunItemORM, TestRunORM
+from models.test_result import TestResult
+
+logger = logging.getLogger(__name__)
+
+STATUS_PARTIAL = "partial"
+STATUS_COMPLETED = "completed"
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+@dataclass
+class TestRun:
+    """Esecuzione di un test salvata domanda per domanda.
+
+    Il record viene creato all'avvio con stato ``partial`` e ogni domanda
+    completata viene registrata in ``test_run_items``: un'esecuzione interrotta
+    può così essere ripresa senza ripetere le chiamate già effettuate.
+    """
+
+    id: str
+    set_id: str
+    set_name: str
+    status: str
+    question_ids: List[str] = field(default_factory=list)
+    generation_preset: str = ""
+    evaluation_preset: str = ""
+    generation_llm: str = ""
+    evaluation_llm: str = ""
+    created_at: str = ""
+    result_id: Optional[str] = None
+    sampling: Optional[Dict[str, Any]] = None
+    __test__ = False
+
+    @staticmethod
+    def _from_orm(run: TestRunORM) -> "TestRun":
+        return TestRun(
+            id=cast(str, run.id),
+            set_id=cast(str, run.set_id),
+            set_name=cast(str, run.set_name or ""),
+            status=cast(str, run.status),
+            question_ids=[str(q) for q in (run.question_ids or [])],
+            generation_preset=cast(str, run.generation_preset or ""),
+            evaluation_preset=cast(str, run.evaluation_preset or ""),
+            generation_llm=cast(str, run.generation_llm or ""),
+            evaluation_llm=cast(str, run.evaluation_llm or ""),
+            created_at=cast(str, run.created_at or ""),
+            result_id=run.result_id,
+            sampling=cast(Optional[Dict[str, Any]], run.sampling),
+        )
+
+    @staticmethod
+    def create(
+        set_id: str,
+        set_name: str,
+        question_ids: List[str],
+        gen_preset_config: Dict[str, Any],
+        eval_preset_config: Dict[str, Any],
+        sampling: Optional[Dict[str, Any]] = None,
+    ) -> "TestRun":
+        """Registra una nuova esecuzione con stato ``partial``.
+
+        ``sampling`` contiene i parametri della valutazione a campione, usati
+        per riprendere l'esecuzione con la stessa regola di arresto.
+        """
+        run = TestRun(
+            id=str(uuid.uuid4()),
+            set_id=str(set_id),
+            set_name=set_name,
+            status=STATUS_PARTIAL,
+            question_ids=[str(q) for q in question_ids],
+            generation_preset=str(gen_preset_config.get("name") or ""),
+            evaluation_preset=str(eval_preset_config.get("name") or ""),
+            generation_llm=str(gen_preset_config.get("model") or ""),
+            evaluation_llm=str(eval_preset_config.get("model") or ""),
+            created_at=_now(),
+            sampling=sampling,
+        )
+        with DatabaseEngine.instance().get_session() as session:
+            session.add(
+                TestRunORM(
+                    id=run.id,
+                    set_id=run.set_id,
+                    set_name=run.set_name,
+                    status=run.status,
+                    question_ids=run.question_ids,
+                    generation_preset=run.generation_preset,
+                    evaluation_preset=run.evaluation_preset,
+                    generation_llm=run.generation_llm,
+                    evaluation_llm=run.evaluation_llm,
+                    created_at=run.created_at,
+                    sampling=run.sampling,
+                )
+            )
+            session.commit()
+        return run
+
+    @staticmethod
+    def get(run_id: str) -> Optional["TestRun"]:
+        with DatabaseEngine.instance().get_session() as session:
+            run = session.get(TestRunORM, run_id)
+            return TestRun._from_orm(run) if run is not None else None
+
+    @staticmethod
+    def load_incomplete() -> List["TestRun"]:
+        """Restituisce le esecuzioni non completate, dalla più recente."""
+        with DatabaseEngine.instance().get_session() as session:
+            runs = session.execute(
+                select(TestRunORM)
+                .where(TestRunORM.status == STATUS_PARTIAL)
+                .order_by(TestRunORM.created_at.desc())
+            ).scalars().all()
+            return [TestRun._from_orm(r) for r in runs]
+
+    @staticmethod
+    def save_item(
+        run_id: str, question_id: str, result: Dict[str, Any], failed: bool = False
+    ) -> None:
+        """Registra (o sostituisce) il risultato di una domanda dell'esecuzione."""
+        with DatabaseEngine.instance().get_session() as session:
+            session.merge(
+                TestRunItemORM(
+                    run_id=run_id,
+                    question_id=str(question_id),
+                    result=result,
+                    failed=failed,
+                    completed_at=_now(),
+                )
+            )
+            session.commit()
+
+    @staticmethod
+    def load_items(
+        run_id: str, include_failed: bool = True
+    ) -> Dict[str, Dict[str, Any]]:
+        """Restituisce i risultati registrati per ``run_id`` indicizzati per domanda.
+
+        Con ``include_failed=False`` vengono escluse le domande terminate con un
+        errore, che in fase di ripresa vanno eseguite di nuovo.
+        """
+        query = select(TestRunItemORM).where(TestRunItemORM.run_id == run_id)
+        if not include_failed:
+            query = query.where(TestRunItemORM.failed.is_(False))
+        with DatabaseEngine.instance().get_session() as session:
+            items = session.execute(query).scalars().all()
+            return {
+                cast(str, item.question_id): cast(Dict[str, Any], item.result or {})
+                for item in items
+            }
+
+    @staticmethod
+    def complete(run_id: str, result_id: str) -> None:
+        """Segna l'esecuzione come completata e la collega al risultato salvato."""
+        with DatabaseEngine.instance().get_session() as session:
+            session.execute(
+                update(TestRunORM)
+                .where(TestRunORM.id == run_id)
+                .values(status=STATUS_COMPLETED, result_id=result_id)
+            )
+            session.commit()
+
+    @staticmethod
+    def load_partial_df() -> pd.DataFrame:
+        """Restituisce le esecuzioni parziali nel formato di ``TestResult.load_all_df``.
+
+        La colonna ``results`` contiene le domande già completate e i campi
+        ``status`` (``"partial"``), ``completed_questions`` e ``total_questions``.
+        """
+        columns = ["id", "set_id", "timestamp", "results"]
+        runs = TestRun.load_incomplete()
+        if not runs:
+            return pd.DataFrame(columns=columns)
+
+        items_by_run: Dict[str, Dict[str, Dict[str, Any]]] = {r.id: {} for r in runs}
+        with DatabaseEngine.instance().get_session() as session:
+            items = session.execute(
+                select(TestRunItemORM).where(TestRunItemORM.run_id.in_(list(items_by_run)))
+            ).scalars().all()
+            for item in items:
+                items_by_run[item.run_id][item.question_id] = item.result or {}
+
+        rows = []
+        for run in runs:
+            completed = items_by_run[run.id]
+            questions = {q: completed[q] for q in run.question_ids if q in completed}
+            stats = TestResult.calculate_statistics(questions)
+            rows.append(
+                {
+                    "id": run.id,
+                    "set_id": run.set_id,
+                    "timestamp": run.created_at,
+                    "results": {
+                        "set_name": run.set_name,
+                        "timestamp": run.created_at,
+                        "avg_score": stats["avg_score"],
+                        "method": "LLM",
+                        "generation_llm": run.generation_llm,
+                        "evaluation_llm": run.evaluation_llm,
+                        "questions": questions,
+                        "per_question_scores": stats["per_question_scores"],
+                        "radar_metrics": stats["radar_metrics"],
+                        "status": STATUS_PARTIAL,
+                        "completed_questions": len(questions),
+                        "total_questions": len(run.question_ids),
+                    },
+                }
+            )
+        return pd.DataFrame(rows, columns=columns)
@@ -0,0 +1,46 @@
+"""Materializza le statistiche dei risultati dei test in ``test_result_stats``.
+
+Le statistiche vengono scritte al salvataggio e all'importazione dei risultati
+e la migrazione ``0005_backfill_test_result_stats`` le calcola per quelli già
+presenti. Questo comando permette di ripetere il backfill, ad esempio dopo un
+ripristino del database, o di ricalcolarle tutte con ``--all`` dopo aver
+cambiato la categoria delle domande.
+
+Uso (dalla radice del progetto)::
+
+    python -m scripts.backfill_result_stats [--all]
+"""
+
+import argparse
+import logging
+import time
+
+from models.database import DatabaseEngine
+from models.test_result import TestResult
+from utils.startup_utils import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="ricalcola le statistiche di tutti i risultati, non solo di quelli che ne sono privi",
+    )
+    args = parser.parse_args()
+
+    setup_logging()
+    DatabaseEngine.instance().init_db()
+    start = time.perf_counter()
+    processed = TestResult.backfill_statistics(recompute=args.all)
+    logger.info(
+        "Statistiche materializzate per %d risultati in %.2f s",
+        processed,
+        time.perf_counter() - start,
+    )
+
+
+if __name__ == "__main__":
+    main()
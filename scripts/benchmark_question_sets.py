@@ -0,0 +1,116 @@
+"""Benchmark del caricamento dei set di domande.
+
+Confronta il caricamento tramite la relazione ``QuestionSetORM.questions``
+(una SELECT aggiuntiva per ogni set) con :meth:`QuestionSet.load_all`, che
+legge gli ID direttamente dalla tabella di associazione.
+
+Uso (dalla radice del progetto)::
+
+    python -m scripts.benchmark_question_sets --sets 1000 --questions 200
+"""
+
+import argparse
+import logging
+import time
+import uuid
+from typing import Callable, List
+
+from sqlalchemy import create_engine, event, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from models.database import Base, DatabaseEngine
+from models.orm_models import (
+    QuestionORM,
+    QuestionSetORM,
+    question_set_questions,
+)
+from models.question_set import QuestionSet
+from utils.startup_utils import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+def _populate(num_sets: int, questions_per_set: int, pool_size: int) -> None:
+    question_ids = [str(uuid.uuid4()) for _ in range(max(pool_size, questions_per_set))]
+    set_ids = [str(uuid.uuid4()) for _ in range(num_sets)]
+    with DatabaseEngine.instance().get_session() as session:
+        session.execute(
+            insert(QuestionORM),
+            [
+                {"id": q_id, "domanda": f"Domanda {i}", "risposta_attesa": "r", "categoria": ""}
+                for i, q_id in enumerate(question_ids)
+            ],
+        )
+        session.execute(
+            insert(QuestionSetORM),
+            [{"id": s_id, "name": f"Set {i}"} for i, s_id in enumerate(set_ids)],
+        )
+        links = []
+        for i, s_id in enumerate(set_ids):
+            start = (i * questions_per_set) % len(question_ids)
+            for j in range(questions_per_set):
+                links.append(
+                    {"set_id": s_id, "question_id": question_ids[(start + j) % len(question_ids)]}
+                )
+        session.execute(insert(question_set_questions), links)
+        session.commit()
+
+
+def _load_with_relationship() -> List[QuestionSet]:
+    """Caricamento precedente: una query lazy per ogni set."""
+    with DatabaseEngine.instance().get_session() as session:
+        sets = session.execute(select(QuestionSetORM)).scalars().all()
+        return [
+            QuestionSet(id=s.id, name=s.name or "", questions=[q.id for q in s.questions])
+            for s in sets
+        ]
+
+
+def _measure(label: str, loader: Callable[[], List[QuestionSet]], counter: List[int], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        counter[0] = 0
+        start = time.perf_counter()
+        sets = loader()
+        best = min(best, time.perf_counter() - start)
+    links = sum(len(s.questions) for s in sets)
+    logger.info(
+        "%s: %.3f s, %d query, %d set, %d associazioni",
+        label, best, counter[0], len(sets), links,
+    )
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sets", type=int, default=1000)
+    parser.add_argument("--questions", type=int, default=200, help="domande per set")
+    parser.add_argument("--pool", type=int, default=5000, help="domande distinte nel database")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--url", default="sqlite://", help="URL SQLAlchemy del database di prova")
+    args = parser.parse_args()
+
+    setup_logging()
+    engine = create_engine(args.url)
+    Base.metadata.create_all(engine)
+    DatabaseEngine.reset_instance()
+    db = DatabaseEngine.instance()
+    db._engine = engine  # type: ignore[attr-defined]
+    db._session_factory = sessionmaker(bind=engine)  # type: ignore[attr-defined]
+
+    counter = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count_queries(*_args: object) -> None:
+        counter[0] += 1
+
+    logger.info("Popolamento: %d set x %d domande...", args.sets, args.questions)
+    _populate(args.sets, args.questions, args.pool)
+
+    before = _measure("Relazione lazy (prima)", _load_with_relationship, counter, args.repeat)
+    after = _measure("Tabella di associazione (dopo)", QuestionSet.load_all, counter, args.repeat)
+    logger.info("Accelerazione: %.1fx", before / after if after else float("inf"))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ from sqlalchemy.orm import sessionmaker
 sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
 
 from models.database import DatabaseEngine, Base
+from utils.job_queue import reset_job_queue
 
 
 @pytest.fixture()
@@ -23,3 +24,16 @@ def in_memory_db():
     # Reimposta dopo il test
     DatabaseEngine.reset_instance()
 
+
+@pytest.fixture()
+def shared_db(tmp_path):
+    # Database su file: ogni thread (coda dei lavori, matrici) usa una propria connessione
+    DatabaseEngine.reset_instance()
+    db = DatabaseEngine.instance()
+    engine = create_engine(f"sqlite:///{tmp_path / 'shared.db'}")
+    Base.metadata.create_all(engine)
+    db._engine = engine  # type: ignore[attr-defined]
+    db._session_factory = sessionmaker(bind=engine)  # type: ignore[attr-defined]
+    yield db
+    reset_job_queue()
+    DatabaseEngine.reset_instance()
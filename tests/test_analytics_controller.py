@@ -0,0 +1,40 @@
+import pandas as pd
+
+from controllers import analytics_controller as controller
+from models.test_result import TestResult
+from utils.cache import result_analytics
+
+
+def _results(score, timestamp):
+    return {
+        "timestamp": timestamp,
+        "generation_llm": "gpt-4",
+        "questions": {"q1": {"evaluation": {"score": score}}},
+    }
+
+
+def test_analytics_follow_new_runs(mocker, in_memory_db):
+    result_analytics.clear()
+    mocker.patch(
+        "controllers.analytics_controller.load_sets",
+        return_value=pd.DataFrame([{"id": "s1", "name": "Set1"}]),
+    )
+    mocker.patch("controllers.result_controller.load_presets", return_value=pd.DataFrame())
+    TestResult.add_and_refresh("s1", _results(90, "2024-01-01 10:00:00"))
+
+    board = controller.get_leaderboard(["model", "set_id"])
+    assert board[["model", "set_name", "runs", "avg_score"]].values.tolist() == [
+        ["gpt-4", "Set1", 1, 90.0]
+    ]
+    assert controller.get_regressions().empty
+
+    TestResult.add_and_refresh("s1", _results(70, "2024-01-02 10:00:00"))
+
+    assert controller.get_leaderboard(["model"]).iloc[0]["runs"] == 2
+    regressions = controller.get_regressions(["model", "set_id"], threshold=10)
+    assert regressions[["set_name", "previous_score", "avg_score", "delta"]].values.tolist() == [
+        ["Set1", 90.0, 70.0, -20.0]
+    ]
+    trends = controller.get_score_trends(["model"], "D")
+    assert trends["avg_score"].tolist() == [90.0, 70.0]
+    result_analytics.clear()
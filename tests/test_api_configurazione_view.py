@@ -56,6 +56,9 @@ def test_start_new_preset_edit_initializes_session_state(monkeypatch, view):
         "model": DEFAULT_MODEL,
         "temperature": 0.0,
         "max_tokens": 1000,
+        "max_concurrency": 4,
+        "requests_per_minute": 0,
+        "tokens_per_minute": 0,
     }
 
 
@@ -84,6 +87,9 @@ def test_start_existing_preset_edit_initializes_session_state(monkeypatch, mocke
         "model": "m",
         "temperature": 0.2,
         "max_tokens": 200,
+        "max_concurrency": 4,
+        "requests_per_minute": 0,
+        "tokens_per_minute": 0,
     }
     assert dummy.errors == []
 
@@ -37,9 +37,7 @@ def test_save_preset_new(mocker):
     )
     mock_load = mocker.patch("controllers.api_preset_controller.load_presets")
     mock_save = mocker.patch("controllers.api_preset_controller.APIPreset.save")
-    mock_refresh = mocker.patch(
-        "controllers.api_preset_controller.refresh_api_presets"
-    )
+    mock_cache = mocker.patch("controllers.api_preset_controller._get_api_presets")
 
     df = pd.DataFrame(
         [
@@ -54,9 +52,8 @@ def test_save_preset_new(mocker):
             }
         ]
     )
-    mock_load.return_value = df
     updated_df = pd.DataFrame([])
-    mock_refresh.return_value = updated_df
+    mock_load.side_effect = [df, df, updated_df]
 
     ok, msg, returned_df = controller.save_preset(
         {
@@ -76,14 +73,14 @@ def test_save_preset_new(mocker):
     saved_presets = mock_save.call_args[0][0]
     assert any(p.id == "new-id" for p in saved_presets)
     assert any(p.name == "New" for p in saved_presets)
+    upserted = mock_cache.upsert.call_args[0][0]
+    assert [r["id"] for r in upserted] == ["new-id"]
 
 
 def test_delete_preset(mocker):
     mock_load = mocker.patch("controllers.api_preset_controller.load_presets")
     mock_delete = mocker.patch("controllers.api_preset_controller.APIPreset.delete")
-    mock_refresh = mocker.patch(
-        "controllers.api_preset_controller.refresh_api_presets"
-    )
+    mock_cache = mocker.patch("controllers.api_preset_controller._get_api_presets")
 
     df = pd.DataFrame(
         [
@@ -98,15 +95,15 @@ def test_delete_preset(mocker):
             }
         ]
     )
-    mock_load.return_value = df
     updated_df = pd.DataFrame([])
-    mock_refresh.return_value = updated_df
+    mock_load.side_effect = [df, updated_df]
 
     ok, msg, returned_df = controller.delete_preset("1")
     assert ok is True
     assert "eliminato" in msg
     assert returned_df is updated_df
     mock_delete.assert_called_once_with("1")
+    mock_cache.delete.assert_called_once_with(["1"], base_version=mock_cache.version)
 
 
 def test_test_api_connection_delegates(mocker):
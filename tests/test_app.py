@@ -52,6 +52,7 @@ def test_app_page_config_and_navigation(monkeypatch):
         "gestione_set",
         "home",
         "visualizza_risultati",
+        "analisi_risultati",
     ]
     for name in view_names:
         mod = types.ModuleType(f"views.{name}")
@@ -66,6 +67,7 @@ def test_app_page_config_and_navigation(monkeypatch):
         "Gestione Set di Domande": views_pkg.gestione_set.render,
         "Esecuzione Test": views_pkg.esecuzione_test.render,
         "Visualizzazione Risultati": views_pkg.visualizza_risultati.render,
+        "Analisi Risultati": views_pkg.analisi_risultati.render,
     }
 
     session_state_mod = types.ModuleType("views.session_state")
@@ -92,6 +94,7 @@ def test_app_page_config_and_navigation(monkeypatch):
         "Gestione Set di Domande",
         "Esecuzione Test",
         "Visualizzazione Risultati",
+        "Analisi Risultati",
     ]
     assert radio_call["options"] == expected_pages
 
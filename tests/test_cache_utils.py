@@ -13,6 +13,7 @@ from utils.cache import (  # noqa: E402
     refresh_api_presets,
     get_results,
     refresh_results,
+    VersionedFrameCache,
 )
 from models.question import Question  # noqa: E402
 from models.question_set import QuestionSet  # noqa: E402
@@ -168,3 +169,110 @@ def test_get_and_refresh_results(monkeypatch):
 
     assert refresh_results().equals(df2)
     assert refresh_called["count"] == 1
+
+
+def _versioned_cache(rows):
+    calls = {"count": 0}
+
+    def loader():
+        calls["count"] += 1
+        return [dict(r) for r in rows]
+
+    return VersionedFrameCache(loader, ["id", "name", "tags"]), calls
+
+
+def test_versioned_cache_applies_deltas_without_reloading():
+    cache, calls = _versioned_cache([{"id": "1", "name": "a", "tags": []}])
+    before = cache()
+    version = cache.version
+
+    cache.upsert([{"id": "2", "name": "b", "tags": ["x"]}], base_version=version)
+    cache.upsert([{"id": "1", "tags": ["y", "z"]}], base_version=cache.version)
+    cache.delete(["2"], base_version=cache.version)
+    cache.upsert([{"id": "3", "name": "c", "tags": []}], base_version=cache.version)
+
+    df = cache()
+    assert calls["count"] == 1
+    assert cache.version == version + 4
+    assert df["id"].tolist() == ["1", "3"]
+    assert df.loc[0, "name"] == "a"
+    assert df.loc[0, "tags"] == ["y", "z"]
+    # I DataFrame già restituiti non vengono modificati
+    assert before["id"].tolist() == ["1"]
+    assert before.loc[0, "tags"] == []
+
+
+def test_versioned_cache_reloads_on_version_mismatch():
+    cache, calls = _versioned_cache([{"id": "1", "name": "a", "tags": []}])
+    cache()
+    stale = cache.version
+    cache.upsert([{"id": "1", "name": "b"}])
+
+    cache.delete(["1"], base_version=stale)
+
+    assert not cache.loaded
+    assert cache()["name"].tolist() == ["a"]
+    assert calls["count"] == 2
+
+
+def test_versioned_cache_reloads_on_incomplete_insert():
+    cache, calls = _versioned_cache([])
+    cache()
+
+    cache.upsert([{"id": "9", "name": "partial"}])
+
+    assert not cache.loaded
+    cache()
+    assert calls["count"] == 2
+
+
+def test_versioned_cache_ignores_deltas_when_not_loaded():
+    cache, calls = _versioned_cache([{"id": "1", "name": "a", "tags": []}])
+    cache.upsert([{"id": "2", "name": "b", "tags": []}])
+    cache.delete(["1"])
+
+    assert calls["count"] == 0
+    assert cache()["id"].tolist() == ["1"]
+
+
+def test_versioned_cache_notifies_listeners():
+    from utils.search_index import InvertedIndex
+
+    cache, _ = _versioned_cache([{"id": "1", "name": "alpha", "tags": []}])
+    index = InvertedIndex({"name": 1.0})
+    cache.add_listener(index)
+    cache.with_frame(lambda df: index.ensure_built(lambda: df.to_dict(orient="records")))
+
+    cache.upsert([{"id": "2", "name": "beta", "tags": []}])
+    cache.upsert([{"id": "1", "name": "gamma"}])
+    assert [doc for doc, _ in index.search("beta")] == ["2"]
+    assert [doc for doc, _ in index.search("gamma")] == ["1"]
+    assert index.search("alpha") == []
+
+    cache.delete(["2"])
+    assert index.search("beta") == []
+
+    cache.cache_clear()
+    assert not index.built
+
+
+def test_category_index_follows_cache_deltas(in_memory_db):
+    from controllers import question_controller, question_set_controller
+    from utils.cache import get_category_index
+
+    get_questions.cache_clear()
+    get_question_sets.cache_clear()
+    qid = question_controller.add_question("d1", "r1", "Storia")
+    set_id = question_set_controller.create_set("s", [qid])
+
+    index = get_category_index()
+    assert index.sets_with_categories(["Storia"]) == {set_id}
+
+    question_controller.update_question(qid, categoria="Arte")
+    assert index.sets_with_categories(["Arte"]) == {set_id}
+    assert index.categories() == ["Arte"]
+
+    question_set_controller.delete_set(set_id)
+    assert index.sets_with_categories(["Arte"]) == set()
+    get_questions.cache_clear()
+    get_question_sets.cache_clear()
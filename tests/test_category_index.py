@@ -0,0 +1,68 @@
+from utils.category_index import CategoryIndex
+
+
+def _index():
+    index = CategoryIndex()
+    index.rebuild(
+        [
+            {"id": "1", "domanda": "d1", "categoria": "A"},
+            {"id": "2", "domanda": "d2", "categoria": "B"},
+            {"id": "3", "domanda": "d3", "categoria": None},
+        ],
+        [
+            {"id": "s1", "questions": ["1", "2"]},
+            {"id": "s2", "questions": ["2", "3"]},
+            {"id": "s3", "questions": ["missing"]},
+        ],
+    )
+    return index
+
+
+def test_rebuild_and_queries():
+    index = _index()
+
+    assert index.categories() == ["A", "B", "N/A"]
+    assert index.questions_in_category("B") == {"2"}
+    assert index.set_categories("s1") == {"A", "B"}
+    assert index.sets_with_categories(["B"]) == {"s1", "s2"}
+    assert index.sets_with_categories(["A", "B"]) == {"s1"}
+    assert index.sets_with_categories(["N/A"]) == {"s2", "s3"}
+    assert index.sets_with_categories(["Z"]) == set()
+    assert index.sets_with_categories([]) == {"s1", "s2", "s3"}
+    assert index.questions_detail("s3") == [
+        {"id": "missing", "domanda": "", "categoria": "N/A"}
+    ]
+
+
+def test_question_changes_propagate_to_sets():
+    index = _index()
+    assert index.questions_detail("s1")[1]["categoria"] == "B"
+
+    index.questions_listener.upsert([{"id": "2", "domanda": "nuova", "categoria": "C"}])
+    assert index.categories() == ["A", "C", "N/A"]
+    assert index.sets_with_categories(["C"]) == {"s1", "s2"}
+    assert index.sets_with_categories(["B"]) == set()
+    assert index.questions_detail("s1")[1] == {"id": "2", "domanda": "nuova", "categoria": "C"}
+
+    index.questions_listener.upsert([{"id": "missing", "domanda": "x", "categoria": "A"}])
+    assert index.sets_with_categories(["A"]) == {"s1", "s3"}
+
+    index.questions_listener.remove(["1"])
+    assert index.set_categories("s1") == {"C", "N/A"}
+
+
+def test_set_changes_and_clear():
+    index = _index()
+
+    index.sets_listener.upsert([{"id": "s2", "questions": ["1"]}])
+    index.sets_listener.upsert([{"id": "s4", "questions": []}])
+    assert index.sets_with_categories(["A"]) == {"s1", "s2"}
+    assert index.set_categories("s4") == set()
+
+    index.sets_listener.remove(["s1"])
+    assert index.sets_with_categories(["A"]) == {"s2"}
+
+    index.sets_listener.clear()
+    assert not index.built
+    index.sets_listener.upsert([{"id": "s9", "questions": ["1"]}])
+    assert index.sets_with_categories([]) == set()
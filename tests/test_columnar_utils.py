@@ -0,0 +1,75 @@
+import io
+
+import pandas as pd
+import pytest
+
+from utils.columnar_utils import columnar_format, iter_columnar_rows, write_columnar
+
+
+def test_columnar_format_from_extension():
+    assert columnar_format("dati.parquet") == "parquet"
+    assert columnar_format("dati.ARROW") == "arrow"
+    assert columnar_format("dati.feather") == "arrow"
+    assert columnar_format("dati.json") is None
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_write_and_read_columnar_in_batches(fmt):
+    records = ({"id": str(i), "score": None if i == 0 else float(i)} for i in range(5))
+    buffer = io.BytesIO()
+    write_columnar(records, buffer, fmt, batch_size=2)
+    buffer.seek(0)
+
+    rows = list(iter_columnar_rows(buffer, fmt, batch_size=2))
+    assert rows[0] == {"id": "0", "score": None}
+    assert [r["score"] for r in rows[1:]] == [1.0, 2.0, 3.0, 4.0]
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_write_columnar_infers_types_of_initially_null_columns(fmt):
+    records = [
+        {"id": "0", "note": None, "score": 1},
+        {"id": "1", "note": None, "score": 2},
+        {"id": "2", "note": "testo", "score": 2.5},
+        {"id": "3", "note": None, "score": None},
+    ]
+    buffer = io.BytesIO()
+    write_columnar(iter(records), buffer, fmt, batch_size=2)
+    buffer.seek(0)
+
+    assert list(iter_columnar_rows(buffer, fmt)) == [
+        {"id": "0", "note": None, "score": 1.0},
+        {"id": "1", "note": None, "score": 2.0},
+        {"id": "2", "note": "testo", "score": 2.5},
+        {"id": "3", "note": None, "score": None},
+    ]
+
+
+def test_write_columnar_stores_columns_null_in_the_sample_as_text(monkeypatch):
+    monkeypatch.setattr("utils.columnar_utils.COLUMNAR_SCHEMA_SAMPLE_ROWS", 2)
+    records = [{"id": "0", "note": None}, {"id": "1", "note": None}, {"id": "2", "note": 5}]
+    buffer = io.BytesIO()
+    write_columnar(iter(records), buffer, "parquet", batch_size=1)
+    buffer.seek(0)
+
+    assert [r["note"] for r in iter_columnar_rows(buffer, "parquet")] == [None, None, "5"]
+
+
+def test_write_columnar_wraps_arrow_errors():
+    records = [{"a": 1}, {"a": {"nested": 1}}]
+    with pytest.raises(ValueError, match="parquet"):
+        write_columnar(iter(records), io.BytesIO(), "parquet", batch_size=1)
+
+
+def test_write_dataset_parquet_path(tmp_path):
+    from utils.file_writer_utils import write_dataset
+
+    path = tmp_path / "out.parquet"
+    write_dataset(pd.DataFrame([{"a": 1, "b": "x"}]), path)
+    loaded = pd.read_parquet(path)
+    assert loaded["a"].tolist() == [1]
+
+
+def test_iter_columnar_rows_invalid_file():
+    with pytest.raises(ValueError):
+        list(iter_columnar_rows(io.BytesIO(b"non parquet"), "parquet"))
@@ -25,6 +25,7 @@ def esecuzione_test(monkeypatch):
         "load_sets",
         lambda: pd.DataFrame([{"id": 1, "name": "s", "questions": [1]}]),
     )
+    monkeypatch.setattr(controllers, "list_incomplete_runs", lambda: [])
 
     import streamlit as st
 
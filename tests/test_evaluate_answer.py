@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 import os
@@ -9,7 +10,11 @@ from utils.openai_client import ClientCreationError
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from controllers.test_controller import evaluate_answer  # noqa: E402
+from controllers.test_controller import (  # noqa: E402
+    evaluate_answer,
+    evaluate_answer_async,
+    evaluate_answers_batch,
+)
 
 
 def _mock_response(mocker, content: str):
@@ -89,3 +94,184 @@ def test_evaluate_answer_no_choices(mocker, caplog):
             )
 
     assert "choices" in caplog.text
+
+
+def test_evaluate_answer_async_success(mocker):
+    mock_get_client = mocker.patch("utils.openai_client.get_async_openai_client")
+    mock_client = mocker.Mock()
+    evaluation = {
+        "score": 80,
+        "explanation": "ok",
+        "similarity": 80,
+        "correctness": 80,
+        "completeness": 80,
+    }
+    mock_client.chat.completions.create = mocker.AsyncMock(
+        return_value=_mock_response(mocker, json.dumps(evaluation))
+    )
+    mock_get_client.return_value = mock_client
+
+    result = asyncio.run(
+        evaluate_answer_async("q", "expected", "actual", {"api_key": "key"})
+    )
+
+    assert result == evaluation
+
+
+def test_evaluate_answer_async_json_decode_error(mocker):
+    mock_get_client = mocker.patch("utils.openai_client.get_async_openai_client")
+    mock_client = mocker.Mock()
+    mock_client.chat.completions.create = mocker.AsyncMock(
+        return_value=_mock_response(mocker, "not json")
+    )
+    mock_get_client.return_value = mock_client
+
+    with pytest.raises(ValueError):
+        asyncio.run(
+            evaluate_answer_async("q", "expected", "actual", {"api_key": "key"})
+        )
+
+
+def test_evaluate_answer_returns_cached_evaluation(mocker):
+    mock_get_client = mocker.patch("utils.openai_client.get_openai_client")
+    mock_client = mock_get_client.return_value
+    evaluation = {
+        "score": 75,
+        "explanation": "cached",
+        "similarity": 75,
+        "correctness": 75,
+        "completeness": 75,
+    }
+    mocker.patch(
+        "controllers.test_controller.ResponseCache.get",
+        return_value=json.dumps(evaluation),
+    )
+
+    result = evaluate_answer(
+        "q", "expected", "actual", {"api_key": "key"}, use_cache=True
+    )
+
+    assert result == evaluation
+    mock_client.chat.completions.create.assert_not_called()
+
+
+def test_evaluate_answer_async_stores_evaluation(mocker):
+    mock_get_client = mocker.patch("utils.openai_client.get_async_openai_client")
+    mock_client = mocker.Mock()
+    evaluation = {
+        "score": 80,
+        "explanation": "ok",
+        "similarity": 80,
+        "correctness": 80,
+        "completeness": 80,
+    }
+    mock_client.chat.completions.create = mocker.AsyncMock(
+        return_value=_mock_response(mocker, json.dumps(evaluation))
+    )
+    mock_get_client.return_value = mock_client
+    mocker.patch("controllers.test_controller.ResponseCache.get", return_value=None)
+    mock_put = mocker.patch("controllers.test_controller.ResponseCache.put")
+
+    asyncio.run(
+        evaluate_answer_async(
+            "q", "expected", "actual", {"api_key": "key"}, use_cache=True
+        )
+    )
+
+    assert json.loads(mock_put.call_args.args[3]) == evaluation
+
+
+def _evaluation(score):
+    return {
+        "score": score,
+        "explanation": "ok",
+        "similarity": score,
+        "correctness": score,
+        "completeness": score,
+    }
+
+
+def test_evaluate_answers_batch_uses_single_request(mocker):
+    mock_get_client = mocker.patch("utils.openai_client.get_openai_client")
+    mock_client = mock_get_client.return_value
+    payload = {
+        "evaluations": [
+            {"id": 1, **_evaluation(40)},
+            {"id": 0, **_evaluation(90)},
+        ]
+    }
+    mock_client.chat.completions.create.return_value = _mock_response(
+        mocker, json.dumps(payload)
+    )
+
+    result = evaluate_answers_batch(
+        [("q1", "e1", "a1"), ("q2", "e2", "a2")], {"api_key": "key", "max_tokens": 100}
+    )
+
+    assert [r["score"] for r in result] == [90, 40]
+    assert "id" not in result[0]
+    mock_client.chat.completions.create.assert_called_once()
+    request = mock_client.chat.completions.create.call_args.kwargs
+    assert request["max_tokens"] == 200
+    assert request["response_format"] == {"type": "json_object"}
+    assert "q1" in request["messages"][0]["content"]
+
+
+def test_evaluate_answers_batch_splits_requests_over_output_limit(mocker):
+    mock_get_client = mocker.patch("utils.openai_client.get_openai_client")
+    mock_client = mock_get_client.return_value
+
+    def respond(**request):
+        count = request["messages"][0]["content"].count('"domanda"')
+        payload = {"evaluations": [{"id": i, **_evaluation(50)} for i in range(count)]}
+        return _mock_response(mocker, json.dumps(payload))
+
+    mock_client.chat.completions.create.side_effect = respond
+    triples = [(f"q{i}", "e", "a") for i in range(20)]
+
+    result = evaluate_answers_batch(triples, {"api_key": "key", "max_tokens": 1000})
+
+    assert len(result) == 20
+    budgets = [c.kwargs["max_tokens"] for c in mock_client.chat.completions.create.call_args_list]
+    assert budgets == [13 * 300, 7 * 300]
+
+
+def test_evaluate_answers_batch_falls_back_for_invalid_items(mocker):
+    mock_get_client = mocker.patch("utils.openai_client.get_openai_client")
+    mock_client = mock_get_client.return_value
+    batch_payload = {
+        "evaluations": [
+            {"id": 0, **_evaluation(70)},
+            {"id": 1, "score": "alto", "explanation": "?"},
+        ]
+    }
+    mock_client.chat.completions.create.side_effect = [
+        _mock_response(mocker, json.dumps(batch_payload)),
+        _mock_response(mocker, json.dumps(_evaluation(30))),
+    ]
+
+    result = evaluate_answers_batch(
+        [("q1", "e1", "a1"), ("q2", "e2", "a2")], {"api_key": "key"}
+    )
+
+    assert [r["score"] for r in result] == [70, 30]
+    assert mock_client.chat.completions.create.call_count == 2
+    fallback_prompt = mock_client.chat.completions.create.call_args.kwargs["messages"][0]["content"]
+    assert "q2" in fallback_prompt and "q1" not in fallback_prompt
+
+
+def test_evaluate_answers_batch_falls_back_on_malformed_json(mocker):
+    mock_get_client = mocker.patch("utils.openai_client.get_openai_client")
+    mock_client = mock_get_client.return_value
+    mock_client.chat.completions.create.side_effect = [
+        _mock_response(mocker, "non json"),
+        _mock_response(mocker, json.dumps(_evaluation(10))),
+        _mock_response(mocker, json.dumps(_evaluation(20))),
+    ]
+
+    result = evaluate_answers_batch(
+        [("q1", "e1", "a1"), ("q2", "e2", "a2")], {"api_key": "key"}
+    )
+
+    assert [r["score"] for r in result] == [10, 20]
+    assert mock_client.chat.completions.create.call_count == 3
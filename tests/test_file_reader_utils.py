@@ -4,6 +4,7 @@ import pytest
 
 from utils.file_reader_utils import (
     read_questions,
+    iter_question_chunks,
     read_question_sets,
     read_test_results,
     filter_new_rows,
@@ -88,3 +89,94 @@ def test_filter_new_rows_duplicates():
     filtered, count = filter_new_rows(df, ["b", "d"])
     assert list(filtered["id"]) == ["a", "c"]
     assert count == 2
+
+
+def test_iter_question_chunks_csv_in_blocks(tmp_path):
+    file = tmp_path / "questions.csv"
+    rows = "".join(f"q{i},a{i}\n" for i in range(5))
+    file.write_text("domanda,risposta_attesa\n" + rows)
+    with file.open("r") as f:
+        chunks = list(iter_question_chunks(f, chunk_size=2))
+    assert [len(c) for c in chunks] == [2, 2, 1]
+    assert list(chunks[0].columns) == ["id", "domanda", "risposta_attesa", "categoria"]
+    assert chunks[2].iloc[0]["domanda"] == "q4"
+
+
+def test_iter_question_chunks_json_streams_small_blocks(tmp_path, monkeypatch):
+    import io
+    import utils.file_reader_utils as reader
+
+    monkeypatch.setattr(reader, "JSON_BLOCK_SIZE", 7)
+    content = {
+        "meta": {"source": "test", "n": [1, 2]},
+        "questions": [
+            {"id": 12345, "question": "Città?", "expected_answer": "Roma"},
+            {"id": "b", "question": "d2", "expected_answer": "r2", "categoria": "c"},
+            {"id": "c", "domanda": "d3", "risposta_attesa": "r3"},
+        ],
+    }
+    data = io.BytesIO(json.dumps(content, ensure_ascii=False).encode("utf-8"))
+    data.name = "questions.json"
+    chunks = list(reader.iter_question_chunks(data, chunk_size=2))
+    df = pd.concat(chunks, ignore_index=True)
+    assert [len(c) for c in chunks] == [2, 1]
+    assert df["id"].tolist() == ["12345", "b", "c"]
+    assert df.iloc[0]["domanda"] == "Città?"
+    assert df.iloc[0]["risposta_attesa"] == "Roma"
+
+
+def test_read_questions_jsonl(tmp_path):
+    file = tmp_path / "questions.jsonl"
+    file.write_text(
+        '{"domanda": "q1", "risposta_attesa": "a1"}\n\n'
+        '{"domanda": "q2", "risposta_attesa": "a2", "categoria": "c"}\n'
+    )
+    with file.open("r") as f:
+        df = read_questions(f)
+    assert df["domanda"].tolist() == ["q1", "q2"]
+    assert df["categoria"].tolist() == ["", "c"]
+
+
+@pytest.mark.parametrize(
+    "name,content",
+    [
+        ("bad.json", '[{"domanda": "q1", "risposta_attesa": "a1"},'),
+        ("bad.json", '{"other": []}'),
+        ("empty.json", "[]"),
+        ("bad.jsonl", '{"domanda": "q1"\n'),
+    ],
+)
+def test_iter_question_chunks_invalid_json(tmp_path, name, content):
+    file = tmp_path / name
+    file.write_text(content)
+    with file.open("r") as f:
+        with pytest.raises(ValueError):
+            list(iter_question_chunks(f))
+
+
+def test_read_question_sets_jsonl(tmp_path):
+    file = tmp_path / "sets.jsonl"
+    file.write_text(
+        '{"name": "S1", "questions": [{"id": "1"}]}\n'
+        '{"name": "S2", "questions": []}\n'
+    )
+    with file.open("r") as f:
+        sets = read_question_sets(f)
+    assert [s["name"] for s in sets] == ["S1", "S2"]
+
+
+def test_iter_test_result_chunks_jsonl(tmp_path):
+    from utils.file_reader_utils import iter_test_result_chunks
+
+    file = tmp_path / "results.jsonl"
+    file.write_text(
+        "".join(
+            json.dumps({"id": str(i), "set_id": "s", "results": {"n": i}}) + "\n"
+            for i in range(5)
+        )
+    )
+    with file.open("rb") as f:
+        chunks = list(iter_test_result_chunks(f, chunk_size=2))
+    assert [len(c) for c in chunks] == [2, 2, 1]
+    assert chunks[2].iloc[0]["results"] == {"n": 4}
+    assert list(chunks[0].columns) == ["id", "set_id", "timestamp", "results"]
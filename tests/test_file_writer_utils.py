@@ -1,6 +1,8 @@
+import io
 import json
 import os
 import pandas as pd
+import pytest
 from utils.file_writer_utils import write_dataset
 
 
@@ -20,3 +22,68 @@ def test_write_dataset_json(tmp_path):
     with open(path, "r", encoding="utf-8") as f:
         loaded = json.load(f)
     assert loaded[1]["a"] == 2
+
+
+def test_write_dataset_json_streams_generator(tmp_path):
+    path = tmp_path / "out.json"
+    write_dataset(({"a": i, "t": "è\n"} for i in range(3)), path)
+    text = path.read_text(encoding="utf-8")
+    assert json.loads(text) == [{"a": i, "t": "è\n"} for i in range(3)]
+    assert text == json.dumps(json.loads(text), ensure_ascii=False, indent=2)
+
+
+def test_write_dataset_jsonl_roundtrip_and_append(tmp_path):
+    from utils.file_reader_utils import read_test_results
+
+    path = tmp_path / "results.jsonl"
+    df = pd.DataFrame([
+        {"id": "1", "set_id": "s", "timestamp": "t", "results": {"avg_score": 50}},
+    ])
+    write_dataset(df, path)
+    write_dataset([{"id": "2", "set_id": "s", "timestamp": "t", "results": {}}], path, append=True)
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["id"] for line in lines] == ["1", "2"]
+    with open(path, "r", encoding="utf-8") as f:
+        loaded = read_test_results(f)
+    assert loaded["id"].tolist() == ["1", "2"]
+    assert loaded.iloc[0]["results"] == {"avg_score": 50}
+
+
+def test_write_dataset_append_requires_jsonl(tmp_path):
+    import pytest
+
+    with pytest.raises(ValueError):
+        write_dataset([{"a": 1}], tmp_path / "out.json", append=True)
+    assert not os.path.exists(tmp_path / "out.json")
+
+
+def test_iter_serialized_csv_from_generator_in_chunks(monkeypatch):
+    import io
+    import utils.file_writer_utils as writer
+
+    monkeypatch.setattr(writer, "WRITE_CHUNK_SIZE", 2)
+    pieces = list(writer.iter_serialized(({"a": i} for i in range(5)), "csv"))
+    assert len(pieces) == 3
+    assert pd.read_csv(io.StringIO("".join(pieces)))["a"].tolist() == [0, 1, 2, 3, 4]
+
+    spooled = writer.spool_dataset([{"a": 1}], "jsonl")
+    assert spooled.read() == b'{"a": 1}\n'
+
+
+@pytest.mark.parametrize("fmt", ["json", "jsonl", "csv", "parquet", "arrow"])
+@pytest.mark.parametrize("max_size", [1, 10 * 1024 * 1024])
+def test_spool_dataset_is_accepted_by_streamlit_download(fmt, max_size):
+    from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+    import utils.file_writer_utils as writer
+
+    spooled = writer.spool_dataset([{"a": 1}, {"a": 2}], fmt, max_size=max_size)
+    data, _ = convert_data_to_bytes_and_infer_mime(spooled, RuntimeError("unsupported"))
+    spooled.close()
+
+    if fmt == "jsonl":
+        assert data == b'{"a": 1}\n{"a": 2}\n'
+    elif fmt == "parquet":
+        assert pd.read_parquet(io.BytesIO(data))["a"].tolist() == [1, 2]
+    else:
+        assert data
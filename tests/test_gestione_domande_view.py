@@ -1,3 +1,4 @@
+import io
 import os
 import sys
 import importlib
@@ -16,6 +17,17 @@ def gestione_domande(monkeypatch):
     from pathlib import Path
 
     monkeypatch.setattr(controllers, "load_questions", lambda: pd.DataFrame())
+    monkeypatch.setattr(controllers, "get_question_categories", lambda: [])
+    monkeypatch.setattr(
+        controllers,
+        "get_questions_page",
+        lambda *args, **kwargs: {
+            "questions_df": pd.DataFrame(),
+            "total": 0,
+            "page": 1,
+            "page_count": 1,
+        },
+    )
 
     base_path = Path(__file__).resolve().parents[1] / "views"
     style_spec = importlib.util.spec_from_file_location("views.style_utils", base_path / "style_utils.py")
@@ -65,6 +77,11 @@ class DummySt:
     def success(self, *args, **kwargs):
         pass
 
+    def progress(self, value, text=None):
+        self.progress_values = getattr(self, "progress_values", [])
+        self.progress_values.append((value, text))
+        return self
+
     def button(self, *args, **kwargs):
         if self.button_returns:
             return self.button_returns.pop(0)
@@ -125,10 +142,14 @@ def test_create_save_question_callback_failure(monkeypatch, gestione_domande):
 
 def test_import_questions_callback_success(monkeypatch, gestione_domande):
     dummy_st = _setup(monkeypatch, gestione_domande)
-    dummy_st.session_state.uploaded_file_content = object()
+    uploaded = io.BytesIO(b"x" * 10)
+    uploaded.size = 10
+    dummy_st.session_state.uploaded_file_content = uploaded
     questions_df = pd.DataFrame({"id": [1]})
 
-    def fake_import_questions_action(_file):
+    def fake_import_questions_action(_file, progress=None):
+        _file.seek(5)
+        progress(3, 2)
         return {"questions_df": questions_df, "imported_count": 2, "warnings": []}
 
     monkeypatch.setattr(
@@ -143,13 +164,15 @@ def test_import_questions_callback_success(monkeypatch, gestione_domande):
     assert dummy_st.session_state.upload_questions_file is None
     assert "upload_questions_file" not in dummy_st.session_state
     assert isinstance(dummy_st.session_state.questions, pd.DataFrame)
+    assert dummy_st.progress_values[-1][0] == 0.5
+    assert "3 righe" in dummy_st.progress_values[-1][1]
 
 
 def test_import_questions_callback_error(monkeypatch, gestione_domande):
     dummy_st = _setup(monkeypatch, gestione_domande)
     dummy_st.session_state.uploaded_file_content = object()
 
-    def fake_import_questions_action(_file):
+    def fake_import_questions_action(_file, progress=None):
         raise Exception("bad")
 
     monkeypatch.setattr(
@@ -204,3 +227,14 @@ def test_confirm_delete_question_dialog_error(monkeypatch, gestione_domande):
     assert state.save_error_message == "fail"
     assert dummy_st.rerun_called is True
 
+
+
+def test_change_questions_page(monkeypatch, gestione_domande):
+    dummy_st = _setup(monkeypatch, gestione_domande)
+    dummy_st.session_state.questions_page = 2
+
+    gestione_domande.change_questions_page(1)
+    assert dummy_st.session_state.questions_page == 3
+
+    gestione_domande.change_questions_page(-1)
+    assert dummy_st.session_state.questions_page == 2
@@ -12,21 +12,48 @@ from models.test_result import TestResult, test_result_importer
 data_dir = os.path.join(os.path.dirname(__file__), "sample_data")
 
 
-@pytest.mark.parametrize("filename", ["test_results.csv", "test_results.json"])
-def test_import_from_file_skips_duplicates_and_saves(mocker, filename):
-    mock_load = mocker.patch("models.test_result.TestResult.load_all_df")
+@pytest.mark.parametrize(
+    "filename", ["test_results.csv", "test_results.json", "test_results.jsonl"]
+)
+def test_import_from_file_skips_duplicates_and_saves(mocker, in_memory_db, filename):
     mock_save = mocker.patch("models.test_result.TestResult.save")
     mock_refresh = mocker.patch("models.test_result.TestResult.refresh_cache")
-    mock_load.return_value = pd.DataFrame(
-        [{"id": "1", "set_id": "s1", "timestamp": "t0", "results": {}}]
+    TestResult.insert_new(
+        [TestResult(id="1", set_id="s1", timestamp="t0", results={"keep": True})]
     )
     with open(os.path.join(data_dir, filename), "r", encoding="utf-8") as f:
         result = test_result_importer.import_from_file(f)
 
     assert result["success"] is True
     assert result["message"] == "Importati 1 risultati."
-    mock_save.assert_called_once()
-    saved = mock_save.call_args[0][0]
-    assert {r.id for r in saved} == {"1", "2"}
+    mock_save.assert_not_called()
     mock_refresh.assert_called_once()
+    stored = {r.id: r for r in TestResult.load_all()}
+    assert set(stored) == {"1", "2"}
+    assert stored["1"].results == {"keep": True}
 
+
+def test_insert_new_is_append_only_and_chunked(in_memory_db):
+    TestResult.insert_new(
+        [TestResult(id="a", set_id="s", timestamp="t", results={"v": 1})]
+    )
+    incoming = [
+        TestResult(
+            id=str(i),
+            set_id="s",
+            timestamp="t",
+            results={"questions": {"q": {"evaluation": {"score": i}}}},
+        )
+        for i in range(7)
+    ]
+    incoming.append(TestResult(id="a", set_id="s", timestamp="t", results={"v": 2}))
+    incoming.append(TestResult(id="0", set_id="s", timestamp="t", results={}))
+
+    added = TestResult.insert_new(incoming, chunk_size=3)
+
+    assert added == 7
+    stored = {r.id: r for r in TestResult.load_all()}
+    assert len(stored) == 8
+    assert stored["a"].results == {"v": 1}
+    assert TestResult.question_averages().loc[0, "runs"] == 7
+    assert TestResult.insert_new(incoming, chunk_size=3) == 0
@@ -1,4 +1,6 @@
 import pandas as pd
+import pytest
+
 from models.question import Question, question_importer
 from models.question_set import QuestionSet, question_set_importer
 from models.test_result import TestResult, test_result_importer
@@ -42,3 +44,93 @@ def test_test_result_gather_data(mocker):
     )
     result = test_result_importer.gather_data()
     assert result.equals(df)
+
+
+def test_test_result_export_streams_from_database(in_memory_db, mocker):
+    import json
+
+    TestResult.insert_new([
+        TestResult(id=str(i), set_id="s", timestamp="t", results={"avg_score": i})
+        for i in range(5)
+    ])
+    mock_load = mocker.patch("models.test_result.TestResult.load_all_df")
+
+    lines = test_result_importer.export_to_buffer("jsonl").read().decode("utf-8").splitlines()
+    assert sorted(json.loads(line)["id"] for line in lines) == ["0", "1", "2", "3", "4"]
+
+    exported = json.loads(test_result_importer.export_to_buffer("json").read())
+    assert {r["id"]: r["results"]["avg_score"] for r in exported} == {str(i): i for i in range(5)}
+    assert list(TestResult.iter_all(batch_size=2))[0].keys() == {"id", "set_id", "timestamp", "results"}
+    mock_load.assert_not_called()
+
+
+def test_test_result_parquet_and_arrow_roundtrip(in_memory_db, mocker):
+    import io
+
+    from models.database import DatabaseEngine
+    from models.orm_models import TestResultItemORM as ItemORM, TestResultORM as ResultORM
+    from sqlalchemy import delete
+
+    questions = {
+        "q1": {
+            "question": "Q1", "expected_answer": "E1", "actual_answer": "A1",
+            "evaluation": {"score": 80.0, "explanation": "ok", "similarity": 70.0,
+                           "correctness": 90.0, "completeness": 60.0},
+            "latency": 1.5,
+        },
+        "q2": {
+            "question": "Q2", "expected_answer": "E2", "actual_answer": "A2",
+            "evaluation": {"score": 40.0, "explanation": "", "similarity": 30.0,
+                           "correctness": 50.0, "completeness": 20.0},
+        },
+    }
+    stats = TestResult.calculate_statistics(questions)
+    results = {
+        "set_name": "S", "timestamp": "2024-01-01", "avg_score": stats["avg_score"],
+        "sample_type": "Generata da LLM", "method": "LLM",
+        "generation_llm": "g", "evaluation_llm": "e", "questions": questions,
+        "per_question_scores": stats["per_question_scores"],
+        "radar_metrics": stats["radar_metrics"],
+    }
+    TestResult.insert_new([
+        TestResult(id="r1", set_id="s1", timestamp="2024-01-01", results=results),
+        TestResult(id="r2", set_id="s1", timestamp="2024-01-02", results={}),
+    ])
+    mocker.patch("models.test_result.TestResult.refresh_cache")
+
+    for fmt in ("parquet", "arrow"):
+        buffer = test_result_importer.export_to_buffer(fmt)
+        if fmt == "parquet":
+            df = pd.read_parquet(buffer)
+            assert len(df) == 3
+            assert df["score"].dtype == "float64"
+            assert df.loc[df["question_id"] == "q1", "latency"].item() == 1.5
+            buffer.seek(0)
+
+        with DatabaseEngine.instance().get_session() as session:
+            session.execute(delete(ItemORM))
+            session.execute(delete(ResultORM))
+            session.commit()
+        upload = io.BytesIO(buffer.read())
+        upload.name = f"results.{fmt}"
+        outcome = test_result_importer.import_from_file(upload)
+
+        assert outcome["imported_count"] == 2
+        stored = {r.id: r for r in TestResult.load_all()}
+        assert stored["r1"].results == results
+        assert stored["r2"].results == {}
+
+
+@pytest.mark.parametrize("fmt", ["json", "jsonl", "csv", "parquet", "arrow"])
+def test_export_results_file_is_accepted_by_streamlit_download(in_memory_db, fmt):
+    from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+    from controllers.test_controller import export_results_file
+
+    TestResult.insert_new([
+        TestResult(id="r1", set_id="s", timestamp="t", results={"avg_score": 1, "questions": {}})
+    ])
+
+    data, _ = convert_data_to_bytes_and_infer_mime(
+        export_results_file(fmt), RuntimeError("unsupported")
+    )
+    assert data
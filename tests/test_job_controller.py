@@ -0,0 +1,106 @@
+from controllers import job_controller
+from models.job import Job
+from models.test_run import TestRun
+from utils.job_queue import get_job_queue
+
+
+def _entry(score):
+    return {
+        "question": "Q",
+        "expected_answer": "A",
+        "actual_answer": "R",
+        "evaluation": {"score": score, "explanation": ""},
+    }
+
+
+def test_submit_test_run_reports_progress_and_results(mocker, shared_db):
+    def fake_run_test(set_id, set_name, question_ids, gen, ev, progress, **kwargs):
+        run = TestRun.create(set_id, set_name, question_ids, gen, ev)
+        progress(run.id, 0, 2)
+        TestRun.save_item(run.id, "2", _entry(40))
+        progress(run.id, 1, 2)
+        TestRun.save_item(run.id, "1", _entry(80))
+        progress(run.id, 2, 2)
+        return {"result_id": "rid", "run_id": run.id}
+
+    mocker.patch.object(job_controller, "run_test", side_effect=fake_run_test)
+
+    job_id = job_controller.submit_test_run(
+        "set1", "Set", ["1", "2"], {"name": "gen", "api_key": "secret"}, {"name": "eval"}
+    )
+    get_job_queue().wait(job_id, timeout=5)
+
+    status = job_controller.get_job_status(job_id)
+    assert status["status"] == "completed"
+    assert status["result_id"] == "rid"
+    assert (status["completed"], status["total"]) == (2, 2)
+    assert list(status["results"]) == ["1", "2"]
+    assert status["avg_score"] == 60
+    assert "secret" not in str(status["payload"])
+
+
+def test_failed_run_marks_job_failed(mocker, shared_db):
+    mocker.patch.object(job_controller, "run_test", return_value={})
+
+    job_id = job_controller.submit_test_run("set1", "Set", ["1"], {}, {})
+    get_job_queue().wait(job_id, timeout=5)
+
+    status = job_controller.get_job_status(job_id)
+    assert status["status"] == "failed"
+    assert status["error"]
+    assert status["results"] == {}
+
+
+def test_get_job_status_unknown_job(shared_db):
+    assert job_controller.get_job_status("missing") is None
+
+
+def test_submit_matrix_run_records_matrix_id(mocker, shared_db):
+    def fake_run_matrix(set_ids, gens, ev, progress, **kwargs):
+        progress(None, 3, 4)
+        return {"matrix_id": "mid", "result_ids": ["r1", "r2"], "summary": {}}
+
+    mocker.patch.object(job_controller, "run_matrix", side_effect=fake_run_matrix)
+
+    job_id = job_controller.submit_matrix_run(
+        ["s1"], [{"name": "a"}, {"name": "b", "api_key": "secret"}], {"name": "eval"}
+    )
+    get_job_queue().wait(job_id, timeout=5)
+
+    status = job_controller.get_job_status(job_id)
+    assert status["kind"] == "run_matrix"
+    assert status["status"] == "completed"
+    assert (status["completed"], status["total"]) == (3, 4)
+    assert status["payload"]["matrix_id"] == "mid"
+    assert status["payload"]["generation_presets"] == ["a", "b"]
+    assert "secret" not in str(status["payload"])
+
+
+def test_submit_runs_forward_async_mode(mocker, shared_db):
+    run_test = mocker.patch.object(job_controller, "run_test", return_value={"result_id": "rid"})
+    resume_test = mocker.patch.object(job_controller, "resume_test", return_value={"result_id": "rid"})
+
+    first = job_controller.submit_test_run("set1", "Set", ["1"], {}, {}, use_async=True)
+    second = job_controller.submit_resume_run("run1", {}, {}, use_async=True)
+    get_job_queue().wait(first, timeout=5)
+    get_job_queue().wait(second, timeout=5)
+
+    assert run_test.call_args.kwargs["use_async"] is True
+    assert resume_test.call_args.kwargs["use_async"] is True
+    assert job_controller.get_job_status(first)["payload"]["use_async"] is True
+
+
+def test_submit_resume_run_reserves_run_immediately(mocker, shared_db):
+    seen = []
+
+    def fake_resume(run_id, gen, ev, **kwargs):
+        seen.append(Job.active_run_ids())
+        return {"result_id": "rid", "run_id": run_id}
+
+    mocker.patch.object(job_controller, "resume_test", side_effect=fake_resume)
+
+    job_id = job_controller.submit_resume_run("run1", {}, {})
+    assert Job.get(job_id).run_id == "run1"
+    get_job_queue().wait(job_id, timeout=5)
+
+    assert seen == [["run1"]]
@@ -0,0 +1,78 @@
+import socket
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models.database import Base, DatabaseEngine
+from models.job import STATUS_COMPLETED, STATUS_FAILED, STATUS_RUNNING, Job
+from utils.job_queue import JobQueue, get_job_queue, reset_job_queue
+
+
+@pytest.fixture()
+def shared_db():
+    """Database in memoria condiviso tra i thread dei worker."""
+    DatabaseEngine.reset_instance()
+    db = DatabaseEngine.instance()
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(engine)
+    db._engine = engine  # type: ignore[attr-defined]
+    db._session_factory = sessionmaker(bind=engine)  # type: ignore[attr-defined]
+    yield db
+    reset_job_queue()
+    DatabaseEngine.reset_instance()
+
+
+def test_submit_runs_job_and_records_outcome(shared_db):
+    queue = JobQueue(max_workers=1)
+    seen = []
+
+    def work(job_id):
+        seen.append(Job.get(job_id).status)
+        Job.update(job_id, completed=1, total=1)
+        return {"result_id": "rid"}
+
+    job_id = queue.submit("demo", {"set": "s"}, work)
+    queue.wait(job_id, timeout=5)
+    queue.shutdown()
+
+    job = Job.get(job_id)
+    assert seen == [STATUS_RUNNING]
+    assert job.status == STATUS_COMPLETED
+    assert job.result_id == "rid"
+    assert job.progress == 1.0
+    assert job.owner == queue.owner
+    assert queue.pending() == 0
+
+
+def test_failed_job_records_error(shared_db):
+    queue = JobQueue(max_workers=1)
+
+    def work(job_id):
+        raise RuntimeError("boom")
+
+    job_id = queue.submit("demo", {}, work)
+    queue.wait(job_id, timeout=5)
+    queue.shutdown()
+
+    job = Job.get(job_id)
+    assert job.status == STATUS_FAILED
+    assert job.error == "boom"
+    assert not job.is_active
+
+
+def test_get_job_queue_fails_jobs_of_previous_processes(shared_db):
+    host = socket.gethostname()
+    stale = Job.create("demo", {}, owner=f"{host}:0")
+    other_host = Job.create("demo", {}, owner="altro-host:1")
+
+    queue = get_job_queue()
+
+    assert get_job_queue() is queue
+    assert Job.get(stale.id).status == STATUS_FAILED
+    assert Job.get(other_host.id).is_active
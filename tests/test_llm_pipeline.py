@@ -0,0 +1,156 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils.llm_pipeline import (  # noqa: E402
+    concurrency_slot,
+    get_max_concurrency,
+    run_batched_pipeline,
+    run_pipeline,
+    run_pipeline_async,
+)
+
+
+def test_get_max_concurrency_defaults_to_sequential():
+    assert get_max_concurrency({}) == 1
+    assert get_max_concurrency({"max_concurrency": None}) == 1
+    assert get_max_concurrency({"max_concurrency": "abc"}) == 1
+    assert get_max_concurrency({"max_concurrency": 0}) == 1
+    assert get_max_concurrency({"max_concurrency": 8}) == 8
+
+
+def test_run_pipeline_preserves_input_order():
+    def generate(item):
+        time.sleep(0.01 * (5 - item))
+        return item * 10
+
+    results = run_pipeline(
+        [1, 2, 3, 4],
+        generate,
+        lambda item, generated: (item, generated + 1),
+        generation_workers=4,
+        evaluation_workers=2,
+    )
+
+    assert results == [(1, 11), (2, 21), (3, 31), (4, 41)]
+
+
+def test_run_pipeline_overlaps_evaluation_with_generation():
+    first_evaluated = threading.Event()
+    overlapped = {"value": False}
+
+    def generate(item):
+        if item == 2:
+            # La seconda generazione attende che la prima valutazione sia partita
+            overlapped["value"] = first_evaluated.wait(timeout=2)
+        return item
+
+    def evaluate(item, generated):
+        if item == 1:
+            first_evaluated.set()
+        return generated
+
+    run_pipeline([1, 2], generate, evaluate)
+
+    assert overlapped["value"] is True
+
+
+def test_run_pipeline_calls_on_result_for_each_item():
+    seen = []
+    run_pipeline(
+        ["a", "b"],
+        lambda item: item.upper(),
+        lambda item, generated: generated,
+        on_result=lambda item, result: seen.append((item, result)),
+    )
+    assert sorted(seen) == [("a", "A"), ("b", "B")]
+
+
+def test_run_pipeline_propagates_errors():
+    def evaluate(item, generated):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        run_pipeline([1], lambda item: item, evaluate)
+
+
+def test_concurrency_slot_limits_in_flight_requests():
+    config = {"id": "preset-limit", "max_concurrency": 2}
+    lock = threading.Lock()
+    state = {"current": 0, "peak": 0}
+
+    def call(item):
+        with concurrency_slot(config):
+            with lock:
+                state["current"] += 1
+                state["peak"] = max(state["peak"], state["current"])
+            time.sleep(0.02)
+            with lock:
+                state["current"] -= 1
+        return item
+
+    run_pipeline(list(range(8)), call, lambda item, g: g, generation_workers=8)
+
+    assert state["peak"] == 2
+
+
+def test_run_batched_pipeline_groups_items_and_preserves_order():
+    batches = []
+
+    def evaluate_batch(batch):
+        batches.append([item for item, _ in batch])
+        return [generated + 1 for _, generated in batch]
+
+    seen = []
+    results = run_batched_pipeline(
+        [1, 2, 3, 4, 5],
+        lambda item: item * 10,
+        evaluate_batch,
+        batch_size=2,
+        generation_workers=3,
+        on_result=lambda item, result: seen.append(item),
+    )
+
+    assert results == [11, 21, 31, 41, 51]
+    assert sorted(len(b) for b in batches) == [1, 2, 2]
+    assert sorted(i for b in batches for i in b) == [1, 2, 3, 4, 5]
+    assert sorted(seen) == [1, 2, 3, 4, 5]
+
+
+def test_run_batched_pipeline_rejects_wrong_result_count():
+    with pytest.raises(ValueError):
+        run_batched_pipeline(
+            [1, 2],
+            lambda item: item,
+            lambda batch: [],
+            batch_size=2,
+        )
+
+
+def test_run_pipeline_async_runs_on_result_off_the_event_loop():
+    events = []
+
+    async def generate(item):
+        await asyncio.sleep(0.05 * item)
+        return item
+
+    async def evaluate(item, generated):
+        events.append(("evaluated", item))
+        return generated * 10
+
+    def on_result(item, result):
+        events.append(("saving", item))
+        time.sleep(0.2)
+        events.append(("saved", item))
+
+    results = asyncio.run(run_pipeline_async([0, 1], generate, evaluate, on_result))
+
+    assert results == [0, 10]
+    assert events.index(("evaluated", 1)) < events.index(("saved", 0))
+    assert events[-2:] == [("saving", 1), ("saved", 1)]
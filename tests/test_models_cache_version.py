@@ -0,0 +1,80 @@
+import pytest
+
+from models.cache_version import CacheVersion
+from utils.cache import VersionedFrameCache
+
+
+@pytest.fixture
+def versions(in_memory_db):
+    CacheVersion.reset()
+    yield CacheVersion
+    CacheVersion.reset()
+
+
+def test_bump_creates_and_increments(versions):
+    assert versions.bump("alpha") == 1
+    assert versions.bump("alpha") == 2
+    assert versions.load_all() == {"alpha": 2}
+
+
+def test_poll_invalidates_only_changed_caches(versions):
+    cleared = []
+    versions.subscribe("poll_a", lambda: cleared.append("a"))
+    versions.subscribe("poll_b", lambda: cleared.append("b"))
+
+    # La prima lettura fissa solo il riferimento
+    assert versions.poll(force=True) == []
+
+    # Modifica eseguita da un altro processo
+    versions.bump("poll_a")
+    assert versions.poll(force=True) == ["poll_a"]
+    assert cleared == ["a"]
+    assert versions.poll(force=True) == []
+
+
+def test_poll_is_throttled(versions, monkeypatch):
+    cleared = []
+    versions.subscribe("throttled", lambda: cleared.append(True))
+    monkeypatch.setattr(CacheVersion, "poll_interval", 60.0)
+    versions.poll()
+
+    versions.bump("throttled")
+    assert versions.poll() == []
+    assert versions.poll(force=True) == ["throttled"]
+
+
+def test_publish_keeps_local_cache_unless_changes_were_missed(versions):
+    cleared = []
+    versions.subscribe("published", lambda: cleared.append(True))
+    versions.poll(force=True)
+
+    versions.publish("published")
+    assert cleared == []
+    assert versions.poll(force=True) == []
+
+    versions.bump("published")
+    versions.publish("published")
+    assert cleared == [True]
+
+
+def test_named_frame_cache_reloads_after_remote_change(versions):
+    rows = [{"id": "1", "name": "a"}]
+    calls = {"count": 0}
+
+    def loader():
+        calls["count"] += 1
+        return [dict(r) for r in rows]
+
+    cache = VersionedFrameCache(loader, ["id", "name"], name="remote_frame")
+    assert cache()["name"].tolist() == ["a"]
+
+    cache.upsert([{"id": "1", "name": "b"}])
+    versions.poll(force=True)
+    assert calls["count"] == 1
+    assert versions.load_all()["remote_frame"] == 1
+
+    rows[0]["name"] = "c"
+    versions.bump("remote_frame")
+    versions.poll(force=True)
+    assert cache()["name"].tolist() == ["c"]
+    assert calls["count"] == 2
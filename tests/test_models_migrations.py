@@ -0,0 +1,149 @@
+from sqlalchemy import create_engine, inspect, select, text
+
+from models.database import Base
+from models.migrations import MIGRATIONS, run_migrations
+from models.orm_models import SchemaMigrationORM
+from models.orm_models import TestResultItemORM as ResultItemORM
+from models.orm_models import TestResultORM as ResultORM
+
+
+def test_run_migrations_adds_missing_columns():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE api_presets"))
+        conn.execute(
+            text(
+                "CREATE TABLE api_presets (id VARCHAR(36) PRIMARY KEY, name TEXT, provider_name TEXT, "
+                "endpoint TEXT, api_key TEXT, model TEXT, temperature FLOAT, max_tokens INTEGER)"
+            )
+        )
+        conn.execute(text("INSERT INTO api_presets (id, name) VALUES ('p1', 'old')"))
+
+    applied = run_migrations(engine)
+
+    assert applied == [m[0] for m in MIGRATIONS]
+    columns = {c["name"] for c in inspect(engine).get_columns("api_presets")}
+    assert {"max_concurrency", "requests_per_minute", "tokens_per_minute"} <= columns
+    with engine.connect() as conn:
+        value = conn.execute(text("SELECT max_concurrency FROM api_presets")).scalar()
+        assert value == 4
+        recorded = conn.execute(select(SchemaMigrationORM.id)).scalars().all()
+        assert set(recorded) == set(applied)
+
+
+def test_run_migrations_is_idempotent():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+
+    run_migrations(engine)
+
+    assert run_migrations(engine) == []
+
+
+def test_backfill_test_result_items_from_json():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    results = {
+        "questions": {
+            "q1": {
+                "actual_answer": "R1",
+                "evaluation": {"score": 80, "similarity": 70, "correctness": 90, "completeness": 60},
+            },
+            "q2": {"actual_answer": "R2", "evaluation": {"score": "n/a"}},
+        }
+    }
+    with engine.begin() as conn:
+        conn.execute(
+            ResultORM.__table__.insert(),
+            [
+                {"id": "r1", "set_id": "s1", "timestamp": "t", "results": results},
+                {"id": "r2", "set_id": "s1", "timestamp": "t", "results": {}},
+            ],
+        )
+
+    run_migrations(engine)
+
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(
+                ResultItemORM.question_id,
+                ResultItemORM.score,
+                ResultItemORM.answer,
+            )
+            .where(ResultItemORM.result_id == "r1")
+            .order_by(ResultItemORM.question_id)
+        ).all()
+    assert rows == [("q1", 80.0, "R1"), ("q2", None, "R2")]
+
+
+def test_summary_columns_added_indexed_and_backfilled():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE test_result_items"))
+        conn.execute(text("DROP TABLE test_results"))
+        conn.execute(
+            text(
+                "CREATE TABLE test_results (id VARCHAR(36) PRIMARY KEY, set_id VARCHAR(36), "
+                "timestamp TEXT, results JSON)"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO test_results (id, set_id, timestamp, results) VALUES "
+                "('r1', 's1', 't', '{\"generation_llm\": \"gpt-4\", "
+                "\"evaluation_llm\": \"judge\", \"avg_score\": 75.5}'), "
+                "('r2', 's1', 't', '{\"generation_preset\": \"p\"}')"
+            )
+        )
+    Base.metadata.create_all(engine)
+
+    run_migrations(engine)
+
+    indexes = {tuple(i["column_names"]) for i in inspect(engine).get_indexes("test_results")}
+    assert {("set_id",), ("generation_llm",), ("evaluation_llm",), ("avg_score",)} <= indexes
+    assert ("timestamp", "id") in indexes
+    with engine.connect() as conn:
+        rows = {
+            r.id: r
+            for r in conn.execute(
+                select(
+                    ResultORM.id,
+                    ResultORM.generation_llm,
+                    ResultORM.generation_preset,
+                    ResultORM.evaluation_llm,
+                    ResultORM.avg_score,
+                )
+            )
+        }
+    assert tuple(rows["r1"])[1:] == ("gpt-4", None, "judge", 75.5)
+    assert tuple(rows["r2"])[1:] == (None, "p", None, None)
+
+
+def test_backfill_test_result_stats():
+    from models.orm_models import TestResultStatsORM as StatsORM
+
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    results = {"questions": {"q1": {"evaluation": {"score": 60}}, "q2": {"evaluation": {"score": 80}}}}
+    with engine.begin() as conn:
+        conn.execute(
+            ResultORM.__table__.insert(),
+            [
+                {"id": "r1", "set_id": "s1", "timestamp": "t", "results": results},
+                {"id": "r2", "set_id": "s1", "timestamp": "t", "results": {}},
+            ],
+        )
+
+    run_migrations(engine)
+
+    with engine.connect() as conn:
+        rows = {
+            r.result_id: r
+            for r in conn.execute(
+                select(StatsORM.result_id, StatsORM.question_count, StatsORM.avg_score, StatsORM.score_median)
+            )
+        }
+    assert tuple(rows["r1"])[1:] == (2, 70.0, 70.0)
+    assert tuple(rows["r2"])[1:] == (0, 0.0, None)
@@ -60,6 +60,10 @@ def test_orm_tables_and_relationships():
         "set_id",
         "timestamp",
         "results",
+        "generation_llm",
+        "generation_preset",
+        "evaluation_llm",
+        "avg_score",
     }
     assert set(APIPresetORM.__table__.columns.keys()) == {
         "id",
@@ -70,6 +74,9 @@ def test_orm_tables_and_relationships():
         "model",
         "temperature",
         "max_tokens",
+        "max_concurrency",
+        "requests_per_minute",
+        "tokens_per_minute",
     }
     assert set(question_set_questions.c.keys()) == {"set_id", "question_id"}
 
@@ -27,7 +27,88 @@ def test_persist_entities_handles_duplicates(in_memory_db):
     ])
     count, warnings = Question._persist_entities(df)
     assert count == 1
-    assert len(warnings) == 1
-    assert 'già esistente' in warnings[0]
+    assert len(warnings) == 2
+    assert 'già presente nel file' in warnings[0]
+    assert 'già esistente' in warnings[1]
     with DatabaseEngine.instance().get_session() as session:
         assert session.get(QuestionORM, 'new1') is not None
+
+
+def test_load_page_count_and_categories(in_memory_db):
+    for i in range(7):
+        Question.add(f"domanda {i}", f"risposta {i}", "Storia" if i % 2 else "", f"q{i}")
+    Question.add("100% vero?", "sì", "Logica", "q_pct")
+
+    first = Question.load_page(0, 3)
+    second = Question.load_page(3, 3)
+    assert [q.id for q in first] == ["q0", "q1", "q2"]
+    assert [q.id for q in second] == ["q3", "q4", "q5"]
+    assert Question.count() == 8
+
+    assert Question.count(category="Storia") == 3
+    assert [q.id for q in Question.load_page(0, 10, category="")] == ["q0", "q2", "q4", "q6"]
+    assert Question.count(search="RISPOSTA 3") == 1
+    assert [q.id for q in Question.load_page(0, 10, search="100%")] == ["q_pct"]
+    assert Question.count(search="q5") == 1
+    assert Question.categories() == ["", "Logica", "Storia"]
+
+
+
+def test_load_by_ids_batches_lookups(in_memory_db, monkeypatch):
+    for i in range(5):
+        Question.add(f"domanda {i}", f"risposta {i}", "", f"q{i}")
+    monkeypatch.setattr("models.question.ID_LOOKUP_BATCH_SIZE", 2)
+
+    loaded = Question.load_by_ids(["q4", "q1", "q1", "missing", "q3"])
+    assert [q.id for q in loaded] == ["q1", "q3", "q4"]
+    assert loaded[0].domanda == "domanda 1"
+    assert Question.load_by_ids([]) == []
+
+def test_import_chunks_dedups_across_chunks_and_reports_progress(in_memory_db):
+    existing_id = Question.add('d', 'r', 'c')
+    chunks = [
+        pd.DataFrame([
+            {'id': existing_id, 'domanda': 'd', 'risposta_attesa': 'r', 'categoria': 'c'},
+            {'id': 'n1', 'domanda': 'd1', 'risposta_attesa': 'r1', 'categoria': ''},
+        ]),
+        pd.DataFrame([
+            {'id': 'n1', 'domanda': 'dup', 'risposta_attesa': 'dup', 'categoria': ''},
+            {'id': 'n2', 'domanda': 'd2', 'risposta_attesa': 'r2', 'categoria': ''},
+        ]),
+    ]
+    progress = []
+    inserted = []
+
+    count, warnings = Question.import_chunks(
+        iter(chunks),
+        lambda done, added: progress.append((done, added)),
+        lambda rows: inserted.append(rows["id"].tolist()),
+    )
+
+    assert count == 2
+    assert warnings == [
+        f"Domanda con ID '{existing_id}' già esistente; saltata.",
+        "Domanda con ID 'n1' già presente nel file; saltata.",
+    ]
+    assert progress == [(2, 1), (4, 2)]
+    assert inserted == [['n1'], ['n2']]
+    with DatabaseEngine.instance().get_session() as session:
+        assert session.get(QuestionORM, 'n1').domanda == 'd1'
+        assert session.get(QuestionORM, 'n2') is not None
+
+
+def test_import_chunks_caps_warnings(in_memory_db, monkeypatch):
+    monkeypatch.setattr('models.question.MAX_IMPORT_WARNINGS', 2)
+    rows = [
+        {'id': q_id, 'domanda': 'd', 'risposta_attesa': 'r', 'categoria': ''}
+        for q_id in ['a', 'a', 'b', 'b', 'c', 'c', 'c']
+    ]
+
+    count, warnings = Question.import_chunks(iter([pd.DataFrame(rows)]))
+
+    assert count == 3
+    assert warnings == [
+        "Domanda con ID 'a' già presente nel file; saltata.",
+        "Domanda con ID 'b' già presente nel file; saltata.",
+        "Altre 1 domande duplicate o già esistenti sono state saltate.",
+    ]
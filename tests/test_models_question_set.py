@@ -41,3 +41,17 @@ def test_resolve_question_ids(monkeypatch, in_memory_db):
     assert len(warnings) == 1
     assert 'saltata' in warnings[0]
     assert '2' in updated['id'].values
+
+
+def test_load_all_reads_question_ids_from_association(in_memory_db):
+    qid1 = Question.add('d1', 'r1')
+    qid2 = Question.add('d2', 'r2')
+    full_id = QuestionSet.create('full', [qid2, qid1])
+    empty_id = QuestionSet.create('empty', [])
+
+    sets = {s.id: s for s in QuestionSet.load_all()}
+
+    assert set(sets) == {full_id, empty_id}
+    assert sets[full_id].name == 'full'
+    assert sorted(sets[full_id].questions) == sorted([qid1, qid2])
+    assert sets[empty_id].questions == []
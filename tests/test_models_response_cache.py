@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from models.response_cache import ResponseCache  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def reset_cache_stats():
+    ResponseCache.reset_stats()
+    yield
+    ResponseCache.reset_stats()
+
+
+def _request(content="Q"):
+    return {
+        "model": "gpt-4o",
+        "messages": [{"role": "user", "content": content}],
+        "temperature": 0,
+        "max_tokens": 100,
+    }
+
+
+def test_make_key_depends_on_request_content():
+    key = ResponseCache.make_key("http://api", _request())
+    assert key == ResponseCache.make_key("http://api", _request())
+    assert key != ResponseCache.make_key("http://api", _request("altro"))
+    assert key != ResponseCache.make_key("http://other", _request())
+
+
+def test_put_and_get_track_hits_and_misses(in_memory_db):
+    key = ResponseCache.make_key(None, _request())
+
+    assert ResponseCache.get(key) is None
+    ResponseCache.put(key, "gpt-4o", None, "risposta")
+    assert ResponseCache.get(key) == "risposta"
+
+    stats = ResponseCache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["stores"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_get_discards_expired_entries(in_memory_db, monkeypatch):
+    key = ResponseCache.make_key(None, _request())
+    ResponseCache.put(key, "gpt-4o", None, "risposta")
+
+    now = time.time()
+    monkeypatch.setattr(
+        "models.response_cache.time.time",
+        lambda: now + ResponseCache.ttl_seconds + 1,
+    )
+
+    assert ResponseCache.get(key) is None
+    assert ResponseCache.stats()["evictions"] == 1
+
+
+def test_evict_keeps_most_recently_used(in_memory_db):
+    keys = [ResponseCache.make_key(None, _request(str(i))) for i in range(3)]
+    for key in keys:
+        ResponseCache.put(key, "gpt-4o", None, key)
+    time.sleep(0.01)
+    ResponseCache.get(keys[0])
+
+    removed = ResponseCache.evict(max_entries=1)
+
+    assert removed == 2
+    assert ResponseCache.get(keys[0]) == keys[0]
+    assert ResponseCache.get(keys[1]) is None
@@ -1,7 +1,9 @@
 import pandas as pd
+from sqlalchemy import event
 
 from models.test_result import TestResult
 from models.orm_models import TestResultORM
+from models.orm_models import TestResultItemORM as ResultItemORM
 from models.database import DatabaseEngine
 
 
@@ -33,3 +35,123 @@ def test_calculate_statistics():
         'per_question_scores': [],
         'radar_metrics': {'similarity': 0, 'correctness': 0, 'completeness': 0},
     }
+
+
+def test_add_writes_normalized_items(in_memory_db):
+    TestResult.load_all_df.cache_clear()
+    results = {
+        'timestamp': 't1',
+        'questions': {
+            'q1': {
+                'actual_answer': 'A',
+                'latency': 1.5,
+                'evaluation': {'score': 40, 'similarity': 40, 'correctness': 40, 'completeness': 40},
+            },
+            'q2': {
+                'actual_answer': 'B',
+                'evaluation': {'score': 80, 'similarity': 60, 'correctness': 80, 'completeness': 100},
+            },
+        },
+    }
+    rid = TestResult.add('set1', results)
+    TestResult.add('set2', {'timestamp': 't2', 'questions': {'q1': {'evaluation': {'score': 100}}}})
+
+    with DatabaseEngine.instance().get_session() as session:
+        item = session.get(ResultItemORM, (rid, 'q1'))
+        assert item.answer == 'A'
+        assert item.latency == 1.5
+
+    averages = TestResult.question_averages().set_index('question_id')
+    assert averages.loc['q1', 'runs'] == 2
+    assert averages.loc['q1', 'avg_score'] == 70
+    assert TestResult.question_averages('set1').set_index('question_id').loc['q1', 'avg_score'] == 40
+
+
+def test_save_replaces_and_removes_items(in_memory_db):
+    TestResult.load_all_df.cache_clear()
+    rid = TestResult.add('set1', {'questions': {'q1': {'evaluation': {'score': 10}}}})
+    TestResult.save([
+        TestResult(id=rid, set_id='set1', timestamp='t', results={'questions': {'q2': {'evaluation': {'score': 20}}}}),
+        TestResult(id='other', set_id='set1', timestamp='t', results={}),
+    ])
+    assert TestResult.question_averages()['question_id'].tolist() == ['q2']
+
+    TestResult.save([])
+    assert TestResult.question_averages().empty
+
+
+def test_add_materializes_statistics(in_memory_db):
+    from models.question import Question
+
+    TestResult.load_all_df.cache_clear()
+    Question.add('Domanda 1', 'R', 'Storia', question_id='q1')
+    results = {
+        'questions': {
+            'q1': {'evaluation': {'score': 40, 'similarity': 20, 'correctness': 40, 'completeness': 60}},
+            'q2': {'evaluation': {'score': 80, 'similarity': 60, 'correctness': 80, 'completeness': 100}},
+            'q3': {'evaluation': {'score': 90}},
+        },
+    }
+    rid = TestResult.add('set1', results)
+
+    stats = TestResult.load_statistics([rid, 'missing'])
+    assert list(stats) == [rid]
+    stats = stats[rid]
+    assert stats['question_count'] == 3
+    assert stats['avg_score'] == 70
+    assert stats['radar_metrics'] == {'similarity': 80 / 3, 'correctness': 40, 'completeness': 160 / 3}
+    assert stats['score_min'] == 40 and stats['score_max'] == 90
+    assert stats['percentiles'] == {25: 60, 50: 80, 75: 85, 90: 88}
+    assert round(stats['score_std'], 4) == 21.6025
+    assert stats['category_stats']['Storia']['count'] == 1
+    assert stats['category_stats']['N/A']['avg_score'] == 85
+
+    empty = TestResult.compute_statistics({})
+    assert empty['question_count'] == 0 and empty['score_std'] is None
+
+
+def test_save_and_backfill_statistics(in_memory_db):
+    from models.orm_models import TestResultStatsORM as StatsORM
+
+    TestResult.load_all_df.cache_clear()
+    rid = TestResult.add('set1', {'questions': {'q1': {'evaluation': {'score': 10}}}})
+    TestResult.save([
+        TestResult(id=rid, set_id='set1', timestamp='t', results={'questions': {'q1': {'evaluation': {'score': 30}}}}),
+    ])
+    assert TestResult.load_statistics([rid])[rid]['avg_score'] == 30
+
+    with DatabaseEngine.instance().get_session() as session:
+        session.query(StatsORM).delete()
+        session.commit()
+    assert TestResult.backfill_statistics() == 1
+    assert TestResult.backfill_statistics() == 0
+    assert TestResult.backfill_statistics(recompute=True) == 1
+    assert TestResult.load_statistics([rid])[rid]['avg_score'] == 30
+
+    TestResult.save([])
+    assert TestResult.load_statistics([rid]) == {}
+
+
+def test_load_summaries_default_order_scans_timestamp_index(in_memory_db):
+    TestResult.add('set1', {'timestamp': '2024-01-02 10:00:00', 'questions': {}})
+    TestResult.add('set1', {'timestamp': '2024-01-01 10:00:00', 'questions': {}})
+    engine = in_memory_db.get_engine()
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        page = TestResult.load_summaries(offset=0, limit=10)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert page["timestamp"].tolist() == ['2024-01-02 10:00:00', '2024-01-01 10:00:00']
+    statement, parameters = statements[-1]
+    with engine.connect() as conn:
+        plan = " ".join(
+            str(row[-1]) for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        )
+    assert "ix_test_results_timestamp_id" in plan
+    assert "TEMP B-TREE" not in plan
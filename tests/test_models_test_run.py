@@ -0,0 +1,61 @@
+from models.test_run import STATUS_COMPLETED, STATUS_PARTIAL, TestRun
+
+
+def _entry(score):
+    return {
+        "question": f"Q{score}",
+        "expected_answer": "A",
+        "actual_answer": "R",
+        "evaluation": {
+            "score": score,
+            "explanation": "",
+            "similarity": score,
+            "correctness": score,
+            "completeness": score,
+        },
+    }
+
+
+def test_create_and_checkpoint_items(in_memory_db):
+    run = TestRun.create(
+        "set1", "Set", ["1", "2", "3"], {"name": "gen", "model": "m1"}, {"model": "m2"}
+    )
+    TestRun.save_item(run.id, "1", _entry(80))
+    TestRun.save_item(run.id, "2", _entry(0), failed=True)
+
+    loaded = TestRun.get(run.id)
+    assert loaded.status == STATUS_PARTIAL
+    assert loaded.question_ids == ["1", "2", "3"]
+    assert loaded.generation_preset == "gen"
+    assert set(TestRun.load_items(run.id)) == {"1", "2"}
+    assert set(TestRun.load_items(run.id, include_failed=False)) == {"1"}
+
+
+def test_save_item_replaces_previous_attempt(in_memory_db):
+    run = TestRun.create("set1", "Set", ["1"], {}, {})
+    TestRun.save_item(run.id, "1", _entry(0), failed=True)
+    TestRun.save_item(run.id, "1", _entry(90))
+
+    items = TestRun.load_items(run.id, include_failed=False)
+    assert items["1"]["evaluation"]["score"] == 90
+
+
+def test_load_partial_df_and_complete(in_memory_db):
+    run = TestRun.create("set1", "Set", ["1", "2"], {"model": "m1"}, {"model": "m2"})
+    TestRun.save_item(run.id, "2", _entry(60))
+
+    df = TestRun.load_partial_df()
+    assert df["id"].tolist() == [run.id]
+    results = df.iloc[0]["results"]
+    assert results["status"] == STATUS_PARTIAL
+    assert results["completed_questions"] == 1
+    assert results["total_questions"] == 2
+    assert results["avg_score"] == 60
+    assert results["generation_llm"] == "m1"
+
+    TestRun.complete(run.id, "rid")
+
+    assert TestRun.get(run.id).status == STATUS_COMPLETED
+    assert TestRun.get(run.id).result_id == "rid"
+    assert TestRun.load_partial_df().empty
+    assert TestRun.load_incomplete() == []
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 import sys
@@ -10,11 +11,23 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from utils.openai_client import (  # noqa: E402
     DEFAULT_MODEL,
     ClientCreationError,
+    close_clients,
+    configure_pool,
+    get_async_openai_client,
     get_available_models_for_endpoint,
     get_openai_client,
+    run_async,
+    shutdown_async_loop,
 )
 
 
+@pytest.fixture(autouse=True)
+def clear_client_registry():
+    close_clients()
+    yield
+    close_clients()
+
+
 def test_get_openai_client_no_api_key(caplog):
     caplog.set_level(logging.WARNING)
     with pytest.raises(ClientCreationError):
@@ -36,10 +49,75 @@ def test_get_openai_client_uses_custom_base_url(mocker):
 
     result = get_openai_client("key", base_url="http://custom")
 
-    mock_openai.assert_called_once_with(api_key="key", base_url="http://custom")
+    mock_openai.assert_called_once()
+    kwargs = mock_openai.call_args.kwargs
+    assert kwargs["api_key"] == "key"
+    assert kwargs["base_url"] == "http://custom"
+    assert "http_client" in kwargs
     assert result is mock_client
 
 
+def test_get_openai_client_reuses_client_per_key_and_endpoint(mocker):
+    mock_openai = mocker.patch("utils.openai_client.OpenAI")
+    mock_openai.side_effect = lambda **kwargs: mocker.MagicMock()
+
+    first = get_openai_client("key", base_url="http://custom")
+    second = get_openai_client("key", base_url="http://custom")
+    other = get_openai_client("key", base_url="http://other")
+
+    assert first is second
+    assert other is not first
+    assert mock_openai.call_count == 2
+
+
+def test_configure_pool_recreates_clients(mocker):
+    mock_openai = mocker.patch("utils.openai_client.OpenAI")
+    mock_openai.side_effect = lambda **kwargs: mocker.MagicMock()
+
+    first = get_openai_client("key")
+    configure_pool(max_connections=5, max_keepalive_connections=2, keepalive_expiry=5.0)
+    second = get_openai_client("key")
+
+    first.close.assert_called_once()
+    assert second is not first
+    configure_pool(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30.0)
+
+
+def test_get_async_openai_client_is_shared_within_loop(mocker):
+    mock_async = mocker.patch("utils.openai_client.AsyncOpenAI")
+    mock_async.side_effect = lambda **kwargs: mocker.MagicMock()
+
+    async def get_twice():
+        return get_async_openai_client("key"), get_async_openai_client("key")
+
+    first, second = asyncio.run(get_twice())
+    third, _ = asyncio.run(get_twice())
+
+    assert first is second
+    assert third is not first
+
+
+
+def test_run_async_reuses_clients_and_closes_them(mocker):
+    mock_async = mocker.patch("utils.openai_client.AsyncOpenAI")
+    mock_async.side_effect = lambda **kwargs: mocker.AsyncMock()
+
+    async def get_client():
+        return get_async_openai_client("key")
+
+    first = run_async(get_client())
+    assert run_async(get_client()) is first
+
+    close_clients()
+    first.close.assert_awaited_once()
+    second = run_async(get_client())
+    assert second is not first
+
+    shutdown_async_loop()
+    second.close.assert_awaited_once()
+    assert run_async(get_client()) is not second
+    shutdown_async_loop()
+
 def test_get_available_models_returns_error_when_no_client(mocker):
     mocker.patch(
         "utils.openai_client.get_openai_client",
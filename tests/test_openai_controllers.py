@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 
@@ -9,7 +10,7 @@ from utils.openai_client import ClientCreationError
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from controllers import api_preset_controller  # noqa: E402
-from controllers.test_controller import generate_answer  # noqa: E402
+from controllers.test_controller import generate_answer, generate_answer_async  # noqa: E402
 
 
 def _mock_response(mocker, content: str):
@@ -95,3 +96,106 @@ def test_test_api_connection_no_client(mocker):
 
     assert ok is False
     assert "Client API non inizializzato" in msg
+
+
+def test_generate_answer_async_uses_async_client(mocker):
+    mock_get_client = mocker.patch("utils.openai_client.get_async_openai_client")
+    mock_client = mocker.Mock()
+    mock_client.chat.completions.create = mocker.AsyncMock(
+        return_value=_mock_response(mocker, " async answer ")
+    )
+    mock_get_client.return_value = mock_client
+
+    result = asyncio.run(generate_answer_async("question", {"api_key": "key"}))
+
+    assert result == "async answer"
+    mock_client.chat.completions.create.assert_awaited_once()
+
+
+def test_generate_answer_async_wraps_api_errors(mocker):
+    mock_get_client = mocker.patch("utils.openai_client.get_async_openai_client")
+    mock_client = mocker.Mock()
+    mock_client.chat.completions.create = mocker.AsyncMock(side_effect=Exception("boom"))
+    mock_get_client.return_value = mock_client
+
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(generate_answer_async("question", {"api_key": "key"}))
+
+
+def test_generate_answer_uses_response_cache(mocker):
+    mock_get_client = mocker.patch("utils.openai_client.get_openai_client")
+    mock_client = mock_get_client.return_value
+    mock_get = mocker.patch(
+        "controllers.test_controller.ResponseCache.get", return_value="cached"
+    )
+
+    result = generate_answer(
+        "question", {"api_key": "key", "temperature": 0}, use_cache=True
+    )
+
+    assert result == "cached"
+    mock_get.assert_called_once()
+    mock_client.chat.completions.create.assert_not_called()
+
+
+def test_generate_answer_reports_usage_only_for_api_calls(mocker):
+    mock_get_client = mocker.patch("utils.openai_client.get_openai_client")
+    response = _mock_response(mocker, "answer")
+    response.usage.total_tokens = 42
+    mock_get_client.return_value.chat.completions.create.return_value = response
+    mocker.patch("controllers.test_controller.ResponseCache.get", return_value=None)
+    mocker.patch("controllers.test_controller.ResponseCache.put")
+
+    stats = {}
+    generate_answer("question", {"api_key": "key", "temperature": 0}, use_cache=True, stats=stats)
+    assert stats["tokens"] == 42 and stats["latency"] >= 0
+
+    mocker.patch("controllers.test_controller.ResponseCache.get", return_value="cached")
+    cached_stats = {}
+    generate_answer("question", {"api_key": "key", "temperature": 0}, use_cache=True, stats=cached_stats)
+    assert cached_stats == {}
+
+
+def test_generate_answer_stores_deterministic_answers(mocker):
+    mock_get_client = mocker.patch("utils.openai_client.get_openai_client")
+    mock_client = mock_get_client.return_value
+    mock_client.chat.completions.create.return_value = _mock_response(mocker, "answer")
+    mocker.patch("controllers.test_controller.ResponseCache.get", return_value=None)
+    mock_put = mocker.patch("controllers.test_controller.ResponseCache.put")
+
+    generate_answer("question", {"api_key": "key", "temperature": 0}, use_cache=True)
+
+    assert mock_put.call_args.args[3] == "answer"
+
+
+def test_generate_answer_skips_cache_for_sampled_requests(mocker):
+    mock_get_client = mocker.patch("utils.openai_client.get_openai_client")
+    mock_client = mock_get_client.return_value
+    mock_client.chat.completions.create.return_value = _mock_response(mocker, "answer")
+    mock_get = mocker.patch("controllers.test_controller.ResponseCache.get")
+    mock_put = mocker.patch("controllers.test_controller.ResponseCache.put")
+
+    generate_answer("question", {"api_key": "key", "temperature": 0.7}, use_cache=True)
+
+    mock_get.assert_not_called()
+    mock_put.assert_not_called()
+
+
+def test_generate_answer_ignores_cache_failures(mocker):
+    mock_get_client = mocker.patch("utils.openai_client.get_openai_client")
+    mock_client = mock_get_client.return_value
+    mock_client.chat.completions.create.return_value = _mock_response(mocker, "answer")
+    mocker.patch(
+        "controllers.test_controller.ResponseCache.get",
+        side_effect=RuntimeError("db down"),
+    )
+    mocker.patch(
+        "controllers.test_controller.ResponseCache.put",
+        side_effect=RuntimeError("db down"),
+    )
+
+    result = generate_answer(
+        "question", {"api_key": "key", "temperature": 0}, use_cache=True
+    )
+
+    assert result == "answer"
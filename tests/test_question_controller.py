@@ -30,8 +30,9 @@ def test_add_question_if_not_exists_existing(mocker):
 
 
 def test_add_question_if_not_exists_new(mocker):
-    mock_refresh = mocker.patch("controllers.question_controller.refresh_questions")
+    mock_cache = mocker.patch("controllers.question_controller._get_questions")
     mock_add = mocker.patch("controllers.question_controller.Question.add")
+    mock_add.return_value = "123"
     mock_load_questions = mocker.patch(
         "controllers.question_controller.load_questions"
     )
@@ -46,11 +47,12 @@ def test_add_question_if_not_exists_new(mocker):
 
     assert result is True
     mock_add.assert_called_once_with("dom", "ans", "cat", "123")
-    mock_refresh.assert_called_once()
+    mock_cache.upsert.assert_called_once()
 
 
 def test_add_question(mocker):
-    mock_refresh = mocker.patch("controllers.question_controller.refresh_questions")
+    mock_cache = mocker.patch("controllers.question_controller._get_questions")
+    mock_cache.version = 3
     mock_add = mocker.patch("controllers.question_controller.Question.add")
     mock_add.return_value = "qid"
 
@@ -58,28 +60,61 @@ def test_add_question(mocker):
 
     assert result == "qid"
     mock_add.assert_called_once_with("dom", "ans", "cat", "qid")
-    mock_refresh.assert_called_once()
+    mock_cache.upsert.assert_called_once_with(
+        [{"id": "qid", "domanda": "dom", "risposta_attesa": "ans", "categoria": "cat"}],
+        base_version=3,
+    )
+    mock_cache.refresh.assert_not_called()
 
 
 def test_update_question(mocker):
-    mock_refresh = mocker.patch("controllers.question_controller.refresh_questions")
+    mock_cache = mocker.patch("controllers.question_controller._get_questions")
+    mock_cache.version = 1
     mock_update = mocker.patch("controllers.question_controller.Question.update")
     mock_update.return_value = True
 
-    result = question_controller.update_question("qid", "dom", "ans", "cat")
+    result = question_controller.update_question("qid", "dom", None, "cat")
 
     assert result is True
-    mock_update.assert_called_once_with("qid", "dom", "ans", "cat")
-    mock_refresh.assert_called_once()
+    mock_update.assert_called_once_with("qid", "dom", None, "cat")
+    mock_cache.upsert.assert_called_once_with(
+        [{"id": "qid", "domanda": "dom", "categoria": "cat"}], base_version=1
+    )
+
+
+def test_update_missing_question_leaves_cache(mocker):
+    mock_cache = mocker.patch("controllers.question_controller._get_questions")
+    mocker.patch(
+        "controllers.question_controller.Question.update", return_value=False
+    )
+
+    assert question_controller.update_question("qid", "dom") is False
+    mock_cache.upsert.assert_not_called()
 
 
 def test_delete_question(mocker):
-    mock_refresh = mocker.patch("controllers.question_controller.refresh_questions")
+    mock_cache = mocker.patch("controllers.question_controller._get_questions")
+    mock_cache.version = 2
+    mock_sets = mocker.patch("controllers.question_controller._refresh_question_sets")
     mock_delete = mocker.patch("controllers.question_controller.Question.delete")
     question_controller.delete_question("qid")
 
     mock_delete.assert_called_once_with("qid")
-    mock_refresh.assert_called_once()
+    mock_cache.delete.assert_called_once_with(["qid"], base_version=2)
+    mock_sets.assert_called_once_with()
+
+
+def test_delete_question_publishes_question_sets_version(mocker, in_memory_db):
+    from models.cache_version import CacheVersion
+
+    publish = mocker.patch.object(CacheVersion, "publish")
+    question_id = question_controller.Question.add("d", "r", "c")
+
+    question_controller.delete_question(question_id)
+
+    assert mocker.call("question_sets") in publish.call_args_list
+
+
 def test_get_filtered_questions(mocker):
     mock_filter = mocker.patch(
         "controllers.question_controller.Question.filter_by_category"
@@ -189,7 +224,7 @@ def test_get_question_category_refresh(mocker):
 
 
 def test_save_question_action_success(mocker):
-    mock_refresh = mocker.patch("controllers.question_controller.refresh_questions")
+    mock_refresh = mocker.patch("controllers.question_controller.load_questions")
     mock_update = mocker.patch("controllers.question_controller.update_question")
     mock_update.return_value = True
     df = pd.DataFrame({"id": ["1"]})
@@ -206,7 +241,7 @@ def test_save_question_action_success(mocker):
 
 
 def test_save_question_action_failure(mocker):
-    mock_refresh = mocker.patch("controllers.question_controller.refresh_questions")
+    mock_refresh = mocker.patch("controllers.question_controller.load_questions")
     mock_update = mocker.patch("controllers.question_controller.update_question")
     mock_update.return_value = False
     result = question_controller.save_question_action("1", "q", "a", "c")
@@ -217,7 +252,7 @@ def test_save_question_action_failure(mocker):
 
 
 def test_delete_question_action(mocker):
-    mock_refresh = mocker.patch("controllers.question_controller.refresh_questions")
+    mock_refresh = mocker.patch("controllers.question_controller.load_questions")
     mock_delete = mocker.patch("controllers.question_controller.delete_question")
     df = pd.DataFrame()
     mock_refresh.return_value = df
@@ -229,27 +264,34 @@ def test_delete_question_action(mocker):
     assert result.equals(df)
 
 
-def test_import_questions_action_success(mocker):
+def test_import_questions_action_applies_chunks_to_cache(mocker, in_memory_db):
+    import io
+
+    from utils.cache import get_questions
+
+    get_questions.cache_clear()
+    question_controller.add_question("esistente", "r", "", "q0")
+    assert get_questions()["id"].tolist() == ["q0"]
     mock_refresh = mocker.patch("controllers.question_controller.refresh_questions")
-    mock_import = mocker.patch(
-        "controllers.question_controller.question_importer.import_from_file"
-    )
-    mock_import.return_value = {
-        "success": True,
-        "imported_count": 1,
-        "warnings": ["w"],
-    }
-    df = pd.DataFrame({"id": ["1"]})
-    mock_refresh.return_value = df
+    progress = mocker.Mock()
+    uploaded = io.StringIO("id,domanda,risposta_attesa,categoria\nq0,d,r,\nq1,d1,r1,Storia\nq2,d2,r2,\n")
+    uploaded.name = "domande.csv"
 
-    uploaded_file = object()
-    result = question_controller.import_questions_action(uploaded_file)
+    result = question_controller.import_questions_action(uploaded, progress)
 
-    mock_import.assert_called_once_with(uploaded_file)
-    mock_refresh.assert_called_once()
-    assert result["imported_count"] == 1
-    assert result["warnings"] == ["w"]
-    assert result["questions_df"].equals(df)
+    mock_refresh.assert_not_called()
+    assert result["imported_count"] == 2
+    assert result["warnings"]
+    assert result["questions_df"]["id"].tolist() == ["q0", "q1", "q2"]
+    assert result["questions_df"].iloc[1]["categoria"] == "Storia"
+    assert progress.call_args.args == (3, 2)
+
+    get_questions.cache_clear()
+    uploaded = io.StringIO("id,domanda,risposta_attesa,categoria\nq3,d3,r3,\n")
+    uploaded.name = "domande.csv"
+    assert question_controller.import_questions_action(uploaded)["questions_df"] is None
+    assert not get_questions.loaded
+    get_questions.cache_clear()
 
 
 def test_import_questions_action_no_file():
@@ -258,9 +300,8 @@ def test_import_questions_action_no_file():
 
 
 def test_import_questions_action_failure(mocker):
-    mock_refresh = mocker.patch("controllers.question_controller.refresh_questions")
     mock_import = mocker.patch(
-        "controllers.question_controller.question_importer.import_from_file"
+        "controllers.question_controller.QuestionImporter.import_from_file"
     )
     mock_import.return_value = {
         "success": False,
@@ -271,6 +312,41 @@ def test_import_questions_action_failure(mocker):
     with pytest.raises(ValueError, match="err"):
         question_controller.import_questions_action(object())
 
-    assert mock_import.return_value["imported_count"] == 0
-    assert mock_import.return_value["warnings"] == ["err"]
-    mock_refresh.assert_not_called()
+
+def test_get_questions_page_clamps_page(mocker):
+    mocker.patch("controllers.question_controller.Question.count", return_value=23)
+    mock_page = mocker.patch("controllers.question_controller.Question.load_page")
+    mock_page.return_value = [question_controller.Question("1", "d", "r", "c")]
+
+    result = question_controller.get_questions_page(9, 10, "c")
+
+    assert result["page"] == 3
+    assert result["page_count"] == 3
+    assert result["total"] == 23
+    mock_page.assert_called_once_with(20, 10, "c")
+    assert result["questions_df"]["id"].tolist() == ["1"]
+
+
+def test_search_questions_ranks_and_pages(mocker):
+    questions = pd.DataFrame(
+        {
+            "id": ["1", "2", "3"],
+            "domanda": ["Capitale della Francia?", "Capitale d'Italia?", "Quanto fa 2+2?"],
+            "risposta_attesa": ["Parigi", "Roma", "4"],
+            "categoria": ["Geografia", "Geografia", "Matematica"],
+        }
+    )
+    mocker.patch("controllers.question_controller.load_questions", return_value=questions)
+    mocker.patch(
+        "controllers.question_controller._search_questions",
+        return_value=[("2", 3.5), ("1", 1.25), ("missing", 1.0)],
+    )
+
+    df = question_controller.search_questions("capitale")
+    assert df["id"].tolist() == ["2", "1"]
+    assert df["score"].tolist() == [3.5, 1.25]
+
+    page = question_controller.get_questions_page(2, 1, search="capitale")
+    assert page["total"] == 2
+    assert page["page_count"] == 2
+    assert page["questions_df"]["id"].tolist() == ["1"]
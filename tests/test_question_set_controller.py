@@ -5,40 +5,52 @@ import pandas as pd
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from controllers import question_set_controller  # noqa: E402
+from models.question_set import QuestionSet  # noqa: E402
+from utils.category_index import CategoryIndex  # noqa: E402
 
 
 def test_create_set_controller(mocker):
-    mock_refresh = mocker.patch(
-        "controllers.question_set_controller.refresh_question_sets"
+    mock_cache = mocker.patch(
+        "controllers.question_set_controller._get_question_sets"
     )
+    mock_cache.version = 4
     mock_create = mocker.patch(
         "controllers.question_set_controller.QuestionSet.create"
     )
     mock_create.return_value = "sid"
+    mocker.patch(
+        "controllers.question_set_controller.QuestionSet.get",
+        return_value=QuestionSet(id="sid", name="name", questions=["q1"]),
+    )
 
     result = question_set_controller.create_set("name", ["q1"])
 
     assert result == "sid"
     mock_create.assert_called_once_with("name", ["q1"])
-    mock_refresh.assert_called_once()
+    mock_cache.upsert.assert_called_once_with(
+        [{"id": "sid", "name": "name", "questions": ["q1"]}], base_version=4
+    )
 
 
 def test_update_set_controller(mocker):
-    mock_refresh = mocker.patch(
-        "controllers.question_set_controller.refresh_question_sets"
+    mock_cache = mocker.patch(
+        "controllers.question_set_controller._get_question_sets"
     )
     mock_update = mocker.patch(
         "controllers.question_set_controller.QuestionSet.update"
     )
+    mocker.patch(
+        "controllers.question_set_controller.QuestionSet.get", return_value=None
+    )
     question_set_controller.update_set("sid", name="name", question_ids=["q1"])
 
     mock_update.assert_called_once_with("sid", "name", ["q1"])
-    mock_refresh.assert_called_once()
+    mock_cache.delete.assert_called_once_with(["sid"], base_version=mock_cache.version)
 
 
 def test_delete_set_controller(mocker):
-    mock_refresh = mocker.patch(
-        "controllers.question_set_controller.refresh_question_sets"
+    mock_cache = mocker.patch(
+        "controllers.question_set_controller._get_question_sets"
     )
     mock_delete = mocker.patch(
         "controllers.question_set_controller.QuestionSet.delete"
@@ -46,7 +58,7 @@ def test_delete_set_controller(mocker):
     question_set_controller.delete_set("sid")
 
     mock_delete.assert_called_once_with("sid")
-    mock_refresh.assert_called_once()
+    mock_cache.delete.assert_called_once_with(["sid"], base_version=mock_cache.version)
 
 
 def test_prepare_sets_for_view(mocker):
@@ -74,6 +86,12 @@ def test_prepare_sets_for_view(mocker):
 
     mock_get_questions.return_value = questions_df
     mock_get_sets.return_value = sets_df
+    index = CategoryIndex()
+    index.rebuild(questions_df.to_dict("records"), sets_df.to_dict("records"))
+    mocker.patch(
+        "controllers.question_set_controller._get_category_index",
+        return_value=index,
+    )
 
     result = question_set_controller.prepare_sets_for_view(["A"])
 
@@ -0,0 +1,117 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+from openai import RateLimitError
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils import rate_limiter  # noqa: E402
+from utils.rate_limiter import (  # noqa: E402
+    RateLimiter,
+    TokenBucket,
+    call_with_rate_limit,
+    call_with_rate_limit_async,
+    estimate_tokens,
+    get_rate_limiter,
+    retry_after_seconds,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _rate_limit_error(headers=None):
+    response = SimpleNamespace(
+        request=None, status_code=429, headers=headers or {}
+    )
+    return RateLimitError("rate limited", response=response, body=None)
+
+
+def test_token_bucket_allows_burst_then_waits():
+    clock = FakeClock()
+    bucket = TokenBucket(60, burst_seconds=2, clock=clock)
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(1.0)
+
+    clock.now = 10
+    assert bucket.reserve() == 0
+
+
+def test_rate_limiter_uses_stricter_budget_and_pause():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=600, clock=clock)
+
+    assert limiter.reserve(tokens=100) == 0
+    assert limiter.reserve(tokens=100) == pytest.approx(10.0)
+
+    limiter.pause(30)
+    assert limiter.reserve() == pytest.approx(30.0)
+
+
+def test_get_rate_limiter_is_shared_per_preset():
+    config = {"id": "p1", "requests_per_minute": 10}
+    assert get_rate_limiter(config) is get_rate_limiter(dict(config))
+    assert get_rate_limiter({"id": "p1", "requests_per_minute": 20}) is not get_rate_limiter(config)
+
+
+def test_estimate_tokens():
+    request = {"messages": [{"content": "x" * 400}], "max_tokens": 50}
+    assert estimate_tokens(request) == 150
+
+
+def test_retry_after_seconds_parses_headers():
+    assert retry_after_seconds(_rate_limit_error({"retry-after": "3"})) == 3
+    assert retry_after_seconds(_rate_limit_error({"retry-after-ms": "1500"})) == 1.5
+    assert retry_after_seconds(_rate_limit_error({})) is None
+    assert retry_after_seconds(ValueError("x")) is None
+
+
+def test_call_with_rate_limit_retries_and_honours_retry_after(mocker):
+    sleeps = []
+    mocker.patch.object(rate_limiter.time, "sleep", side_effect=sleeps.append)
+    call = mocker.Mock(side_effect=[_rate_limit_error({"retry-after": "2"}), "ok"])
+
+    result = call_with_rate_limit({"id": "retry-test"}, {}, call)
+
+    assert result == "ok"
+    assert call.call_count == 2
+    assert 2 in sleeps
+
+
+def test_call_with_rate_limit_uses_backoff_and_gives_up(mocker):
+    mocker.patch.object(rate_limiter.time, "sleep")
+    backoff = mocker.patch.object(rate_limiter, "backoff_delay", return_value=0.0)
+    call = mocker.Mock(side_effect=_rate_limit_error())
+
+    with pytest.raises(RateLimitError):
+        call_with_rate_limit({"id": "giveup-test"}, {}, call, max_retries=2)
+
+    assert call.call_count == 3
+    assert backoff.call_count == 2
+
+
+def test_call_with_rate_limit_does_not_retry_other_errors(mocker):
+    call = mocker.Mock(side_effect=ValueError("bad"))
+    with pytest.raises(ValueError):
+        call_with_rate_limit({"id": "other-error"}, {}, call)
+    assert call.call_count == 1
+
+
+def test_call_with_rate_limit_async_retries(mocker):
+    mocker.patch.object(rate_limiter, "backoff_delay", return_value=0.0)
+    call = mocker.AsyncMock(side_effect=[_rate_limit_error(), "ok"])
+
+    result = asyncio.run(call_with_rate_limit_async({"id": "async-test"}, {}, call))
+
+    assert result == "ok"
+    assert call.await_count == 2
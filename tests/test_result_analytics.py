@@ -0,0 +1,100 @@
+import pandas as pd
+import pytest
+
+from models.test_result import CATEGORY_ROW_COLUMNS
+from utils.result_analytics import ResultAnalytics
+
+
+def _row(result_id, set_id, timestamp, model, category, count, score, preset=None):
+    return {
+        "result_id": result_id,
+        "set_id": set_id,
+        "timestamp": timestamp,
+        "generation_llm": model,
+        "generation_preset": preset,
+        "category": category,
+        "count": count,
+        "avg_score": score,
+        "avg_similarity": score,
+        "avg_correctness": score,
+        "avg_completeness": score,
+    }
+
+
+ROWS = [
+    _row("r1", "s1", "2024-01-01 10:00:00", "gpt-4", "Storia", 3, 90),
+    _row("r1", "s1", "2024-01-01 10:00:00", "gpt-4", "Geo", 1, 50),
+    _row("r2", "s1", "2024-01-02 10:00:00", "gpt-4", "Storia", 2, 60),
+    _row("r3", "s1", "2024-01-01 12:00:00", None, "Storia", 2, 70, preset="fast"),
+]
+
+
+class FakeSource:
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.loaded = []
+
+    def list_ids(self):
+        return sorted({r["result_id"] for r in self.rows})
+
+    def load_rows(self, ids):
+        self.loaded.append(list(ids))
+        return pd.DataFrame([r for r in self.rows if r["result_id"] in ids], columns=CATEGORY_ROW_COLUMNS)
+
+
+def _analytics(rows=ROWS):
+    source = FakeSource(rows)
+    return source, ResultAnalytics(source.list_ids, source.load_rows, CATEGORY_ROW_COLUMNS)
+
+
+def test_leaderboard_weights_categories_by_question_count():
+    _, analytics = _analytics()
+
+    board = analytics.leaderboard(["model"], {"fast": "mistral"})
+    assert board["model"].tolist() == ["gpt-4", "mistral"]
+    assert board["rank"].tolist() == [1, 2]
+    assert board["runs"].tolist() == [2, 1]
+    assert board["questions"].tolist() == [6, 2]
+    assert board.iloc[0]["avg_score"] == pytest.approx((3 * 90 + 50 + 2 * 60) / 6)
+
+    by_category = analytics.leaderboard(["model", "category"])
+    assert by_category.iloc[0][["model", "category"]].tolist() == ["gpt-4", "Storia"]
+    assert "N/A" in by_category["model"].tolist()
+
+    with pytest.raises(ValueError):
+        analytics.leaderboard(["timestamp"])
+
+
+def test_trends_and_regressions():
+    _, analytics = _analytics()
+
+    trends = analytics.trends(["model"], "D", {"fast": "mistral"})
+    gpt = trends[trends["model"] == "gpt-4"]
+    assert gpt["period"].dt.strftime("%Y-%m-%d").tolist() == ["2024-01-01", "2024-01-02"]
+    assert gpt["avg_score"].tolist() == [80, 60]
+
+    regressions = analytics.regressions(["model", "set_id"], threshold=10)
+    assert regressions["result_id"].tolist() == ["r2"]
+    assert regressions.iloc[0]["previous_result_id"] == "r1"
+    assert regressions.iloc[0]["delta"] == -20
+    assert analytics.regressions(["model", "set_id"], threshold=25).empty
+
+
+def test_sync_loads_only_new_results_and_drops_removed():
+    source, analytics = _analytics(ROWS[:2])
+
+    first = analytics.leaderboard(["model"])
+    assert analytics.leaderboard(["model"]) is first
+    assert source.loaded == [["r1"]]
+
+    source.rows = ROWS[2:]
+    analytics.mark_stale()
+    board = analytics.leaderboard(["model"])
+    assert source.loaded == [["r1"], ["r2", "r3"]]
+    assert set(analytics.frame()["result_id"]) == {"r2", "r3"}
+    assert board.iloc[0]["questions"] == 2
+
+    version = analytics.version
+    analytics.mark_stale()
+    analytics.frame()
+    assert analytics.version == version
@@ -2,6 +2,7 @@ import os
 import sys
 
 import pandas as pd
+import pytest
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
@@ -57,18 +58,43 @@ def sample_data():
     return results_df, sets_df, presets_df
 
 
-def test_get_results_filters(mocker):
+def test_get_results_filters(mocker, in_memory_db):
+    from models.test_result import TestResult
+
     results_df, sets_df, presets_df = sample_data()
-    mocker.patch("controllers.result_controller.load_results", return_value=results_df)
+    TestResult.insert_new(
+        [TestResult(**row) for row in results_df.to_dict(orient="records")]
+    )
+    mock_load = mocker.patch("controllers.result_controller.load_results")
+    partial_df = pd.DataFrame(
+        [
+            {
+                "id": "run1",
+                "set_id": "10",
+                "timestamp": "2024-01-04",
+                "results": {"generation_llm": "gpt-4", "status": "partial"},
+            }
+        ]
+    )
+    mocker.patch(
+        "controllers.result_controller.load_partial_results", return_value=partial_df
+    )
     mocker.patch("controllers.result_controller.load_sets", return_value=sets_df)
     mocker.patch("controllers.result_controller.load_presets", return_value=presets_df)
 
     df_set = controller.get_results("Set1", None)
-    assert set(df_set["id"]) == {"1", "3"}
+    assert set(df_set["id"]) == {"1", "3", "run1"}
 
     df_model = controller.get_results(None, "gpt-3.5")
     assert set(df_model["id"]) == {"1", "2"}
 
+    df_both = controller.get_results("Set1", "gpt-4", include_partial=False)
+    assert df_both["id"].tolist() == ["3"]
+    assert df_both.iloc[0]["results"]["avg_score"] == 90
+
+    assert controller.get_results("Missing", None, include_partial=False).empty
+    mock_load.assert_not_called()
+
 
 def test_list_names(mocker):
     results_df, sets_df, presets_df = sample_data()
@@ -90,3 +116,130 @@ def test_prepare_select_options():
         "1": "2024-01-01 - 🤖 Set1 (Avg: 80.00%) - LLM",
     }
     assert options == expected
+
+
+def _insert_sample(mocker):
+    from models.test_result import TestResult
+
+    results_df, sets_df, presets_df = sample_data()
+    TestResult.insert_new(
+        [TestResult(**row) for row in results_df.to_dict(orient="records")]
+    )
+    partial_df = pd.DataFrame(
+        [
+            {
+                "id": "run1",
+                "set_id": "10",
+                "timestamp": "2024-01-04",
+                "results": {
+                    "generation_llm": "gpt-4",
+                    "avg_score": 75,
+                    "status": "partial",
+                    "completed_questions": 1,
+                    "total_questions": 3,
+                },
+            }
+        ]
+    )
+    mocker.patch(
+        "controllers.result_controller.load_partial_results", return_value=partial_df
+    )
+    mocker.patch("controllers.result_controller.load_sets", return_value=sets_df)
+    mocker.patch("controllers.result_controller.load_presets", return_value=presets_df)
+    return sets_df
+
+
+def test_get_result_summaries_pages_and_sorts(mocker, in_memory_db):
+    _insert_sample(mocker)
+
+    first = controller.get_result_summaries(page=1, page_size=2)
+    assert first["total"] == 4
+    assert first["page_count"] == 2
+    assert first["summaries_df"]["id"].tolist() == ["run1", "3"]
+    assert "results" not in first["summaries_df"].columns
+    assert first["summaries_df"].iloc[0]["progress"] == "1/3"
+
+    second = controller.get_result_summaries(page=5, page_size=2)
+    assert second["page"] == 2
+    assert second["summaries_df"]["id"].tolist() == ["2", "1"]
+
+    pages = [
+        controller.get_result_summaries(
+            page=page, page_size=1, sort_by="avg_score", descending=False
+        )
+        for page in range(1, 5)
+    ]
+    assert [p["summaries_df"]["id"].tolist() for p in pages] == [["2"], ["run1"], ["1"], ["3"]]
+    assert {(p["total"], p["page_count"]) for p in pages} == {(4, 4)}
+    by_model = controller.get_result_summaries(sort_by="generation_llm", page_size=3)
+    assert by_model["summaries_df"]["id"].tolist() == ["run1", "3", "1"]
+
+    by_score = controller.get_result_summaries(
+        sort_by="avg_score", descending=False, include_partial=False
+    )
+    assert by_score["summaries_df"]["id"].tolist() == ["2", "1", "3"]
+
+    filtered = controller.get_result_summaries("Set1", "gpt-3.5")
+    assert filtered["summaries_df"]["id"].tolist() == ["1"]
+    assert filtered["total"] == 1
+
+    with pytest.raises(ValueError):
+        controller.get_result_summaries(sort_by="results")
+
+
+def test_get_results_by_ids(mocker, in_memory_db):
+    _insert_sample(mocker)
+
+    df = controller.get_results_by_ids(["3", "run1"])
+    assert set(df["id"]) == {"3", "run1"}
+    row = df[df["id"] == "3"].iloc[0]
+    assert row["results"]["avg_score"] == 90
+
+
+def test_list_result_names(mocker, in_memory_db):
+    sets_df = _insert_sample(mocker)
+
+    assert controller.list_result_set_names(sets_df) == ["Set1", "Set2"]
+    assert controller.list_result_model_names() == ["gpt-3.5", "gpt-4"]
+
+
+def test_prepare_summary_options():
+    _, sets_df, _ = sample_data()
+    summaries_df = pd.DataFrame(
+        [
+            {"id": "run1", "set_id": "10", "timestamp": "2024-01-04",
+             "generation_llm": "gpt-4", "avg_score": None,
+             "status": "partial", "progress": "1/3"},
+            {"id": "2", "set_id": "20", "timestamp": "2024-01-02",
+             "generation_preset": "presetA", "avg_score": 70.0},
+        ]
+    )
+    options = controller.prepare_summary_options(summaries_df, sets_df)
+    assert options == {
+        "run1": "2024-01-04 - Set1 (Avg: 0.00%) - gpt-4 - ⏸️ Parziale (1/3)",
+        "2": "2024-01-02 - Set2 (Avg: 70.00%) - presetA",
+    }
+
+
+def test_get_result_statistics_uses_stored_values(mocker, in_memory_db):
+    _insert_sample(mocker)
+    mocker.patch("models.test_result.result_stats_row", side_effect=AssertionError)
+
+    viewed = controller.get_results_by_ids(["3"])
+    stats = controller.get_result_statistics(viewed)
+    assert stats["3"]["question_count"] == 0
+
+
+def test_get_result_statistics_computes_partial_runs(mocker, in_memory_db):
+    _insert_sample(mocker)
+    partial_df = pd.DataFrame(
+        [{"id": "run1", "set_id": "10", "timestamp": "t",
+          "results": {"questions": {"q1": {"evaluation": {"score": 50}}}}}]
+    )
+
+    stats = controller.get_result_statistics(partial_df)
+    assert stats["run1"]["avg_score"] == 50
+    assert stats["run1"]["category_stats"] == {
+        "N/A": {"count": 1, "avg_score": 50.0, "avg_similarity": 0.0,
+                "avg_correctness": 0.0, "avg_completeness": 0.0}
+    }
@@ -0,0 +1,52 @@
+from collections import Counter
+
+import pytest
+
+from utils.sampling import SamplingConfig, bootstrap_ci, sample_order
+
+
+def test_sample_order_is_a_seeded_permutation():
+    ids = [str(i) for i in range(50)]
+
+    order = sample_order(ids, seed=1)
+    assert sorted(order, key=int) == ids
+    assert order != ids
+    assert sample_order(ids, seed=1) == order
+
+
+def test_stratified_order_keeps_category_proportions_in_every_prefix():
+    categories = {str(i): "A" if i < 80 else "B" for i in range(100)}
+
+    order = sample_order(list(categories), categories, seed=3)
+    assert sorted(order, key=int) == sorted(categories, key=int)
+    for size in (10, 25, 50):
+        counts = Counter(categories[q] for q in order[:size])
+        assert abs(counts["B"] - size * 0.2) <= 1
+
+
+def test_bootstrap_ci_narrows_with_more_samples():
+    low, high = bootstrap_ci([50, 50, 50], seed=0)
+    assert low == high == 50
+
+    small = bootstrap_ci([0, 100] * 5, seed=0)
+    large = bootstrap_ci([0, 100] * 200, seed=0)
+    assert small[0] < 50 < small[1]
+    assert large[1] - large[0] < small[1] - small[0]
+    assert bootstrap_ci([]) == (0.0, 0.0)
+
+
+def test_stratified_bootstrap_keeps_strata_sizes():
+    scores = [0] * 10 + [100] * 10
+    strata = ["A"] * 10 + ["B"] * 10
+
+    assert bootstrap_ci(scores, strata=strata, seed=0) == (50.0, 50.0)
+
+
+def test_sampling_config_validation():
+    with pytest.raises(ValueError):
+        SamplingConfig(ci_width=0)
+    with pytest.raises(ValueError):
+        SamplingConfig(confidence=1.5)
+    with pytest.raises(ValueError):
+        SamplingConfig(max_questions=0)
+    assert SamplingConfig(seed=4).to_dict()["seed"] == 4
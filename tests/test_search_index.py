@@ -0,0 +1,79 @@
+from utils.search_index import InvertedIndex, tokenize
+
+
+def _index():
+    index = InvertedIndex({"domanda": 2.0, "risposta_attesa": 1.0, "categoria": 1.0})
+    index.rebuild(
+        [
+            {
+                "id": "1",
+                "domanda": "Qual è la capitale della Francia?",
+                "risposta_attesa": "Parigi",
+                "categoria": "Geografia",
+            },
+            {
+                "id": "2",
+                "domanda": "Chi ha scritto l'Amleto?",
+                "risposta_attesa": "Shakespeare",
+                "categoria": "Letteratura",
+            },
+            {
+                "id": "3",
+                "domanda": "Città più popolosa della Francia",
+                "risposta_attesa": "Parigi è la capitale",
+                "categoria": "Geografia",
+            },
+        ]
+    )
+    return index
+
+
+def test_tokenize_normalizes_case_and_accents():
+    assert tokenize("Perché È così?") == ["perche", "e", "cosi"]
+    assert tokenize(None) == []
+
+
+def test_search_ranks_by_field_weight_and_terms():
+    index = _index()
+
+    ranked = index.search("capitale francia")
+    assert [doc for doc, _ in ranked] == ["1", "3"]
+    assert ranked[0][1] > ranked[1][1]
+
+    assert {doc for doc, _ in index.search("parigi")} == {"1", "3"}
+    assert index.search("inesistente") == []
+    assert index.search("   ") == []
+
+
+def test_search_prefix_and_filter():
+    index = _index()
+
+    assert [doc for doc, _ in index.search("shakesp")] == ["2"]
+    assert [doc for doc, _ in index.search("francia", where={"categoria": "Letteratura"})] == []
+    assert len(index.search("capitale", limit=1)) == 1
+
+
+def test_incremental_updates():
+    index = _index()
+
+    index.upsert(
+        [
+            {
+                "id": "2",
+                "domanda": "Capitale del Giappone?",
+                "risposta_attesa": "Tokyo",
+                "categoria": "Geografia",
+            }
+        ]
+    )
+    assert index.search("shakespeare") == []
+    assert "2" in [doc for doc, _ in index.search("giappone")]
+
+    index.remove(["1", "3"])
+    assert [doc for doc, _ in index.search("capitale")] == ["2"]
+    assert len(index) == 1
+
+    index.clear()
+    assert not index.built
+    index.upsert([{"id": "9", "domanda": "x"}])
+    assert len(index) == 0
@@ -7,7 +7,13 @@ import pytest
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from controllers.test_controller import import_results_action, run_test
+from controllers.test_controller import import_results_action, resume_test, run_matrix, run_test
+from models.question import Question
+from models.question_set import QuestionSet
+from models.test_matrix import TestMatrix
+from models.test_result import TestResult
+from utils.sampling import SamplingConfig
+from models.test_run import TestRun
 
 
 def test_import_results_action_no_file(mocker):
@@ -32,7 +38,7 @@ def test_import_results_action_failure(mocker):
     mock_load_results.assert_not_called()
 
 
-def test_run_test_success(mocker):
+def test_run_test_success(mocker, in_memory_db):
     mock_load_all = mocker.patch("controllers.test_controller.Question.load_all")
     mock_gen = mocker.patch("controllers.test_controller.generate_answer")
     mock_eval = mocker.patch("controllers.test_controller.evaluate_answer")
@@ -61,7 +67,38 @@ def test_run_test_success(mocker):
     assert res["results"]["1"]["actual_answer"] == "Ans"
 
 
-def test_run_test_generation_and_evaluation_errors(mocker):
+def test_run_test_records_generation_usage(mocker, in_memory_db):
+    mocker.patch(
+        "controllers.test_controller.Question.load_all",
+        return_value=[
+            SimpleNamespace(id="1", domanda="Q1", risposta_attesa="A"),
+            SimpleNamespace(id="2", domanda="Q2", risposta_attesa="A"),
+        ],
+    )
+
+    def fake_generate(question, client_config, use_cache=False, stats=None):
+        if question == "Q1":
+            stats.update(latency=0.12345, tokens=30)
+        return "Ans"
+
+    mocker.patch("controllers.test_controller.generate_answer", side_effect=fake_generate)
+    mocker.patch(
+        "controllers.test_controller.evaluate_answer",
+        return_value={"score": 50, "explanation": "ok"},
+    )
+    mocker.patch("controllers.test_controller.TestResult.add_and_refresh", return_value="rid")
+    mocker.patch(
+        "controllers.test_controller.TestResult.load_all_df", return_value=pd.DataFrame()
+    )
+
+    res = run_test("set1", "name", ["1", "2"], {}, {})
+
+    assert res["results"]["1"]["latency"] == 0.123
+    assert res["results"]["1"]["tokens"] == 30
+    assert "latency" not in res["results"]["2"] and "tokens" not in res["results"]["2"]
+
+
+def test_run_test_generation_and_evaluation_errors(mocker, in_memory_db):
     mock_load_all = mocker.patch("controllers.test_controller.Question.load_all")
     mock_gen = mocker.patch("controllers.test_controller.generate_answer")
     mock_eval = mocker.patch("controllers.test_controller.evaluate_answer")
@@ -93,6 +130,43 @@ def test_run_test_generation_and_evaluation_errors(mocker):
     assert isinstance(res["results_df"], pd.DataFrame)
 
 
+def test_run_test_async_path(mocker, in_memory_db):
+    mock_load_all = mocker.patch("controllers.test_controller.Question.load_all")
+    mock_gen = mocker.patch(
+        "controllers.test_controller.generate_answer_async", new_callable=mocker.AsyncMock
+    )
+    mock_eval = mocker.patch(
+        "controllers.test_controller.evaluate_answer_async", new_callable=mocker.AsyncMock
+    )
+    mock_sync_gen = mocker.patch("controllers.test_controller.generate_answer")
+    mocker.patch(
+        "controllers.test_controller.TestResult.add_and_refresh", return_value="rid"
+    )
+    mocker.patch(
+        "controllers.test_controller.TestResult.load_all_df",
+        return_value=pd.DataFrame(),
+    )
+    mock_load_all.return_value = [
+        SimpleNamespace(id="1", domanda="Q1", risposta_attesa="A1"),
+        SimpleNamespace(id="2", domanda="Q2", risposta_attesa="A2"),
+    ]
+    mock_gen.side_effect = lambda question, cfg, **kwargs: f"ans-{question}"
+    mock_eval.return_value = {
+        "score": 70,
+        "explanation": "ok",
+        "similarity": 70,
+        "correctness": 70,
+        "completeness": 70,
+    }
+
+    res = run_test("set1", "name", ["2", "1"], {"max_concurrency": 2}, {}, use_async=True)
+
+    assert list(res["results"].keys()) == ["2", "1"]
+    assert res["results"]["1"]["actual_answer"] == "ans-Q1"
+    assert res["avg_score"] == 70
+    mock_sync_gen.assert_not_called()
+
+
 def test_export_results_action(mocker, tmp_path):
     mock_export = mocker.patch(
         "controllers.test_controller.test_result_importer.export_to_file"
@@ -102,3 +176,374 @@ def test_export_results_action(mocker, tmp_path):
 
     export_results_action(dest)
     mock_export.assert_called_once_with(dest)
+
+
+def test_run_test_checkpoints_each_question(mocker, in_memory_db):
+    mocker.patch(
+        "controllers.test_controller.Question.load_all",
+        return_value=[
+            SimpleNamespace(id="1", domanda="Q1", risposta_attesa="A1"),
+            SimpleNamespace(id="2", domanda="Q2", risposta_attesa="A2"),
+        ],
+    )
+    mocker.patch(
+        "controllers.test_controller.generate_answer",
+        side_effect=["ans1", Exception("gen fail")],
+    )
+    mocker.patch(
+        "controllers.test_controller.evaluate_answer",
+        return_value={
+            "score": 80,
+            "explanation": "ok",
+            "similarity": 80,
+            "correctness": 80,
+            "completeness": 80,
+        },
+    )
+    mocker.patch(
+        "controllers.test_controller.TestResult.add_and_refresh",
+        side_effect=Exception("db down"),
+    )
+
+    assert run_test("set1", "name", ["1", "2"], {}, {}) == {}
+
+    (run,) = TestRun.load_incomplete()
+    assert set(TestRun.load_items(run.id)) == {"1", "2"}
+    assert set(TestRun.load_items(run.id, include_failed=False)) == {"1"}
+
+
+def test_resume_test_runs_only_missing_questions(mocker, in_memory_db):
+    mocker.patch(
+        "controllers.test_controller.Question.load_all",
+        return_value=[
+            SimpleNamespace(id="1", domanda="Q1", risposta_attesa="A1"),
+            SimpleNamespace(id="2", domanda="Q2", risposta_attesa="A2"),
+        ],
+    )
+    mock_gen = mocker.patch(
+        "controllers.test_controller.generate_answer", return_value="ans2"
+    )
+    mocker.patch(
+        "controllers.test_controller.evaluate_answer",
+        return_value={
+            "score": 40,
+            "explanation": "ok",
+            "similarity": 40,
+            "correctness": 40,
+            "completeness": 40,
+        },
+    )
+    mocker.patch(
+        "controllers.test_controller.TestResult.add_and_refresh", return_value="rid"
+    )
+    mocker.patch(
+        "controllers.test_controller.TestResult.load_all_df",
+        return_value=pd.DataFrame(),
+    )
+    run = TestRun.create("set1", "name", ["1", "2"], {}, {})
+    TestRun.save_item(
+        run.id,
+        "1",
+        {
+            "question": "Q1",
+            "expected_answer": "A1",
+            "actual_answer": "ans1",
+            "evaluation": {"score": 100},
+        },
+    )
+
+    res = resume_test(run.id, {}, {})
+
+    mock_gen.assert_called_once()
+    assert mock_gen.call_args.args[0] == "Q2"
+    assert list(res["results"].keys()) == ["1", "2"]
+    assert res["avg_score"] == 70
+    assert TestRun.get(run.id).status == "completed"
+    assert resume_test(run.id, {}, {}) == {}
+
+
+def test_run_test_batched_evaluation(mocker, in_memory_db):
+    mocker.patch(
+        "controllers.test_controller.Question.load_all",
+        return_value=[
+            SimpleNamespace(id=str(i), domanda=f"Q{i}", risposta_attesa="A")
+            for i in range(1, 4)
+        ],
+    )
+    mocker.patch(
+        "controllers.test_controller.generate_answer",
+        side_effect=lambda question, cfg, **kwargs: f"ans-{question}",
+    )
+    mock_single = mocker.patch("controllers.test_controller.evaluate_answer")
+    mock_batch = mocker.patch(
+        "controllers.test_controller._evaluate_batch_outcomes",
+        side_effect=lambda triples, cfg, use_cache: [
+            ({"score": 50, "explanation": t[2]}, None) for t in triples
+        ],
+    )
+    mocker.patch(
+        "controllers.test_controller.TestResult.add_and_refresh", return_value="rid"
+    )
+    mocker.patch(
+        "controllers.test_controller.TestResult.load_all_df",
+        return_value=pd.DataFrame(),
+    )
+
+    res = run_test("set1", "name", ["1", "2", "3"], {}, {}, evaluation_batch_size=2)
+
+    assert list(res["results"]) == ["1", "2", "3"]
+    assert res["results"]["3"]["evaluation"]["explanation"] == "ans-Q3"
+    assert res["avg_score"] == 50
+    assert sorted(len(c.args[0]) for c in mock_batch.call_args_list) == [1, 2]
+    mock_single.assert_not_called()
+
+
+def test_run_matrix_runs_every_combination(mocker, shared_db):
+    for q_id in ("1", "2", "3"):
+        Question.add(f"Q{q_id}", f"A{q_id}", "", q_id)
+    set_a = QuestionSet.create("Set A", ["1", "2"])
+    set_b = QuestionSet.create("Set B", ["2", "3"])
+    load_all = mocker.patch("controllers.test_controller.Question.load_all")
+    load_by_ids = mocker.spy(Question, "load_by_ids")
+    scores = {"fast": 40, "smart": 90}
+
+    def fake_generate(question, client_config, **kwargs):
+        return client_config["name"]
+
+    def fake_evaluate(question, expected, actual, client_config, **kwargs):
+        score = scores.get(actual, 0)
+        return {
+            "score": score,
+            "explanation": "ok",
+            "similarity": score,
+            "correctness": score,
+            "completeness": score,
+        }
+
+    mocker.patch("controllers.test_controller.generate_answer", side_effect=fake_generate)
+    mocker.patch("controllers.test_controller.evaluate_answer", side_effect=fake_evaluate)
+    progress = mocker.Mock()
+
+    res = run_matrix(
+        [set_a, set_b],
+        [{"name": "fast", "model": "m1"}, {"name": "smart", "model": "m2"}],
+        {"name": "judge", "model": "m3"},
+        use_cache=False,
+        progress=progress,
+        max_parallel_runs=2,
+    )
+
+    load_all.assert_not_called()
+    load_by_ids.assert_called_once()
+    summary = res["summary"]
+    assert len(res["result_ids"]) == 4 and summary["failed"] == 0
+    assert {c["avg_score"] for c in summary["combinations"]} == {40, 90}
+    assert summary["best_by_set"][set_a]["generation_preset"] == "smart"
+    assert summary["best_by_set"][set_b]["avg_score"] == 90
+    assert progress.call_args.args == (None, 8, 8)
+
+    saved = TestResult.load_by_ids(res["result_ids"])
+    assert len(saved) == 4
+    assert {r["matrix_id"] for r in saved["results"]} == {res["matrix_id"]}
+    assert {r["generation_preset"] for r in saved["results"]} == {"fast", "smart"}
+    matrix = TestMatrix.get(res["matrix_id"])
+    assert matrix.status == "completed"
+    assert sorted(matrix.result_ids) == sorted(res["result_ids"])
+    assert matrix.generation_presets == ["fast", "smart"]
+
+
+def test_run_matrix_reports_failed_combinations(mocker, shared_db):
+    Question.add("Q1", "A1", "", "1")
+    set_id = QuestionSet.create("Set", ["1"])
+    mocker.patch("controllers.test_controller.generate_answer", return_value="ans")
+    mocker.patch(
+        "controllers.test_controller.evaluate_answer",
+        return_value={"score": 70, "explanation": "ok"},
+    )
+    add = TestResult.add
+
+    def flaky_add(set_id, data):
+        if data["generation_preset"] == "broken":
+            raise RuntimeError("db down")
+        return add(set_id, data)
+
+    mocker.patch("controllers.test_controller.TestResult.add", side_effect=flaky_add)
+
+    res = run_matrix([set_id], [{"name": "ok"}, {"name": "broken"}], {"name": "judge"})
+
+    ok, broken = res["summary"]["combinations"]
+    assert ok["result_id"] and ok["error"] is None
+    assert broken["result_id"] is None and "db down" in broken["error"]
+    assert res["result_ids"] == [ok["result_id"]]
+    assert TestMatrix.get(res["matrix_id"]).status == "completed"
+
+    assert run_matrix(["missing"], [{"name": "ok"}], {"name": "judge"}) == {}
+    assert run_matrix([set_id], [], {"name": "judge"}) == {}
+
+
+def test_run_matrix_closes_matrix_as_failed_on_unexpected_errors(mocker, shared_db):
+    Question.add("Q1", "A1", "", "1")
+    set_id = QuestionSet.create("Set", ["1"])
+    mocker.patch("controllers.test_controller.generate_answer", return_value="ans")
+    mocker.patch(
+        "controllers.test_controller.evaluate_answer",
+        return_value={"score": 70, "explanation": "ok"},
+    )
+    mocker.patch(
+        "controllers.test_controller._matrix_summary", side_effect=RuntimeError("boom")
+    )
+
+    assert run_matrix([set_id], [{"name": "ok"}], {"name": "judge"}) == {}
+
+    (matrix,) = TestMatrix.list_recent()
+    assert matrix.status == "failed" and matrix.completed_at
+    assert "boom" in matrix.summary["error"]
+
+
+def _sampled_questions(mocker, count):
+    mocker.patch(
+        "controllers.test_controller.Question.load_all",
+        return_value=[
+            SimpleNamespace(
+                id=str(i), domanda=f"Q{i}", risposta_attesa="A", categoria="A" if i % 4 else "B"
+            )
+            for i in range(count)
+        ],
+    )
+    add = mocker.patch(
+        "controllers.test_controller.TestResult.add_and_refresh", return_value="rid"
+    )
+    mocker.patch(
+        "controllers.test_controller.TestResult.load_all_df", return_value=pd.DataFrame()
+    )
+    return add
+
+
+def test_run_test_sampling_stops_when_interval_is_narrow(mocker, in_memory_db):
+    add = _sampled_questions(mocker, 200)
+    mock_gen = mocker.patch("controllers.test_controller.generate_answer", return_value="ans")
+    mocker.patch(
+        "controllers.test_controller.evaluate_answer",
+        side_effect=lambda q, *args, **kwargs: {
+            "score": 70 if int(q[1:]) % 2 else 80,
+            "explanation": "ok",
+        },
+    )
+    progress = mocker.Mock()
+    sampling = SamplingConfig(ci_width=8, min_questions=10, step=10, stratify=True, seed=7)
+
+    res = run_test("set1", "name", [str(i) for i in range(200)], {}, {}, progress=progress, sampling=sampling)
+
+    info = add.call_args.args[1]["sampling"]
+    assert mock_gen.call_count == len(res["results"]) == info["sample_size"] == 10
+    assert info["population_size"] == 200 and info["stopped_early"] is True
+    assert info["ci_low"] <= res["avg_score"] <= info["ci_high"]
+    assert info["ci_width"] <= 8 and info["settings"]["stratify"] is True
+    assert progress.call_args.args[1:] == (10, 10)
+    assert len(TestRun.get(res["run_id"]).question_ids) == 200
+
+
+def test_run_test_sampling_without_results_is_not_an_early_stop(mocker, in_memory_db):
+    add = _sampled_questions(mocker, 50)
+    blocks = iter(
+        [
+            lambda items: {
+                q_id: {"evaluation": {"score": 100 * (i % 2)}} for i, (q_id, _, _) in enumerate(items)
+            },
+            lambda items: {},
+        ]
+    )
+    mocker.patch(
+        "controllers.test_controller._execute_questions",
+        side_effect=lambda items, *args, **kwargs: next(blocks)(items),
+    )
+    sampling = SamplingConfig(ci_width=1, min_questions=5, step=5, seed=1)
+
+    run_test("set1", "name", [str(i) for i in range(50)], {}, {}, sampling=sampling)
+
+    info = add.call_args.args[1]["sampling"]
+    assert info["sample_size"] == 5
+    assert info["stopped_early"] is False and info["converged"] is False
+    assert info["incomplete"] is True
+
+
+def test_run_test_sampling_respects_max_questions(mocker, in_memory_db):
+    add = _sampled_questions(mocker, 50)
+    mocker.patch("controllers.test_controller.generate_answer", return_value="ans")
+    scores = iter([0, 100] * 50)
+    mocker.patch(
+        "controllers.test_controller.evaluate_answer",
+        side_effect=lambda *args, **kwargs: {"score": next(scores), "explanation": "ok"},
+    )
+    sampling = SamplingConfig(ci_width=1, min_questions=5, step=5, max_questions=12, seed=1)
+
+    res = run_test("set1", "name", [str(i) for i in range(50)], {}, {}, sampling=sampling)
+
+    info = add.call_args.args[1]["sampling"]
+    assert len(res["results"]) == info["sample_size"] == 12
+    assert info["stopped_early"] is False
+    assert info["ci_width"] > 1
+
+
+def test_resume_test_continues_sampled_run(mocker, in_memory_db):
+    add = _sampled_questions(mocker, 200)
+    mock_gen = mocker.patch("controllers.test_controller.generate_answer", return_value="ans")
+    mocker.patch(
+        "controllers.test_controller.evaluate_answer",
+        side_effect=lambda q, *args, **kwargs: {
+            "score": 70 if int(q[1:]) % 2 else 80,
+            "explanation": "ok",
+        },
+    )
+    sampling = SamplingConfig(ci_width=8, min_questions=10, step=10, seed=7)
+    order = [str(i) for i in reversed(range(200))]
+    run = TestRun.create(
+        "set1", "name", order, {}, {}, sampling={**sampling.to_dict(), "population_size": 300}
+    )
+    for q_id in order[:5]:
+        TestRun.save_item(
+            run.id,
+            q_id,
+            {"question": f"Q{q_id}", "evaluation": {"score": 70 if int(q_id) % 2 else 80}},
+        )
+
+    res = resume_test(run.id, {}, {})
+
+    info = add.call_args.args[1]["sampling"]
+    assert mock_gen.call_count == 5
+    assert list(res["results"]) == order[:10]
+    assert info["sample_size"] == 10 and info["population_size"] == 300
+    assert info["stopped_early"] is True and info["ci_width"] <= 8
+    assert info["settings"] == sampling.to_dict()
+    assert TestRun.get(run.id).status == "completed"
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_run_test_logs_cache_stats_of_the_run(mocker, shared_db, caplog, use_async):
+    import json
+    import logging
+
+    for q_id in ("1", "2"):
+        Question.add(f"Q{q_id}", f"A{q_id}", "", q_id)
+
+    def create(**request):
+        content = (
+            json.dumps({"score": 80, "explanation": "ok", "similarity": 80, "correctness": 80, "completeness": 80})
+            if "response_format" in request
+            else "risposta"
+        )
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    client = mocker.patch("utils.openai_client.get_openai_client").return_value
+    client.chat.completions.create.side_effect = create
+    async_client = mocker.patch("utils.openai_client.get_async_openai_client").return_value
+    async_client.chat.completions.create = mocker.AsyncMock(side_effect=create)
+    gen = {"api_key": "k", "temperature": 0}
+
+    with caplog.at_level(logging.INFO, logger="controllers.test_controller"):
+        for _ in range(2):
+            run_test("set1", "name", ["1", "2"], gen, {"api_key": "k"}, use_async=use_async)
+
+    logged = [r.getMessage() for r in caplog.records if "Cache delle risposte" in r.getMessage()]
+    assert "0 hit, 4 miss" in logged[0]
+    assert "4 hit, 0 miss" in logged[1]
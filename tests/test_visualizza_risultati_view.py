@@ -16,18 +16,29 @@ def visualizza_risultati(monkeypatch):
 
     monkeypatch.setattr(
         controllers,
-        "get_results",
+        "get_result_summaries",
+        lambda *_a, **_k: {
+            "summaries_df": pd.DataFrame([{"id": 1, "set_id": 1, "timestamp": "t"}]),
+            "total": 1,
+            "page": 1,
+            "page_count": 1,
+        },
+    )
+    monkeypatch.setattr(
+        controllers,
+        "get_results_by_ids",
         lambda *_a, **_k: pd.DataFrame(
             [{"id": 1, "set_id": 1, "timestamp": "t", "results": {}}]
         ),
     )
+    monkeypatch.setattr(controllers, "get_result_statistics", lambda *_a: {})
     monkeypatch.setattr(
         controllers, "load_sets", lambda: pd.DataFrame([{ "id": 1, "name": "s" }])
     )
-    monkeypatch.setattr(controllers, "list_set_names", lambda *_a: ["s"])
-    monkeypatch.setattr(controllers, "list_model_names", lambda *_a: ["m"])
+    monkeypatch.setattr(controllers, "list_result_set_names", lambda *_a: ["s"])
+    monkeypatch.setattr(controllers, "list_result_model_names", lambda *_a: ["m"])
     monkeypatch.setattr(
-        controllers, "prepare_select_options", lambda df, sets: {1: "r"}
+        controllers, "prepare_summary_options", lambda df, sets: {1: "r"}
     )
     monkeypatch.setattr(json, "dumps", lambda *a, **k: "{}")
 
@@ -115,7 +126,7 @@ class StopRender(Exception):
     pass
 
 
-def _setup(monkeypatch, visualizza_risultati):
+def _setup(monkeypatch, visualizza_risultati, loaded_ids=None):
     dummy_st = DummySt()
     monkeypatch.setattr(visualizza_risultati, "st", dummy_st)
     monkeypatch.setattr(visualizza_risultati, "add_page_header", lambda *a, **k: None)
@@ -126,12 +137,27 @@ def _setup(monkeypatch, visualizza_risultati):
     ])
     sets_df = pd.DataFrame([{"id": 1, "name": "s"}])
 
-    monkeypatch.setattr(visualizza_risultati, "get_results", lambda *_a, **_k: res_df)
+    summaries_df = pd.DataFrame([{"id": 1, "set_id": 1, "timestamp": "t"}])
+
+    def fake_get_results_by_ids(ids):
+        if loaded_ids is not None:
+            loaded_ids.append(list(ids))
+        return res_df
+
+    monkeypatch.setattr(
+        visualizza_risultati,
+        "get_result_summaries",
+        lambda *_a, **_k: {
+            "summaries_df": summaries_df, "total": 1, "page": 1, "page_count": 1
+        },
+    )
+    monkeypatch.setattr(visualizza_risultati, "get_results_by_ids", fake_get_results_by_ids)
+    monkeypatch.setattr(visualizza_risultati, "get_result_statistics", lambda *_a: {})
     monkeypatch.setattr(visualizza_risultati, "load_sets", lambda: sets_df)
-    monkeypatch.setattr(visualizza_risultati, "list_set_names", lambda *_a: ["s"])
-    monkeypatch.setattr(visualizza_risultati, "list_model_names", lambda *_a: ["m"])
+    monkeypatch.setattr(visualizza_risultati, "list_result_set_names", lambda *_a: ["s"])
+    monkeypatch.setattr(visualizza_risultati, "list_result_model_names", lambda *_a: ["m"])
     monkeypatch.setattr(
-        visualizza_risultati, "prepare_select_options", lambda df, sets: {1: "r"}
+        visualizza_risultati, "prepare_summary_options", lambda df, sets: {1: "r"}
     )
 
     def fake_add_section_title(*args, **kwargs):
@@ -167,7 +193,15 @@ def test_import_results_callback_success(monkeypatch, visualizza_risultati):
     assert dummy_st.session_state.import_results_error is False
     assert dummy_st.session_state.uploaded_results_file is None
     assert dummy_st.session_state.upload_results is None
-    assert isinstance(dummy_st.session_state.results, pd.DataFrame)
+    assert dummy_st.session_state.results_page == 1
+    assert "results" not in dummy_st.session_state
+
+
+def test_render_loads_only_selected_result(monkeypatch, visualizza_risultati):
+    loaded_ids = []
+    _setup(monkeypatch, visualizza_risultati, loaded_ids)
+
+    assert loaded_ids == [[1]]
 
 
 def test_import_results_callback_error(monkeypatch, visualizza_risultati):
@@ -1,41 +1,276 @@
-from functools import lru_cache
+"""Cache in memoria dei DataFrame usati dalle viste.
+
+Ogni tabella è mantenuta da un :class:`VersionedFrameCache`: il DataFrame viene
+caricato per intero al primo accesso e in seguito aggiornato applicando le
+singole modifiche (inserimenti, aggiornamenti, eliminazioni) come delta, senza
+rileggere l'intera tabella dal database dopo ogni scrittura.
+
+Le cache con un nome sono inoltre sincronizzate tra processi tramite
+:class:`~models.cache_version.CacheVersion`: ogni scrittura ne incrementa la
+versione condivisa e le modifiche fatte da altre repliche invalidano la sola
+cache interessata.
+"""
+
+import logging
+import threading
 from dataclasses import asdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Protocol, Tuple, TypeVar
+
 import pandas as pd
 
+from models.cache_version import CacheVersion
 from models.question import Question
 from models.question_set import QuestionSet
 from models.api_preset import APIPreset
-from models.test_result import TestResult
+from models.test_result import CATEGORY_ROW_COLUMNS, TestResult
+from utils.category_index import CategoryIndex
+from utils.result_analytics import ResultAnalytics
+from utils.search_index import InvertedIndex
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class FrameListener(Protocol):
+    """Struttura derivata mantenuta allineata ai delta di una cache."""
+
+    def upsert(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Aggiunge o sostituisce le righe complete indicate."""
+
+    def remove(self, keys: Iterable[Any]) -> None:
+        """Rimuove le righe con le chiavi indicate."""
+
+    def clear(self) -> None:
+        """Scarta la struttura, che verrà ricostruita al prossimo utilizzo."""
+
+
+class VersionedFrameCache:
+    """DataFrame in cache con numero di versione e aggiornamento tramite delta.
+
+    Ogni delta applicato incrementa ``version``. Chi modifica il database legge
+    la versione prima della scrittura e la passa come ``base_version``: se nel
+    frattempo è stato applicato un altro delta (o la cache è stata ricaricata)
+    l'ordine delle modifiche non è più garantito e la cache viene invalidata,
+    così che il successivo accesso ricarichi l'intera tabella.
+
+    L'istanza è richiamabile come le funzioni decorate con ``lru_cache`` che
+    sostituisce e ne espone anche ``cache_clear``. I DataFrame già restituiti
+    non vengono mai modificati: ogni delta produce un nuovo DataFrame.
+
+    Se viene indicato ``name`` ogni modifica è pubblicata agli altri processi
+    e, prima di ogni lettura, vengono applicate le invalidazioni ricevute.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], List[Dict[str, Any]]],
+        columns: List[str],
+        key: str = "id",
+        name: Optional[str] = None,
+    ) -> None:
+        self._loader = loader
+        self.columns = columns
+        self.key = key
+        self.name = name
+        self._frame: Optional[pd.DataFrame] = None
+        self._version = 0
+        self._lock = threading.RLock()
+        self._listeners: List[FrameListener] = []
+        if name is not None:
+            CacheVersion.subscribe(name, self.cache_clear)
+
+    def _publish(self) -> None:
+        if self.name is not None:
+            CacheVersion.publish(self.name)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def loaded(self) -> bool:
+        return self._frame is not None
+
+    def add_listener(self, listener: FrameListener) -> None:
+        """Registra una struttura da aggiornare a ogni delta o invalidazione.
+
+        I listener vengono notificati tenendo il lock della cache, con le
+        righe complete dopo l'applicazione del delta.
+        """
+        with self._lock:
+            self._listeners.append(listener)
 
+    def __call__(self) -> pd.DataFrame:
+        return self.with_frame(lambda frame: frame)
 
-@lru_cache(maxsize=1)
-def get_questions() -> pd.DataFrame:
-    data = [asdict(q) for q in Question.load_all()]
-    columns = ["id", "domanda", "risposta_attesa", "categoria"]
-    return pd.DataFrame(data, columns=columns)
+    def with_frame(self, fn: Callable[[pd.DataFrame], T]) -> T:
+        """Esegue ``fn`` sul DataFrame corrente senza che nel frattempo vengano applicati delta."""
+        if self.name is not None:
+            CacheVersion.poll()
+        with self._lock:
+            if self._frame is None:
+                self._frame = pd.DataFrame(self._loader(), columns=self.columns)
+            return fn(self._frame)
+
+    def cache_clear(self) -> None:
+        """Scarta il DataFrame: il prossimo accesso ricarica l'intera tabella."""
+        with self._lock:
+            self._frame = None
+            self._version += 1
+            for listener in self._listeners:
+                listener.clear()
+
+    def refresh(self) -> pd.DataFrame:
+        """Ricarica l'intera tabella e restituisce il nuovo DataFrame."""
+        self.cache_clear()
+        self._publish()
+        return self()
+
+    def _frame_for_delta(self, base_version: Optional[int]) -> Optional[pd.DataFrame]:
+        """Restituisce il DataFrame a cui applicare il delta, se possibile."""
+        if self._frame is None:
+            # Nulla da aggiornare: il prossimo accesso leggerà i dati aggiornati
+            self._version += 1
+            return None
+        if base_version is not None and base_version != self._version:
+            logger.debug(
+                "Versione della cache %s diversa da quella attesa %s: ricarico",
+                self._version,
+                base_version,
+            )
+            self.cache_clear()
+            return None
+        return self._frame
+
+    def upsert(
+        self, rows: Iterable[Dict[str, Any]], base_version: Optional[int] = None
+    ) -> None:
+        """Inserisce o aggiorna le righe indicate.
+
+        Per le righe già presenti vengono aggiornate solo le colonne fornite;
+        le righe nuove devono contenere tutte le colonne, altrimenti la cache
+        viene invalidata.
+        """
+        self._apply_upsert(list(rows), base_version)
+        self._publish()
+
+    def _apply_upsert(
+        self, rows: List[Dict[str, Any]], base_version: Optional[int]
+    ) -> None:
+        with self._lock:
+            current = self._frame_for_delta(base_version)
+            if current is None:
+                return
+            frame = current.copy(deep=False)
+            positions = {k: i for i, k in enumerate(frame[self.key].tolist())}
+            new_rows: List[Dict[str, Any]] = []
+            for row in rows:
+                pos = positions.get(row[self.key])
+                if pos is None:
+                    if any(col not in row for col in self.columns):
+                        self.cache_clear()
+                        return
+                    new_rows.append({col: row[col] for col in self.columns})
+                    continue
+                label = frame.index[pos]
+                for col, value in row.items():
+                    if col in self.columns and col != self.key:
+                        frame.at[label, col] = value
+            if new_rows:
+                additions = pd.DataFrame(new_rows, columns=self.columns)
+                frame = (
+                    additions
+                    if frame.empty
+                    else pd.concat([frame, additions], ignore_index=True)
+                )
+            self._frame = frame
+            self._version += 1
+            if self._listeners:
+                keys = [row[self.key] for row in rows]
+                changed = frame[frame[self.key].isin(keys)].to_dict(orient="records")
+                for listener in self._listeners:
+                    listener.upsert(changed)
+
+    def delete(
+        self, keys: Iterable[Any], base_version: Optional[int] = None
+    ) -> None:
+        """Rimuove le righe con le chiavi indicate."""
+        keys = list(keys)
+        with self._lock:
+            frame = self._frame_for_delta(base_version)
+            if frame is not None:
+                self._frame = frame[~frame[self.key].isin(keys)].reset_index(drop=True)
+                self._version += 1
+                for listener in self._listeners:
+                    listener.remove(keys)
+        self._publish()
+
+
+get_questions = VersionedFrameCache(
+    lambda: [asdict(q) for q in Question.load_all()],
+    ["id", "domanda", "risposta_attesa", "categoria"],
+    name="questions",
+)
 
 
 def refresh_questions() -> pd.DataFrame:
-    get_questions.cache_clear()
-    return get_questions()
+    return get_questions.refresh()
+
+
+# Indice di ricerca sulle domande, aggiornato con i delta di ``get_questions``
+question_search_index = InvertedIndex(
+    {"domanda": 2.0, "risposta_attesa": 1.0, "categoria": 1.0}
+)
+get_questions.add_listener(question_search_index)
 
 
-@lru_cache(maxsize=1)
-def get_question_sets() -> pd.DataFrame:
-    data = [asdict(s) for s in QuestionSet.load_all()]
-    columns = ["id", "name", "questions"]
-    return pd.DataFrame(data, columns=columns)
+def search_questions(
+    query: str, limit: Optional[int] = None, category: Optional[str] = None
+) -> List[Tuple[str, float]]:
+    """Cerca nelle domande e restituisce le coppie ``(id, punteggio)`` per rilevanza.
+
+    L'indice viene costruito al primo utilizzo dal DataFrame in cache.
+    """
+    get_questions.with_frame(
+        lambda frame: question_search_index.ensure_built(
+            lambda: frame.to_dict(orient="records")
+        )
+    )
+    where = {"categoria": category} if category is not None else None
+    return question_search_index.search(query, limit=limit, where=where)
+
+
+get_question_sets = VersionedFrameCache(
+    lambda: [asdict(s) for s in QuestionSet.load_all()],
+    ["id", "name", "questions"],
+    name="question_sets",
+)
 
 
 def refresh_question_sets() -> pd.DataFrame:
-    get_question_sets.cache_clear()
-    return get_question_sets()
+    return get_question_sets.refresh()
+
+
+# Indice delle categorie, aggiornato con i delta di domande e set
+category_index = CategoryIndex()
+get_questions.add_listener(category_index.questions_listener)
+get_question_sets.add_listener(category_index.sets_listener)
+
 
+def get_category_index() -> CategoryIndex:
+    """Restituisce l'indice delle categorie, costruendolo se necessario."""
+    get_questions.with_frame(
+        lambda questions: get_question_sets.with_frame(
+            lambda sets: category_index.ensure_built(questions, sets)
+        )
+    )
+    return category_index
 
-@lru_cache(maxsize=1)
-def get_api_presets() -> pd.DataFrame:
-    data = [asdict(p) for p in APIPreset.load_all()]
-    columns = [
+
+get_api_presets = VersionedFrameCache(
+    lambda: [asdict(p) for p in APIPreset.load_all()],
+    [
         "id",
         "name",
         "provider_name",
@@ -44,18 +279,35 @@ def get_api_presets() -> pd.DataFrame:
         "model",
         "temperature",
         "max_tokens",
-    ]
-    return pd.DataFrame(data, columns=columns)
+        "max_concurrency",
+        "requests_per_minute",
+        "tokens_per_minute",
+    ],
+    name="api_presets",
+)
 
 
 def refresh_api_presets() -> pd.DataFrame:
-    get_api_presets.cache_clear()
-    return get_api_presets()
+    return get_api_presets.refresh()
 
 
 def get_results() -> pd.DataFrame:
+    CacheVersion.poll()
     return TestResult.load_all_df()
 
 
 def refresh_results() -> pd.DataFrame:
     return TestResult.refresh_cache()
+
+
+# Aggregati dei risultati, sincronizzati a ogni modifica dei risultati
+result_analytics = ResultAnalytics(
+    TestResult.list_ids, TestResult.load_category_rows, CATEGORY_ROW_COLUMNS
+)
+TestResult.add_change_listener(result_analytics.mark_stale)
+
+
+def get_result_analytics() -> ResultAnalytics:
+    """Restituisce gli aggregati dei risultati dopo aver applicato le modifiche di altri processi."""
+    CacheVersion.poll()
+    return result_analytics
@@ -0,0 +1,256 @@
+"""Indice delle categorie di domande e set mantenuto in modo incrementale.
+
+L'indice associa a ogni categoria le domande che la usano e a ogni set il
+conteggio delle categorie delle sue domande. Viene aggiornato con i delta delle
+cache di domande e set (vedi :class:`utils.cache.VersionedFrameCache`), così
+che il filtro dei set per categoria si riduca a un'intersezione di insiemi.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set
+
+import pandas as pd
+
+# Categoria usata per le domande senza categoria o non trovate
+MISSING_CATEGORY = "N/A"
+
+
+def _category(value: Any) -> str:
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return MISSING_CATEGORY
+    return str(value)
+
+
+def _question_ids(value: Any) -> List[str]:
+    return [str(q) for q in value] if isinstance(value, list) else []
+
+
+class _Listener:
+    """Adatta un lato dell'indice all'interfaccia dei listener della cache."""
+
+    def __init__(self, index: "CategoryIndex", kind: str) -> None:
+        self._index = index
+        self._kind = kind
+
+    def upsert(self, rows: Iterable[Dict[str, Any]]) -> None:
+        if self._kind == "questions":
+            self._index.upsert_questions(rows)
+        else:
+            self._index.upsert_sets(rows)
+
+    def remove(self, keys: Iterable[Any]) -> None:
+        if self._kind == "questions":
+            self._index.remove_questions(keys)
+        else:
+            self._index.remove_sets(keys)
+
+    def clear(self) -> None:
+        self._index.clear()
+
+
+class CategoryIndex:
+    """Indice categoria → domande e set → categorie."""
+
+    def __init__(self) -> None:
+        self._questions: Dict[str, Dict[str, str]] = {}
+        self._by_category: Dict[str, Set[str]] = {}
+        self._set_questions: Dict[str, List[str]] = {}
+        self._question_sets: Dict[str, Set[str]] = {}
+        self._set_categories: Dict[str, Counter] = {}
+        self._sets_by_category: Dict[str, Set[str]] = {}
+        self._details: Dict[str, List[Dict[str, str]]] = {}
+        self._built = False
+        self._lock = threading.RLock()
+        self.questions_listener = _Listener(self, "questions")
+        self.sets_listener = _Listener(self, "sets")
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    # --- costruzione -----------------------------------------------------
+
+    def rebuild(
+        self,
+        questions: Iterable[Mapping[str, Any]],
+        sets: Iterable[Mapping[str, Any]],
+    ) -> None:
+        """Ricostruisce l'indice dalle righe di domande e set."""
+        with self._lock:
+            self._reset()
+            for row in questions:
+                self._store_question(row)
+            for row in sets:
+                self._store_set(str(row["id"]), _question_ids(row.get("questions")))
+            self._built = True
+
+    def ensure_built(self, questions: pd.DataFrame, sets: pd.DataFrame) -> None:
+        """Costruisce l'indice dai DataFrame in cache se non è già disponibile."""
+        with self._lock:
+            if not self._built:
+                self.rebuild(
+                    questions.to_dict(orient="records"), sets.to_dict(orient="records")
+                )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+            self._built = False
+
+    def _reset(self) -> None:
+        self._questions = {}
+        self._by_category = {}
+        self._set_questions = {}
+        self._question_sets = {}
+        self._set_categories = {}
+        self._sets_by_category = {}
+        self._details = {}
+
+    # --- domande ---------------------------------------------------------
+
+    def _store_question(self, row: Mapping[str, Any]) -> None:
+        q_id = str(row["id"])
+        category = _category(row.get("categoria"))
+        self._questions[q_id] = {
+            "domanda": str(row.get("domanda") or ""),
+            "categoria": category,
+        }
+        self._by_category.setdefault(category, set()).add(q_id)
+
+    def _unstore_question(self, q_id: str) -> None:
+        info = self._questions.pop(q_id, None)
+        if info is None:
+            return
+        members = self._by_category.get(info["categoria"])
+        if members is not None:
+            members.discard(q_id)
+            if not members:
+                del self._by_category[info["categoria"]]
+
+    def _question_category(self, q_id: str) -> str:
+        info = self._questions.get(q_id)
+        return info["categoria"] if info else MISSING_CATEGORY
+
+    def _refresh_sets_of(self, question_ids: Iterable[str]) -> None:
+        affected: Set[str] = set()
+        for q_id in question_ids:
+            affected |= self._question_sets.get(q_id, set())
+        for set_id in affected:
+            self._store_set(set_id, self._set_questions[set_id])
+
+    def upsert_questions(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        with self._lock:
+            if not self._built:
+                return
+            changed = []
+            for row in rows:
+                q_id = str(row["id"])
+                self._unstore_question(q_id)
+                self._store_question(row)
+                changed.append(q_id)
+            self._refresh_sets_of(changed)
+
+    def remove_questions(self, keys: Iterable[Any]) -> None:
+        with self._lock:
+            if not self._built:
+                return
+            removed = [str(k) for k in keys]
+            for q_id in removed:
+                self._unstore_question(q_id)
+            self._refresh_sets_of(removed)
+
+    # --- set -------------------------------------------------------------
+
+    def _store_set(self, set_id: str, question_ids: List[str]) -> None:
+        self._unstore_set(set_id)
+        self._set_questions[set_id] = question_ids
+        counts: Counter = Counter()
+        for q_id in question_ids:
+            self._question_sets.setdefault(q_id, set()).add(set_id)
+            counts[self._question_category(q_id)] += 1
+        self._set_categories[set_id] = counts
+        for category in counts:
+            self._sets_by_category.setdefault(category, set()).add(set_id)
+
+    def _unstore_set(self, set_id: str) -> None:
+        question_ids = self._set_questions.pop(set_id, None)
+        self._details.pop(set_id, None)
+        if question_ids is None:
+            return
+        for q_id in question_ids:
+            members = self._question_sets.get(q_id)
+            if members is not None:
+                members.discard(set_id)
+                if not members:
+                    del self._question_sets[q_id]
+        for category in self._set_categories.pop(set_id, Counter()):
+            members = self._sets_by_category.get(category)
+            if members is not None:
+                members.discard(set_id)
+                if not members:
+                    del self._sets_by_category[category]
+
+    def upsert_sets(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        with self._lock:
+            if not self._built:
+                return
+            for row in rows:
+                self._store_set(str(row["id"]), _question_ids(row.get("questions")))
+
+    def remove_sets(self, keys: Iterable[Any]) -> None:
+        with self._lock:
+            if not self._built:
+                return
+            for set_id in keys:
+                self._unstore_set(str(set_id))
+
+    # --- interrogazioni --------------------------------------------------
+
+    def categories(self) -> List[str]:
+        """Categorie delle domande esistenti, in ordine alfabetico."""
+        with self._lock:
+            return sorted(self._by_category)
+
+    def questions_in_category(self, category: str) -> Set[str]:
+        with self._lock:
+            return set(self._by_category.get(category, set()))
+
+    def set_categories(self, set_id: str) -> Set[str]:
+        with self._lock:
+            return set(self._set_categories.get(str(set_id), Counter()))
+
+    def sets_with_categories(self, categories: Iterable[str]) -> Set[str]:
+        """Set che contengono domande di tutte le ``categories`` indicate."""
+        with self._lock:
+            result: Optional[Set[str]] = None
+            for category in categories:
+                members = self._sets_by_category.get(category, set())
+                result = set(members) if result is None else result & members
+                if not result:
+                    return set()
+            return result if result is not None else set(self._set_questions)
+
+    def questions_detail(self, set_id: str) -> List[Dict[str, str]]:
+        """Dettagli delle domande del set nel formato di ``build_questions_detail``."""
+        set_id = str(set_id)
+        with self._lock:
+            details = self._details.get(set_id)
+            if details is None:
+                details = []
+                for q_id in self._set_questions.get(set_id, []):
+                    info = self._questions.get(q_id, {})
+                    details.append(
+                        {
+                            "id": q_id,
+                            "domanda": info.get("domanda", ""),
+                            "categoria": info.get("categoria", MISSING_CATEGORY),
+                        }
+                    )
+                self._details[set_id] = details
+            return details
+
+
+__all__ = ["MISSING_CATEGORY", "CategoryIndex"]
@@ -0,0 +1,154 @@
+"""Lettura e scrittura di dataset nei formati colonnari Parquet e Arrow IPC.
+
+I record vengono convertiti in ``RecordBatch`` di ``COLUMNAR_BATCH_SIZE`` righe
+e scritti uno alla volta, e in lettura i batch vengono restituiti uno alla
+volta: né il file né l'intera tabella devono stare in memoria. ``pyarrow`` è
+importato solo quando serve.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+__all__ = [
+    "COLUMNAR_FORMATS",
+    "import_pyarrow",
+    "columnar_format",
+    "iter_columnar_rows",
+    "write_columnar",
+]
+
+# Formato colonnare associato a ciascuna estensione supportata
+COLUMNAR_FORMATS = {".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow"}
+
+# Righe per ``RecordBatch`` in scrittura e in lettura
+COLUMNAR_BATCH_SIZE = 10_000
+
+# Righe esaminate al massimo per dedurre il tipo delle colonne ancora tutte nulle
+COLUMNAR_SCHEMA_SAMPLE_ROWS = 100_000
+
+
+def import_pyarrow() -> Any:
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ModuleNotFoundError as exc:  # pragma: no cover - dipende dall'ambiente
+        raise ValueError(
+            "I formati Parquet e Arrow richiedono pyarrow: installa le dipendenze "
+            "con 'pip install -r requirements.txt'"
+        ) from exc
+    return pyarrow
+
+
+def columnar_format(name: str) -> Optional[str]:
+    """Restituisce ``"parquet"`` o ``"arrow"`` per i nomi di file colonnari, altrimenti ``None``."""
+    return COLUMNAR_FORMATS.get(os.path.splitext(name)[1].lower())
+
+
+def _batches(
+    records: Iterable[Dict[str, Any]], schema: Any, batch_size: int
+) -> Iterator[Any]:
+    pa = import_pyarrow()
+    batch: List[Dict[str, Any]] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield pa.RecordBatch.from_pylist(batch, schema=schema)
+            batch = []
+    if batch:
+        yield pa.RecordBatch.from_pylist(batch, schema=schema)
+
+
+def _infer_schema(
+    batches: Iterator[Any], sample_rows: Optional[int] = None
+) -> Tuple[Any, List[Any]]:
+    """Deduce lo schema dai primi batch e restituisce anche i batch già letti.
+
+    Finché qualche colonna ha solo valori nulli (tipo ``null``) vengono letti
+    altri batch, fino a ``sample_rows`` righe (``COLUMNAR_SCHEMA_SAMPLE_ROWS``
+    se omesso); le colonne rimaste nulle diventano testuali, così che i
+    valori scalari successivi possano esservi convertiti.
+    """
+    pa = import_pyarrow()
+    if sample_rows is None:
+        sample_rows = COLUMNAR_SCHEMA_SAMPLE_ROWS
+    schema: Any = None
+    buffered: List[Any] = []
+    rows = 0
+    for batch in batches:
+        buffered.append(batch)
+        rows += batch.num_rows
+        schema = (
+            batch.schema
+            if schema is None
+            else pa.unify_schemas([schema, batch.schema], promote_options="permissive")
+        )
+        if rows >= sample_rows or not any(pa.types.is_null(f.type) for f in schema):
+            break
+    if schema is None:
+        return pa.schema([]), buffered
+    return (
+        pa.schema(
+            [f.with_type(pa.string()) if pa.types.is_null(f.type) else f for f in schema]
+        ),
+        buffered,
+    )
+
+
+def write_columnar(
+    records: Iterable[Dict[str, Any]],
+    destination: IO[bytes],
+    fmt: str,
+    schema: Any = None,
+    batch_size: int = COLUMNAR_BATCH_SIZE,
+) -> None:
+    """Scrive ``records`` su ``destination`` (file binario) in formato ``fmt``.
+
+    ``schema`` è uno schema ``pyarrow``; se omesso viene dedotto dai primi
+    batch (vedi :func:`_infer_schema`) e applicato ai successivi. Gli errori
+    di conversione di ``pyarrow`` vengono segnalati come ``ValueError``.
+    """
+    pa = import_pyarrow()
+    if fmt not in ("parquet", "arrow"):
+        raise ValueError(f"Formato colonnare non supportato: {fmt}")
+    try:
+        batches = _batches(records, schema, batch_size)
+        buffered: List[Any] = []
+        if schema is None:
+            schema, buffered = _infer_schema(batches)
+
+        if fmt == "parquet":
+            writer: Any = pa.parquet.ParquetWriter(destination, schema)
+        else:
+            writer = pa.ipc.new_file(destination, schema)
+        with writer:
+            for batch in itertools.chain(buffered, batches):
+                writer.write_batch(
+                    batch if batch.schema.equals(schema) else batch.cast(schema)
+                )
+    except pa.ArrowException as e:
+        raise ValueError(f"Impossibile scrivere i dati in formato {fmt}: {e}") from e
+
+
+def iter_columnar_rows(
+    file: IO[bytes], fmt: str, batch_size: int = COLUMNAR_BATCH_SIZE
+) -> Iterator[Dict[str, Any]]:
+    """Itera sulle righe di un file Parquet o Arrow IPC leggendolo un batch alla volta."""
+    pa = import_pyarrow()
+    try:
+        if fmt == "parquet":
+            batches: Iterable[Any] = pa.parquet.ParquetFile(file).iter_batches(
+                batch_size=batch_size
+            )
+        elif fmt == "arrow":
+            reader = pa.ipc.open_file(file)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        else:
+            raise ValueError(f"Formato colonnare non supportato: {fmt}")
+        for batch in batches:
+            yield from batch.to_pylist()
+    except pa.ArrowException as e:
+        raise ValueError(f"Il formato del file {fmt} non è valido") from e
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Any, IO, Union, final
+from typing import Any, IO, Iterable, Tuple, Union, final
 
 
 class ExportTemplate(ABC):
@@ -14,6 +14,34 @@ class ExportTemplate(ABC):
         """Raccoglie i dati correnti da esportare."""
         pass
 
+    def iter_data(self) -> Iterable[Any]:
+        """Restituisce i record da esportare.
+
+        L'implementazione predefinita usa :meth:`gather_data`; le sottoclassi
+        possono restituire un generatore per leggere i dati a blocchi durante
+        la scrittura.
+        """
+        return self.gather_data()
+
+    def iter_columnar_data(self) -> Iterable[Any]:
+        """Restituisce i record da esportare nei formati colonnari (Parquet, Arrow).
+
+        Per impostazione predefinita coincide con :meth:`iter_data`; le
+        sottoclassi possono appiattire le strutture annidate in colonne.
+        """
+        return self.iter_data()
+
+    def columnar_schema(self) -> Any:
+        """Schema ``pyarrow`` dei record colonnari, oppure ``None`` per dedurlo."""
+        return None
+
+    def _export_args(self, fmt: str) -> Tuple[Iterable[Any], Any]:
+        from utils.columnar_utils import COLUMNAR_FORMATS
+
+        if fmt in COLUMNAR_FORMATS.values():
+            return self.iter_columnar_data(), self.columnar_schema()
+        return self.iter_data(), None
+
     @final
     def export_to_file(self, destination: Union[str, IO[Any]]) -> None:
         """Esporta i dati raccolti su ``destination``.
@@ -25,10 +53,23 @@ class ExportTemplate(ABC):
         destination: Union[str, IO[Any]]
             Percorso del file di destinazione oppure file aperto in scrittura.
         """
-        from utils.file_writer_utils import write_dataset
+        from utils.file_writer_utils import dataset_format, write_dataset
+
+        data, schema = self._export_args(dataset_format(destination))
+        write_dataset(data, destination, schema=schema)
+
+    @final
+    def export_to_buffer(self, fmt: str = "json") -> IO[bytes]:
+        """Esporta i dati nel formato ``fmt`` in un file temporaneo binario.
+
+        Pensato per i download: il contenuto viene prodotto solo quando il
+        metodo è invocato e scritto a frammenti, riversandosi su disco oltre
+        una certa dimensione.
+        """
+        from utils.file_writer_utils import spool_dataset
 
-        data = self.gather_data()
-        write_dataset(data, destination)
+        data, schema = self._export_args(fmt)
+        return spool_dataset(data, fmt, schema=schema)
 
 
 __all__ = ["ExportTemplate"]
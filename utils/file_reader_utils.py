@@ -1,15 +1,21 @@
+import codecs
 import os
 import json
 import uuid
 from datetime import datetime
-from typing import IO, Any, Dict, Iterable, List, Tuple
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Tuple, cast
 
 import pandas as pd
 
+from utils.columnar_utils import columnar_format, iter_columnar_rows
+
 __all__ = [
     "read_questions",
+    "iter_question_chunks",
     "read_question_sets",
     "read_test_results",
+    "iter_test_result_chunks",
+    "iter_jsonl",
     "filter_new_rows",
 ]
 
@@ -17,6 +23,15 @@ REQUIRED_QUESTION_COLUMNS = ["domanda", "risposta_attesa"]
 REQUIRED_SET_COLUMNS = ["name", "id", "domanda", "risposta_attesa", "categoria"]
 REQUIRED_RESULT_COLUMNS = ["id", "set_id", "timestamp", "results"]
 
+# Estensioni riconosciute come JSON Lines (un record per riga)
+JSONL_EXTENSIONS = (".jsonl", ".ndjson")
+
+# Righe per blocco nella lettura incrementale delle domande e dei risultati
+QUESTION_CHUNK_SIZE = 5000
+RESULT_CHUNK_SIZE = 500
+# Caratteri letti per volta dai file JSON
+JSON_BLOCK_SIZE = 1 << 16
+
 
 def filter_new_rows(df: pd.DataFrame, existing_ids: Iterable[str]) -> Tuple[pd.DataFrame, int]:
     """Ritorna le righe di ``df`` il cui ``id`` non è in ``existing_ids``.
@@ -43,40 +58,12 @@ def filter_new_rows(df: pd.DataFrame, existing_ids: Iterable[str]) -> Tuple[pd.D
     return filtered, int(mask.sum())
 
 
-def read_questions(file: IO[str] | IO[bytes]) -> pd.DataFrame:
-    """Legge un file di domande (CSV o JSON) e restituisce un DataFrame normalizzato."""
-    if hasattr(file, "seek"):
-        file.seek(0)
-    file_extension = os.path.splitext(file.name)[1].lower()
-
-    if file_extension == ".csv":
-        try:
-            df = pd.read_csv(file)
-        except Exception as e:  # pragma: no cover - handled via ValueError
-            raise ValueError("Il formato del file csv non è valido") from e
-    elif file_extension == ".json":
-        try:
-            data = json.load(file)
-        except Exception as e:  # pragma: no cover - handled via ValueError
-            raise ValueError("Il formato del file json non è valido") from e
-        if isinstance(data, list):
-            df = pd.DataFrame(data)
-        elif isinstance(data, dict) and isinstance(data.get("questions"), list):
-            df = pd.DataFrame(data["questions"])
-        else:
-            raise ValueError(
-                "Il file JSON deve essere una lista di domande o contenere la chiave 'questions'."
-            )
-    else:  # pragma: no cover - supported formats only
-        raise ValueError("Formato file non supportato. Caricare un file CSV o JSON.")
-
-    if df is None or df.empty:
-        raise ValueError("Il file importato è vuoto o non contiene dati validi.")
-
+def _normalize_questions(df: pd.DataFrame) -> pd.DataFrame:
+    """Rinomina, valida e completa le colonne di un blocco di domande."""
     if "question" in df.columns and "domanda" not in df.columns:
-        df.rename(columns={"question": "domanda"}, inplace=True)
+        df = df.rename(columns={"question": "domanda"})
     if "expected_answer" in df.columns and "risposta_attesa" not in df.columns:
-        df.rename(columns={"expected_answer": "risposta_attesa"}, inplace=True)
+        df = df.rename(columns={"expected_answer": "risposta_attesa"})
 
     if not all(col in df.columns for col in REQUIRED_QUESTION_COLUMNS):
         raise ValueError(
@@ -99,8 +86,231 @@ def read_questions(file: IO[str] | IO[bytes]) -> pd.DataFrame:
     return df[["id", "domanda", "risposta_attesa", "categoria"]]
 
 
+class _JsonStream:
+    """Lettura incrementale di valori JSON da un file di testo o binario.
+
+    Il contenuto viene letto a blocchi di ``block_size`` caratteri e ogni
+    valore è decodificato con :meth:`json.JSONDecoder.raw_decode` non appena
+    è completo, così che in memoria resti solo il valore corrente.
+    """
+
+    def __init__(self, file: IO[str] | IO[bytes], block_size: int = JSON_BLOCK_SIZE) -> None:
+        self._file = file
+        self._block_size = block_size
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Legge il blocco successivo; restituisce ``False`` a fine file."""
+        if self._eof:
+            return False
+        block = self._file.read(self._block_size)
+        if isinstance(block, bytes):
+            text = self._utf8.decode(block, final=not block)
+        else:
+            text = block
+        if not block:
+            self._eof = True
+        if self._pos > self._block_size:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        self._buffer += text
+        return bool(block)
+
+    def peek(self) -> str:
+        """Restituisce il prossimo carattere non vuoto senza consumarlo ("" a fine file)."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos].isspace():
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                if self._pos == 0 and self._buffer[0] == "\ufeff":
+                    self._pos = 1
+                    continue
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Atteso '{char}' nel file JSON")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Decodifica il prossimo valore JSON completo."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # Un numero alla fine del buffer potrebbe proseguire nel blocco successivo
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def array_items(self) -> Iterator[Any]:
+        """Itera sugli elementi dell'array che inizia alla posizione corrente."""
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ",":
+                self._pos += 1
+                continue
+            self.expect("]")
+            return
+
+
+def _iter_json_questions(file: IO[str] | IO[bytes]) -> Iterator[Any]:
+    """Itera sulle domande di un file JSON (lista o oggetto con chiave ``questions``)."""
+    stream = _JsonStream(file)
+    first = stream.peek()
+    if first == "[":
+        yield from stream.array_items()
+        return
+    if first == "{":
+        stream.expect("{")
+        while stream.peek() != "}":
+            key = stream.value()
+            stream.expect(":")
+            if key == "questions" and stream.peek() == "[":
+                yield from stream.array_items()
+                return
+            stream.value()
+            if stream.peek() == ",":
+                stream.expect(",")
+    raise ValueError(
+        "Il file JSON deve essere una lista di domande o contenere la chiave 'questions'."
+    )
+
+
+def _iter_json_results(file: IO[str] | IO[bytes]) -> Iterator[Any]:
+    """Itera sui risultati di un file JSON (lista o singolo oggetto)."""
+    stream = _JsonStream(file)
+    if stream.peek() == "[":
+        yield from stream.array_items()
+        return
+    value = stream.value()
+    if not isinstance(value, dict):
+        raise ValueError(
+            "Il file JSON deve contenere un oggetto o una lista di risultati."
+        )
+    yield value
+
+
+def iter_jsonl(file: IO[str] | IO[bytes]) -> Iterator[Any]:
+    """Itera sui valori di un file JSON Lines (un valore per riga), una riga alla volta."""
+    for line in file:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def _record_chunks(records: Iterator[Any], chunk_size: int) -> Iterator[pd.DataFrame]:
+    batch: List[Dict[str, Any]] = []
+    for record in records:
+        if not isinstance(record, dict):
+            raise ValueError("Ogni elemento del file JSON deve essere un oggetto.")
+        batch.append(record)
+        if len(batch) >= chunk_size:
+            yield pd.DataFrame(batch)
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch)
+
+
+def _iter_chunks(
+    file: IO[str] | IO[bytes],
+    chunk_size: int,
+    json_records: Callable[[IO[str] | IO[bytes]], Iterator[Any]],
+    normalize: Callable[[pd.DataFrame], pd.DataFrame],
+) -> Iterator[pd.DataFrame]:
+    """Legge ``file`` (CSV, JSON, JSONL, Parquet o Arrow) a blocchi normalizzati con ``normalize``.
+
+    Gli errori di formato sono riportati come ``ValueError``; un file senza
+    righe produce l'errore di file vuoto.
+    """
+    if hasattr(file, "seek"):
+        file.seek(0)
+    file_extension = os.path.splitext(file.name)[1].lower()
+
+    chunks: Iterator[pd.DataFrame]
+    if file_extension == ".csv":
+        format_name = "csv"
+        try:
+            chunks = iter(pd.read_csv(file, chunksize=chunk_size))
+        except Exception as e:  # pragma: no cover - handled via ValueError
+            raise ValueError("Il formato del file csv non è valido") from e
+    elif file_extension == ".json":
+        format_name = "json"
+        chunks = _record_chunks(json_records(file), chunk_size)
+    elif file_extension in JSONL_EXTENSIONS:
+        format_name = "jsonl"
+        chunks = _record_chunks(iter_jsonl(file), chunk_size)
+    elif columnar_format(file.name) is not None:
+        format_name = cast(str, columnar_format(file.name))
+        chunks = _record_chunks(
+            iter_columnar_rows(cast(IO[bytes], file), format_name), chunk_size
+        )
+    else:  # pragma: no cover - supported formats only
+        raise ValueError(
+            "Formato file non supportato. Caricare un file CSV, JSON, JSONL, Parquet o Arrow."
+        )
+
+    empty = True
+    while True:
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            break
+        except ValueError as e:
+            if isinstance(e, json.JSONDecodeError) or format_name == "csv":
+                raise ValueError(f"Il formato del file {format_name} non è valido") from e
+            raise
+        except Exception as e:  # pragma: no cover - handled via ValueError
+            raise ValueError(f"Il formato del file {format_name} non è valido") from e
+        if chunk.empty:
+            continue
+        empty = False
+        yield normalize(chunk)
+
+    if empty:
+        raise ValueError("Il file importato è vuoto o non contiene dati validi.")
+
+
+def iter_question_chunks(
+    file: IO[str] | IO[bytes], chunk_size: int = QUESTION_CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """Legge un file di domande (CSV, JSON o JSONL) a blocchi di ``chunk_size`` righe.
+
+    Ogni blocco è normalizzato come in :func:`read_questions`; il file non
+    viene mai caricato interamente in memoria.
+
+    Raises
+    ------
+    ValueError
+        Se il file non è valido, non contiene domande o manca di colonne obbligatorie.
+    """
+    return _iter_chunks(file, chunk_size, _iter_json_questions, _normalize_questions)
+
+
+def read_questions(file: IO[str] | IO[bytes]) -> pd.DataFrame:
+    """Legge un file di domande (CSV, JSON o JSONL) e restituisce un DataFrame normalizzato."""
+    return pd.concat(list(iter_question_chunks(file)), ignore_index=True)
+
+
 def read_question_sets(file: IO[str] | IO[bytes]) -> List[Dict[str, Any]]:
-    """Legge un file di set di domande (CSV o JSON) e restituisce una lista di dizionari."""
+    """Legge un file di set di domande (CSV, JSON o JSONL) e restituisce una lista di dizionari."""
     if hasattr(file, "seek"):
         file.seek(0)
     file_extension = os.path.splitext(file.name)[1].lower()
@@ -150,39 +360,18 @@ def read_question_sets(file: IO[str] | IO[bytes]) -> List[Dict[str, Any]]:
             raise ValueError("Il formato del file json non è valido")
         return data
 
-    else:  # pragma: no cover - supported formats only
-        raise ValueError("Formato file non supportato. Caricare un file CSV o JSON.")
-
-
-def read_test_results(file: IO[str] | IO[bytes]) -> pd.DataFrame:
-    """Legge un file di risultati di test (CSV o JSON) e restituisce un DataFrame normalizzato."""
-    if hasattr(file, "seek"):
-        file.seek(0)
-    file_extension = os.path.splitext(file.name)[1].lower()
-
-    if file_extension == ".csv":
-        try:
-            df = pd.read_csv(file)
-        except Exception as e:  # pragma: no cover - handled via ValueError
-            raise ValueError("Il formato del file csv non è valido") from e
-    elif file_extension == ".json":
+    elif file_extension in JSONL_EXTENSIONS:
         try:
-            data = json.load(file)
-        except Exception as e:  # pragma: no cover - handled via ValueError
-            raise ValueError("Il formato del file json non è valido") from e
-        if isinstance(data, dict):
-            data = [data]
-        if not isinstance(data, list):
-            raise ValueError(
-                "Il file JSON deve contenere un oggetto o una lista di risultati."
-            )
-        df = pd.DataFrame(data)
+            return list(iter_jsonl(file))
+        except json.JSONDecodeError as e:
+            raise ValueError("Il formato del file jsonl non è valido") from e
+
     else:  # pragma: no cover - supported formats only
         raise ValueError("Formato file non supportato. Caricare un file CSV o JSON.")
 
-    if df is None or df.empty:
-        raise ValueError("Il file importato è vuoto o non contiene dati validi.")
 
+def _normalize_test_results(df: pd.DataFrame) -> pd.DataFrame:
+    """Completa e converte le colonne di un blocco di risultati di test."""
     if "id" not in df.columns:
         df["id"] = [str(uuid.uuid4()) for _ in range(len(df))]
     else:
@@ -216,3 +405,19 @@ def read_test_results(file: IO[str] | IO[bytes]) -> pd.DataFrame:
         df["results"] = df["results"].apply(_parse_results)
 
     return df[["id", "set_id", "timestamp", "results"]]
+
+
+def iter_test_result_chunks(
+    file: IO[str] | IO[bytes], chunk_size: int = RESULT_CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """Legge un file di risultati (CSV, JSON o JSONL) a blocchi di ``chunk_size`` righe.
+
+    Nei file JSONL ogni riga contiene un risultato, quindi anche storici molto
+    grandi vengono letti con memoria costante.
+    """
+    return _iter_chunks(file, chunk_size, _iter_json_results, _normalize_test_results)
+
+
+def read_test_results(file: IO[str] | IO[bytes]) -> pd.DataFrame:
+    """Legge un file di risultati di test (CSV, JSON o JSONL) e restituisce un DataFrame normalizzato."""
+    return pd.concat(list(iter_test_result_chunks(file)), ignore_index=True)
@@ -1,14 +1,37 @@
-"""Utility per la serializzazione di dataset in CSV o JSON."""
+"""Utility per la serializzazione di dataset in CSV, JSON, JSONL, Parquet o Arrow.
+
+I dati vengono serializzati a frammenti tramite generatori, così che né i
+record né il testo prodotto debbano stare interamente in memoria.
+"""
 
 from __future__ import annotations
 
+import io
 import json
 import os
-from typing import Any, IO, Union
+import tempfile
+from typing import Any, Dict, IO, Iterator, List, Mapping, Union, cast
 
 import pandas as pd
 
-__all__ = ["write_dataset"]
+from utils.columnar_utils import COLUMNAR_FORMATS, columnar_format, write_columnar
+
+__all__ = [
+    "write_dataset",
+    "dataset_format",
+    "iter_records",
+    "iter_serialized",
+    "spool_dataset",
+]
+
+# Righe di un DataFrame convertite in dizionari per volta durante la scrittura
+WRITE_CHUNK_SIZE = 1000
+
+JSONL_EXTENSIONS = (".jsonl", ".ndjson")
+EXPORT_FORMATS = ("csv", "json", "jsonl", "parquet", "arrow")
+
+# Byte tenuti in memoria dai file di esportazione prima di passare al disco
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
 
 
 def _ensure_dataframe(data: Any) -> pd.DataFrame:
@@ -18,34 +41,158 @@ def _ensure_dataframe(data: Any) -> pd.DataFrame:
     return pd.DataFrame(data)
 
 
-def write_dataset(data: Any, destination: Union[str, IO[str]]) -> None:
-    """Scrive ``data`` su ``destination`` in formato CSV o JSON.
+def iter_records(data: Any) -> Iterator[Dict[str, Any]]:
+    """Itera sui record di ``data`` senza materializzarli tutti insieme.
+
+    ``data`` può essere un ``DataFrame`` (convertito a blocchi di
+    ``WRITE_CHUNK_SIZE`` righe), un singolo dizionario o un iterabile di
+    dizionari, anche un generatore.
+    """
+    if isinstance(data, pd.DataFrame):
+        for start in range(0, len(data), WRITE_CHUNK_SIZE):
+            yield from data.iloc[start:start + WRITE_CHUNK_SIZE].to_dict(orient="records")
+    elif isinstance(data, Mapping):
+        yield dict(data)
+    else:
+        yield from data
+
+
+def _iter_csv(data: Any) -> Iterator[str]:
+    if isinstance(data, pd.DataFrame):
+        yield data.to_csv(index=False)
+        return
+    header = True
+    batch: List[Dict[str, Any]] = []
+    for record in iter_records(data):
+        batch.append(record)
+        if len(batch) >= WRITE_CHUNK_SIZE:
+            yield pd.DataFrame(batch).to_csv(index=False, header=header)
+            header = False
+            batch = []
+    if batch or header:
+        yield pd.DataFrame(batch).to_csv(index=False, header=header)
+
+
+def _iter_jsonl(data: Any) -> Iterator[str]:
+    for record in iter_records(data):
+        yield json.dumps(record, ensure_ascii=False, default=str) + "\n"
+
+
+def _iter_json(data: Any) -> Iterator[str]:
+    """Produce una lista JSON indentata un elemento alla volta.
+
+    Il risultato è identico a ``json.dump(list(records), indent=2)`` senza
+    costruire la lista completa in memoria.
+    """
+    if isinstance(data, Mapping):
+        yield json.dumps(data, ensure_ascii=False, indent=2)
+        return
+    first = True
+    for record in iter_records(data):
+        prefix = "[\n  " if first else ",\n  "
+        yield prefix + json.dumps(record, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+        first = False
+    yield "[]" if first else "\n]"
+
+
+def dataset_format(destination: Union[str, "os.PathLike[str]", IO[Any]]) -> str:
+    """Restituisce il formato (csv, json, jsonl, parquet o arrow) dedotto dall'estensione."""
+    if isinstance(destination, (str, os.PathLike)):
+        name = os.fspath(destination)
+    else:
+        name = getattr(destination, "name", "")
+    ext = os.path.splitext(name)[1].lower()
+    fmt = columnar_format(name) or ("jsonl" if ext in JSONL_EXTENSIONS else ext.lstrip("."))
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(
+            "Formato file non supportato. Usare estensione .csv, .json, .jsonl, .parquet o .arrow"
+        )
+    return fmt
+
+
+def iter_serialized(data: Any, fmt: str) -> Iterator[str]:
+    """Serializza ``data`` nel formato ``fmt`` (csv, json o jsonl) a frammenti di testo.
+
+    I record vengono letti da ``data`` solo mentre il generatore viene
+    consumato, quindi un iterabile pigro non viene mai materializzato.
+    """
+    if fmt == "csv":
+        return _iter_csv(data)
+    if fmt == "json":
+        return _iter_json(data)
+    if fmt == "jsonl":
+        return _iter_jsonl(data)
+    raise ValueError(f"Formato di esportazione non supportato: {fmt}")
+
+
+def spool_dataset(
+    data: Any, fmt: str, max_size: int = SPOOL_MAX_SIZE, schema: Any = None
+) -> IO[bytes]:
+    """Serializza ``data`` in un file binario pronto per il download.
+
+    Il contenuto resta in memoria fino a ``max_size`` byte, oltre viene
+    riversato su disco. Restituisce un ``io.BytesIO`` o, per i file
+    riversati, un ``io.BufferedReader`` sul file temporaneo: entrambi sono
+    accettati da ``st.download_button``. Il file è riposizionato all'inizio.
+    ``schema`` è lo schema ``pyarrow`` opzionale dei formati Parquet e Arrow.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=max_size)
+    try:
+        if fmt in COLUMNAR_FORMATS.values():
+            write_columnar(iter_records(data), cast(IO[bytes], spool), fmt, schema)
+        else:
+            for piece in iter_serialized(data, fmt):
+                spool.write(piece.encode("utf-8"))
+        size = spool.tell()
+        spool.seek(0)
+        if size <= max_size:
+            return io.BytesIO(spool.read())
+        # Nuovo descrittore sullo stesso file temporaneo, che resta
+        # disponibile finché il lettore restituito non viene chiuso
+        reader = os.fdopen(os.dup(spool.fileno()), "rb")
+    finally:
+        spool.close()
+    reader.seek(0)
+    return reader
+
+
+def write_dataset(
+    data: Any,
+    destination: Union[str, IO[Any]],
+    append: bool = False,
+    schema: Any = None,
+) -> None:
+    """Scrive ``data`` su ``destination`` in formato CSV, JSON, JSONL, Parquet o Arrow.
 
     Il formato viene determinato dall'estensione del file.
-    ``destination`` può essere un percorso o un file aperto in scrittura.
+    ``destination`` può essere un percorso o un file aperto in scrittura
+    (binario per Parquet e Arrow). ``data`` può essere un ``DataFrame``, una
+    lista o un iterabile di record, che vengono scritti un blocco alla volta.
+    Con ``append`` i record vengono aggiunti in coda a un file JSONL esistente;
+    ``schema`` è lo schema ``pyarrow`` opzionale dei formati colonnari.
     """
+    fmt = dataset_format(destination)
+    if append and fmt != "jsonl":
+        raise ValueError("L'aggiunta in coda è supportata solo per i file JSONL")
+    columnar = fmt in COLUMNAR_FORMATS.values()
+
     close_after = False
     if isinstance(destination, (str, os.PathLike)):
-        file_path = os.fspath(destination)
-        ext = os.path.splitext(file_path)[1].lower()
-        f: IO[str] = open(file_path, "w", encoding="utf-8", newline="")
+        path = os.fspath(destination)
+        if columnar:
+            f: IO[Any] = open(path, "wb")
+        else:
+            f = open(path, "a" if append else "w", encoding="utf-8", newline="")
         close_after = True
     else:
         f = destination
-        name = getattr(f, "name", "")
-        ext = os.path.splitext(name)[1].lower()
-
-    if ext == ".csv":
-        df = _ensure_dataframe(data)
-        df.to_csv(f, index=False)
-    elif ext == ".json":
-        if isinstance(data, pd.DataFrame):
-            payload = data.to_dict(orient="records")
-        else:
-            payload = data
-        json.dump(payload, f, ensure_ascii=False, indent=2)
-    else:
-        raise ValueError("Formato file non supportato. Usare estensione .csv o .json")
 
-    if close_after:
-        f.close()
+    try:
+        if columnar:
+            write_columnar(iter_records(data), f, fmt, schema)
+        else:
+            for piece in iter_serialized(data, fmt):
+                f.write(piece)
+    finally:
+        if close_after:
+            f.close()
@@ -0,0 +1,143 @@
+"""Coda locale di lavori eseguiti in background.
+
+I test LLM possono durare molti minuti: eseguirli nel thread dello script
+Streamlit bloccherebbe la sessione dell'utente per tutta la durata. La coda
+esegue i lavori su un pool di thread condiviso dal processo e ne registra
+stato e avanzamento nella tabella ``jobs``, che la pagina interroga
+periodicamente.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from models.job import Job, STATUS_COMPLETED, STATUS_FAILED, STATUS_RUNNING
+
+logger = logging.getLogger(__name__)
+
+# Numero di lavori eseguiti contemporaneamente dal processo
+JOB_WORKERS: int = 2
+
+# Funzione eseguita dal lavoro: riceve l'id del lavoro e restituisce i campi
+# finali da salvare (ad esempio ``result_id``)
+JobFunction = Callable[[str], Dict[str, Any]]
+
+
+def process_owner() -> str:
+    """Identifica il processo corrente come ``host:pid``."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """Esegue lavori in background e ne aggiorna lo stato nel database."""
+
+    def __init__(self, max_workers: int = JOB_WORKERS) -> None:
+        self.owner = process_owner()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="job-worker"
+        )
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        fn: JobFunction,
+        run_id: Optional[str] = None,
+    ) -> str:
+        """Registra un lavoro e lo accoda per l'esecuzione.
+
+        ``run_id`` è l'esecuzione di test già nota a cui il lavoro si riferisce.
+        Restituisce l'identificativo del lavoro da usare per il polling.
+        """
+        job = Job.create(kind, payload, owner=self.owner, run_id=run_id)
+        with self._lock:
+            future = self._executor.submit(self._run, job.id, fn)
+            self._futures[job.id] = future
+        future.add_done_callback(lambda _f: self._forget(job.id))
+        return job.id
+
+    def _forget(self, job_id: str) -> None:
+        with self._lock:
+            self._futures.pop(job_id, None)
+
+    def _run(self, job_id: str, fn: JobFunction) -> None:
+        try:
+            Job.update(job_id, status=STATUS_RUNNING)
+            outcome = fn(job_id) or {}
+            Job.update(job_id, status=STATUS_COMPLETED, **outcome)
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Lavoro %s terminato con errore", job_id)
+            try:
+                Job.update(job_id, status=STATUS_FAILED, error=str(exc))
+            except Exception:  # noqa: BLE001
+                logger.exception("Impossibile aggiornare lo stato del lavoro %s", job_id)
+
+    def pending(self) -> int:
+        """Numero di lavori accodati o in esecuzione in questo processo."""
+        with self._lock:
+            return len(self._futures)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> None:
+        """Attende il termine di ``job_id`` se è gestito da questo processo."""
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            future.result(timeout=timeout)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Restituisce la coda condivisa del processo, creandola al primo utilizzo.
+
+    Alla creazione i lavori rimasti attivi da un'esecuzione precedente del
+    processo sullo stesso host vengono segnati come falliti.
+    """
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                queue = JobQueue()
+                try:
+                    interrupted = Job.fail_interrupted(
+                        socket.gethostname(), queue.owner
+                    )
+                    if interrupted:
+                        logger.warning(
+                            "%d lavori interrotti da un riavvio segnati come falliti",
+                            interrupted,
+                        )
+                except Exception as exc:  # noqa: BLE001
+                    logger.warning("Impossibile verificare i lavori interrotti: %s", exc)
+                _queue = queue
+    return _queue
+
+
+def reset_job_queue() -> None:
+    """Arresta e rimuove la coda condivisa (usato principalmente nei test)."""
+    global _queue
+    with _queue_lock:
+        if _queue is not None:
+            _queue.shutdown(wait=True)
+        _queue = None
+
+
+__all__ = [
+    "JOB_WORKERS",
+    "JobQueue",
+    "process_owner",
+    "get_job_queue",
+    "reset_job_queue",
+]
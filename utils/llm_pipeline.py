@@ -0,0 +1,279 @@
+"""Esecuzione concorrente a pipeline delle chiamate LLM di un test.
+
+La generazione delle risposte e la loro valutazione sono due stadi separati,
+ciascuno con il proprio pool di thread: non appena la risposta a una domanda è
+disponibile la sua valutazione viene accodata, così la valutazione della
+domanda N si sovrappone alla generazione della domanda N+1.
+
+Il numero massimo di richieste contemporanee verso lo stesso preset è limitato
+da un semaforo condiviso tra gli stadi (e tra esecuzioni diverse nello stesso
+processo), configurato tramite il campo ``max_concurrency`` del preset.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import threading
+import weakref
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import asynccontextmanager, contextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+G = TypeVar("G")
+R = TypeVar("R")
+
+_semaphores: Dict[Tuple[str, int], threading.BoundedSemaphore] = {}
+_semaphores_lock = threading.Lock()
+_async_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, int], asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_max_concurrency(client_config: Dict[str, Any]) -> int:
+    """Restituisce il numero massimo di richieste parallele per ``client_config``.
+
+    Le configurazioni prive del campo ``max_concurrency`` (ad esempio preset
+    creati prima della sua introduzione) vengono eseguite in modo sequenziale.
+    """
+    try:
+        value = int(client_config.get("max_concurrency") or 1)
+    except (TypeError, ValueError):
+        return 1
+    return max(1, value)
+
+
+def _preset_key(client_config: Dict[str, Any]) -> str:
+    preset_id = client_config.get("id")
+    if preset_id:
+        return str(preset_id)
+    return "|".join(
+        str(client_config.get(k, "")) for k in ("endpoint", "api_key", "model")
+    )
+
+
+@contextmanager
+def concurrency_slot(client_config: Dict[str, Any]) -> Iterator[None]:
+    """Occupa uno slot di concorrenza del preset per la durata del blocco."""
+    limit = get_max_concurrency(client_config)
+    key = (_preset_key(client_config), limit)
+    with _semaphores_lock:
+        semaphore = _semaphores.get(key)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(limit)
+            _semaphores[key] = semaphore
+    with semaphore:
+        yield
+
+
+@asynccontextmanager
+async def async_concurrency_slot(client_config: Dict[str, Any]) -> AsyncIterator[None]:
+    """Variante asincrona di :func:`concurrency_slot`, condivisa per event loop."""
+    limit = get_max_concurrency(client_config)
+    key = (_preset_key(client_config), limit)
+    loop_semaphores = _async_semaphores.setdefault(asyncio.get_running_loop(), {})
+    semaphore = loop_semaphores.get(key)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(limit)
+        loop_semaphores[key] = semaphore
+    async with semaphore:
+        yield
+
+
+def _submit(pool: ThreadPoolExecutor, fn: Callable[..., Any], *args: Any) -> Future:
+    """Accoda ``fn`` su ``pool`` nel contesto (``contextvars``) del chiamante."""
+    return pool.submit(contextvars.copy_context().run, fn, *args)
+
+
+def run_pipeline(
+    items: Sequence[T],
+    generate: Callable[[T], G],
+    evaluate: Callable[[T, G], R],
+    generation_workers: int = 1,
+    evaluation_workers: int = 1,
+    on_result: Optional[Callable[[T, R], None]] = None,
+) -> List[R]:
+    """Esegue ``generate`` ed ``evaluate`` per ogni elemento di ``items``.
+
+    Parametri
+    ---------
+    items:
+        Elementi da elaborare.
+    generate:
+        Primo stadio, invocato con l'elemento.
+    evaluate:
+        Secondo stadio, invocato con l'elemento e il risultato di ``generate``.
+    generation_workers, evaluation_workers:
+        Dimensione dei pool di thread dei due stadi.
+    on_result:
+        Callback opzionale invocata nel thread chiamante per ogni elemento
+        completato, nell'ordine di completamento.
+
+    Restituisce
+    -----------
+    list
+        I risultati di ``evaluate`` nello stesso ordine di ``items``.
+
+    Le eccezioni sollevate dagli stadi vengono propagate al chiamante: gli
+    stadi che non devono interrompere l'esecuzione vanno protetti a monte.
+    """
+    if not items:
+        return []
+
+    results: List[Any] = [None] * len(items)
+    with ThreadPoolExecutor(
+        max_workers=max(1, generation_workers), thread_name_prefix="llm-gen"
+    ) as gen_pool, ThreadPoolExecutor(
+        max_workers=max(1, evaluation_workers), thread_name_prefix="llm-eval"
+    ) as eval_pool:
+        gen_futures: Dict[Future, int] = {
+            _submit(gen_pool, generate, item): idx for idx, item in enumerate(items)
+        }
+        eval_futures: Dict[Future, int] = {}
+        pending = set(gen_futures)
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in gen_futures:
+                        idx = gen_futures[future]
+                        eval_future = _submit(
+                            eval_pool, evaluate, items[idx], future.result()
+                        )
+                        eval_futures[eval_future] = idx
+                        pending.add(eval_future)
+                    else:
+                        idx = eval_futures[future]
+                        results[idx] = future.result()
+                        if on_result is not None:
+                            on_result(items[idx], results[idx])
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+    return results
+
+
+def run_batched_pipeline(
+    items: Sequence[T],
+    generate: Callable[[T], G],
+    evaluate_batch: Callable[[List[Tuple[T, G]]], List[R]],
+    batch_size: int,
+    generation_workers: int = 1,
+    evaluation_workers: int = 1,
+    on_result: Optional[Callable[[T, R], None]] = None,
+) -> List[R]:
+    """Variante di :func:`run_pipeline` con valutazione a lotti.
+
+    Gli elementi generati vengono raggruppati in lotti di al massimo
+    ``batch_size`` elementi, ciascuno passato a ``evaluate_batch`` non appena
+    è completo (l'ultimo lotto può essere più piccolo). ``evaluate_batch``
+    deve restituire un risultato per ogni elemento, nello stesso ordine.
+    I risultati complessivi mantengono l'ordine di ``items``.
+    """
+    if not items:
+        return []
+
+    batch_size = max(1, batch_size)
+    results: List[Any] = [None] * len(items)
+    with ThreadPoolExecutor(
+        max_workers=max(1, generation_workers), thread_name_prefix="llm-gen"
+    ) as gen_pool, ThreadPoolExecutor(
+        max_workers=max(1, evaluation_workers), thread_name_prefix="llm-eval"
+    ) as eval_pool:
+        gen_futures: Dict[Future, int] = {
+            _submit(gen_pool, generate, item): idx for idx, item in enumerate(items)
+        }
+        eval_futures: Dict[Future, List[int]] = {}
+        pending = set(gen_futures)
+        buffer: List[Tuple[int, Any]] = []
+        remaining_generations = len(gen_futures)
+
+        def flush() -> None:
+            indexes = [idx for idx, _ in buffer]
+            batch = [(items[idx], generated) for idx, generated in buffer]
+            buffer.clear()
+            future = _submit(eval_pool, evaluate_batch, batch)
+            eval_futures[future] = indexes
+            pending.add(future)
+
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in gen_futures:
+                        remaining_generations -= 1
+                        buffer.append((gen_futures[future], future.result()))
+                        if len(buffer) >= batch_size:
+                            flush()
+                    else:
+                        indexes = eval_futures[future]
+                        batch_results = future.result()
+                        if len(batch_results) != len(indexes):
+                            raise ValueError(
+                                "evaluate_batch ha restituito un numero di risultati errato"
+                            )
+                        for idx, result in zip(indexes, batch_results):
+                            results[idx] = result
+                            if on_result is not None:
+                                on_result(items[idx], result)
+                if remaining_generations == 0 and buffer:
+                    flush()
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+    return results
+
+
+async def run_pipeline_async(
+    items: Sequence[T],
+    generate: Callable[[T], Awaitable[G]],
+    evaluate: Callable[[T, G], Awaitable[R]],
+    on_result: Optional[Callable[[T, R], None]] = None,
+) -> List[R]:
+    """Variante asincrona di :func:`run_pipeline`.
+
+    Ogni elemento viene elaborato da una coroutine indipendente: i limiti di
+    concorrenza sono applicati dagli stadi tramite
+    :func:`async_concurrency_slot`. ``on_result`` (ad esempio il salvataggio
+    di un checkpoint sul database) viene eseguita in un thread, una chiamata
+    alla volta come in :func:`run_pipeline`, senza bloccare l'event loop.
+    """
+    callback_lock = asyncio.Lock()
+
+    async def process(item: T) -> R:
+        generated = await generate(item)
+        result = await evaluate(item, generated)
+        if on_result is not None:
+            async with callback_lock:
+                await asyncio.to_thread(on_result, item, result)
+        return result
+
+    return list(await asyncio.gather(*(process(item) for item in items)))
+
+
+__all__ = [
+    "get_max_concurrency",
+    "concurrency_slot",
+    "async_concurrency_slot",
+    "run_pipeline",
+    "run_batched_pipeline",
+    "run_pipeline_async",
+]
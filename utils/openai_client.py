@@ -1,22 +1,183 @@
 """Utility per interagire con le API dei provider LLM."""
 
+import asyncio
+import atexit
 import logging
-from typing import Any, List
+import threading
+import weakref
+from typing import Any, Coroutine, Dict, List, Optional, Tuple, TypeVar
 
-from openai import OpenAI
+import httpx2
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_MODEL: str = "gpt-4o"
 DEFAULT_ENDPOINT: str = "https://api.openai.com/v1"
 
+# Parametri del pool di connessioni HTTP condiviso da ciascun client
+POOL_MAX_CONNECTIONS: int = 20
+POOL_MAX_KEEPALIVE_CONNECTIONS: int = 10
+POOL_KEEPALIVE_EXPIRY: float = 30.0
+# Attesa massima, in secondi, per la chiusura dei client asincroni
+ASYNC_CLOSE_TIMEOUT: float = 10.0
+
+_ClientKey = Tuple[str, str]
+T = TypeVar("T")
+
+_clients: Dict[_ClientKey, OpenAI] = {}
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[_ClientKey, AsyncOpenAI]]" = (
+    weakref.WeakKeyDictionary()
+)
+_clients_lock = threading.Lock()
+
+# Event loop condiviso dalle esecuzioni asincrone (vedi ``run_async``)
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_loop_lock = threading.Lock()
+
 
 class ClientCreationError(Exception):
     """Eccezione sollevata quando la creazione del client OpenAI fallisce."""
 
 
+def _resolve_base_url(base_url: str | None) -> str:
+    return (
+        base_url
+        if base_url and base_url.strip() and base_url != "custom"
+        else DEFAULT_ENDPOINT
+    )
+
+
+def _pool_limits() -> httpx2.Limits:
+    # I client HTTP predefiniti dell'SDK sono basati su httpx2
+    return httpx2.Limits(
+        max_connections=POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=POOL_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+    )
+
+
+def configure_pool(
+    max_connections: int | None = None,
+    max_keepalive_connections: int | None = None,
+    keepalive_expiry: float | None = None,
+) -> None:
+    """Aggiorna i parametri del pool di connessioni.
+
+    I client già creati vengono chiusi e ricreati alla richiesta successiva
+    con i nuovi parametri.
+    """
+    global POOL_MAX_CONNECTIONS, POOL_MAX_KEEPALIVE_CONNECTIONS, POOL_KEEPALIVE_EXPIRY
+    if max_connections is not None:
+        POOL_MAX_CONNECTIONS = max_connections
+    if max_keepalive_connections is not None:
+        POOL_MAX_KEEPALIVE_CONNECTIONS = max_keepalive_connections
+    if keepalive_expiry is not None:
+        POOL_KEEPALIVE_EXPIRY = keepalive_expiry
+    close_clients()
+
+
+async def _close_async_clients(clients: List[AsyncOpenAI]) -> None:
+    for client in clients:
+        try:
+            await client.close()
+        except Exception:  # noqa: BLE001
+            logger.debug("Errore durante la chiusura del client OpenAI asincrono", exc_info=True)
+
+
+def close_clients() -> None:
+    """Chiude e rimuove dal registro tutti i client.
+
+    I client asincroni vengono chiusi sull'event loop che li ha creati, se è
+    ancora in esecuzione; quelli di loop già terminati vengono solo rimossi
+    dal registro.
+    """
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+        async_clients = [(loop, list(c.values())) for loop, c in _async_clients.items()]
+        _async_clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception:  # noqa: BLE001
+            logger.debug("Errore durante la chiusura del client OpenAI", exc_info=True)
+
+    try:
+        current_loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+    except RuntimeError:
+        current_loop = None
+    for loop, loop_clients in async_clients:
+        if loop.is_closed() or not loop.is_running():
+            continue
+        if loop is current_loop:
+            # Chiamata dal loop stesso: non si può attendere in modo sincrono
+            loop.create_task(_close_async_clients(loop_clients))
+            continue
+        future = asyncio.run_coroutine_threadsafe(_close_async_clients(loop_clients), loop)
+        try:
+            future.result(timeout=ASYNC_CLOSE_TIMEOUT)
+        except Exception:  # noqa: BLE001
+            logger.debug("Chiusura dei client OpenAI asincroni non completata", exc_info=True)
+
+
+def _event_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _loop_thread
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(
+                target=_loop.run_forever, name="llm-async-loop", daemon=True
+            )
+            _loop_thread.start()
+        return _loop
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """Esegue ``coro`` sull'event loop condiviso e ne restituisce il risultato.
+
+    Il loop resta attivo in un thread dedicato tra un'esecuzione e l'altra,
+    così i client ``AsyncOpenAI`` e i relativi pool di connessioni vengono
+    riutilizzati invece di essere ricreati per ogni test.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _event_loop()).result()
+
+
+def shutdown_async_loop() -> None:
+    """Chiude i client asincroni e arresta l'event loop condiviso."""
+    global _loop, _loop_thread
+    with _loop_lock:
+        loop, thread = _loop, _loop_thread
+        _loop, _loop_thread = None, None
+    if loop is None or loop.is_closed():
+        return
+    with _clients_lock:
+        loop_clients = list(_async_clients.pop(loop, {}).values())
+    if loop_clients:
+        future = asyncio.run_coroutine_threadsafe(_close_async_clients(loop_clients), loop)
+        try:
+            future.result(timeout=ASYNC_CLOSE_TIMEOUT)
+        except Exception:  # noqa: BLE001
+            logger.debug("Chiusura dei client OpenAI asincroni non completata", exc_info=True)
+    loop.call_soon_threadsafe(loop.stop)
+    if thread is not None:
+        thread.join(timeout=ASYNC_CLOSE_TIMEOUT)
+    if not loop.is_running():
+        loop.close()
+
+
+atexit.register(shutdown_async_loop)
+
+
 def get_openai_client(api_key: str, base_url: str | None = None) -> OpenAI:
-    """Crea e restituisce un client OpenAI configurato.
+    """Restituisce il client OpenAI condiviso per ``api_key`` ed endpoint.
+
+    Il client viene creato alla prima richiesta e riutilizzato dalle chiamate
+    successive, così le connessioni HTTP (e i relativi handshake TLS) restano
+    aperte nel pool invece di essere ricreate per ogni domanda. I tentativi
+    automatici dell'SDK sono disattivati: i retry sono gestiti da
+    :mod:`utils.rate_limiter`.
 
     Solleva ``ClientCreationError`` se la chiave API è mancante o la creazione fallisce.
     """
@@ -24,16 +185,59 @@ def get_openai_client(api_key: str, base_url: str | None = None) -> OpenAI:
     if not api_key:
         logger.warning("Tentativo di creare client OpenAI senza chiave API.")
         raise ClientCreationError("Chiave API mancante")
-    try:
-        effective_base_url = (
-            base_url
-            if base_url and base_url.strip() and base_url != "custom"
-            else DEFAULT_ENDPOINT
-        )
-        return OpenAI(api_key=api_key, base_url=effective_base_url)
-    except Exception as exc:  # noqa: BLE001
-        logger.error(f"Errore durante la creazione del client OpenAI: {exc}")
-        raise ClientCreationError(str(exc)) from exc
+    effective_base_url = _resolve_base_url(base_url)
+    key = (api_key, effective_base_url)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is not None:
+            return client
+        try:
+            client = OpenAI(
+                api_key=api_key,
+                base_url=effective_base_url,
+                max_retries=0,
+                http_client=DefaultHttpxClient(limits=_pool_limits()),
+            )
+        except Exception as exc:  # noqa: BLE001
+            logger.error(f"Errore durante la creazione del client OpenAI: {exc}")
+            raise ClientCreationError(str(exc)) from exc
+        _clients[key] = client
+        return client
+
+
+def get_async_openai_client(api_key: str, base_url: str | None = None) -> AsyncOpenAI:
+    """Restituisce il client ``AsyncOpenAI`` condiviso per ``api_key`` ed endpoint.
+
+    Deve essere invocata all'interno di un event loop in esecuzione: i client
+    asincroni sono condivisi per loop, perché le connessioni del pool non
+    possono essere usate da loop diversi.
+
+    Solleva ``ClientCreationError`` se la chiave API è mancante o la creazione fallisce.
+    """
+
+    if not api_key:
+        logger.warning("Tentativo di creare client OpenAI senza chiave API.")
+        raise ClientCreationError("Chiave API mancante")
+    effective_base_url = _resolve_base_url(base_url)
+    key = (api_key, effective_base_url)
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        loop_clients = _async_clients.setdefault(loop, {})
+        client = loop_clients.get(key)
+        if client is not None:
+            return client
+        try:
+            client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=effective_base_url,
+                max_retries=0,
+                http_client=DefaultAsyncHttpxClient(limits=_pool_limits()),
+            )
+        except Exception as exc:  # noqa: BLE001
+            logger.error(f"Errore durante la creazione del client OpenAI asincrono: {exc}")
+            raise ClientCreationError(str(exc)) from exc
+        loop_clients[key] = client
+        return client
 
 
 def get_available_models_for_endpoint(
@@ -102,6 +306,11 @@ __all__ = [
     "DEFAULT_MODEL",
     "DEFAULT_ENDPOINT",
     "ClientCreationError",
+    "configure_pool",
+    "close_clients",
+    "run_async",
+    "shutdown_async_loop",
     "get_openai_client",
+    "get_async_openai_client",
     "get_available_models_for_endpoint",
 ]
@@ -0,0 +1,259 @@
+"""Scheduler delle richieste LLM con limiti di frequenza per preset.
+
+Ogni preset può definire un budget di richieste al minuto
+(``requests_per_minute``) e di token al minuto (``tokens_per_minute``); il
+valore ``0`` indica nessun limite. Le richieste attendono il proprio turno in
+due token bucket condivisi da tutte le chiamate verso lo stesso preset, così il
+throughput resta vicino al limite del provider senza superarlo.
+
+Quando il provider risponde comunque con un errore di rate limit (o un errore
+transitorio) la richiesta viene ripetuta rispettando l'header ``Retry-After``
+oppure, in sua assenza, con un backoff esponenziale con jitter.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import logging
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type, TypeVar
+
+from openai import APIConnectionError, InternalServerError, RateLimitError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+MAX_RETRIES: int = 5
+BACKOFF_BASE_SECONDS: float = 1.0
+BACKOFF_MAX_SECONDS: float = 60.0
+# Ampiezza massima dei burst, espressa in secondi di budget accumulabile
+BURST_SECONDS: float = 10.0
+
+RETRYABLE_ERRORS: Tuple[Type[BaseException], ...] = (
+    RateLimitError,
+    APIConnectionError,
+    InternalServerError,
+)
+
+
+class TokenBucket:
+    """Token bucket thread-safe con ricarica continua.
+
+    ``reserve`` preleva subito i token richiesti (il saldo può diventare
+    negativo) e restituisce il tempo di attesa necessario, così le richieste
+    concorrenti vengono servite in ordine di arrivo.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        burst_seconds: float = BURST_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = max(1.0, self.rate_per_second * burst_seconds)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Preleva ``amount`` token e restituisce i secondi da attendere."""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = self._clock()
+            elapsed = now - self._updated
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_second)
+            self._updated = now
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate_per_second
+
+
+class RateLimiter:
+    """Combina i budget di richieste e token al minuto di un preset."""
+
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._clock = clock
+        self._requests = TokenBucket(requests_per_minute, clock=clock) if requests_per_minute > 0 else None
+        self._tokens = TokenBucket(tokens_per_minute, clock=clock) if tokens_per_minute > 0 else None
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: int = 0) -> float:
+        """Prenota una richiesta da ``tokens`` token e restituisce l'attesa in secondi."""
+        delay = 0.0
+        if self._requests is not None:
+            delay = max(delay, self._requests.reserve(1))
+        if self._tokens is not None and tokens > 0:
+            delay = max(delay, self._tokens.reserve(tokens))
+        with self._lock:
+            delay = max(delay, self._paused_until - self._clock())
+        return delay
+
+    def pause(self, seconds: float) -> None:
+        """Sospende tutte le richieste del preset per ``seconds`` secondi."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    def acquire(self, tokens: int = 0) -> None:
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: int = 0) -> None:
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+_limiters: Dict[Tuple[str, int, int], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _limit(client_config: Dict[str, Any], key: str) -> int:
+    try:
+        return max(0, int(client_config.get(key) or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def get_rate_limiter(client_config: Dict[str, Any]) -> RateLimiter:
+    """Restituisce il limitatore condiviso per il preset di ``client_config``."""
+    preset = str(
+        client_config.get("id")
+        or "|".join(str(client_config.get(k, "")) for k in ("endpoint", "api_key", "model"))
+    )
+    rpm = _limit(client_config, "requests_per_minute")
+    tpm = _limit(client_config, "tokens_per_minute")
+    key = (preset, rpm, tpm)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = RateLimiter(rpm, tpm)
+            _limiters[key] = limiter
+        return limiter
+
+
+def estimate_tokens(request: Dict[str, Any]) -> int:
+    """Stima i token consumati da ``request`` (prompt più completamento massimo)."""
+    prompt_chars = sum(
+        len(str(message.get("content", ""))) for message in request.get("messages", [])
+    )
+    return prompt_chars // 4 + int(request.get("max_tokens") or 0)
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Estrae l'attesa suggerita dagli header ``Retry-After`` della risposta."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000.0)
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        parsed = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, parsed.timestamp() - time.time())
+
+
+def backoff_delay(attempt: int) -> float:
+    """Backoff esponenziale con jitter completo per il tentativo ``attempt``."""
+    ceiling = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+def _retry_delay(
+    limiter: RateLimiter, exc: BaseException, attempt: int, max_retries: int
+) -> float:
+    delay = retry_after_seconds(exc)
+    if delay is None:
+        delay = backoff_delay(attempt)
+    logger.warning(
+        "Richiesta LLM fallita (%s), nuovo tentativo %d/%d tra %.1fs",
+        type(exc).__name__,
+        attempt + 1,
+        max_retries,
+        delay,
+    )
+    if isinstance(exc, RateLimitError):
+        limiter.pause(delay)
+    return delay
+
+
+def call_with_rate_limit(
+    client_config: Dict[str, Any],
+    request: Dict[str, Any],
+    call: Callable[[], T],
+    max_retries: int = MAX_RETRIES,
+) -> T:
+    """Esegue ``call`` rispettando i limiti del preset e ritentando gli errori transitori."""
+    limiter = get_rate_limiter(client_config)
+    tokens = estimate_tokens(request)
+    attempt = 0
+    while True:
+        limiter.acquire(tokens)
+        try:
+            return call()
+        except RETRYABLE_ERRORS as exc:
+            if attempt >= max_retries:
+                raise
+            time.sleep(_retry_delay(limiter, exc, attempt, max_retries))
+            attempt += 1
+
+
+async def call_with_rate_limit_async(
+    client_config: Dict[str, Any],
+    request: Dict[str, Any],
+    call: Callable[[], Awaitable[T]],
+    max_retries: int = MAX_RETRIES,
+) -> T:
+    """Variante asincrona di :func:`call_with_rate_limit`."""
+    limiter = get_rate_limiter(client_config)
+    tokens = estimate_tokens(request)
+    attempt = 0
+    while True:
+        await limiter.acquire_async(tokens)
+        try:
+            return await call()
+        except RETRYABLE_ERRORS as exc:
+            if attempt >= max_retries:
+                raise
+            await asyncio.sleep(_retry_delay(limiter, exc, attempt, max_retries))
+            attempt += 1
+
+
+__all__ = [
+    "TokenBucket",
+    "RateLimiter",
+    "get_rate_limiter",
+    "estimate_tokens",
+    "retry_after_seconds",
+    "backoff_delay",
+    "call_with_rate_limit",
+    "call_with_rate_limit_async",
+]
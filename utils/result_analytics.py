@@ -0,0 +1,259 @@
+"""Aggregati dei risultati dei test per modello, set e categoria.
+
+I dati di partenza sono le righe per risultato e categoria delle statistiche
+materializzate (vedi ``test_result_stats``), mantenute in un unico DataFrame
+aggiornato in modo incrementale: quando arrivano nuove esecuzioni vengono
+lette solo le righe dei risultati aggiunti e scartate quelle dei risultati
+eliminati. Classifiche, andamenti e regressioni sono calcolati con operazioni
+vettoriali di pandas e memorizzati fino alla modifica successiva.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+import pandas as pd
+
+# Dimensioni di aggregazione ammesse
+DIMENSIONS = ("model", "set_id", "category")
+# Metriche mediate pesando ogni categoria con il numero di domande
+METRICS = ("avg_score", "avg_similarity", "avg_correctness", "avg_completeness")
+# Modello usato per i risultati senza modello né preset riconosciuto
+UNKNOWN_MODEL = "N/A"
+# Calo minimo del punteggio medio, in punti percentuali, segnalato come regressione
+REGRESSION_THRESHOLD = 5.0
+
+
+def _dimensions(by: Iterable[str]) -> List[str]:
+    keys = list(dict.fromkeys(by))
+    invalid = [k for k in keys if k not in DIMENSIONS]
+    if invalid or not keys:
+        raise ValueError(f"Dimensioni di aggregazione non valide: {invalid or keys}")
+    return keys
+
+
+def _weighted(frame: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """Media delle metriche per ``keys`` pesata con il numero di domande."""
+    weights = frame["count"].astype(float)
+    weighted = frame[keys].copy()
+    weighted["questions"] = weights
+    for metric in METRICS:
+        weighted[metric] = frame[metric].astype(float).fillna(0.0) * weights
+    totals = weighted.groupby(keys, sort=False, dropna=False).sum()
+    for metric in METRICS:
+        totals[metric] = totals[metric] / totals["questions"].where(totals["questions"] > 0)
+    totals["questions"] = totals["questions"].astype(int)
+    return totals
+
+
+class ResultAnalytics:
+    """Aggregazioni dei risultati mantenute allineate alle nuove esecuzioni.
+
+    ``list_ids`` restituisce gli ID dei risultati salvati e ``load_rows`` le
+    righe per risultato e categoria dei soli ID indicati. :meth:`mark_stale`
+    va registrato come listener delle modifiche dei risultati: alla lettura
+    successiva vengono sincronizzate solo le differenze. Le modifiche al
+    contenuto di risultati già letti richiedono :meth:`clear`.
+    """
+
+    def __init__(
+        self,
+        list_ids: Callable[[], Iterable[str]],
+        load_rows: Callable[[Sequence[str]], pd.DataFrame],
+        columns: Sequence[str],
+    ) -> None:
+        self._list_ids = list_ids
+        self._load_rows = load_rows
+        self.columns = list(columns)
+        self._frame: Optional[pd.DataFrame] = None
+        self._ids: Set[str] = set()
+        self._stale = True
+        self._version = 0
+        self._memo: Dict[Tuple[Any, ...], pd.DataFrame] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def mark_stale(self) -> None:
+        """Segnala che i risultati sono cambiati: la prossima lettura sincronizza."""
+        with self._lock:
+            self._stale = True
+
+    def clear(self) -> None:
+        """Scarta i dati: la prossima lettura ricarica tutti i risultati."""
+        with self._lock:
+            self._frame = None
+            self._ids = set()
+            self._stale = True
+            self._memo = {}
+            self._version += 1
+
+    def _sync(self) -> pd.DataFrame:
+        if self._frame is not None and not self._stale:
+            return self._frame
+        ids = {str(i) for i in self._list_ids()}
+        frame = self._frame if self._frame is not None else pd.DataFrame(columns=self.columns)
+        removed = self._ids - ids
+        added = ids - self._ids
+        if removed:
+            frame = frame[~frame["result_id"].astype(str).isin(removed)]
+        if added:
+            new_rows = self._load_rows(sorted(added)).reindex(columns=self.columns)
+            if not new_rows.empty:
+                frame = new_rows if frame.empty else pd.concat([frame, new_rows], ignore_index=True)
+        if removed or added or self._frame is None:
+            self._frame = frame.reset_index(drop=True)
+            self._memo = {}
+            self._version += 1
+        self._ids = ids
+        self._stale = False
+        assert self._frame is not None
+        return self._frame
+
+    def frame(self) -> pd.DataFrame:
+        """Righe per risultato e categoria aggiornate all'ultima esecuzione."""
+        with self._lock:
+            return self._sync()
+
+    def _with_model(self, preset_models: Mapping[str, str]) -> pd.DataFrame:
+        frame = self._sync().copy(deep=False)
+        llm = frame["generation_llm"]
+        from_preset = frame["generation_preset"].map(dict(preset_models))
+        frame["model"] = llm.where(llm.notna() & (llm != ""), from_preset).fillna(UNKNOWN_MODEL)
+        frame["set_id"] = frame["set_id"].astype(str)
+        return frame
+
+    def _cached(
+        self, key: Tuple[Any, ...], compute: Callable[[], pd.DataFrame]
+    ) -> pd.DataFrame:
+        with self._lock:
+            self._sync()
+            if key not in self._memo:
+                self._memo[key] = compute()
+            return self._memo[key]
+
+    def _run_scores(self, keys: List[str], preset_models: Mapping[str, str]) -> pd.DataFrame:
+        """Punteggio medio di ogni esecuzione per i gruppi ``keys``."""
+        frame = self._with_model(preset_models)
+        scores = _weighted(frame, keys + ["result_id", "timestamp"]).reset_index()
+        scores["executed_at"] = pd.to_datetime(
+            scores["timestamp"], errors="coerce", format="mixed"
+        )
+        return scores
+
+    def leaderboard(
+        self,
+        by: Sequence[str] = DIMENSIONS,
+        preset_models: Mapping[str, str] | None = None,
+    ) -> pd.DataFrame:
+        """Classifica dei gruppi ``by`` per punteggio medio.
+
+        Colonne: le dimensioni ``by``, ``rank``, ``runs`` (esecuzioni),
+        ``questions`` (domande valutate) e le medie di ``METRICS`` pesate con
+        il numero di domande.
+        """
+        keys = _dimensions(by)
+        models = dict(preset_models or {})
+
+        def compute() -> pd.DataFrame:
+            frame = self._with_model(models)
+            columns = keys + ["rank", "runs", "questions", *METRICS]
+            if frame.empty:
+                return pd.DataFrame(columns=columns)
+            board = _weighted(frame, keys)
+            board["runs"] = frame.groupby(keys, sort=False, dropna=False)["result_id"].nunique()
+            board = board.reset_index().sort_values(
+                ["avg_score", "questions"], ascending=[False, False], kind="stable"
+            )
+            board["rank"] = range(1, len(board) + 1)
+            return board.reindex(columns=columns).reset_index(drop=True)
+
+        return self._cached(("leaderboard", tuple(keys), tuple(sorted(models.items()))), compute)
+
+    def trends(
+        self,
+        by: Sequence[str] = ("model",),
+        freq: str = "D",
+        preset_models: Mapping[str, str] | None = None,
+    ) -> pd.DataFrame:
+        """Andamento del punteggio medio nel tempo per i gruppi ``by``.
+
+        ``freq`` è un periodo di pandas (``"D"``, ``"W"``, ``"M"``). Colonne:
+        le dimensioni ``by``, ``period`` (inizio del periodo), ``runs`` e
+        ``avg_score`` (media dei punteggi delle esecuzioni del periodo). Le
+        esecuzioni con data non riconosciuta sono escluse.
+        """
+        keys = _dimensions(by)
+        models = dict(preset_models or {})
+
+        def compute() -> pd.DataFrame:
+            columns = keys + ["period", "runs", "avg_score"]
+            scores = self._run_scores(keys, models).dropna(subset=["executed_at"])
+            if scores.empty:
+                return pd.DataFrame(columns=columns)
+            scores["period"] = scores["executed_at"].dt.to_period(freq).dt.start_time
+            trend = (
+                scores.groupby(keys + ["period"], dropna=False)
+                .agg(runs=("result_id", "nunique"), avg_score=("avg_score", "mean"))
+                .reset_index()
+                .sort_values(keys + ["period"], kind="stable")
+            )
+            return trend.reindex(columns=columns).reset_index(drop=True)
+
+        return self._cached(("trends", tuple(keys), freq, tuple(sorted(models.items()))), compute)
+
+    def regressions(
+        self,
+        by: Sequence[str] = ("model", "set_id"),
+        threshold: float = REGRESSION_THRESHOLD,
+        preset_models: Mapping[str, str] | None = None,
+    ) -> pd.DataFrame:
+        """Gruppi la cui ultima esecuzione peggiora rispetto alla precedente.
+
+        Per ogni gruppo ``by`` confronta il punteggio dell'esecuzione più
+        recente con quello della precedente e restituisce i gruppi con un
+        calo di almeno ``threshold`` punti, dal peggiore. Colonne: le
+        dimensioni ``by``, ``result_id``, ``timestamp``, ``avg_score``,
+        ``previous_result_id``, ``previous_timestamp``, ``previous_score`` e
+        ``delta``.
+        """
+        keys = _dimensions(by)
+        models = dict(preset_models or {})
+
+        def compute() -> pd.DataFrame:
+            columns = keys + [
+                "result_id",
+                "timestamp",
+                "avg_score",
+                "previous_result_id",
+                "previous_timestamp",
+                "previous_score",
+                "delta",
+            ]
+            scores = self._run_scores(keys, models)
+            if scores.empty:
+                return pd.DataFrame(columns=columns)
+            scores = scores.sort_values(["executed_at", "timestamp", "result_id"], kind="stable")
+            grouped = scores.groupby(keys, sort=False, dropna=False)
+            scores["previous_result_id"] = grouped["result_id"].shift(1)
+            scores["previous_timestamp"] = grouped["timestamp"].shift(1)
+            scores["previous_score"] = grouped["avg_score"].shift(1)
+            latest = scores.groupby(keys, sort=False, dropna=False).tail(1)
+            latest = latest.dropna(subset=["previous_score"]).copy()
+            latest["delta"] = latest["avg_score"] - latest["previous_score"]
+            latest = latest[latest["delta"] <= -abs(threshold)]
+            return (
+                latest.sort_values("delta", kind="stable")
+                .reindex(columns=columns)
+                .reset_index(drop=True)
+            )
+
+        return self._cached(
+            ("regressions", tuple(keys), float(threshold), tuple(sorted(models.items()))), compute
+        )
+
+
+__all__ = ["DIMENSIONS", "METRICS", "REGRESSION_THRESHOLD", "UNKNOWN_MODEL", "ResultAnalytics"]
@@ -0,0 +1,116 @@
+"""Valutazione a campione dei test con arresto anticipato.
+
+Per i controlli rapidi non serve valutare tutte le domande di un set: le
+domande vengono estratte in ordine casuale (eventualmente stratificato per
+categoria, così che ogni prefisso dell'ordine rispetti le proporzioni delle
+categorie) e valutate a blocchi. Dopo ogni blocco l'intervallo di confidenza
+bootstrap del punteggio medio indica se il campione è già sufficiente.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class SamplingConfig:
+    """Parametri della modalità a campione di ``run_test``.
+
+    ``max_questions`` limita il campione (``None`` = tutte le domande),
+    ``min_questions`` è il numero di domande valutate prima di controllare
+    l'intervallo e ``step`` quante se ne aggiungono a ogni blocco.
+    L'esecuzione si ferma quando l'ampiezza dell'intervallo di confidenza
+    al livello ``confidence`` scende sotto ``ci_width`` punti percentuali.
+    """
+
+    ci_width: float = 10.0
+    confidence: float = 0.95
+    min_questions: int = 30
+    step: int = 20
+    max_questions: Optional[int] = None
+    stratify: bool = False
+    resamples: int = 1000
+    seed: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.ci_width <= 0:
+            raise ValueError("L'ampiezza dell'intervallo deve essere positiva")
+        if not 0 < self.confidence < 1:
+            raise ValueError("Il livello di confidenza deve essere compreso tra 0 e 1")
+        if self.min_questions < 2 or self.step < 1 or self.resamples < 1:
+            raise ValueError("Parametri di campionamento non validi")
+        if self.max_questions is not None and self.max_questions < 1:
+            raise ValueError("Il campione deve contenere almeno una domanda")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def sample_order(
+    question_ids: Sequence[str],
+    categories: Optional[Mapping[str, str]] = None,
+    seed: Optional[int] = None,
+) -> List[str]:
+    """Ordine casuale in cui valutare ``question_ids``.
+
+    Con ``categories`` (``{id: categoria}``) le domande di ogni categoria
+    vengono mescolate e poi intercalate in proporzione alla dimensione della
+    categoria: ogni prefisso dell'ordine è un campione stratificato.
+    """
+    rng = random.Random(seed)
+    ids = [str(q) for q in question_ids]
+    if categories is None:
+        rng.shuffle(ids)
+        return ids
+
+    strata: Dict[str, List[str]] = {}
+    for q_id in ids:
+        strata.setdefault(categories.get(q_id) or "", []).append(q_id)
+    keyed: List[Tuple[float, str]] = []
+    for members in strata.values():
+        rng.shuffle(members)
+        size = len(members)
+        # Posizione relativa nella categoria con una perturbazione casuale
+        # per non favorire sempre le stesse categorie a parità di posizione
+        keyed.extend(((rank + rng.random()) / size, q_id) for rank, q_id in enumerate(members))
+    keyed.sort(key=lambda item: item[0])
+    return [q_id for _, q_id in keyed]
+
+
+def bootstrap_ci(
+    scores: Sequence[float],
+    confidence: float = 0.95,
+    resamples: int = 1000,
+    strata: Optional[Sequence[str]] = None,
+    seed: Optional[int] = None,
+) -> Tuple[float, float]:
+    """Intervallo di confidenza bootstrap (percentili) della media di ``scores``.
+
+    Con ``strata`` i ricampionamenti avvengono all'interno di ciascuno
+    strato, mantenendone invariata la numerosità.
+    """
+    values = np.asarray(scores, dtype=float)
+    if values.size == 0:
+        return 0.0, 0.0
+    rng = np.random.default_rng(seed)
+    if strata is None:
+        groups = [values]
+    else:
+        labels = np.asarray(strata, dtype=object)
+        groups = [values[labels == label] for label in dict.fromkeys(strata)]
+
+    sums = np.zeros(resamples)
+    for group in groups:
+        picks = rng.integers(0, group.size, size=(resamples, group.size))
+        sums += group[picks].sum(axis=1)
+    means = sums / values.size
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(means, [alpha, 1 - alpha])
+    return float(low), float(high)
+
+
+__all__ = ["SamplingConfig", "sample_order", "bootstrap_ci"]
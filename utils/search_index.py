@@ -0,0 +1,211 @@
+"""Indice invertito in memoria per la ricerca testuale con ranking BM25.
+
+L'indice è costruito una sola volta a partire dalle righe di una cache e poi
+aggiornato in modo incrementale a ogni inserimento, modifica o eliminazione,
+così che le ricerche non richiedano la scansione dell'intera tabella.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import re
+import threading
+import unicodedata
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# Segni diacritici combinanti rimossi dopo la decomposizione NFKD
+_COMBINING_RE = re.compile("[\u0300-\u036f]")
+
+# Parametri standard di BM25
+BM25_K1: float = 1.2
+BM25_B: float = 0.75
+
+# Numero massimo di termini in cui viene espanso il prefisso finale
+MAX_PREFIX_TERMS: int = 50
+
+
+def tokenize(text: Any) -> List[str]:
+    """Suddivide ``text`` in token minuscoli e senza accenti."""
+    if text is None:
+        return []
+    text = str(text).lower()
+    if not text.isascii():
+        text = _COMBINING_RE.sub("", unicodedata.normalize("NFKD", text))
+    return _TOKEN_RE.findall(text)
+
+
+class InvertedIndex:
+    """Indice invertito con pesi per campo e ranking BM25.
+
+    ``fields`` associa a ogni colonna indicizzata il peso con cui le sue
+    occorrenze contribuiscono alla frequenza del termine. L'ultimo termine
+    della ricerca viene trattato anche come prefisso, per supportare la
+    ricerca durante la digitazione.
+    """
+
+    def __init__(self, fields: Mapping[str, float], key: str = "id") -> None:
+        self.fields = dict(fields)
+        self.key = key
+        self._postings: Dict[str, Dict[Any, float]] = {}
+        self._doc_terms: Dict[Any, Dict[str, float]] = {}
+        self._doc_lengths: Dict[Any, float] = {}
+        self._attributes: Dict[Any, Dict[str, Any]] = {}
+        self._vocabulary: List[str] = []
+        self._total_length = 0.0
+        self._built = False
+        self._lock = threading.RLock()
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def _term_weights(self, row: Mapping[str, Any]) -> Dict[str, float]:
+        weights: Dict[str, float] = {}
+        for field, weight in self.fields.items():
+            for token in tokenize(row.get(field)):
+                weights[token] = weights.get(token, 0.0) + weight
+        return weights
+
+    def _remove(self, doc_id: Any) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self._total_length -= self._doc_lengths.pop(doc_id, 0.0)
+        self._attributes.pop(doc_id, None)
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                pos = bisect.bisect_left(self._vocabulary, term)
+                if pos < len(self._vocabulary) and self._vocabulary[pos] == term:
+                    self._vocabulary.pop(pos)
+
+    def _add(self, row: Mapping[str, Any], sort_vocabulary: bool = True) -> None:
+        doc_id = row[self.key]
+        terms = self._term_weights(row)
+        self._doc_terms[doc_id] = terms
+        length = float(sum(terms.values()))
+        self._doc_lengths[doc_id] = length
+        self._total_length += length
+        self._attributes[doc_id] = {k: v for k, v in row.items() if k != self.key}
+        for term, weight in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                if sort_vocabulary:
+                    bisect.insort(self._vocabulary, term)
+            postings[doc_id] = weight
+
+    def rebuild(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        """Ricostruisce l'indice da zero con le righe fornite."""
+        with self._lock:
+            self._postings = {}
+            self._doc_terms = {}
+            self._doc_lengths = {}
+            self._attributes = {}
+            self._vocabulary = []
+            self._total_length = 0.0
+            for row in rows:
+                self._remove(row[self.key])
+                self._add(row, sort_vocabulary=False)
+            self._vocabulary = sorted(self._postings)
+            self._built = True
+
+    def ensure_built(self, rows: Callable[[], Iterable[Mapping[str, Any]]]) -> None:
+        """Costruisce l'indice con ``rows()`` se non è già disponibile."""
+        with self._lock:
+            if not self._built:
+                self.rebuild(rows())
+
+    def upsert(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        """Aggiorna l'indice con righe nuove o modificate (complete)."""
+        with self._lock:
+            if not self._built:
+                return
+            for row in rows:
+                self._remove(row[self.key])
+                self._add(row)
+
+    def remove(self, keys: Iterable[Any]) -> None:
+        with self._lock:
+            if not self._built:
+                return
+            for key in keys:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """Scarta l'indice: verrà ricostruito alla prossima ricerca."""
+        with self._lock:
+            self._built = False
+            self._postings = {}
+            self._doc_terms = {}
+            self._doc_lengths = {}
+            self._attributes = {}
+            self._vocabulary = []
+            self._total_length = 0.0
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        terms = []
+        for term in self._vocabulary[start:start + MAX_PREFIX_TERMS]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def search(
+        self,
+        query: str,
+        limit: Optional[int] = None,
+        where: Optional[Mapping[str, Any]] = None,
+    ) -> List[Tuple[Any, float]]:
+        """Restituisce le coppie ``(chiave, punteggio)`` ordinate per rilevanza.
+
+        ``where`` filtra i documenti per valore esatto delle colonne (ad
+        esempio ``{"categoria": "Storia"}``).
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        with self._lock:
+            doc_count = len(self._doc_terms)
+            if doc_count == 0:
+                return []
+            avg_length = self._total_length / doc_count or 1.0
+            scores: Dict[Any, float] = {}
+            matched: Dict[Any, Set[int]] = {}
+            for position, token in enumerate(tokens):
+                terms = [token] if token in self._postings else []
+                if position == len(tokens) - 1:
+                    terms = self._expand_prefix(token) or terms
+                for term in terms:
+                    postings = self._postings[term]
+                    idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for doc_id, tf in postings.items():
+                        norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_lengths[doc_id] / avg_length)
+                        scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+                        matched.setdefault(doc_id, set()).add(position)
+
+            if where:
+                scores = {
+                    doc_id: score
+                    for doc_id, score in scores.items()
+                    if all(self._attributes[doc_id].get(k) == v for k, v in where.items())
+                }
+            # I documenti che contengono più termini distinti vengono prima
+            ranked = sorted(
+                scores.items(),
+                key=lambda item: (-len(matched[item[0]]), -item[1], str(item[0])),
+            )
+        return ranked[:limit] if limit is not None else ranked
+
+
+__all__ = ["BM25_K1", "BM25_B", "MAX_PREFIX_TERMS", "InvertedIndex", "tokenize"]
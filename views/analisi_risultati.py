@@ -0,0 +1,125 @@
+import logging
+
+import streamlit as st
+import plotly.express as px
+
+from controllers import get_leaderboard, get_score_trends, get_regressions
+# from views import register_page
+from views.style_utils import add_page_header, add_section_title
+logger = logging.getLogger(__name__)
+
+# Etichette delle dimensioni di aggregazione
+DIMENSION_LABELS = {"model": "Modello", "set_id": "Set", "category": "Categoria"}
+# Periodi disponibili per l'andamento dei punteggi
+TREND_PERIODS = {"Giorno": "D", "Settimana": "W", "Mese": "M"}
+# Nomi delle colonne mostrate nelle tabelle
+COLUMN_LABELS = {
+    "rank": "Posizione",
+    "model": "Modello",
+    "set_name": "Set",
+    "category": "Categoria",
+    "runs": "Esecuzioni",
+    "questions": "Domande",
+    "avg_score": "Punteggio medio",
+    "avg_similarity": "Somiglianza",
+    "avg_correctness": "Correttezza",
+    "avg_completeness": "Completezza",
+    "period": "Periodo",
+    "timestamp": "Ultima esecuzione",
+    "previous_timestamp": "Esecuzione precedente",
+    "previous_score": "Punteggio precedente",
+    "delta": "Variazione",
+}
+
+
+def _select_dimensions(label, default, key):
+    selected = st.multiselect(
+        label,
+        options=list(DIMENSION_LABELS),
+        default=list(default),
+        format_func=lambda d: DIMENSION_LABELS[d],
+        key=key,
+    )
+    return selected or list(default)
+
+
+def _display(df):
+    """Mostra solo le colonne leggibili, con le etichette in italiano."""
+    columns = [c for c in COLUMN_LABELS if c in df.columns]
+    return df[columns].rename(columns=COLUMN_LABELS)
+
+
+def _group_label(df, dimensions):
+    names = ["set_name" if d == "set_id" else d for d in dimensions]
+    return df[names].astype(str).agg(" · ".join, axis=1)
+
+
+# @register_page("Analisi Risultati")
+def render():
+    add_page_header(
+        "Analisi Risultati",
+        icon="🏆",
+        description="Confronta modelli, set e categorie su tutte le esecuzioni salvate."
+    )
+
+    tabs = st.tabs(["Classifica", "Andamento", "Regressioni"])
+
+    with tabs[0]:
+        add_section_title("Classifica", icon="🏆")
+        dimensions = _select_dimensions(
+            "Raggruppa per", ("model", "set_id", "category"), "analytics_leaderboard_by"
+        )
+        board = get_leaderboard(dimensions)
+        if board.empty:
+            st.info("Nessun risultato disponibile. Esegui prima alcuni test dalla pagina 'Esecuzione Test'.")
+        else:
+            st.dataframe(_display(board), hide_index=True, use_container_width=True)
+
+    with tabs[1]:
+        add_section_title("Andamento dei punteggi", icon="📈")
+        dimensions = _select_dimensions("Raggruppa per", ("model",), "analytics_trend_by")
+        period = st.selectbox(
+            "Periodo", options=list(TREND_PERIODS), index=0, key="analytics_trend_period"
+        )
+        trends = get_score_trends(dimensions, TREND_PERIODS[period])
+        if trends.empty:
+            st.info("Nessuna esecuzione con data valida.")
+        else:
+            trends = trends.assign(Gruppo=_group_label(trends, dimensions))
+            fig = px.line(
+                trends,
+                x="period",
+                y="avg_score",
+                color="Gruppo",
+                markers=True,
+                hover_data=["runs"],
+                labels={"period": "Periodo", "avg_score": "Punteggio medio", "runs": "Esecuzioni"},
+            )
+            fig.update_layout(yaxis_range=[0, 100])
+            st.plotly_chart(fig, use_container_width=True)
+
+    with tabs[2]:
+        add_section_title("Regressioni", icon="📉")
+        dimensions = _select_dimensions(
+            "Raggruppa per", ("model", "set_id"), "analytics_regressions_by"
+        )
+        threshold = st.number_input(
+            "Calo minimo (punti percentuali)",
+            min_value=0.0,
+            max_value=100.0,
+            value=5.0,
+            step=1.0,
+            key="analytics_regression_threshold",
+        )
+        regressions = get_regressions(dimensions, threshold)
+        if regressions.empty:
+            st.success("Nessuna regressione rispetto all'esecuzione precedente.")
+        else:
+            st.warning(f"{len(regressions)} gruppi peggiorati rispetto all'esecuzione precedente.")
+            st.dataframe(_display(regressions), hide_index=True, use_container_width=True)
+
+
+if __name__ == "__main__":
+    render()
+else:
+    render()
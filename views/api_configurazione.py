@@ -27,7 +27,10 @@ def start_new_preset_edit():
         "api_key": "",
         "model": DEFAULT_MODEL,
         "temperature": 0.0,
-        "max_tokens": 1000
+        "max_tokens": 1000,
+        "max_concurrency": 4,
+        "requests_per_minute": 0,
+        "tokens_per_minute": 0,
     }
 
 
@@ -46,6 +49,13 @@ def start_existing_preset_edit(preset_id: str) -> None:
     st.session_state.preset_form_data["max_tokens"] = int(
         st.session_state.preset_form_data.get("max_tokens", 1000)
     )
+    st.session_state.preset_form_data["max_concurrency"] = int(
+        st.session_state.preset_form_data.get("max_concurrency", 4)
+    )
+    for limit_key in ("requests_per_minute", "tokens_per_minute"):
+        st.session_state.preset_form_data[limit_key] = int(
+            st.session_state.preset_form_data.get(limit_key, 0)
+        )
     if "endpoint" not in st.session_state.preset_form_data:
         st.session_state.preset_form_data["endpoint"] = DEFAULT_ENDPOINT
 
@@ -75,6 +85,24 @@ def save_preset_from_form():
             st.session_state.preset_form_data.get("max_tokens", 1000),
         )
     )
+    max_concurrency = int(
+        st.session_state.get(
+            "preset_max_concurrency",
+            st.session_state.preset_form_data.get("max_concurrency", 4),
+        )
+    )
+    requests_per_minute = int(
+        st.session_state.get(
+            "preset_requests_per_minute",
+            st.session_state.preset_form_data.get("requests_per_minute", 0),
+        )
+    )
+    tokens_per_minute = int(
+        st.session_state.get(
+            "preset_tokens_per_minute",
+            st.session_state.preset_form_data.get("tokens_per_minute", 0),
+        )
+    )
 
     # Aggiorna il dizionario del form in sessione con i valori raccolti
     st.session_state.preset_form_data.update(
@@ -85,6 +113,9 @@ def save_preset_from_form():
             "model": model,
             "temperature": temperature,
             "max_tokens": max_tokens,
+            "max_concurrency": max_concurrency,
+            "requests_per_minute": requests_per_minute,
+            "tokens_per_minute": tokens_per_minute,
         }
     )
 
@@ -193,6 +224,31 @@ def render():
                 step=50,
                 key="preset_max_tokens",
             )
+            form_data["max_concurrency"] = st.number_input(
+                "Richieste Parallele Massime",
+                min_value=1,
+                max_value=64,
+                value=int(form_data.get("max_concurrency", 4)),
+                step=1,
+                key="preset_max_concurrency",
+                help="Numero massimo di richieste contemporanee inviate a questo preset durante i test."
+            )
+            form_data["requests_per_minute"] = st.number_input(
+                "Limite Richieste al Minuto",
+                min_value=0,
+                value=int(form_data.get("requests_per_minute", 0)),
+                step=10,
+                key="preset_requests_per_minute",
+                help="Richieste al minuto consentite dal provider (0 = nessun limite)."
+            )
+            form_data["tokens_per_minute"] = st.number_input(
+                "Limite Token al Minuto",
+                min_value=0,
+                value=int(form_data.get("tokens_per_minute", 0)),
+                step=1000,
+                key="preset_tokens_per_minute",
+                help="Token al minuto consentiti dal provider (0 = nessun limite)."
+            )
 
             # Campo Test Connessione e pulsanti di salvataggio/annullamento
             # Pulsante Test Connessione
@@ -1,12 +1,26 @@
 import logging
+import time
 
 import streamlit as st
 
-from controllers import run_test, load_sets, load_presets, get_preset_by_name
+from controllers import (
+    submit_test_run,
+    submit_resume_run,
+    get_job_status,
+    list_incomplete_runs,
+    load_results,
+    load_sets,
+    load_presets,
+    get_preset_by_name,
+)
 # from views import register_page
+from utils.sampling import SamplingConfig
 from views.style_utils import add_page_header, add_section_title
 logger = logging.getLogger(__name__)
 
+# Intervallo di aggiornamento della pagina durante un'esecuzione in background
+JOB_POLL_SECONDS = 1.5
+
 
 # === FUNZIONI DI CALLBACK ===
 
@@ -22,6 +36,66 @@ def run_llm_test_callback():
     st.session_state.run_llm_test = True
 
 
+def resume_llm_test_callback():
+    """Funzione di callback: riprende un'esecuzione interrotta"""
+    st.session_state.resume_llm_test = True
+
+
+def show_question_results(results):
+    """Mostra i risultati delle singole domande già completate."""
+    st.subheader("Risultati Dettagliati")
+    for q_id, result in results.items():
+        with st.expander(
+            f"Domanda: {result['question'][:50]}..."
+        ):
+            col1, col2 = st.columns(2)
+            with col1:
+                st.write("**Domanda:**", result['question'])
+                st.write("**Risposta Attesa:**", result['expected_answer'])
+            with col2:
+                st.write("**Risposta Generata:**", result['actual_answer'])
+                st.write("**Punteggio:**", f"{result['evaluation']['score']:.1f}%")
+                st.write("**Valutazione:**", result['evaluation']['explanation'])
+
+
+def show_job_progress(job_id):
+    """Mostra avanzamento e risultati del lavoro in background ``job_id``.
+
+    Restituisce ``True`` se il lavoro è ancora in corso.
+    """
+    job = get_job_status(job_id)
+    if job is None:
+        st.session_state.active_job_id = None
+        return False
+
+    add_section_title("Esecuzione in Corso" if job['is_active'] else "Ultima Esecuzione", icon="⏳")
+    if job['is_active']:
+        label = (
+            f"Domande completate: {job['completed']}/{job['total']}"
+            if job['total'] else "In attesa di avvio..."
+        )
+        st.progress(job['progress'], text=label)
+    elif job['status'] == "completed":
+        st.success(f"Test LLM completato! Punteggio medio: {job['avg_score']:.2f}%")
+        if not st.session_state.get('job_results_refreshed'):
+            st.session_state.results = load_results()
+            st.session_state.job_results_refreshed = True
+    else:
+        st.error(f"Esecuzione non riuscita: {job['error'] or 'errore sconosciuto'}")
+        if job['run_id']:
+            st.info("Le domande completate sono state salvate: puoi riprendere l'esecuzione qui sotto.")
+
+    if job['results']:
+        show_question_results(job['results'])
+    return job['is_active']
+
+
+def start_job(job_id):
+    """Registra ``job_id`` come esecuzione attiva della sessione."""
+    st.session_state.active_job_id = job_id
+    st.session_state.job_results_refreshed = False
+
+
 # @register_page("Esecuzione Test")
 def render():
     # === Inizializzazione delle variabili di stato ===
@@ -31,6 +105,10 @@ def render():
         st.session_state.mode_changed = False
     if 'run_llm_test' not in st.session_state:
         st.session_state.run_llm_test = False
+    if 'resume_llm_test' not in st.session_state:
+        st.session_state.resume_llm_test = False
+    if 'active_job_id' not in st.session_state:
+        st.session_state.active_job_id = None
 
     # Gestisce il cambio di modalità
     if st.session_state.mode_changed:
@@ -115,6 +193,80 @@ def render():
     if test_mode_selected == "Valutazione Automatica con LLM":
         st.header("Esecuzione: Valutazione Automatica con LLM")
 
+        bypass_cache = st.checkbox(
+            "Ignora cache delle risposte",
+            value=False,
+            key="bypass_response_cache",
+            help="Se selezionato, tutte le risposte vengono richieste nuovamente all'LLM "
+                 "anche se già presenti nella cache (usata solo per richieste con temperatura 0)."
+        )
+        evaluation_batch_size = int(st.number_input(
+            "Risposte valutate per richiesta",
+            min_value=1,
+            max_value=20,
+            value=1,
+            step=1,
+            key="evaluation_batch_size",
+            help="Con un valore maggiore di 1 più risposte vengono inviate insieme al modello "
+                 "valutatore, riducendo chiamate e token spesi per le istruzioni di valutazione. "
+                 "Le risposte non valutate correttamente vengono rivalutate singolarmente."
+        ))
+        use_async = st.checkbox(
+            "Esecuzione asincrona",
+            value=False,
+            key="use_async_execution",
+            help="Esegue le chiamate con i client asincroni su un event loop condiviso, "
+                 "adatto a preset con molte richieste parallele. Non si applica alla "
+                 "valutazione a lotti."
+        )
+
+        with st.expander("Valutazione a campione", expanded=False):
+            use_sampling = st.checkbox(
+                "Valuta solo un campione di domande",
+                value=False,
+                key="use_sampling",
+                help="Le domande vengono valutate in ordine casuale e il test si ferma "
+                     "quando l'intervallo di confidenza del punteggio medio è abbastanza "
+                     "stretto: utile per controlli rapidi su set di grandi dimensioni."
+            )
+            sampling_cols = st.columns(3)
+            with sampling_cols[0]:
+                ci_width = st.number_input(
+                    "Ampiezza massima IC (punti)",
+                    min_value=1.0,
+                    max_value=100.0,
+                    value=10.0,
+                    step=1.0,
+                    key="sampling_ci_width",
+                    disabled=not use_sampling,
+                )
+            with sampling_cols[1]:
+                max_questions = int(st.number_input(
+                    "Domande massime",
+                    min_value=2,
+                    value=max(2, min(len(questions_in_set), 200)),
+                    step=10,
+                    key="sampling_max_questions",
+                    disabled=not use_sampling,
+                ))
+            with sampling_cols[2]:
+                stratify = st.checkbox(
+                    "Stratifica per categoria",
+                    value=True,
+                    key="sampling_stratify",
+                    disabled=not use_sampling,
+                )
+        sampling = (
+            SamplingConfig(
+                ci_width=float(ci_width),
+                min_questions=min(30, max_questions),
+                max_questions=max_questions,
+                stratify=stratify,
+            )
+            if use_sampling
+            else None
+        )
+
         # Pulsante che utilizza la funzione di callback
         st.button(
             "🚀 Esegui Test con LLM",
@@ -138,33 +290,86 @@ def render():
             if not gen_preset_config or not eval_preset_config:
                 st.error("Assicurati di aver selezionato preset validi per generazione e valutazione.")
             else:
-                with st.spinner("Generazione risposte e valutazione LLM in corso..."):
-                    exec_result = run_test(
+                start_job(
+                    submit_test_run(
                         selected_set_id,
                         selected_set['name'],
                         questions_in_set,
                         gen_preset_config,
                         eval_preset_config,
+                        use_cache=not bypass_cache,
+                        evaluation_batch_size=evaluation_batch_size,
+                        sampling=sampling,
+                        use_async=use_async,
+                    )
+                )
+
+        job_running = False
+        if st.session_state.active_job_id:
+            job_running = show_job_progress(st.session_state.active_job_id)
+
+        # --- Ripresa delle esecuzioni interrotte ---
+        incomplete_runs = list_incomplete_runs()
+        if incomplete_runs:
+            add_section_title("Esecuzioni Interrotte", icon="⏸️")
+            run_options = {
+                run.id: (
+                    f"{run.created_at} - {run.set_name} "
+                    f"({len(run.question_ids)} domande, preset {run.generation_preset or 'N/A'})"
+                )
+                for run in incomplete_runs
+            }
+            selected_run_id = st.selectbox(
+                "Seleziona un'esecuzione da riprendere",
+                options=list(run_options.keys()),
+                format_func=lambda x: run_options[x],
+                key="select_run_to_resume",
+                help="Le domande già completate non vengono rieseguite."
+            )
+            st.button(
+                "▶️ Riprendi Esecuzione",
+                key="resume_llm_test_btn",
+                on_click=resume_llm_test_callback
+            )
+
+            if st.session_state.resume_llm_test:
+                st.session_state.resume_llm_test = False
+                run = next(r for r in incomplete_runs if r.id == selected_run_id)
+                # Usa i preset originali se ancora presenti, altrimenti quelli selezionati
+                gen_preset_config = get_preset_by_name(
+                    run.generation_preset or st.session_state.selected_generation_preset_name,
+                    st.session_state.api_presets,
+                ) or get_preset_by_name(
+                    st.session_state.selected_generation_preset_name,
+                    st.session_state.api_presets,
+                )
+                eval_preset_config = get_preset_by_name(
+                    run.evaluation_preset or st.session_state.selected_evaluation_preset_name,
+                    st.session_state.api_presets,
+                ) or get_preset_by_name(
+                    st.session_state.selected_evaluation_preset_name,
+                    st.session_state.api_presets,
+                )
+
+                if not gen_preset_config or not eval_preset_config:
+                    st.error("Preset non disponibili per riprendere l'esecuzione selezionata.")
+                else:
+                    start_job(
+                        submit_resume_run(
+                            selected_run_id,
+                            gen_preset_config,
+                            eval_preset_config,
+                            use_cache=not bypass_cache,
+                            evaluation_batch_size=evaluation_batch_size,
+                            use_async=use_async,
+                        )
                     )
+                    st.rerun()
 
-                if exec_result:
-                    st.session_state.results = exec_result['results_df']
-                    st.success(f"Test LLM completato! Punteggio medio: {exec_result['avg_score']:.2f}%")
-
-                    # Visualizzazione risultati dettagliati
-                    st.subheader("Risultati Dettagliati")
-                    for q_id, result in exec_result['results'].items():
-                        with st.expander(
-                            f"Domanda: {result['question'][:50]}..."
-                        ):
-                            col1, col2 = st.columns(2)
-                            with col1:
-                                st.write("**Domanda:**", result['question'])
-                                st.write("**Risposta Attesa:**", result['expected_answer'])
-                            with col2:
-                                st.write("**Risposta Generata:**", result['actual_answer'])
-                                st.write("**Punteggio:**", f"{result['evaluation']['score']:.1f}%")
-                                st.write("**Valutazione:**", result['evaluation']['explanation'])
+        # Aggiorna periodicamente la pagina finché il lavoro è in esecuzione
+        if job_running:
+            time.sleep(JOB_POLL_SECONDS)
+            st.rerun()
 
 
 if __name__ == "__main__":
@@ -1,11 +1,11 @@
 import logging
 
 import streamlit as st
-import pandas as pd
 
 from controllers import (
     add_question,
-    get_filtered_questions,
+    get_question_categories,
+    get_questions_page,
     load_questions,
     save_question_action,
     delete_question_action,
@@ -16,6 +16,9 @@ from views.style_utils import add_page_header
 from views.state_models import QuestionPageState
 logger = logging.getLogger(__name__)
 
+# Dimensioni di pagina selezionabili; la seconda è quella predefinita
+PAGE_SIZE_OPTIONS = [10, 25, 50, 100]
+
 
 # === FUNZIONI DI CALLBACK ===
 
@@ -45,12 +48,39 @@ def create_save_question_callback(
     return callback
 
 
+def _import_progress(uploaded_file):
+    """Restituisce la callback che aggiorna una barra di avanzamento dell'importazione.
+
+    La frazione completata è stimata dalla posizione di lettura nel file caricato.
+    """
+    bar = st.progress(0.0, text="Importazione in corso...")
+    size = getattr(uploaded_file, "size", None)
+
+    def report(processed, imported):
+        fraction = 0.0
+        if size:
+            try:
+                fraction = min(1.0, uploaded_file.tell() / size)
+            except (AttributeError, OSError, ValueError):
+                fraction = 0.0
+        bar.progress(
+            fraction,
+            text=f"Importazione in corso: {processed} righe elaborate, {imported} domande importate",
+        )
+
+    return report
+
+
 def import_questions_callback():
     uploaded_file = st.session_state.get("uploaded_file_content")
     state = QuestionPageState()
     try:
-        result = import_questions_action(uploaded_file)
-        st.session_state.questions = result["questions_df"]
+        result = import_questions_action(
+            uploaded_file,
+            progress=_import_progress(uploaded_file) if uploaded_file is not None else None,
+        )
+        if result["questions_df"] is not None:
+            st.session_state.questions = result["questions_df"]
         count = result.get("imported_count", 0)
         warnings = result.get("warnings", [])
 
@@ -76,6 +106,10 @@ def import_questions_callback():
     st.session_state.uploaded_file_content = None
 
 
+def change_questions_page(step):
+    st.session_state.questions_page = st.session_state.get("questions_page", 1) + step
+
+
 # === FUNZIONI DI DIALOGO ===
 
 @st.dialog("Conferma Eliminazione")
@@ -112,10 +146,6 @@ def render():
     st.session_state.setdefault("question_page_state", QuestionPageState())
     state: QuestionPageState = st.session_state.question_page_state
 
-    # Carica le domande utilizzando la cache solo se non già presenti
-    if "questions" not in st.session_state:
-        st.session_state.questions = load_questions()
-
     # Gestisce la logica di rerun
     if state.trigger_rerun:
         state.trigger_rerun = False
@@ -152,67 +182,119 @@ def render():
     with tabs[0]:
         st.header("Visualizza e Modifica Domande")
 
-        if 'questions' in st.session_state and not st.session_state.questions.empty:
-            _, categories = get_filtered_questions()
-            category_options = ["Tutte le categorie"] + categories
+        categories = get_question_categories()
+        category_options = ["Tutte le categorie"] + categories
 
+        filter_col, search_col, size_col = st.columns([2, 3, 1])
+        with filter_col:
             selected_category = st.selectbox(
                 "Filtra per categoria:",
                 options=category_options,
-                index=0
+                index=0,
+                key="questions_filter_category",
+            )
+        with search_col:
+            search = st.text_input(
+                "Cerca nel testo:",
+                key="questions_search",
+                placeholder="Parole della domanda, della risposta o della categoria...",
+            )
+        with size_col:
+            page_size = st.selectbox(
+                "Per pagina:",
+                options=PAGE_SIZE_OPTIONS,
+                index=1,
+                key="questions_page_size",
             )
 
-            filter_cat = None if selected_category == "Tutte le categorie" else selected_category
-            filtered_questions_df, _ = get_filtered_questions(filter_cat)
-
-            if not filtered_questions_df.empty:
-                for idx, row in filtered_questions_df.iterrows():
-                    category_display = row.get('categoria', 'N/A') if pd.notna(row.get('categoria')) else 'N/A'
-                    with st.expander(
-                        f"{row['domanda'][:100]}... (Categoria: {category_display})"
-                    ):
-                        col1, col2 = st.columns([3, 1])
-
-                        with col1:
-                            edited_question = st.text_area(
-                                f"Modifica Domanda {idx + 1}",
-                                value=row['domanda'],
-                                key=f"q_edit_{row['id']}"
-                            )
-
-                            edited_answer = st.text_area(
-                                f"Modifica Risposta Attesa {idx + 1}",
-                                value=row['risposta_attesa'],
-                                key=f"a_edit_{row['id']}"
-                            )
-
-                            edited_category_value = row.get('categoria', '')
-                            edited_category = st.text_input(
-                                f"Modifica Categoria {idx + 1}",
-                                value=edited_category_value,
-                                key=f"c_edit_{row['id']}"
-                            )
-
-                        with col2:
-                            st.button(
-                                "Salva Modifiche",
-                                key=f"save_{row['id']}",
-                                on_click=create_save_question_callback(
-                                    row['id'], edited_question, edited_answer, edited_category
-                                ),
-                            )
-
-                            if st.button(
-                                    "Elimina Domanda",
-                                    key=f"delete_{row['id']}",
-                                    type="secondary"
-                            ):
-                                confirm_delete_question_dialog(row['id'], row['domanda'])
-            else:
-                st.info(f"Nessuna domanda trovata per la categoria '{selected_category}'.")
+        filter_cat = None if selected_category == "Tutte le categorie" else selected_category
+        filters = (filter_cat, search, page_size)
+        if st.session_state.get("questions_filters") != filters:
+            # Con filtri diversi si riparte dalla prima pagina
+            st.session_state.questions_filters = filters
+            st.session_state.questions_page = 1
+
+        page_data = get_questions_page(
+            st.session_state.get("questions_page", 1), page_size, filter_cat, search
+        )
+        st.session_state.questions_page = page_data["page"]
+        page_df = page_data["questions_df"]
+        offset = (page_data["page"] - 1) * page_size
 
+        if page_data["total"] == 0:
+            if filter_cat is None and not search:
+                st.info("Nessuna domanda disponibile. Aggiungi domande utilizzando la scheda 'Aggiungi Domande'.")
+            else:
+                st.info("Nessuna domanda trovata con i filtri selezionati.")
         else:
-            st.info("Nessuna domanda disponibile. Aggiungi domande utilizzando la scheda 'Aggiungi Domande'.")
+            st.caption(
+                f"Domande {offset + 1}-{offset + len(page_df)} di {page_data['total']}"
+            )
+            for position, (_, row) in enumerate(page_df.iterrows(), start=offset + 1):
+                category_display = row.get('categoria') or 'N/A'
+                with st.expander(
+                    f"{row['domanda'][:100]}... (Categoria: {category_display})"
+                ):
+                    col1, col2 = st.columns([3, 1])
+
+                    with col1:
+                        edited_question = st.text_area(
+                            f"Modifica Domanda {position}",
+                            value=row['domanda'],
+                            key=f"q_edit_{row['id']}"
+                        )
+
+                        edited_answer = st.text_area(
+                            f"Modifica Risposta Attesa {position}",
+                            value=row['risposta_attesa'],
+                            key=f"a_edit_{row['id']}"
+                        )
+
+                        edited_category_value = row.get('categoria', '')
+                        edited_category = st.text_input(
+                            f"Modifica Categoria {position}",
+                            value=edited_category_value,
+                            key=f"c_edit_{row['id']}"
+                        )
+
+                    with col2:
+                        st.button(
+                            "Salva Modifiche",
+                            key=f"save_{row['id']}",
+                            on_click=create_save_question_callback(
+                                row['id'], edited_question, edited_answer, edited_category
+                            ),
+                        )
+
+                        if st.button(
+                                "Elimina Domanda",
+                                key=f"delete_{row['id']}",
+                                type="secondary"
+                        ):
+                            confirm_delete_question_dialog(row['id'], row['domanda'])
+
+            if page_data["page_count"] > 1:
+                prev_col, page_col, next_col = st.columns([1, 2, 1])
+                with prev_col:
+                    st.button(
+                        "◀ Precedente",
+                        key="questions_prev_page",
+                        disabled=page_data["page"] <= 1,
+                        on_click=change_questions_page,
+                        args=(-1,),
+                    )
+                with page_col:
+                    st.markdown(
+                        f"Pagina **{page_data['page']}** di **{page_data['page_count']}**"
+                    )
+                with next_col:
+                    st.button(
+                        "Successiva ▶",
+                        key="questions_next_page",
+                        disabled=page_data["page"] >= page_data["page_count"],
+                        on_click=change_questions_page,
+                        args=(1,),
+                    )
 
     # Scheda Aggiungi Domande
     with tabs[1]:
@@ -250,7 +332,8 @@ def render():
         st.header("Importa Domande da File")
 
         st.write("""
-        Carica un file CSV o JSON contenente domande, risposte attese e categorie (opzionale).
+        Carica un file CSV, JSON o JSONL contenente domande, risposte attese e categorie (opzionale).
+        I file vengono letti e salvati a blocchi, quindi è possibile importare anche archivi molto grandi.
 
         ### Formato File:
         - **CSV**: Deve includere le colonne 'domanda' e 'risposta_attesa'.
@@ -259,6 +342,7 @@ def render():
         - **JSON**: Deve contenere un array di oggetti con i campi 'domanda' e 'risposta_attesa'.
           Può includere opzionalmente 'categoria'.
           (Se usi i vecchi nomi 'question' e 'expected_answer', verranno convertiti automaticamente).
+        - **JSONL**: Un oggetto JSON per riga, con gli stessi campi del formato JSON.
 
         ### Esempio CSV:
         ```csv
@@ -290,7 +374,7 @@ def render():
         """)
 
         uploaded_file = st.file_uploader(
-            "Scegli un file", type=["csv", "json"], key="upload_questions_file"
+            "Scegli un file", type=["csv", "json", "jsonl"], key="upload_questions_file"
         )
 
         if uploaded_file is not None:
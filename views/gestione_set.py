@@ -332,6 +332,9 @@ def render():
         Matematica Base,4,Quanto fa 10*4?,40,Matematica
         ```
 
+        ### Formato JSONL:
+        Un set per riga, con gli stessi campi ``name`` e ``questions`` del formato JSON.
+
         ### Note Importanti:
         - Se una domanda con lo stesso ID esiste già, non verrà aggiunta nuovamente
         - Se un set con lo stesso nome esiste già, verrà saltato
@@ -340,7 +343,7 @@ def render():
         """)
 
         uploaded_file = st.file_uploader(
-            "Scegli un file", type=["json", "csv"], key="upload_set_file"
+            "Scegli un file", type=["json", "jsonl", "csv"], key="upload_set_file"
         )
 
         if uploaded_file is not None:
@@ -1,4 +1,5 @@
 import logging
+import os
 
 import streamlit as st
 import pandas as pd
@@ -8,17 +9,83 @@ import plotly.graph_objects as go
 
 from controllers import (
     import_results_action,
-    calculate_statistics,
+    export_results_file,
     load_sets,
-    get_results,
-    list_set_names,
-    list_model_names,
-    prepare_select_options,
+    get_result_summaries,
+    get_results_by_ids,
+    get_result_statistics,
+    list_result_set_names,
+    list_result_model_names,
+    prepare_summary_options,
 )
 # from views import register_page
 from views.style_utils import add_page_header, add_section_title
 logger = logging.getLogger(__name__)
 
+# Formati disponibili per l'esportazione di tutti i risultati
+EXPORT_EXTENSIONS = (".json", ".jsonl", ".csv", ".parquet", ".arrow")
+EXPORT_MIME_TYPES = {
+    "json": "application/json",
+    "jsonl": "application/jsonl",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+
+PAGE_SIZE_OPTIONS = [10, 25, 50, 100]
+# Ordinamenti del selettore dei risultati: colonna e ordine decrescente
+SORT_OPTIONS = {
+    "Più recenti": ("timestamp", True),
+    "Meno recenti": ("timestamp", False),
+    "Punteggio più alto": ("avg_score", True),
+    "Punteggio più basso": ("avg_score", False),
+    "Modello": ("generation_llm", False),
+}
+
+
+def change_results_page(step):
+    st.session_state.results_page = st.session_state.get("results_page", 1) + step
+
+
+def _question_scores(questions_results, label_type):
+    """Punteggi per domanda per il grafico a barre."""
+    rows = []
+    for q_data in questions_results.values():
+        label = q_data.get("question", "Domanda")
+        label = label[:50] + "..." if len(label) > 50 else label
+        score = (q_data.get("evaluation") or {}).get("score", 0)
+        rows.append({"Domanda": label, "Punteggio": score, "Tipo": label_type})
+    return rows
+
+
+def _score_distribution(stats, label_type):
+    percentiles = stats["percentiles"]
+    return {
+        "Risultato": label_type,
+        "Deviazione standard": stats["score_std"],
+        "Minimo": stats["score_min"],
+        "25° percentile": percentiles[25],
+        "Mediana": percentiles[50],
+        "75° percentile": percentiles[75],
+        "90° percentile": percentiles[90],
+        "Massimo": stats["score_max"],
+    }
+
+
+def _category_rows(stats, label_type):
+    return [
+        {
+            "Categoria": category,
+            "Risultato": label_type,
+            "Domande": values["count"],
+            "Punteggio medio": values["avg_score"],
+            "Somiglianza": values["avg_similarity"],
+            "Correttezza": values["avg_correctness"],
+            "Completezza": values["avg_completeness"],
+        }
+        for category, values in stats["category_stats"].items()
+    ]
+
 
 # @register_page("Visualizzazione Risultati")
 def render():
@@ -28,13 +95,6 @@ def render():
         description="Analizza e visualizza i risultati dettagliati delle valutazioni dei test eseguiti."
     )
 
-    # Carica i risultati utilizzando la cache
-    if 'results' not in st.session_state:
-        st.session_state.results = get_results(None, None)
-    if st.session_state.results.empty:
-        st.warning("Nessun risultato di test disponibile. Esegui prima alcuni test dalla pagina 'Esecuzione Test'.")
-        st.stop()
-
     # Carica i set di domande utilizzando la cache
     if 'question_sets' not in st.session_state:
         st.session_state.question_sets = load_sets()
@@ -61,13 +121,14 @@ def render():
             and st.session_state.uploaded_results_file is not None
         ):
             try:
-                results_df, message = import_results_action(
+                _, message = import_results_action(
                     st.session_state.uploaded_results_file
                 )
                 st.session_state.import_results_message = message
                 st.session_state.import_results_success = True
                 st.session_state.import_results_error = False
-                st.session_state.results = results_df
+                # I nuovi risultati compaiono dalla prima pagina
+                st.session_state.results_page = 1
             except Exception as exc:  # noqa: BLE001
                 st.session_state.import_results_message = str(exc)
                 st.session_state.import_results_success = False
@@ -76,8 +137,11 @@ def render():
         st.session_state.upload_results = None
 
     # Filtri per Set e Modello LLM
-    all_set_names = list_set_names(st.session_state.results, st.session_state.question_sets)
-    all_model_names = list_model_names(st.session_state.results)
+    all_set_names = list_result_set_names(st.session_state.question_sets)
+    if not all_set_names:
+        st.warning("Nessun risultato di test disponibile. Esegui prima alcuni test dalla pagina 'Esecuzione Test'.")
+        st.stop()
+    all_model_names = list_result_model_names()
 
     selected_set_filter = st.selectbox(
         "Filtra per Set",
@@ -93,13 +157,43 @@ def render():
         key="filter_model_name"
     )
 
-    filtered_results_df = get_results(
-        None if selected_set_filter == "Tutti" else selected_set_filter,
-        None if selected_model_filter == "Tutti" else selected_model_filter,
+    sort_col, size_col = st.columns([3, 1])
+    with sort_col:
+        sort_option = st.selectbox(
+            "Ordina per",
+            options=list(SORT_OPTIONS.keys()),
+            index=0,
+            key="results_sort",
+        )
+    with size_col:
+        page_size = st.selectbox(
+            "Per pagina:",
+            options=PAGE_SIZE_OPTIONS,
+            index=1,
+            key="results_page_size",
+        )
+
+    filter_set = None if selected_set_filter == "Tutti" else selected_set_filter
+    filter_model = None if selected_model_filter == "Tutti" else selected_model_filter
+    filters = (filter_set, filter_model, sort_option, page_size)
+    if st.session_state.get("results_filters") != filters:
+        # Con filtri o ordinamento diversi si riparte dalla prima pagina
+        st.session_state.results_filters = filters
+        st.session_state.results_page = 1
+
+    sort_by, descending = SORT_OPTIONS[sort_option]
+    page_data = get_result_summaries(
+        filter_set,
+        filter_model,
+        page=st.session_state.get("results_page", 1),
+        page_size=page_size,
+        sort_by=sort_by,
+        descending=descending,
     )
+    st.session_state.results_page = page_data["page"]
 
-    result_options = prepare_select_options(
-        filtered_results_df, st.session_state.question_sets
+    result_options = prepare_summary_options(
+        page_data["summaries_df"], st.session_state.question_sets
     )
 
     # Seleziona il risultato da visualizzare
@@ -121,14 +215,48 @@ def render():
         index=0,
         key="select_test_result_compare"
     )
+
+    if page_data["page_count"] > 1:
+        prev_col, page_col, next_col = st.columns([1, 2, 1])
+        with prev_col:
+            st.button(
+                "◀ Precedente",
+                key="results_prev_page",
+                disabled=page_data["page"] <= 1,
+                on_click=change_results_page,
+                args=(-1,),
+            )
+        with page_col:
+            st.markdown(
+                f"Pagina **{page_data['page']}** di **{page_data['page_count']}** "
+                f"({page_data['total']} risultati)"
+            )
+        with next_col:
+            st.button(
+                "Successiva ▶",
+                key="results_next_page",
+                disabled=page_data["page"] >= page_data["page_count"],
+                on_click=change_results_page,
+                args=(1,),
+            )
+
     if not selected_result_id:
         st.info("Nessun risultato selezionato o disponibile.")
         st.stop()
 
+    # Il JSON completo viene caricato solo per i risultati visualizzati
+    viewed_results_df = get_results_by_ids(
+        [selected_result_id] + ([compare_result_id] if compare_result_id else [])
+    )
+    # Statistiche materializzate al salvataggio dei risultati
+    viewed_stats = get_result_statistics(viewed_results_df)
+
     # Ottieni i dati del risultato selezionato
-    selected_result_row = filtered_results_df[
-        filtered_results_df['id'] == selected_result_id
-    ].iloc[0]
+    selected_rows = viewed_results_df[viewed_results_df['id'] == selected_result_id]
+    if selected_rows.empty:
+        st.info("Il risultato selezionato non è più disponibile.")
+        st.stop()
+    selected_result_row = selected_rows.iloc[0]
     result_data = selected_result_row['results']
     set_name_map = {
         str(row['id']): row['name']
@@ -140,12 +268,14 @@ def render():
     with st.expander("Esporta/Importa Risultati"):
         col_exp, col_imp = st.columns(2)
         with col_exp:
-            selected_json = json.dumps({
-                'id': selected_result_row['id'],
-                'set_id': selected_result_row['set_id'],
-                'timestamp': selected_result_row['timestamp'],
-                'results': result_data
-            }, indent=2)
+            def selected_json():
+                return json.dumps({
+                    'id': selected_result_row['id'],
+                    'set_id': selected_result_row['set_id'],
+                    'timestamp': selected_result_row['timestamp'],
+                    'results': result_data
+                }, indent=2)
+
             selected_filename = st.text_input(
                 "Nome file per export risultato selezionato",
                 value=f"result_{selected_result_row['id']}.json",
@@ -153,6 +283,7 @@ def render():
             )
             if selected_filename and not selected_filename.endswith(".json"):
                 selected_filename += ".json"
+            # Il contenuto viene generato solo al click sul pulsante
             st.download_button(
                 "Export Risultato Selezionato",
                 selected_json,
@@ -161,22 +292,26 @@ def render():
             )
 
             all_filename = st.text_input(
-                "Nome file per export tutti i risultati",
+                "Nome file per export tutti i risultati (.json, .jsonl, .csv, .parquet o .arrow)",
                 value="all_results.json",
                 key="all_results_filename",
             )
-            if all_filename and not all_filename.endswith(".json"):
+            if all_filename and not all_filename.endswith(EXPORT_EXTENSIONS):
                 all_filename += ".json"
-            all_json = json.dumps(st.session_state.results.to_dict(orient="records"), indent=2)
+            all_format = os.path.splitext(all_filename)[1].lstrip(".") or "json"
             st.download_button(
                 "Export Tutti i Risultati",
-                all_json,
+                lambda: export_results_file(all_format),
                 file_name=all_filename,
-                mime="application/json"
+                mime=EXPORT_MIME_TYPES.get(all_format, "application/json")
             )
 
         with col_imp:
-            uploaded_file = st.file_uploader("Seleziona file JSON", type=["json"], key="upload_results")
+            uploaded_file = st.file_uploader(
+                "Seleziona file JSON, JSONL, Parquet o Arrow",
+                type=["json", "jsonl", "parquet", "arrow"],
+                key="upload_results",
+            )
             if uploaded_file is not None:
                 st.session_state.uploaded_results_file = uploaded_file
             st.button(
@@ -189,10 +324,13 @@ def render():
     compare_result_row = None
     compare_result_data = None
     compare_questions_results = {}
-    if compare_result_id:
-        compare_result_row = filtered_results_df[
-            filtered_results_df['id'] == compare_result_id
-        ].iloc[0]
+    compare_rows = (
+        viewed_results_df[viewed_results_df['id'] == compare_result_id]
+        if compare_result_id
+        else viewed_results_df.iloc[0:0]
+    )
+    if not compare_rows.empty:
+        compare_result_row = compare_rows.iloc[0]
         compare_result_data = compare_result_row['results']
         compare_questions_results = compare_result_data.get('questions', {})
 
@@ -205,6 +343,23 @@ def render():
     st.markdown(f"**ID Risultato:** `{selected_result_id}`")
     st.markdown(f"**Eseguito il:** {selected_result_row['timestamp']}")
     st.markdown(f"**Metodo di Valutazione:** {method_icon} **{method_desc}**")
+    if result_data.get('status') == 'partial':
+        st.warning(
+            f"⏸️ Esecuzione parziale: completate {result_data.get('completed_questions', 0)} "
+            f"domande su {result_data.get('total_questions', 0)}. "
+            "Puoi riprenderla dalla pagina 'Esecuzione Test'."
+        )
+    sampling = result_data.get('sampling')
+    if sampling:
+        st.info(
+            f"🎲 Valutazione a campione: {sampling.get('sample_size', 0)} domande su "
+            f"{sampling.get('population_size', 0)}. Intervallo di confidenza al "
+            f"{sampling.get('confidence', 0.95):.0%} del punteggio medio: "
+            f"[{sampling.get('ci_low', 0):.1f}%, {sampling.get('ci_high', 0):.1f}%]"
+            + (" (interrotta in anticipo)" if sampling.get('stopped_early') else "")
+            + (" (campione incompleto: alcuni blocchi non hanno prodotto risultati)"
+               if sampling.get('incomplete') else "")
+        )
 
     if 'generation_llm' in result_data:
         st.markdown(f"**LLM Generazione Risposte:** `{result_data['generation_llm']}`")
@@ -220,10 +375,10 @@ def render():
     # Metriche Generali del Test
     add_section_title("Metriche Generali del Test", icon="📈")
 
-    if questions_results:
-        stats = calculate_statistics(questions_results)
+    stats = viewed_stats.get(str(selected_result_id))
+    if questions_results and stats:
         avg_score_overall = stats["avg_score"]
-        num_questions = len(stats["per_question_scores"])
+        num_questions = stats["question_count"]
 
         cols_metrics = st.columns(2)
         with cols_metrics[0]:
@@ -231,9 +386,12 @@ def render():
         with cols_metrics[1]:
             st.metric("Numero di Domande Valutate", num_questions)
 
-        compare_stats = None
-        if compare_result_row is not None:
-            compare_stats = calculate_statistics(compare_questions_results)
+        compare_stats = (
+            viewed_stats.get(str(compare_result_id))
+            if compare_result_row is not None
+            else None
+        )
+        if compare_stats:
             compare_avg = compare_stats["avg_score"]
             diff_avg = compare_avg - avg_score_overall
             st.markdown("### Confronto")
@@ -242,16 +400,9 @@ def render():
             cols_cmp[1].metric("Punteggio Confronto", f"{compare_avg:.2f}%")
             cols_cmp[2].metric("Differenza", f"{diff_avg:+.2f}%")
 
-        scores_data = []
-        for item in stats["per_question_scores"]:
-            label = item["question"]
-            label = label[:50] + "..." if len(label) > 50 else label
-            scores_data.append({"Domanda": label, "Punteggio": item["score"], "Tipo": "Selezionato"})
+        scores_data = _question_scores(questions_results, "Selezionato")
         if compare_stats:
-            for item in compare_stats["per_question_scores"]:
-                label = item["question"]
-                label = label[:50] + "..." if len(label) > 50 else label
-                scores_data.append({"Domanda": label, "Punteggio": item["score"], "Tipo": "Confronto"})
+            scores_data += _question_scores(compare_questions_results, "Confronto")
 
         if scores_data:
             df_scores = pd.DataFrame(scores_data)
@@ -315,6 +466,19 @@ def render():
                 cols_cmp[0].metric("Somiglianza (Confronto)", f"{crm['similarity']:.2f}%")
                 cols_cmp[1].metric("Correttezza (Confronto)", f"{crm['correctness']:.2f}%")
                 cols_cmp[2].metric("Completezza (Confronto)", f"{crm['completeness']:.2f}%")
+
+            st.subheader("Distribuzione dei punteggi")
+            distribution = [_score_distribution(stats, "Selezionato")]
+            if compare_stats:
+                distribution.append(_score_distribution(compare_stats, "Confronto"))
+            st.dataframe(pd.DataFrame(distribution).set_index("Risultato"))
+
+            if stats["category_stats"]:
+                st.subheader("Punteggi per categoria")
+                category_rows = _category_rows(stats, "Selezionato")
+                if compare_stats:
+                    category_rows += _category_rows(compare_stats, "Confronto")
+                st.dataframe(pd.DataFrame(category_rows))
     else:
         st.info("Nessun dettaglio per le domande disponibile in questo risultato.")
 